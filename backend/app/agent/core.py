@@ -1,5 +1,7 @@
 from openai import AsyncOpenAI
+import openai
 from typing import AsyncGenerator, Dict, Any, List, Optional
+import inspect
 import json
 import logging
 import time
@@ -8,20 +10,32 @@ from app.agent.tools import TOOLS_REGISTRY
 from app.agent.prompts import SYSTEM_PROMPT
 from app.services.agent_service import AgentService
 from app.services.redis_service import RedisPubSubService
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import RetryPolicy, resilient_call
 from app.database import get_db
 from app.schemas.agent import AgentLogBase
 
 logger = logging.getLogger(__name__)
 
+# 模型调用中可重试且计入熔断的临时错误
+LLM_TRANSIENT_ERRORS = (
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    openai.RateLimitError,
+)
+
 
 class PPTAgent:
     """PPT 生成 Agent 核心"""
 
     def __init__(self, redis_service: Optional[RedisPubSubService] = None, conversation_id: Optional[str] = None):
+        # 重试由 RetryPolicy 统一处理，关闭SDK自带重试以便熔断器看到每次失败
         self.client = AsyncOpenAI(
             api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL
+            base_url=settings.OPENAI_BASE_URL,
+            max_retries=0
         )
+        self.llm_retry = RetryPolicy("llm", settings.LLM_MAX_ATTEMPTS, retry_on=LLM_TRANSIENT_ERRORS)
         self.model = settings.OPENAI_MODEL
         self.tools = self._register_tools()
         self.redis_service = redis_service
@@ -49,7 +63,7 @@ class PPTAgent:
                             },
                             "rank": {
                                 "type": "boolean",
-                                "description": "是否使用AI排序",
+                                "description": "是否按相关性和画布适配度排序，只返回最佳的几张",
                                 "default": True
                             }
                         },
@@ -84,16 +98,28 @@ class PPTAgent:
                 "type": "function",
                 "function": {
                     "name": "visit_page",
-                    "description": "访问网页获取详细内容",
+                    "description": "访问网页，返回与关注点最相关的段落；不提供focus时按顺序分页读取。返回的handle可用于继续读取同一页面",
                     "parameters": {
                         "type": "object",
                         "properties": {
                             "url": {
                                 "type": "string",
                                 "description": "要访问的网页URL"
+                            },
+                            "focus": {
+                                "type": "string",
+                                "description": "需要从页面中查找的信息（问题或关键词）；只提供focus时在已访问的所有页面中检索"
+                            },
+                            "handle": {
+                                "type": "string",
+                                "description": "之前返回的页面句柄，用于继续读取而不重新下载"
+                            },
+                            "offset": {
+                                "type": "integer",
+                                "description": "按顺序读取时的起始段落（使用上次返回的next_offset）",
+                                "default": 0
                             }
-                        },
-                        "required": ["url"]
+                        }
                     }
                 }
             },
@@ -132,6 +158,32 @@ class PPTAgent:
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "insert_pages",
+                    "description": "一次插入多个新页面（生成多页时优先使用）",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "pages": {
+                                "type": "array",
+                                "description": "要插入的页面列表",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "index": {"type": "integer", "description": "插入位置"},
+                                        "html": {"type": "string", "description": "页面HTML代码"}
+                                    },
+                                    "required": ["index", "html"]
+                                }
+                            },
+                            "action_description": {"type": "string", "description": "操作描述"}
+                        },
+                        "required": ["pages", "action_description"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -148,6 +200,48 @@ class PPTAgent:
                     }
                 }
             },
+            {
+                "type": "function",
+                "function": {
+                    "name": "patch_page",
+                    "description": "局部修改现有页面：按CSS选择器修改文字、属性、样式或增删元素。小改动优先使用本工具，无需重新输出整页HTML",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer", "description": "页面索引"},
+                            "operations": {
+                                "type": "array",
+                                "description": "按顺序执行的修改操作，任一操作失败则整体不生效",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "op": {
+                                            "type": "string",
+                                            "enum": ["set_text", "set_attr", "set_style", "replace_html", "insert_html", "remove"],
+                                            "description": "操作类型"
+                                        },
+                                        "selector": {"type": "string", "description": "CSS选择器，例如 'h2' 或 '.content-block p:nth-of-type(2)'"},
+                                        "all": {"type": "boolean", "description": "是否作用于全部匹配元素，默认只修改第一个"},
+                                        "text": {"type": "string", "description": "set_text 的新文本"},
+                                        "name": {"type": "string", "description": "set_attr 的属性名"},
+                                        "property": {"type": "string", "description": "set_style 的CSS属性名"},
+                                        "value": {"type": "string", "description": "set_attr/set_style 的新值，省略则删除"},
+                                        "html": {"type": "string", "description": "replace_html/insert_html 的HTML片段"},
+                                        "position": {
+                                            "type": "string",
+                                            "enum": ["before", "after", "prepend", "append"],
+                                            "description": "insert_html 的插入位置"
+                                        }
+                                    },
+                                    "required": ["op", "selector"]
+                                }
+                            },
+                            "action_description": {"type": "string", "description": "操作描述"}
+                        },
+                        "required": ["index", "operations", "action_description"]
+                    }
+                }
+            },
             {
                 "type": "function",
                 "function": {
@@ -433,14 +527,13 @@ class PPTAgent:
                 {"role": "user", "content": user_message}
             ]
 
-            # 调用 OpenAI API
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=self.tools,
-                tool_choice="auto",
-                stream=True,
-                temperature=0.7
+            # 调用 OpenAI API（临时错误重试 + 熔断）
+            response = await resilient_call(
+                "llm",
+                self._create_completion,
+                messages,
+                retry=self.llm_retry,
+                failure_exceptions=LLM_TRANSIENT_ERRORS
             )
 
             current_tool_call = None
@@ -518,11 +611,16 @@ class PPTAgent:
                     if hasattr(choice, 'finish_reason') and choice.finish_reason == "tool_calls" and current_tool_call:
                         # 执行工具
                         start_time = time.time()
-                        tool_result = await self._execute_tool(
-                            current_tool_call["name"],
-                            json.loads(current_tool_call["arguments"]),
-                            project_id
-                        )
+                        try:
+                            tool_result = await self._execute_tool(
+                                current_tool_call["name"],
+                                json.loads(current_tool_call["arguments"]),
+                                project_id,
+                                conversation_id or self.conversation_id
+                            )
+                        except Exception as e:
+                            logger.error(f"Tool {current_tool_call['name']} failed: {e}")
+                            tool_result = {"success": False, "error": str(e)}
                         execution_time = time.time() - start_time
 
                         # think工具的结果不显示给用户，但需要在think后向用户说明下一步行动
@@ -616,18 +714,37 @@ class PPTAgent:
 
         return conversation_history
 
+    async def _create_completion(self, messages: List[Dict]):
+        """创建流式补全（与所有Worker共享模型调用预算，超出时排队）"""
+        await rate_limiter.acquire("llm", settings.OPENAI_API_KEY)
+        return await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            tools=self.tools,
+            tool_choice="auto",
+            stream=True,
+            temperature=0.7
+        )
+
     async def _execute_tool(
         self,
         tool_name: str,
         arguments: Dict,
-        project_id: str
+        project_id: str,
+        conversation_id: Optional[str] = None
     ) -> Any:
         """执行工具调用"""
         tool_func = TOOLS_REGISTRY.get(tool_name)
         if not tool_func:
             raise ValueError(f"Unknown tool: {tool_name}")
 
+        # 需要按对话隔离状态或推送对话事件的工具（如网页段落索引、缩略图就绪通知）额外传入对话ID
+        if "conversation_id" in inspect.signature(tool_func).parameters:
+            arguments = {**arguments, "conversation_id": conversation_id}
+
         logger.info(f"Executing tool: {tool_name} with args: {arguments}")
+        # 工具自身捕获异常并返回 {"success": False}，搜索提供方带有熔断，HTTP请求带有重试，
+        # 这里不再包一层工具级熔断：能抛到这里的只有模型传错参数，不应计入故障或重试
         result = await tool_func(project_id=project_id, **arguments)
         logger.info(f"Tool {tool_name} result: {result}")
 
@@ -184,6 +184,7 @@ think工具是详细计划、决策过程或对当前状态以及下一步做什
 1. **尺寸/画布大小**
 - 幻灯片CSS应具有固定的1280px宽度和最小720px高度，以正确处理垂直内容溢出。不要将高度设置为固定值。
 - 请尝试将关键点适配在720px高度内。这意味着你不应该添加太多内容或盒子。
+- 项目共享主题（CSS变量 --theme-background/--theme-primary/--theme-accent/--theme-font、字体和图标库链接、页面尺寸）会在渲染时统一注入。页面可以只输出<body>；即使输出了<head>，与其他页面重复的链接和样式规则也会被自动去重。
 - 使用图表库时，确保图表或其容器具有高度约束配置。例如，如果在Chart.js中设置maintainAspectRatio为false，请为其容器添加高度。
 2. 不要截断任何模块或块的内容。如果内容超过允许的区域，尽可能完整地显示每块的内容，并清楚地指示内容是否部分显示（例如，使用省略号或"更多"指示符），而不是裁剪项目的一部分。
 3. 请忽略所有base64格式的图像，以避免使HTML文件过大。
@@ -4,7 +4,9 @@ from .visit_page import visit_page
 from .ppt_operations import (
     initialize_design,
     insert_page,
+    insert_pages,
     update_page,
+    patch_page,
     remove_pages
 )
 from .think import think
@@ -15,7 +17,9 @@ TOOLS_REGISTRY = {
     "visit_page": visit_page,
     "initialize_design": initialize_design,
     "insert_page": insert_page,
+    "insert_pages": insert_pages,
     "update_page": update_page,
+    "patch_page": patch_page,
     "remove_pages": remove_pages,
     "think": think
 }
@@ -26,7 +30,9 @@ __all__ = [
     "visit_page",
     "initialize_design",
     "insert_page",
+    "insert_pages",
     "update_page",
+    "patch_page",
     "remove_pages",
     "think",
     "TOOLS_REGISTRY"
@@ -1,9 +1,13 @@
 from typing import List, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
-from app.models.slide import Slide
+from app.database import async_session_maker
 from app.models.project import Project, ProjectStatus
 from app.services.slide_service import SlideService
+from app.services.asset_service import AssetService
+from app.services.revision_service import RevisionService
+from app.services.theme_service import ThemeService
+from app.services.thumbnail_service import ThumbnailService
+from app.utils.html_patcher import HTMLPatcher
+from app.utils.html_processor import HTMLProcessor
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,7 +38,7 @@ async def initialize_design(
         操作结果
     """
     try:
-        async with get_db() as db:
+        async with async_session_maker() as db:
             project = await db.get(Project, project_id)
             if not project:
                 raise ValueError(f"Project {project_id} not found")
@@ -68,7 +72,8 @@ async def insert_page(
     index: int,
     html: str,
     action_description: str,
-    project_id: str
+    project_id: str,
+    conversation_id: str = None
 ) -> Dict[str, Any]:
     """
     插入新页面
@@ -78,33 +83,36 @@ async def insert_page(
         html: 页面HTML代码
         action_description: 操作描述
         project_id: 项目ID
+        conversation_id: 对话ID（缩略图就绪后通过该对话的SSE通知）
 
     Returns:
         操作结果
     """
     try:
-        async with get_db() as db:
+        async with async_session_maker() as db:
             # 检查项目是否存在
             project = await db.get(Project, project_id)
             if not project:
                 raise ValueError(f"Project {project_id} not found")
 
-            # 创建新页面
-            slide = Slide(
-                project_id=project_id,
-                index=index,
-                html_content=html
-            )
+            # 外部图片入库并改写为本地地址
+            html, assets = await AssetService.ingest_images(db, project.id, html)
+            # 公共head部分并入项目主题，页面只保存<body>
+            html, = await ThemeService.absorb_pages(db, project.id, [html])
 
-            db.add(slide)
+            # 创建新页面（插入到index之前，后续页面的序号自动后移）
+            slide = await SlideService.insert_slide(db, project.id, int(index), html)
+            await AssetService.attach_assets(db, slide, assets)
+            await RevisionService.record_revision(db, slide, "insert_page")
             await db.commit()
-            await db.refresh(slide)
+            await ThumbnailService.schedule([slide.id], conversation_id)
 
-            logger.info(f"Inserted slide at index {index} for project {project_id}")
+            logger.info(f"Inserted slide at index {slide.index} for project {project_id}")
             return {
                 "success": True,
                 "slide_id": str(slide.id),
-                "index": index
+                "index": slide.index,
+                "localized_images": len(assets)
             }
 
     except Exception as e:
@@ -112,11 +120,71 @@ async def insert_page(
         return {"success": False, "error": str(e)}
 
 
+async def insert_pages(
+    pages: List[Dict[str, Any]],
+    action_description: str,
+    project_id: str,
+    conversation_id: str = None
+) -> Dict[str, Any]:
+    """
+    批量插入多个页面（一次事务）
+
+    Args:
+        pages: 页面列表 [{"index": 插入位置, "html": 页面HTML代码}, ...]
+        action_description: 操作描述
+        project_id: 项目ID
+        conversation_id: 对话ID（缩略图就绪后通过该对话的SSE通知）
+
+    Returns:
+        操作结果（包含每个页面的ID）
+    """
+    try:
+        if not pages:
+            raise ValueError("pages must not be empty")
+
+        async with async_session_maker() as db:
+            # 检查项目是否存在
+            project = await db.get(Project, project_id)
+            if not project:
+                raise ValueError(f"Project {project_id} not found")
+
+            # 所有页面的外部图片一起入库并改写为本地地址
+            htmls, page_assets = await AssetService.ingest_images_batch(
+                db, project.id, [page["html"] for page in pages]
+            )
+            htmls = await ThemeService.absorb_pages(db, project.id, htmls)
+
+            slides = await SlideService.bulk_create_slides(
+                db,
+                project.id,
+                [{"index": int(page["index"]), "html_content": html} for page, html in zip(pages, htmls)]
+            )
+            for slide, assets in zip(slides, page_assets):
+                db.add_all(AssetService.build_assets(slide, assets))
+            await RevisionService.record_revisions(db, slides, "insert_pages")
+            await db.commit()
+            await ThumbnailService.schedule([slide.id for slide in slides], conversation_id)
+
+            logger.info(f"Inserted {len(slides)} slides for project {project_id}")
+            return {
+                "success": True,
+                "slides": [
+                    {"slide_id": str(slide.id), "index": slide.index, "localized_images": len(assets)}
+                    for slide, assets in zip(slides, page_assets)
+                ]
+            }
+
+    except Exception as e:
+        logger.error(f"Insert pages error: {e}", exc_info=True)
+        return {"success": False, "error": str(e)}
+
+
 async def update_page(
     index: int,
     html: str,
     action_description: str,
-    project_id: str
+    project_id: str,
+    conversation_id: str = None
 ) -> Dict[str, Any]:
     """
     更新现有页面
@@ -126,34 +194,37 @@ async def update_page(
         html: 更新后的HTML代码
         action_description: 操作描述
         project_id: 项目ID
+        conversation_id: 对话ID（缩略图就绪后通过该对话的SSE通知）
 
     Returns:
         操作结果
     """
     try:
-        async with get_db() as db:
+        async with async_session_maker() as db:
             # 查找页面
-            from sqlalchemy import select
-            result = await db.execute(
-                select(Slide).where(
-                    Slide.project_id == project_id,
-                    Slide.index == index
-                )
-            )
-            slide = result.scalar_one_or_none()
+            slide = await SlideService.get_slide_by_index(db, project_id, int(index))
 
             if not slide:
                 raise ValueError(f"Slide at index {index} not found")
 
+            # 外部图片入库并改写为本地地址
+            html, assets = await AssetService.ingest_images(db, slide.project_id, html)
+            # 重写已有页面不累计规则出现次数
+            html, = await ThemeService.absorb_pages(db, slide.project_id, [html], count_rules=False)
+
             # 更新内容
             slide.html_content = html
+            await AssetService.attach_assets(db, slide, assets)
+            await RevisionService.record_revision(db, slide, "update_page")
             await db.commit()
+            await ThumbnailService.schedule([slide.id], conversation_id)
 
             logger.info(f"Updated slide at index {index} for project {project_id}")
             return {
                 "success": True,
                 "slide_id": str(slide.id),
-                "index": index
+                "index": index,
+                "localized_images": len(assets)
             }
 
     except Exception as e:
@@ -161,6 +232,59 @@ async def update_page(
         return {"success": False, "error": str(e)}
 
 
+async def patch_page(
+    index: int,
+    operations: List[Dict[str, Any]],
+    action_description: str,
+    project_id: str,
+    conversation_id: str = None
+) -> Dict[str, Any]:
+    """
+    局部修改现有页面（按CSS选择器在服务端修改HTML，无需重新生成整页）
+
+    Args:
+        index: 页面索引
+        operations: 补丁操作列表（见 HTMLPatcher.apply）
+        action_description: 操作描述
+        project_id: 项目ID
+        conversation_id: 对话ID（缩略图就绪后通过该对话的SSE通知）
+
+    Returns:
+        操作结果（只包含每个操作的变更摘要，不返回整页HTML）
+    """
+    try:
+        async with async_session_maker() as db:
+            slide = await SlideService.get_slide_by_index(db, project_id, int(index))
+            if not slide:
+                raise ValueError(f"Slide at index {index} not found")
+
+            html, changes = HTMLPatcher.apply(slide.html_content, operations)
+            if not HTMLProcessor.validate_html_structure(html):
+                raise ValueError("Patched HTML has no elements left")
+
+            # 新插入的外部图片入库并改写为本地地址
+            html, assets = await AssetService.ingest_images(db, slide.project_id, html)
+
+            slide.html_content = html
+            await AssetService.attach_assets(db, slide, assets)
+            await RevisionService.record_revision(db, slide, "patch_page")
+            await db.commit()
+            await ThumbnailService.schedule([slide.id], conversation_id)
+
+            logger.info(f"Patched slide at index {index} for project {project_id}: {len(operations)} operations")
+            return {
+                "success": True,
+                "slide_id": str(slide.id),
+                "index": slide.index,
+                "changes": changes,
+                "localized_images": len(assets)
+            }
+
+    except Exception as e:
+        logger.error(f"Patch page error: {e}", exc_info=True)
+        return {"success": False, "error": str(e)}
+
+
 async def remove_pages(
     indexes: List[int],
     action_description: str,
@@ -178,22 +302,15 @@ async def remove_pages(
         操作结果
     """
     try:
-        async with get_db() as db:
-            from sqlalchemy import delete
-
-            # 删除指定索引的页面
-            await db.execute(
-                delete(Slide).where(
-                    Slide.project_id == project_id,
-                    Slide.index.in_(indexes)
-                )
-            )
+        async with async_session_maker() as db:
+            # 删除指定索引的页面（其余页面的序号自动前移）
+            removed = await SlideService.delete_slides_by_index(db, project_id, [int(i) for i in indexes])
             await db.commit()
 
             logger.info(f"Removed slides at indexes {indexes} for project {project_id}")
             return {
                 "success": True,
-                "removed_count": len(indexes)
+                "removed_count": removed
             }
 
     except Exception as e:
@@ -1,11 +1,100 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import asyncio
 import httpx
 from app.config import settings
+from app.services.http_service import http_service
+from app.services.search_service import search_service
+from app.utils.image_probe import ImageProbe
+from app.utils.image_ranker import ImageRanker
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+async def _probe_image(url: str) -> Optional[Dict[str, Any]]:
+    """
+    用小范围GET读取图片头，获取真实格式和尺寸
+
+    Returns:
+        {"format", "width", "height", "content_type"}，链接失效或不是图片时返回None
+    """
+    if not url:
+        return None
+
+    data = b""
+    try:
+        async with http_service.stream(
+            "GET",
+            url,
+            follow_redirects=True,
+            headers={"Range": f"bytes=0-{settings.IMAGE_PROBE_BYTES - 1}"},
+            timeout=settings.IMAGE_PROBE_TIMEOUT
+        ) as response:
+            if response.status_code not in (200, 206):
+                return None
+
+            content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if content_type and not content_type.startswith(("image/", "application/octet-stream")):
+                return None
+
+            # 服务器忽略Range时也只读取开头部分
+            async for chunk in response.aiter_bytes():
+                data += chunk
+                if len(data) >= settings.IMAGE_PROBE_BYTES:
+                    break
+    except httpx.HTTPError as e:
+        logger.debug(f"Image probe failed for {url}: {e!r}")
+        return None
+
+    info = ImageProbe.parse_header(data)
+    if not info:
+        return None
+    return {**info, "content_type": content_type}
+
+
+async def _probe_candidates(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    并发探测候选图片，丢弃失效和尺寸过小的图片
+
+    在总截止时间内未完成探测的图片保留但标记为未验证，并排在已验证图片之后
+    """
+    tasks = {asyncio.create_task(_probe_image(image["url"])): image for image in images}
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks.keys(), timeout=settings.IMAGE_PROBE_DEADLINE)
+    for task in pending:
+        task.cancel()
+
+    verified, unverified = [], []
+    for task, image in tasks.items():
+        if task in pending:
+            unverified.append({**image, "verified": False})
+            continue
+
+        info = None if task.exception() else task.result()
+        if not info:
+            continue
+
+        width, height = info["width"], info["height"]
+        if width is not None and (width < settings.IMAGE_MIN_WIDTH or height < settings.IMAGE_MIN_HEIGHT):
+            continue
+
+        verified.append({
+            **image,
+            "width": width,
+            "height": height,
+            "format": info["format"],
+            "verified": True
+        })
+
+    logger.info(
+        f"Probed {len(images)} images: {len(verified)} usable, "
+        f"{len(images) - len(verified) - len(unverified)} dropped, {len(unverified)} unverified"
+    )
+    return verified + unverified
+
+
 async def search_images(
     query: str,
     gl: str = "cn",
@@ -18,44 +107,22 @@ async def search_images(
     Args:
         query: 搜索查询
         gl: 国家代码
-        rank: 是否使用AI排序
+        rank: 是否按相关性、分辨率、宽高比和来源信誉本地排序并只返回最佳的几张
         project_id: 项目ID（用于日志记录）
 
     Returns:
-        图片结果列表
+        图片结果列表（已探测可用性和真实尺寸）
     """
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://serpapi.com/search",
-                params={
-                    "engine": "google_images",
-                    "q": query,
-                    "gl": gl,
-                    "num": 10,
-                    "api_key": settings.SERPAPI_KEY
-                }
-            )
-
-            if response.status_code != 200:
-                logger.error(f"SerpAPI error: {response.text}")
-                return []
-
-            data = response.json()
-            images = []
-
-            for item in data.get("images_results", [])[:10]:
-                images.append({
-                    "url": item.get("original"),
-                    "thumbnail": item.get("thumbnail"),
-                    "title": item.get("title", ""),
-                    "source": item.get("source", ""),
-                    "width": item.get("original_width"),
-                    "height": item.get("original_height")
-                })
-
-            logger.info(f"Found {len(images)} images for query: {query}")
-            return images
+        candidates = await search_service.image_search(query, gl, settings.IMAGE_SEARCH_CANDIDATES)
+        images = await _probe_candidates(candidates)
+        if rank:
+            images = ImageRanker.rank(images, query, settings.IMAGE_RANK_TOP_K)
+        else:
+            images = images[:settings.IMAGE_SEARCH_MAX_RESULTS]
+
+        logger.info(f"Found {len(images)} images for query: {query}")
+        return images
 
     except Exception as e:
         logger.error(f"Image search error: {e}", exc_info=True)
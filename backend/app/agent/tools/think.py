@@ -1,4 +1,6 @@
 from typing import Dict, Any, Optional
+from app.database import async_session_maker
+from app.services.theme_service import ThemeService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -344,6 +346,17 @@ async def think(
                 "ppt_planning": planning_result,
                 "message": "PPT制作规划完成"
             }
+
+            if project_id:
+                theme = await _save_theme(project_id, {
+                    "background_color": background_color,
+                    "primary_color": primary_color,
+                    "accent_color": accent_color,
+                    "selected_font_scheme": selected_font_scheme,
+                    "use_material_icons": use_material_icons if use_material_icons is not None else True
+                })
+                if theme:
+                    result["theme"] = theme
         else:
             # 普通思考
             result = {
@@ -362,6 +375,27 @@ async def think(
         return {"success": False, "error": str(e)}
 
 
+async def _save_theme(project_id: str, plan: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    根据规划生成项目共享主题（失败不影响规划结果）
+
+    Returns:
+        供模型参考的主题摘要
+    """
+    try:
+        async with async_session_maker() as db:
+            theme = await ThemeService.save_plan_theme(db, project_id, plan)
+            await db.commit()
+        return {
+            "hash": theme["hash"],
+            "css_variables": [f"--theme-{name}" for name in theme["palette"]] + ["--theme-font"],
+            "note": "配色变量、字体、图标库和页面尺寸已由共享主题统一注入，页面只需输出<body>内容"
+        }
+    except Exception as e:
+        logger.warning(f"Failed to save theme for project {project_id}: {e}")
+        return None
+
+
 def generate_page_detail_template(page_num: int, page_type: str, title: str,
                                 content: list = None, layout: str = None) -> str:
     """生成页面详细规划模板"""
@@ -1,91 +1,158 @@
-from typing import Dict, Any
-import httpx
+from typing import Dict, Any, List, Optional
 from bs4 import BeautifulSoup
+from app.config import settings
+from app.services.http_service import http_service
+from app.services.passage_index import passage_index, PassageIndexService
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 与正文无关的页面区域
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg"]
+
+# 正文文本块元素
+BLOCK_TAGS = ["h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "blockquote", "pre", "td", "th", "dt", "dd", "figcaption"]
+
+
+def _extract_blocks(soup: BeautifulSoup) -> List[str]:
+    """按DOM顺序提取正文文本块"""
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+
+    # 尝试不同的内容选择器
+    content_selectors = [
+        'article',
+        '[class*="content"]',
+        '[class*="article"]',
+        '[class*="post"]',
+        'main',
+        '.main-content',
+        '#content',
+        '#main'
+    ]
+
+    root = None
+    for selector in content_selectors:
+        root = soup.select_one(selector)
+        if root:
+            break
+    root = root or soup.body or soup
+
+    blocks = [
+        element.get_text(separator=' ', strip=True)
+        for element in root.find_all(BLOCK_TAGS)
+        # 嵌套的块（如li中的p）只取最内层，避免重复
+        if not element.find(BLOCK_TAGS)
+    ]
+    if not any(blocks):
+        blocks = root.get_text(separator='\n', strip=True).split('\n')
+    return blocks
+
+
+async def _fetch_page(url: str) -> Dict[str, Any]:
+    """
+    获取页面并切分为段落
 
-async def visit_page(url: str, project_id: str = None) -> Dict[str, Any]:
+    Returns:
+        {"title", "passages"}，失败时 {"error"}
+    """
+    response = await http_service.get(url, follow_redirects=True)
+    if response.status_code != 200:
+        return {"error": f"HTTP {response.status_code}"}
+
+    soup = BeautifulSoup(response.text, 'html.parser')
+    title = ""
+    if soup.title:
+        title = soup.title.string.strip() if soup.title.string else ""
+
+    return {"title": title, "passages": PassageIndexService.split_passages(_extract_blocks(soup))}
+
+
+async def visit_page(
+    url: Optional[str] = None,
+    focus: Optional[str] = None,
+    handle: Optional[str] = None,
+    offset: int = 0,
+    project_id: str = None,
+    conversation_id: str = None
+) -> Dict[str, Any]:
     """
-    访问网页获取详细内容
+    访问网页，只返回与关注点相关的段落
+
+    页面切分为段落后写入当前对话的BM25索引，同一对话内再次访问或翻页不会重复下载。
 
     Args:
         url: 要访问的网页URL
+        focus: 关注的问题或关键词，提供时返回最相关的段落
+        handle: 已访问页面的句柄，用于继续读取（不传url时使用）
+        offset: 不提供focus时按文档顺序读取的起始段落
         project_id: 项目ID（用于日志记录）
+        conversation_id: 对话ID（索引按对话隔离）
 
     Returns:
-        页面内容字典
+        页面段落字典
     """
     try:
-        async with httpx.AsyncClient(
-            timeout=30.0,
-            follow_redirects=True,
-            headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-        ) as client:
-            response = await client.get(url)
-
-            if response.status_code != 200:
-                return {
-                    "success": False,
-                    "error": f"HTTP {response.status_code}",
-                    "url": url
-                }
-
-            # 解析HTML内容
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # 提取标题
-            title = ""
-            if soup.title:
-                title = soup.title.string.strip() if soup.title.string else ""
-
-            # 提取主要内容
-            content = ""
-
-            # 尝试不同的内容选择器
-            content_selectors = [
-                'article',
-                '[class*="content"]',
-                '[class*="article"]',
-                '[class*="post"]',
-                'main',
-                '.main-content',
-                '#content',
-                '#main'
-            ]
+        if not url and not handle and not focus:
+            return {"success": False, "error": "url, handle or focus is required"}
 
-            for selector in content_selectors:
-                content_element = soup.select_one(selector)
-                if content_element:
-                    content = content_element.get_text(separator='\n', strip=True)
-                    break
+        # 模型可能传入 3.0 这样的数字，切片需要整数
+        offset = max(0, int(offset or 0))
+        index = passage_index.get(conversation_id, create=True)
 
-            # 如果没有找到特定内容，提取body文本
-            if not content:
-                body = soup.body
-                if body:
-                    content = body.get_text(separator='\n', strip=True)
-
-            # 清理内容
-            content = ' '.join(content.split())  # 移除多余的空白字符
-            content = content[:10000]  # 限制内容长度
-
-            result = {
+        # 只有focus时在本对话访问过的所有页面中检索
+        if not url and not handle:
+            passages = index.search(focus, limit=settings.PASSAGE_TOP_K)
+            return {
                 "success": True,
-                "url": url,
-                "title": title,
-                "content": content,
-                "status_code": response.status_code
+                "focus": focus,
+                "passages": passages,
+                "pages": [
+                    {"handle": page_handle, "url": page["url"], "title": page["title"]}
+                    for page_handle, page in index.pages.items()
+                ]
             }
 
-            logger.info(f"Successfully visited page: {url}")
-            return result
+        handle = handle or PassageIndexService.make_handle(url)
+        page = index.pages.get(handle)
+        if page is None:
+            if not url:
+                return {"success": False, "error": f"Unknown handle {handle}, visit the url again"}
+
+            fetched = await _fetch_page(url)
+            if "error" in fetched:
+                return {"success": False, "error": fetched["error"], "url": url}
+
+            index.add_page(handle, url, fetched["title"], fetched["passages"])
+            page = index.pages[handle]
+            logger.info(f"Indexed page {url}: {len(fetched['passages'])} passages")
+
+        total = len(page["passage_ids"])
+        result = {
+            "success": True,
+            "url": page["url"],
+            "title": page["title"],
+            "handle": handle,
+            "total_passages": total
+        }
+
+        if focus:
+            result["focus"] = focus
+            result["passages"] = [
+                {"index": passage["index"], "text": passage["text"], "score": passage["score"]}
+                for passage in index.search(focus, handle=handle, limit=settings.PASSAGE_TOP_K)
+            ]
+        else:
+            passages = index.read(handle, offset, settings.PASSAGE_TOP_K)
+            result["passages"] = [{"index": passage["index"], "text": passage["text"]} for passage in passages]
+            next_offset = offset + len(passages)
+            result["next_offset"] = next_offset if next_offset < total else None
+
+        logger.info(f"Successfully visited page: {page['url']}")
+        return result
 
     except Exception as e:
-        logger.error(f"Visit page error for {url}: {e}", exc_info=True)
+        logger.error(f"Visit page error for {url or handle}: {e}", exc_info=True)
         return {
             "success": False,
             "error": str(e),
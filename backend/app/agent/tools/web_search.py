@@ -1,11 +1,26 @@
 from typing import List, Dict, Any
-import httpx
-from app.config import settings
+import asyncio
+from app.services.search_service import search_service
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+async def _search_one(query: str, recency_days: int) -> List[Dict[str, Any]]:
+    """执行单个查询，失败时返回空列表"""
+    try:
+        results = await search_service.web_search(query, num=5, recency_days=recency_days)  # 每个查询取前5个结果
+    except Exception as e:
+        logger.error(f"Web search error for query {query}: {e}")
+        return []
+
+    for item in results:
+        item["query"] = query
+
+    logger.info(f"Found {len(results)} results for query: {query}")
+    return results
+
+
 async def web_search(
     queries: List[str],
     recency_days: int = -1,
@@ -23,46 +38,12 @@ async def web_search(
         搜索结果列表
     """
     try:
-        all_results = []
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for query in queries:
-                # 构建搜索参数
-                params = {
-                    "engine": "google",
-                    "q": query,
-                    "num": 10,
-                    "api_key": settings.SERPAPI_KEY
-                }
-
-                # 添加时间限制
-                if recency_days > 0:
-                    params["tbs"] = f"qdr:d{max(recency_days, 1)}"
-
-                response = await client.get(
-                    "https://serpapi.com/search",
-                    params=params
-                )
-
-                if response.status_code != 200:
-                    logger.error(f"SerpAPI web search error: {response.text}")
-                    continue
-
-                data = response.json()
-                results = []
-
-                for item in data.get("organic_results", [])[:5]:  # 每个查询取前5个结果
-                    results.append({
-                        "title": item.get("title", ""),
-                        "link": item.get("link", ""),
-                        "snippet": item.get("snippet", ""),
-                        "display_link": item.get("displayed_link", ""),
-                        "query": query
-                    })
-
-                all_results.extend(results)
-                logger.info(f"Found {len(results)} results for query: {query}")
+        # 多个查询并发执行
+        results = await asyncio.gather(*[_search_one(query, recency_days) for query in queries])
 
+        all_results = []
+        for query_results in results:
+            all_results.extend(query_results)
         return all_results
 
     except Exception as e:
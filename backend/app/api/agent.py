@@ -88,6 +88,30 @@ async def get_agent_logs(
     return [AgentLog.from_orm(log) for log in logs]
 
 
+@router.get("/conversations/{conversation_id}/logs/{log_id}", response_model=AgentLog)
+async def get_agent_log(
+    conversation_id: UUID,
+    log_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取单条Agent执行日志（包含完整的参数和结果）"""
+    conversation = await AgentService.get_conversation(db, conversation_id, current_user.id)
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+
+    log = await AgentService.get_agent_log(db, conversation_id, log_id)
+    if not log:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Log not found"
+        )
+    return AgentLog.from_orm(log)
+
+
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
     conversation_id: UUID,
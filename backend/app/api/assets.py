@@ -0,0 +1,39 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from app.services.storage_service import storage_service, PUBLIC_PREFIX
+
+
+router = APIRouter()
+
+
+@router.get("/{object_key:path}")
+async def get_asset(object_key: str, request: Request):
+    """获取已入库的素材（内容寻址，可长期缓存；只对外提供 assets/ 前缀下的对象）"""
+    key = f"{PUBLIC_PREFIX}{object_key}"
+    if ".." in object_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found"
+        )
+
+    etag = f'"{object_key.rsplit("/", 1)[-1]}"'
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": etag,
+    }
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    result = await storage_service.get_bytes(key)
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asset not found"
+        )
+
+    data, content_type = result
+    headers["X-Content-Type-Options"] = "nosniff"
+    if content_type and content_type.split(";")[0].strip().lower() == "image/svg+xml":
+        # SVG可以携带脚本，与后端同源时只作为附件下载，不在浏览器中执行
+        headers["Content-Disposition"] = "attachment"
+        headers["Content-Security-Policy"] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    return Response(content=data, media_type=content_type, headers=headers)
@@ -1,12 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Literal, Optional
+from urllib.parse import quote
 from uuid import UUID
+from app.config import settings
 from app.database import get_db
+from app.services.bundle_service import BundleService
+from app.services.export_service import ExportService
 from app.services.project_service import ProjectService
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service
+from app.services.theme_service import ThemeService
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate, ProjectWithSlides
 from app.models.user import User
 from app.dependencies import get_current_active_user
+from app.utils.byte_range import ByteRange
+from app.utils.theme_stylesheet import ThemeStylesheet
+from app.tasks import export_deck_html, export_deck_pdf, render_deck
 
 
 router = APIRouter()
@@ -49,6 +60,230 @@ async def get_project(
     return Project.from_orm(project)
 
 
+@router.get("/{project_id}/theme")
+async def get_project_theme(
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取项目共享主题（head标签与样式表）"""
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    # 前端预览使用已生成的字体子集和预编译CSS（覆盖全部页面时；否则使用完整字体和运行时脚本）
+    slides = await SlideService.get_slides_by_project(db, project_id)
+    theme = ThemeStylesheet.prepare(
+        project.theme or ThemeService.default_theme(),
+        [slide.html_content or "" for slide in slides]
+    )
+    return {
+        "hash": theme["hash"],
+        "palette": theme["palette"],
+        "head": theme["head"],
+        "stylesheet": ThemeStylesheet.stylesheet(theme)
+    }
+
+
+@router.post("/{project_id}/render")
+async def render_project_deck(
+    project_id: UUID,
+    conversation_id: Optional[UUID] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批量渲染整套幻灯片的整页图片和缩略图（异步任务，进度通过SSE推送）
+
+    传入 conversation_id 时进度事件发到该对话的流中
+    """
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    task = render_deck.delay(str(project_id), str(conversation_id) if conversation_id else None)
+    return {"task_id": task.id, "status": "queued"}
+
+
+@router.post("/{project_id}/export/pdf")
+async def export_project_pdf(
+    project_id: UUID,
+    conversation_id: Optional[UUID] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    导出整套幻灯片为PDF（异步任务，进度通过SSE推送；内容未变化时直接返回已有文件）
+
+    传入 conversation_id 时进度事件发到该对话的流中
+    """
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slides, _, key = await ExportService.current_pdf(db, project_id)
+    if not slides:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Project has no slides"
+        )
+    url = f"/api/projects/{project_id}/export/pdf"
+    size = await storage_service.size(key)
+    if size is not None:
+        return {"status": "ready", "url": url, "size": size, "pages": len(slides)}
+
+    task = export_deck_pdf.delay(str(project_id), str(conversation_id) if conversation_id else None)
+    return {"task_id": task.id, "status": "queued", "url": url}
+
+
+@router.get("/{project_id}/export/pdf")
+async def download_project_pdf(
+    project_id: UUID,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """下载当前内容对应的PDF（从对象存储流式读取，支持Range断点续传）"""
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    _, _, key = await ExportService.current_pdf(db, project_id)
+    return await _stream_export(request, key, "application/pdf", f"{project.title}.pdf")
+
+
+@router.post("/{project_id}/export/html")
+async def export_project_html(
+    project_id: UUID,
+    bundle: Literal["single", "zip"] = "single",
+    conversation_id: Optional[UUID] = None,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    导出离线HTML包（single 单个HTML文件 / zip 多文件包；内容未变化时直接返回已有文件）
+
+    传入 conversation_id 时完成事件发到该对话的流中
+    """
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slides, _, _, key = await BundleService.current_bundle(db, project_id, bundle)
+    if not slides:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Project has no slides"
+        )
+    url = f"/api/projects/{project_id}/export/html?bundle={bundle}"
+    size = await storage_service.size(key)
+    if size is not None:
+        return {"status": "ready", "url": url, "size": size, "pages": len(slides)}
+
+    task = export_deck_html.delay(str(project_id), bundle, str(conversation_id) if conversation_id else None)
+    return {"task_id": task.id, "status": "queued", "url": url}
+
+
+@router.get("/{project_id}/export/html")
+async def download_project_html(
+    project_id: UUID,
+    request: Request,
+    bundle: Literal["single", "zip"] = "single",
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """下载当前内容对应的离线HTML包（单文件版按 Accept-Encoding 返回预压缩版本）"""
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    _, _, _, key = await BundleService.current_bundle(db, project_id, bundle)
+    if bundle == "zip":
+        return await _stream_export(request, key, "application/zip", f"{project.title}.zip")
+
+    accepted = {value.split(";")[0].strip() for value in request.headers.get("Accept-Encoding", "").split(",")}
+    for encoding, suffix in (("br", "br"), ("gzip", "gz")):
+        if encoding in accepted and await storage_service.size(f"{key}.{suffix}") is not None:
+            return await _stream_export(
+                request, f"{key}.{suffix}", "text/html; charset=utf-8", f"{project.title}.html", encoding
+            )
+    return await _stream_export(request, key, "text/html; charset=utf-8", f"{project.title}.html")
+
+
+async def _stream_export(
+    request: Request,
+    key: str,
+    media_type: str,
+    filename: str,
+    content_encoding: Optional[str] = None
+):
+    """从对象存储流式返回导出文件（支持 Range/If-Range 断点续传和 If-None-Match）"""
+    size = await storage_service.size(key)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not ready"
+        )
+
+    # 对象键中的内容哈希即为ETag，不同编码的版本各自独立
+    digest = key.rsplit("/", 1)[-1].split(".", 1)[0]
+    etag = f'"{digest}-{content_encoding}"' if content_encoding else f'"{digest}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(filename)}",
+        "Vary": "Accept-Encoding",
+    }
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # If-Range 不匹配（文件已重新导出）时返回完整文件
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        range_header = None
+    try:
+        byte_range = ByteRange.parse(range_header, size)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage_service.iter_range(key, start, end - start + 1, settings.EXPORT_STREAM_CHUNK),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=media_type,
+        headers=headers
+    )
+
+
 @router.put("/{project_id}", response_model=Project)
 async def update_project(
     project_id: UUID,
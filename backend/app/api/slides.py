@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 from app.database import get_db
 from app.services.slide_service import SlideService, SlideAssetService
-from app.schemas.slide import Slide, SlideCreate, SlideUpdate, SlideAsset, SlideAssetCreate, SlideAssetUpdate
+from app.schemas.slide import (
+    Slide, SlideCreate, SlideUpdate, SlideMove, SlideOrder, SlideSummary, SlideRevision, SlideRevisionDetail,
+    SlideAsset, SlideAssetCreate, SlideAssetUpdate
+)
 from app.models.user import User
 from app.dependencies import get_current_active_user
 from app.services.project_service import ProjectService
+from app.services.revision_service import RevisionService
+from app.services.theme_service import ThemeService
+from app.services.thumbnail_service import ThumbnailService
 
 
 router = APIRouter()
@@ -30,6 +37,7 @@ async def create_slide(
         )
 
     slide = await SlideService.create_slide(db, project_id, slide_data)
+    await ThumbnailService.schedule([slide.id])
     return Slide.from_orm(slide)
 
 
@@ -52,6 +60,49 @@ async def get_slides(
     return [Slide.from_orm(slide) for slide in slides]
 
 
+@router.get("/summaries", response_model=List[SlideSummary])
+async def get_slide_summaries(
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取项目幻灯片摘要列表（不含HTML，完整内容通过单页接口按需获取）"""
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    return await SlideService.get_slide_summaries(db, project_id)
+
+
+@router.put("/reorder")
+async def reorder_slides(
+    project_id: UUID,
+    slide_orders: List[SlideOrder],
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """重新排序幻灯片（只改写顺序发生变化的幻灯片）"""
+    # 检查项目权限
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    success = await SlideService.reorder_slides(db, project_id, [order.dict() for order in slide_orders])
+    if not success:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Failed to reorder slides"
+        )
+
+    return {"message": "Slides reordered successfully"}
+
+
 @router.get("/{slide_id}", response_model=Slide)
 async def get_slide(
     slide_id: UUID,
@@ -78,6 +129,31 @@ async def get_slide(
     return Slide.from_orm(slide)
 
 
+@router.get("/{slide_id}/render", response_class=HTMLResponse)
+async def render_slide(
+    slide_id: UUID,
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取注入项目主题后的完整页面HTML"""
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slide = await SlideService.get_slide(db, slide_id, project_id)
+    if not slide:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slide not found"
+        )
+
+    return HTMLResponse(await ThemeService.render_slide(db, slide, project.title))
+
+
 @router.put("/{slide_id}", response_model=Slide)
 async def update_slide(
     slide_id: UUID,
@@ -96,6 +172,35 @@ async def update_slide(
         )
 
     slide = await SlideService.update_slide(db, slide_id, project_id, slide_data)
+    if not slide:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slide not found"
+        )
+    if slide_data.html_content:
+        await ThumbnailService.schedule([slide.id])
+
+    return Slide.from_orm(slide)
+
+
+@router.put("/{slide_id}/move", response_model=Slide)
+async def move_slide(
+    slide_id: UUID,
+    project_id: UUID,
+    move_data: SlideMove,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """移动幻灯片到指定位置"""
+    # 检查项目权限
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slide = await SlideService.move_slide(db, slide_id, project_id, move_data.index)
     if not slide:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -131,6 +236,93 @@ async def delete_slide(
     return {"message": "Slide deleted successfully"}
 
 
+# 版本相关路由
+@router.get("/{slide_id}/revisions", response_model=List[SlideRevision])
+async def get_revisions(
+    slide_id: UUID,
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取幻灯片版本列表"""
+    # 检查项目权限
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slide = await SlideService.get_slide(db, slide_id, project_id)
+    if not slide:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slide not found"
+        )
+
+    revisions = await RevisionService.list_revisions(db, slide_id)
+    return [SlideRevision.from_orm(revision) for revision in revisions]
+
+
+@router.get("/{slide_id}/revisions/{revision_id}", response_model=SlideRevisionDetail)
+async def get_revision(
+    slide_id: UUID,
+    revision_id: UUID,
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """获取幻灯片版本内容"""
+    # 检查项目权限
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slide = await SlideService.get_slide(db, slide_id, project_id)
+    revision = await RevisionService.get_revision(db, slide_id, revision_id) if slide else None
+    if not revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+
+    html_content = await RevisionService.load_html(db, revision)
+    return SlideRevisionDetail(**SlideRevision.from_orm(revision).dict(), html_content=html_content)
+
+
+@router.post("/{slide_id}/revisions/{revision_id}/restore", response_model=Slide)
+async def restore_revision(
+    slide_id: UUID,
+    revision_id: UUID,
+    project_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """恢复幻灯片到指定版本"""
+    # 检查项目权限
+    project = await ProjectService.get_project(db, project_id, current_user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+
+    slide = await SlideService.get_slide(db, slide_id, project_id)
+    revision = await RevisionService.get_revision(db, slide_id, revision_id) if slide else None
+    if not revision:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Revision not found"
+        )
+
+    slide = await RevisionService.restore_revision(db, slide, revision)
+    await ThumbnailService.schedule([slide.id])
+    return Slide.from_orm(slide)
+
+
 # 素材相关路由
 @router.post("/{slide_id}/assets", response_model=SlideAsset)
 async def create_asset(
@@ -1,7 +1,10 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional
 import os
 
+# 后端根目录（backend/），相对路径配置按此解析，不依赖进程的工作目录
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 
 class Settings(BaseSettings):
     """应用配置"""
@@ -34,6 +37,135 @@ class Settings(BaseSettings):
     # SerpAPI 配置 (图片搜索)
     SERPAPI_KEY: str = ""
 
+    # 搜索提供方配置 (按顺序作为主/备用，超过p95延迟时对冲请求)
+    SEARCH_PROVIDERS: List[str] = ["serpapi", "searxng"]
+    SEARXNG_URL: str = ""
+    SEARCH_FIXTURE_DIR: str = os.path.join(BASE_DIR, "tests", "fixtures", "search")
+    SEARCH_FIXTURE_LATENCY_MS: int = 0
+    SEARCH_HEDGE_MIN_SAMPLES: int = 20
+    SEARCH_HEDGE_DEFAULT_DELAY: float = 3.0
+    SEARCH_HEDGE_MIN_DELAY: float = 0.5
+
+    # 分布式限流配置 (Redis令牌桶，rate为每秒令牌数，key_*为单个API Key的预算)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_WAIT: float = 10.0
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "serpapi": {"rate": 5, "burst": 10, "key_rate": 5, "key_burst": 10},
+        "searxng": {"rate": 10, "burst": 20},
+        "llm": {"rate": 3, "burst": 6, "key_rate": 3, "key_burst": 6},
+    }
+
+    # 图片搜索候选探测配置
+    IMAGE_SEARCH_CANDIDATES: int = 20
+    IMAGE_SEARCH_MAX_RESULTS: int = 10
+    IMAGE_PROBE_BYTES: int = 64 * 1024
+    IMAGE_PROBE_TIMEOUT: float = 3.0
+    IMAGE_PROBE_DEADLINE: float = 4.0
+    IMAGE_MIN_WIDTH: int = 400
+    IMAGE_MIN_HEIGHT: int = 300
+
+    # 图片候选本地排序配置 (目标画布尺寸/来源信誉)
+    SLIDE_WIDTH: int = 1280
+    SLIDE_HEIGHT: int = 720
+    IMAGE_RANK_TOP_K: int = 5
+    IMAGE_TRUSTED_SOURCES: List[str] = [
+        "wikimedia.org", "wikipedia.org", "unsplash.com", "pexels.com", "pixabay.com",
+        "nasa.gov", "flickr.com", "staticflickr.com", "gov.cn", "xinhuanet.com"
+    ]
+    IMAGE_WATERMARKED_SOURCES: List[str] = [
+        "shutterstock", "alamy", "dreamstime", "123rf", "istockphoto", "gettyimages",
+        "depositphotos", "vectorstock", "veer.com", "quanjing.com"
+    ]
+
+    # 幻灯片排序键配置 (分数排序键超过长度上限时整体重新分配)
+    SLIDE_POSITION_MAX_LENGTH: int = 48
+    SLIDE_POSITION_RETRIES: int = 3
+
+    # 幻灯片版本配置 (内容定义分块 + zlib压缩，块按哈希去重)
+    REVISION_CHUNK_MIN_SIZE: int = 512
+    REVISION_CHUNK_AVG_SIZE: int = 2048
+    REVISION_CHUNK_MAX_SIZE: int = 8192
+    REVISION_COMPRESS_LEVEL: int = 6
+
+    # 大字段分层存储配置 (超过阈值的工具载荷/对话消息压缩后按哈希存入内容块表，行内只保留引用)
+    PAYLOAD_OFFLOAD_THRESHOLD: int = 4096
+    PAYLOAD_SUMMARY_LENGTH: int = 200
+
+    # 无头浏览器池配置 (缩略图/导出渲染，每个进程一个常驻Chromium)
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_PAGE_MAX_RENDERS: int = 50
+    BROWSER_RENDER_TIMEOUT: float = 15.0
+    BROWSER_ACQUIRE_TIMEOUT: float = 60.0
+    BROWSER_POOL_PREWARM: bool = True
+
+    # 渲染资源缓存配置 (字体/图标/CDN脚本由本地磁盘缓存提供，严格模式下拒绝其它外部请求)
+    RENDER_ASSET_CACHE_ENABLED: bool = True
+    RENDER_ASSET_CACHE_DIR: str = "/tmp/render-assets"
+    RENDER_ASSET_HOSTS: List[str] = [
+        "fonts.googleapis.com", "fonts.gstatic.com", "cdn.cn.font.mi.com", "raw.githubusercontent.com",
+        "cdn.jsdelivr.net", "cdn.tailwindcss.com", "cdnjs.cloudflare.com", "unpkg.com"
+    ]
+    RENDER_ASSET_STRICT: bool = True
+    RENDER_ASSET_FETCH_TIMEOUT: float = 10.0
+    RENDER_ASSET_WARM_URLS: List[str] = [
+        "https://fonts.googleapis.com/icon?family=Material+Icons",
+        "https://raw.githubusercontent.com/bytedance/fonts/main/DouyinSans/DouyinSansBold.ttf",
+        "https://cdn.jsdelivr.net/npm/chart.js",
+        "https://cdn.tailwindcss.com"
+    ]
+    RENDER_DEADLINE: float = 8.0
+
+    # 缩略图渲染配置 (页面写入后投递到独立队列，防抖后渲染并上传到对象存储)
+    THUMBNAIL_QUEUE: str = "thumbnails"
+    THUMBNAIL_DEBOUNCE: float = 2.0
+    # 一次整页截图生成多个尺寸（宽度，高度按页面比例）和格式的变体，编码在线程池中执行
+    THUMBNAIL_VARIANTS: Dict[str, int] = {"sidebar": 160, "grid": 320, "full": 1280}
+    THUMBNAIL_PRIMARY_VARIANT: str = "grid"
+    THUMBNAIL_FORMATS: List[str] = ["webp", "avif"]
+    THUMBNAIL_QUALITY: Dict[str, int] = {"webp": 80, "avif": 50}
+    THUMBNAIL_ENCODE_THREADS: int = 2
+    THUMBNAIL_TOKEN_TTL: int = 3600
+
+    # 字体子集配置 (按整套页面用到的字符生成WOFF2子集；只处理这些主机的字体CSS，Google Fonts 已按字符范围分片)
+    FONT_SUBSET_ENABLED: bool = True
+    FONT_SUBSET_CSS_HOSTS: List[str] = ["cdn.cn.font.mi.com"]
+    FONT_SUBSET_DEBOUNCE: float = 5.0
+    FONT_SUBSET_CONCURRENCY: int = 2
+
+    # Tailwind预编译配置 (使用 Play CDN 的主题按整套页面用到的工具类在服务端生成静态CSS，替换浏览器内即时生成)
+    TAILWIND_PRECOMPILE_ENABLED: bool = True
+    TAILWIND_CDN_HOSTS: List[str] = ["cdn.tailwindcss.com"]
+    TAILWIND_COMPILE_TIMEOUT: float = 10.0
+
+    # 导出配置 (PDF在缩略图队列中渲染，每页为Chromium直接输出的JPEG)
+    EXPORT_PDF_QUALITY: int = 90
+    EXPORT_STREAM_CHUNK: int = 256 * 1024
+
+    # 网页段落检索配置 (visit_page 按对话建立BM25索引)
+    PASSAGE_MAX_CHARS: int = 800
+    PASSAGE_TOP_K: int = 5
+    PASSAGE_INDEX_MAX_PAGES: int = 50
+    PASSAGE_INDEX_MAX_CONVERSATIONS: int = 200
+    PASSAGE_INDEX_TTL: int = 3600
+
+    # 工具HTTP客户端配置 (连接池/重试)
+    TOOL_HTTP_TIMEOUT: float = 30.0
+    TOOL_HTTP_CONNECT_TIMEOUT: float = 5.0
+    TOOL_HTTP_MAX_CONNECTIONS: int = 100
+    TOOL_HTTP_MAX_KEEPALIVE: int = 20
+    TOOL_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    TOOL_HTTP_PER_HOST_LIMIT: int = 10
+    TOOL_HTTP_HTTP2: bool = True
+    TOOL_HTTP_DNS_TTL: int = 300
+    TOOL_HTTP_CONNECT_RETRIES: int = 1
+    TOOL_HTTP_MAX_RETRIES: int = 2
+    TOOL_HTTP_BACKOFF_BASE: float = 0.5
+    TOOL_HTTP_BACKOFF_MAX: float = 8.0
+    TOOL_HTTP_USER_AGENT: str = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    )
+
     # CORS 配置
     CORS_ORIGINS: List[str] = [
         "http://localhost:8090",
@@ -57,6 +189,13 @@ class Settings(BaseSettings):
     MINIO_SECURE: bool = False
     MINIO_BUCKET: str = "ppt-agent"
 
+    # 素材入库配置 (图片下载到对象存储后通过后端地址访问)
+    ASSET_BASE_URL: str = "http://localhost:18000"
+    ASSET_MAX_BYTES: int = 10 * 1024 * 1024  # 10MB
+    ASSET_INGEST_TIMEOUT: float = 15.0
+    ASSET_PHASH_DISTANCE: int = 6
+    ASSET_MAX_REDIRECTS: int = 5
+
     # Celery 配置
     CELERY_BROKER_URL: str = REDIS_URL
     CELERY_RESULT_BACKEND: str = REDIS_URL
@@ -67,6 +206,14 @@ class Settings(BaseSettings):
 
     # Prometheus 指标
     ENABLE_METRICS: bool = True
+    WORKER_METRICS_PORT: int = 9100
+
+    # 重试与熔断配置
+    LLM_MAX_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 0.5
+    RETRY_MAX_DELAY: float = 8.0
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RESET_TIMEOUT: float = 30.0
 
     class Config:
         env_file = ".env"
@@ -4,12 +4,15 @@ from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 import logging
 import sentry_sdk
+from prometheus_client import make_asgi_app
 from typing import Dict, List
 
 from app.config import settings
-from app.api import auth_router, projects_router, slides_router, agent_router
+from app.api import auth_router, projects_router, slides_router, agent_router, assets_router
 from app.database import engine
 from app.models.base import Base
+from app.services.resilience import breaker_snapshot
+from app.services.browser_pool import browser_pool
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -61,7 +64,11 @@ async def global_exception_handler(request, exc):
 # 健康检查
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "circuit_breakers": breaker_snapshot()}
+
+# Prometheus 指标
+if settings.ENABLE_METRICS:
+    app.mount("/metrics", make_asgi_app())
 
 # 已移除Socket.IO测试端点
 
@@ -70,6 +77,7 @@ app.include_router(auth_router, prefix="/api/auth", tags=["认证"])
 app.include_router(projects_router, prefix="/api/projects", tags=["项目"])
 app.include_router(slides_router, prefix="/api/slides", tags=["幻灯片"])
 app.include_router(agent_router, prefix="/api/agent", tags=["Agent"])
+app.include_router(assets_router, prefix="/api/assets", tags=["素材"])
 
 # 启动事件
 @app.on_event("startup")
@@ -83,6 +91,7 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutting down...")
+    await browser_pool.shutdown()
 
 # 已移除WebSocket路由，使用SSE + Redis PubSub架构
 
@@ -3,6 +3,7 @@ from .user import User
 from .project import Project, ProjectStatus
 from .slide import Slide, SlideAsset
 from .conversation import Conversation, AgentLog
+from .revision import ContentBlob, SlideRevision
 
 __all__ = [
     "Base",
@@ -13,4 +14,6 @@ __all__ = [
     "SlideAsset",
     "Conversation",
     "AgentLog",
+    "ContentBlob",
+    "SlideRevision",
 ]
@@ -24,12 +24,14 @@ class Project(Base):
     status = Column(Enum(ProjectStatus), default=ProjectStatus.DRAFT)
     config = Column(JSONB, default={})
     meta_data = Column(JSONB, default={})
+    # 共享主题（见 ThemeStylesheet），页面只保存<body>
+    theme = Column(JSONB)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # 关系
     user = relationship("User", back_populates="projects")
-    slides = relationship("Slide", back_populates="project", cascade="all, delete-orphan", order_by="Slide.index")
+    slides = relationship("Slide", back_populates="project", cascade="all, delete-orphan", order_by="Slide.position")
     conversations = relationship("Conversation", back_populates="project", cascade="all, delete-orphan")
 
     def __repr__(self):
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+import uuid
+from app.models.base import Base
+
+
+class ContentBlob(Base):
+    """按内容哈希寻址的压缩内容块（跨幻灯片、跨项目共享）"""
+    __tablename__ = "content_blobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    hash = Column(String(64), unique=True, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ContentBlob {self.hash[:12]} ({self.size} bytes)>"
+
+
+class SlideRevision(Base):
+    """幻灯片版本：按顺序引用内容块的清单"""
+    __tablename__ = "slide_revisions"
+    __table_args__ = (UniqueConstraint('slide_id', 'revision_number', name='uq_slide_revision_number'),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    slide_id = Column(UUID(as_uuid=True), ForeignKey("slides.id", ondelete="CASCADE"), nullable=False, index=True)
+    parent_id = Column(UUID(as_uuid=True), ForeignKey("slide_revisions.id", ondelete="SET NULL"))
+    revision_number = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    chunks = Column(JSONB, nullable=False, default=[])
+    size = Column(Integer, nullable=False)
+    source = Column(String(50))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<SlideRevision {self.slide_id} #{self.revision_number}>"
@@ -1,20 +1,35 @@
-from sqlalchemy import Column, Integer, Text, String, ForeignKey, UniqueConstraint, DateTime
+from sqlalchemy import Column, Text, String, Integer, ForeignKey, UniqueConstraint, DateTime
 from sqlalchemy.dialects.postgresql import UUID, JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
+import hashlib
 import uuid
+from app.config import settings
 from app.models.base import Base
+from app.utils.payload_codec import PayloadCodec
 
 
 class Slide(Base):
     __tablename__ = "slides"
-    __table_args__ = (UniqueConstraint('project_id', 'index', name='uq_project_slide_index'),)
+    __table_args__ = (UniqueConstraint('project_id', 'position', name='uq_project_slide_position'),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
-    index = Column(Integer, nullable=False)
+    # 分数排序键（见 FractionalIndex），按字节序比较
+    position = Column(String(64, collation="C"), nullable=False)
     html_content = Column(Text, nullable=False)
+    # 内容哈希/大小/文本摘要，列表查询只读这些列，不加载整页HTML
+    content_hash = Column(String(64))
+    content_size = Column(Integer)
+    summary = Column(String(300))
     thumbnail_url = Column(String(500))
+    # 缩略图各尺寸/格式变体 {"grid": {"webp": url, "avif": url}, ...}
+    thumbnail_variants = Column(JSONB)
+    # 当前版本（恢复历史版本时只需切换该指针）
+    current_revision_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("slide_revisions.id", ondelete="SET NULL", use_alter=True, name="fk_slide_current_revision")
+    )
     style_config = Column(JSONB, default={})
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -23,8 +38,19 @@ class Slide(Base):
     project = relationship("Project", back_populates="slides")
     assets = relationship("SlideAsset", back_populates="slide", cascade="all, delete-orphan")
 
+    # 连续的展示序号，不持久化，由 SlideService 读取时按 position 计算
+    index = None
+
+    @validates("html_content")
+    def _track_content(self, key, value):
+        data = (value or "").encode("utf-8")
+        self.content_hash = hashlib.sha256(data).hexdigest()
+        self.content_size = len(data)
+        self.summary = PayloadCodec.html_summary(value, settings.PAYLOAD_SUMMARY_LENGTH)
+        return value
+
     def __repr__(self):
-        return f"<Slide {self.project_id} - {self.index}>"
+        return f"<Slide {self.project_id} - {self.position}>"
 
 
 class SlideAsset(Base):
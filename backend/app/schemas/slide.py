@@ -19,10 +19,24 @@ class SlideUpdate(BaseModel):
     style_config: Optional[Dict[str, Any]] = None
 
 
+class SlideMove(BaseModel):
+    index: int = Field(ge=0)
+
+
+class SlideOrder(BaseModel):
+    id: UUID
+    index: int = Field(ge=0)
+
+
 class SlideInDB(SlideBase):
     id: UUID
     project_id: UUID
+    position: Optional[str] = None
+    current_revision_id: Optional[UUID] = None
+    content_hash: Optional[str] = None
+    content_size: Optional[int] = None
     thumbnail_url: Optional[str] = None
+    thumbnail_variants: Optional[Dict[str, Dict[str, str]]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -30,6 +44,20 @@ class SlideInDB(SlideBase):
         from_attributes = True
 
 
+class SlideSummary(BaseModel):
+    id: UUID
+    project_id: UUID
+    index: int
+    position: str
+    content_hash: Optional[str] = None
+    content_size: Optional[int] = None
+    summary: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    thumbnail_variants: Optional[Dict[str, Dict[str, str]]] = None
+    current_revision_id: Optional[UUID] = None
+    updated_at: datetime
+
+
 class Slide(SlideInDB):
     assets: Optional[List["SlideAsset"]] = []
 
@@ -37,6 +65,24 @@ class Slide(SlideInDB):
         from_attributes = True
 
 
+class SlideRevision(BaseModel):
+    id: UUID
+    slide_id: UUID
+    parent_id: Optional[UUID] = None
+    revision_number: int
+    content_hash: str
+    size: int
+    source: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SlideRevisionDetail(SlideRevision):
+    html_content: str
+
+
 class SlideAssetBase(BaseModel):
     asset_type: str = Field(min_length=1, max_length=50)
     asset_url: str = Field(min_length=1, max_length=500)
@@ -4,6 +4,7 @@ from sqlalchemy import select, delete
 from uuid import UUID
 from app.models.conversation import Conversation, AgentLog
 from app.schemas.agent import ConversationCreate, AgentLogBase
+from app.services.payload_store import PayloadStore
 
 
 class AgentService:
@@ -66,12 +67,13 @@ class AgentService:
         db: AsyncSession,
         conversation_id: UUID,
         messages: List[dict],
-        agent_state: Optional[dict] = None
+        agent_state: Optional[dict] = None,
+        stored_messages: Optional[List[dict]] = None
     ) -> bool:
-        """更新对话消息"""
+        """更新对话消息（过大的消息转存到内容块，行内只保留摘要和引用；stored_messages 中已有的引用直接沿用）"""
         from sqlalchemy import update
 
-        update_data = {"messages": messages}
+        update_data = {"messages": await PayloadStore.offload_messages(db, messages, stored_messages)}
         if agent_state is not None:
             update_data["agent_state"] = agent_state
 
@@ -83,6 +85,11 @@ class AgentService:
         await db.commit()
         return result.rowcount > 0
 
+    @classmethod
+    async def load_conversation_messages(cls, db: AsyncSession, conversation: Conversation) -> List[dict]:
+        """读取对话的完整消息历史（还原已转存的消息）"""
+        return await PayloadStore.load_messages(db, conversation.messages or [])
+
     @classmethod
     async def create_agent_log(
         cls,
@@ -90,12 +97,12 @@ class AgentService:
         conversation_id: UUID,
         log_data: AgentLogBase
     ) -> AgentLog:
-        """创建Agent日志"""
+        """创建Agent日志（过大的参数和结果转存到内容块）"""
         log = AgentLog(
             conversation_id=conversation_id,
             tool_name=log_data.tool_name,
-            tool_params=log_data.tool_params,
-            tool_result=log_data.tool_result,
+            tool_params=await PayloadStore.offload(db, log_data.tool_params),
+            tool_result=await PayloadStore.offload(db, log_data.tool_result),
             execution_time=log_data.execution_time,
             status=log_data.status,
             error_message=log_data.error_message
@@ -122,6 +129,29 @@ class AgentService:
         )
         return list(result.scalars().all())
 
+    @classmethod
+    async def get_agent_log(
+        cls,
+        db: AsyncSession,
+        conversation_id: UUID,
+        log_id: UUID
+    ) -> Optional[AgentLog]:
+        """获取单条Agent日志，并还原已转存的参数和结果"""
+        result = await db.execute(
+            select(AgentLog).where(
+                AgentLog.id == log_id,
+                AgentLog.conversation_id == conversation_id
+            )
+        )
+        log = result.scalar_one_or_none()
+        if log:
+            tool_params, tool_result = await PayloadStore.load_many(db, [log.tool_params, log.tool_result])
+            # 只用于响应，不写回数据库
+            db.expunge(log)
+            log.tool_params = tool_params
+            log.tool_result = tool_result
+        return log
+
     @classmethod
     async def delete_conversation(
         cls,
@@ -0,0 +1,276 @@
+import asyncio
+import html as html_lib
+import logging
+import mimetypes
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+from uuid import UUID
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.slide import Slide, SlideAsset
+from app.services.http_service import http_service
+from app.services.storage_service import storage_service
+from app.utils.image_hash import ImageHasher
+
+logger = logging.getLogger(__name__)
+
+# SVG可以携带脚本，/api/assets 与后端同源，不入库
+UNSAFE_IMAGE_TYPES = {"image/svg+xml"}
+
+# <img src="..."> 以及 background/background-image 中的 url(...)
+IMG_SRC_PATTERN = re.compile(r'<img\b[^>]*?\bsrc\s*=\s*["\'](https?://[^"\']+)["\']', re.IGNORECASE)
+CSS_BG_PATTERN = re.compile(
+    r'background(?:-image)?\s*:[^;"}]*?url\(\s*(?:&quot;|["\'])?(https?://[^"\')\s]+?)(?:&quot;|["\'])?\s*\)',
+    re.IGNORECASE
+)
+
+
+class AssetService:
+    """图片素材入库服务：下载、去重、存储并改写幻灯片中的图片地址"""
+
+    @classmethod
+    def extract_image_urls(cls, html: str) -> List[str]:
+        """提取HTML中引用的外部图片URL（保持出现顺序、去重）"""
+        if not html:
+            return []
+
+        local_prefix = storage_service.public_url("")
+        urls = IMG_SRC_PATTERN.findall(html) + CSS_BG_PATTERN.findall(html)
+        return [
+            url for url in dict.fromkeys(urls)
+            if not url.startswith(local_prefix)
+        ]
+
+    @classmethod
+    def rewrite_urls(cls, html: str, mapping: Dict[str, str]) -> str:
+        """
+        按映射改写 <img src> 和背景 url() 中的图片地址
+
+        只替换匹配到的完整地址，一个地址是另一个地址的前缀时不会破坏较长的地址
+        """
+        if not mapping:
+            return html
+
+        def replace(match: re.Match) -> str:
+            url = match.group(1)
+            if url not in mapping:
+                return match.group(0)
+            start, end = match.span(1)
+            offset = match.start(0)
+            text = match.group(0)
+            return text[:start - offset] + mapping[url] + text[end - offset:]
+
+        for pattern in (IMG_SRC_PATTERN, CSS_BG_PATTERN):
+            html = pattern.sub(replace, html)
+        return html
+
+    @classmethod
+    async def _download(cls, url: str) -> Optional[Tuple[bytes, str]]:
+        """
+        下载图片，超出大小限制、非图片类型或指向内网地址时返回None
+
+        地址来自模型生成的页面，每一跳重定向都重新检查目标地址
+        """
+        for _ in range(settings.ASSET_MAX_REDIRECTS + 1):
+            if not await http_service.is_public_url(url):
+                logger.warning(f"Asset download skipped, not a public address: {url}")
+                return None
+
+            async with http_service.stream("GET", url, follow_redirects=False) as response:
+                if response.is_redirect and response.headers.get("Location"):
+                    url = urljoin(url, response.headers["Location"])
+                    continue
+                if response.status_code != 200:
+                    logger.info(f"Asset download skipped, HTTP {response.status_code}: {url}")
+                    return None
+
+                content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if not content_type.startswith("image/") or content_type in UNSAFE_IMAGE_TYPES:
+                    logger.info(f"Asset download skipped, not an image ({content_type}): {url}")
+                    return None
+
+                chunks = []
+                total = 0
+                async for chunk in response.aiter_bytes():
+                    total += len(chunk)
+                    if total > settings.ASSET_MAX_BYTES:
+                        logger.info(f"Asset download skipped, larger than {settings.ASSET_MAX_BYTES} bytes: {url}")
+                        return None
+                    chunks.append(chunk)
+
+                return b"".join(chunks), content_type
+
+        logger.info(f"Asset download skipped, too many redirects: {url}")
+        return None
+
+    @classmethod
+    async def _load_project_assets(cls, db: AsyncSession, project_id: UUID) -> List[SlideAsset]:
+        """加载项目已入库的图片素材（用于URL复用和感知哈希去重）"""
+        result = await db.execute(
+            select(SlideAsset)
+            .join(Slide, SlideAsset.slide_id == Slide.id)
+            .where(Slide.project_id == project_id, SlideAsset.asset_type == "image")
+        )
+        return list(result.scalars().all())
+
+    @classmethod
+    def _find_similar(cls, phash: Optional[str], known: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """在已知素材中查找感知哈希相近的图片"""
+        if not phash:
+            return None
+        for record in known:
+            other = record.get("phash")
+            if other and ImageHasher.hamming_distance(phash, other) <= settings.ASSET_PHASH_DISTANCE:
+                return record
+        return None
+
+    @classmethod
+    async def _ingest_one(cls, url: str, known: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """下载并存储单张图片，返回素材记录"""
+        downloaded = await cls._download(html_lib.unescape(url))
+        if not downloaded:
+            return None
+        data, content_type = downloaded
+
+        content_hash = ImageHasher.content_hash(data)
+        phash = ImageHasher.perceptual_hash(data)
+        size = ImageHasher.image_size(data) or (None, None)
+
+        # 感知哈希相近且分辨率不低于当前图片时，直接复用已有素材
+        similar = cls._find_similar(phash, known)
+        if similar and (similar.get("width") or 0) >= (size[0] or 0):
+            return {**similar, "original_url": url, "dedup": "perceptual"}
+
+        extension = mimetypes.guess_extension(content_type) or ""
+        object_key = f"assets/images/{content_hash}{extension}"
+        dedup = "content"
+        if not await storage_service.exists(object_key):
+            await storage_service.put_bytes(object_key, data, content_type)
+            dedup = None
+
+        return {
+            "original_url": url,
+            "object_key": object_key,
+            "asset_url": storage_service.public_url(object_key),
+            "content_hash": content_hash,
+            "phash": phash,
+            "content_type": content_type,
+            "size": len(data),
+            "width": size[0],
+            "height": size[1],
+            "dedup": dedup
+        }
+
+    @classmethod
+    async def ingest_images(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        html: str
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        下载HTML中的外部图片并存入对象存储，改写为本地稳定地址
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            html: 幻灯片HTML
+
+        Returns:
+            (改写后的HTML, 素材记录列表)；下载失败或超时的图片保留原地址
+        """
+        htmls, records = await cls.ingest_images_batch(db, project_id, [html])
+        return htmls[0], records[0]
+
+    @classmethod
+    async def ingest_images_batch(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        htmls: List[str]
+    ) -> Tuple[List[str], List[List[Dict[str, Any]]]]:
+        """
+        批量入库多页幻灯片的图片（一次查询已有素材，所有页面的图片并发下载、共享截止时间）
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            htmls: 幻灯片HTML列表
+
+        Returns:
+            (改写后的HTML列表, 每页的素材记录列表)
+        """
+        page_urls = [cls.extract_image_urls(html) for html in htmls]
+        urls = list(dict.fromkeys(url for page in page_urls for url in page))
+        if not urls:
+            return list(htmls), [[] for _ in htmls]
+
+        known = [asset.meta_data or {} for asset in await cls._load_project_assets(db, project_id)]
+        known_by_url = {record.get("original_url"): record for record in known if record.get("asset_url")}
+
+        records: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[asyncio.Task, str] = {}
+        for url in urls:
+            if url in known_by_url:
+                records[url] = {**known_by_url[url], "dedup": "url"}
+            else:
+                pending[asyncio.create_task(cls._ingest_one(url, known))] = url
+
+        if pending:
+            done, not_done = await asyncio.wait(pending.keys(), timeout=settings.ASSET_INGEST_TIMEOUT)
+            for task in not_done:
+                task.cancel()
+                logger.info(f"Asset ingest timed out: {pending[task]}")
+            for task in done:
+                if task.exception():
+                    logger.warning(f"Asset ingest failed for {pending[task]}: {task.exception()}")
+                elif task.result():
+                    records[pending[task]] = task.result()
+
+        rewritten, page_records = [], []
+        for html, page in zip(htmls, page_urls):
+            found = [records[url] for url in page if url in records]
+            rewritten.append(cls.rewrite_urls(html, {record["original_url"]: record["asset_url"] for record in found}))
+            page_records.append(found)
+
+        logger.info(f"Ingested {len(records)}/{len(urls)} images across {len(htmls)} slides for project {project_id}")
+        return rewritten, page_records
+
+    @classmethod
+    async def attach_assets(cls, db: AsyncSession, slide: Slide, records: List[Dict[str, Any]]):
+        """
+        同步幻灯片的图片素材记录：移除不再引用的素材，添加新素材（不提交事务）
+
+        Args:
+            db: 数据库会话
+            slide: 已写入HTML的幻灯片
+            records: ingest_images 返回的素材记录
+        """
+        result = await db.execute(
+            select(SlideAsset).where(
+                SlideAsset.slide_id == slide.id,
+                SlideAsset.asset_type == "image"
+            )
+        )
+        existing = {asset.asset_url: asset for asset in result.scalars().all()}
+
+        stale_ids = [asset.id for url, asset in existing.items() if url not in slide.html_content]
+        if stale_ids:
+            await db.execute(delete(SlideAsset).where(SlideAsset.id.in_(stale_ids)))
+
+        db.add_all(cls.build_assets(slide, [record for record in records if record["asset_url"] not in existing]))
+
+    @classmethod
+    def build_assets(cls, slide: Slide, records: List[Dict[str, Any]]) -> List[SlideAsset]:
+        """为幻灯片创建素材对象（同一地址只保留一条）"""
+        assets = {}
+        for record in records:
+            assets.setdefault(record["asset_url"], SlideAsset(
+                slide_id=slide.id,
+                asset_type="image",
+                asset_url=record["asset_url"],
+                meta_data={k: v for k, v in record.items() if k != "dedup"}
+            ))
+        return list(assets.values())
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from app.config import settings
+from app.services.render_asset_cache import render_asset_cache
+
+logger = logging.getLogger(__name__)
+
+# 容器内运行Chromium所需的启动参数
+LAUNCH_ARGS = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"]
+
+
+class _PageSlot:
+    """池中的一个渲染槽位：独立的浏览器上下文 + 常驻页面"""
+
+    def __init__(self, context: BrowserContext, page: Page, generation: int):
+        self.context = context
+        self.page = page
+        self.generation = generation
+        self.renders = 0
+
+    async def close(self):
+        try:
+            await self.context.close()
+        except PlaywrightError:
+            pass
+
+
+class BrowserPool:
+    """
+    进程级常驻无头浏览器池
+
+    - Chromium只启动一次，按槽位预热上下文和页面
+    - 槽位数即并发上限，取不到槽位的调用排队等待
+    - 页面渲染 BROWSER_PAGE_MAX_RENDERS 次后回收重建，避免内存增长
+    - 页面崩溃时重建该槽位，浏览器崩溃时整体重启（旧槽位归还时丢弃）
+    - 字体/图标/CDN脚本请求由本地资源缓存提供，加载有严格的截止时间（见 RenderAssetCache）
+    """
+
+    def __init__(self, size: Optional[int] = None, max_renders: Optional[int] = None):
+        self.size = size or settings.BROWSER_POOL_SIZE
+        self.max_renders = max_renders or settings.BROWSER_PAGE_MAX_RENDERS
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._slots: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._generation = 0
+        self.stats: Dict[str, int] = {
+            "renders": 0, "recycled": 0, "crashes": 0, "launches": 0, "deadline_exceeded": 0
+        }
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _new_slot(self) -> _PageSlot:
+        context = await self._browser.new_context(
+            viewport={"width": settings.SLIDE_WIDTH, "height": settings.SLIDE_HEIGHT}
+        )
+        if settings.RENDER_ASSET_CACHE_ENABLED:
+            await context.route("**/*", render_asset_cache.handle)
+        page = await context.new_page()
+        page.set_default_timeout(settings.BROWSER_RENDER_TIMEOUT * 1000)
+        return _PageSlot(context, page, self._generation)
+
+    async def _launch(self):
+        """启动浏览器并预热全部槽位（调用方持有锁）"""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        started = time.perf_counter()
+        self._browser = await self._playwright.chromium.launch(args=LAUNCH_ARGS)
+        self._generation += 1
+        self.stats["launches"] += 1
+
+        # 丢弃上一代留在队列中的槽位，等待中的调用会直接拿到新槽位
+        while not self._slots.empty():
+            await self._slots.get_nowait().close()
+        slots: List[_PageSlot] = await asyncio.gather(*(self._new_slot() for _ in range(self.size)))
+        for slot in slots:
+            self._slots.put_nowait(slot)
+        logger.info(
+            f"Browser pool started: {self.size} pages in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+
+    async def startup(self):
+        """启动浏览器池（重复调用无副作用）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Playwright对象绑定在创建它的事件循环上，换循环后重新初始化
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Queue()
+            self._playwright = self._browser = None
+        if not self.started:
+            async with self._lock:
+                if not self.started:
+                    if self._browser is not None:
+                        self.stats["crashes"] += 1
+                        logger.warning("Browser disconnected, relaunching pool")
+                    await self._launch()
+
+    async def _release(self, slot: _PageSlot, healthy: bool):
+        """归还槽位；损坏的槽位关闭后补充新槽位，保持并发数不变"""
+        if healthy and slot.generation == self._generation and not slot.page.is_closed():
+            self._slots.put_nowait(slot)
+            return
+
+        await slot.close()
+        if slot.generation != self._generation:
+            # 浏览器已重启并补满槽位
+            return
+        try:
+            if self.started:
+                self._slots.put_nowait(await self._new_slot())
+            else:
+                await self.startup()
+        except PlaywrightError as e:
+            logger.error(f"Failed to replace browser page: {e}")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """
+        借用一个预热好的页面（用完自动归还）
+
+        Raises:
+            asyncio.TimeoutError: 等待空闲页面超时
+            PlaywrightError: 渲染失败
+        """
+        await self.startup()
+        slot: _PageSlot = await asyncio.wait_for(self._slots.get(), timeout=settings.BROWSER_ACQUIRE_TIMEOUT)
+
+        healthy = False
+        try:
+            if slot.generation != self._generation or slot.page.is_closed() or slot.renders >= self.max_renders:
+                if slot.renders >= self.max_renders:
+                    self.stats["recycled"] += 1
+                await slot.close()
+                slot = await self._new_slot()
+            yield slot.page
+            slot.renders += 1
+            self.stats["renders"] += 1
+            healthy = True
+        except PlaywrightError:
+            raise
+        except Exception:
+            # 业务异常不影响页面状态
+            healthy = True
+            raise
+        finally:
+            await self._release(slot, healthy)
+
+    async def within_deadline(self, awaitable, deadline: Optional[float] = None) -> bool:
+        """
+        在截止时间内等待（超时不抛异常，按页面当前状态继续截图）
+
+        Returns:
+            是否在截止时间内完成
+        """
+        try:
+            await asyncio.wait_for(awaitable, deadline or settings.RENDER_DEADLINE)
+            return True
+        except (asyncio.TimeoutError, PlaywrightTimeoutError):
+            self.stats["deadline_exceeded"] += 1
+            logger.warning(f"Render exceeded {deadline or settings.RENDER_DEADLINE}s deadline")
+            return False
+
+    async def load(self, page: Page, html: str) -> bool:
+        """
+        加载HTML并等待字体就绪（资源来自本地缓存，不再等待 networkidle）
+
+        Returns:
+            是否在截止时间内完成
+        """
+        async def _load():
+            await page.set_content(html, wait_until="load")
+            await page.evaluate("document.fonts.ready.then(() => true)")
+
+        return await self.within_deadline(_load())
+
+    async def screenshot(self, html: str, width: int, height: int) -> bytes:
+        """
+        渲染HTML并截取左上角 width x height 区域
+
+        Args:
+            html: 完整HTML文档
+            width: 视口宽度
+            height: 视口高度
+
+        Returns:
+            PNG字节
+        """
+        async with self.page() as page:
+            await page.set_viewport_size({"width": width, "height": height})
+            await self.load(page, html)
+            return await page.screenshot(
+                full_page=False,
+                clip={"x": 0, "y": 0, "width": width, "height": height}
+            )
+
+    async def shutdown(self):
+        """关闭浏览器池"""
+        if self._slots is not None:
+            while not self._slots.empty():
+                await self._slots.get_nowait().close()
+        try:
+            if self._browser:
+                await self._browser.close()
+            if self._playwright:
+                await self._playwright.stop()
+        except PlaywrightError as e:
+            logger.warning(f"Error closing browser pool: {e}")
+        self._browser = self._playwright = None
+        self._loop = None
+        logger.info(f"Browser pool closed: {self.stats}")
+
+
+# 全局实例（每个进程一个）
+browser_pool = BrowserPool()
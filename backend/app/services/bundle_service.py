@@ -0,0 +1,298 @@
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import mimetypes
+import zipfile
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from uuid import UUID
+from bs4 import BeautifulSoup
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.project import Project
+from app.models.slide import Slide
+from app.services.export_service import ExportService
+from app.services.render_asset_cache import BlockedAssetError, render_asset_cache
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service, PUBLIC_PREFIX
+from app.services.theme_service import ThemeService
+from app.utils.html_bundler import ASSET_REF, HTMLBundler
+from app.utils.theme_stylesheet import ThemeStylesheet
+
+logger = logging.getLogger(__name__)
+
+# 离线包格式：single 单个HTML文件，zip 多文件压缩包
+BUNDLE_FORMATS = ("single", "zip")
+
+# 按浏览器标识请求Google Fonts CSS，才会返回woff2字体
+FONT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# mimetypes 在部分系统上不认识的类型
+_EXTENSIONS = {
+    "font/woff2": ".woff2",
+    "font/woff": ".woff",
+    "font/ttf": ".ttf",
+    "font/otf": ".otf",
+    "text/javascript": ".js",
+    "application/javascript": ".js",
+    "image/jpeg": ".jpg",
+    "image/svg+xml": ".svg",
+    "image/webp": ".webp",
+    "image/avif": ".avif",
+}
+
+BundleFiles = Dict[str, Tuple[bytes, str]]
+
+
+class _AssetTable:
+    """离线包内的资源：按内容哈希命名，相同内容只保留一份"""
+
+    def __init__(self):
+        self.files: BundleFiles = {}
+
+    def add(self, data: bytes, content_type: str) -> str:
+        """登记资源，返回占位引用 bundle:{文件名}"""
+        content_type = content_type.split(";")[0].strip().lower() or "application/octet-stream"
+        extension = _EXTENSIONS.get(content_type) or mimetypes.guess_extension(content_type) or ".bin"
+        name = f"{hashlib.sha256(data).hexdigest()[:16]}{extension}"
+        self.files[name] = (data, content_type)
+        return f"{ASSET_REF}{name}"
+
+    def data_uris(self) -> Dict[str, str]:
+        return {
+            name: f"data:{content_type};base64,{base64.b64encode(data).decode('ascii')}"
+            for name, (data, content_type) in self.files.items()
+        }
+
+
+class BundleService:
+    """
+    离线HTML包导出
+
+    主题head中的字体CSS、图标字体和CDN脚本下载后打包（经渲染资源缓存，只保留页面文字用到的字体分片），
+    页面中的素材图片从对象存储读取，所有资源按内容去重。导航页在iframe中逐页显示：
+    - single：单个HTML，共享样式和资源各存一份，翻页时在浏览器中拼出当前页
+    - zip：index.html + deck.css + slides/*.html + assets/*，文本文件附带 .gz/.br 预压缩版本
+    """
+
+    @classmethod
+    def bundle_key(cls, project_id: UUID, digest: str, bundle: str) -> str:
+        return f"exports/{project_id}/{digest}.{'html' if bundle == 'single' else 'zip'}"
+
+    @classmethod
+    async def current_bundle(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        bundle: str
+    ) -> Tuple[List[Slide], Dict[str, Any], str, str]:
+        """
+        当前内容对应的离线包对象键
+
+        Returns:
+            (幻灯片列表, 主题, 项目标题, 对象键)
+        """
+        slides = await SlideService.get_slides_by_project(db, project_id)
+        theme = await ThemeService.get_theme(db, project_id) or ThemeService.default_theme()
+        result = await db.execute(select(Project.title).where(Project.id == project_id))
+        title = result.scalar_one_or_none() or ""
+        digest = ExportService.deck_digest(slides, theme["hash"], f"bundle-{bundle}|{title}")
+        return slides, theme, title, cls.bundle_key(project_id, digest, bundle)
+
+    @classmethod
+    async def _fetch_remote(cls, url: str) -> Optional[Tuple[bytes, str]]:
+        """
+        经渲染资源缓存读取head中引用的资源，失败时返回None（保留原地址）
+
+        素材服务地址（如预编译的Tailwind CSS）从对象存储读取；允许列表以外的外部地址来自模型输出的页面，
+        不在服务端请求（见 RenderAssetCache.fetch）
+        """
+        try:
+            headers, body = await render_asset_cache.fetch(url, {"user-agent": FONT_USER_AGENT})
+        except BlockedAssetError:
+            logger.info(f"Bundle asset not in render allowlist, keeping {url}")
+            return None
+        except Exception as e:
+            logger.warning(f"Bundle asset unavailable {url}: {e}")
+            return None
+        return body, headers.get("content-type", "application/octet-stream")
+
+    @classmethod
+    async def _inline_stylesheet(cls, url: str, codepoints: set, table: _AssetTable) -> Optional[str]:
+        """下载外部CSS，筛掉用不到的字体分片，其余 url() 资源打包"""
+        fetched = await cls._fetch_remote(url)
+        if fetched is None:
+            return None
+        css = HTMLBundler.filter_font_faces(fetched[0].decode("utf-8", "replace"), codepoints)
+        refs = HTMLBundler.css_urls(css)
+        resources = await asyncio.gather(*(cls._fetch_remote(urljoin(url, ref)) for ref in refs))
+        mapping = {ref: table.add(*resource) for ref, resource in zip(refs, resources) if resource}
+        return HTMLBundler.replace_urls(css, mapping)
+
+    @classmethod
+    async def _inline_local_assets(cls, bodies: List[str], table: _AssetTable) -> List[str]:
+        """页面（及主题样式）中引用的素材服务图片、字体子集从对象存储读取后打包"""
+        prefix = storage_service.public_url("")
+        urls = list(dict.fromkeys(url for body in bodies for url in HTMLBundler.prefixed_urls(body, prefix)))
+        objects = await asyncio.gather(
+            *(storage_service.get_bytes(f"{PUBLIC_PREFIX}{url[len(prefix):]}") for url in urls)
+        )
+        mapping = {url: table.add(*found) for url, found in zip(urls, objects) if found}
+        return [HTMLBundler.replace_urls(body, mapping) for body in bodies]
+
+    @classmethod
+    async def _collect(cls, slides: List[Slide], theme: Dict[str, Any]) -> Dict[str, Any]:
+        """下载并去重全部资源，返回打包所需的各部分"""
+        table = _AssetTable()
+        bodies = [slide.html_content or "" for slide in slides]
+        theme = ThemeStylesheet.prepare(theme, bodies)
+        codepoints = HTMLBundler.codepoints(bodies)
+        head: List[str] = []
+        styles: List[str] = []
+        scripts: List[Tuple[bytes, str]] = []
+
+        for tag in theme["head"]:
+            node = BeautifulSoup(tag, "html.parser").find()
+            if node is None:
+                continue
+            rel = [value.lower() for value in node.get("rel") or []]
+            if node.name == "link" and ("preconnect" in rel or "dns-prefetch" in rel):
+                continue
+            if node.name == "link" and "stylesheet" in rel and urlsplit(node.get("href", "")).scheme in ("http", "https"):
+                css = await cls._inline_stylesheet(node["href"], codepoints, table)
+                if css is not None:
+                    styles.append(css)
+                    continue
+            elif node.name == "script" and urlsplit(node.get("src", "")).scheme in ("http", "https"):
+                fetched = await cls._fetch_remote(node["src"])
+                if fetched is not None:
+                    scripts.append(fetched)
+                    continue
+            head.append(tag)
+
+        stylesheet, *bodies = await cls._inline_local_assets(
+            ["\n".join(styles + [ThemeStylesheet.stylesheet(theme)])] + bodies, table
+        )
+        return {
+            "table": table,
+            "head": head,
+            "stylesheet": stylesheet,
+            "scripts": scripts,
+            "bodies": bodies,
+        }
+
+    @classmethod
+    def _build_single(cls, parts: Dict[str, Any], title: str) -> BundleFiles:
+        """单文件：导航页内嵌共享外壳、各页<body>和 data: 资源表"""
+        inline_scripts = [
+            "<script>" + data.decode("utf-8", "replace").replace("</script", "<\\/script") + "</script>"
+            for data, _ in parts["scripts"]
+        ]
+        shell_theme = {"head": parts["head"] + inline_scripts, "base_css": parts["stylesheet"], "shared_rules": []}
+        slides = [
+            {"doc": body} if ThemeStylesheet.is_document(body) else {"body": ThemeStylesheet.wrap_body(body)}
+            for body in parts["bodies"]
+        ]
+        deck = {
+            "mode": "single",
+            "shell": ThemeStylesheet.compose(shell_theme, "<body></body>", title),
+            "slides": slides,
+            "assets": parts["table"].data_uris(),
+        }
+        html = HTMLBundler.navigator(title, deck, settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT)
+        return {"deck.html": (html.encode("utf-8"), "text/html")}
+
+    @classmethod
+    def _build_zip(cls, parts: Dict[str, Any], title: str) -> BundleFiles:
+        """多文件：每页一个HTML，共享 deck.css 和 assets/，文本文件附带预压缩版本"""
+        table: _AssetTable = parts["table"]
+        script_tags = [f'<script src="{table.add(*script)}"></script>' for script in parts["scripts"]]
+        slide_theme = {
+            "head": parts["head"] + ['<link rel="stylesheet" href="../deck.css">'] + script_tags,
+            "base_css": "",
+            "shared_rules": []
+        }
+
+        files: BundleFiles = {}
+        paths = []
+        for number, body in enumerate(parts["bodies"], start=1):
+            path = f"slides/{number:02d}.html"
+            document = ThemeStylesheet.compose(slide_theme, body, f"{title} - {number}")
+            files[path] = (HTMLBundler.resolve_refs(document, "../assets/").encode("utf-8"), "text/html")
+            paths.append(path)
+        files["deck.css"] = (HTMLBundler.resolve_refs(parts["stylesheet"], "assets/").encode("utf-8"), "text/css")
+        files["index.html"] = (
+            HTMLBundler.navigator(title, {"mode": "zip", "slides": paths}, settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT)
+            .encode("utf-8"),
+            "text/html"
+        )
+        for name, asset in table.files.items():
+            files[f"assets/{name}"] = asset
+
+        for path, (data, content_type) in list(files.items()):
+            if HTMLBundler.compressible(content_type):
+                for suffix, compressed in HTMLBundler.precompress(data).items():
+                    files[f"{path}.{suffix}"] = (compressed, "application/octet-stream")
+        return files
+
+    @classmethod
+    def pack_zip(cls, files: BundleFiles) -> bytes:
+        """写成zip（固定时间戳，相同内容得到相同字节；已压缩的内容不再压缩）"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for path in sorted(files):
+                data, content_type = files[path]
+                info = zipfile.ZipInfo(path, date_time=(1980, 1, 1, 0, 0, 0))
+                info.compress_type = zipfile.ZIP_DEFLATED if HTMLBundler.compressible(content_type) else zipfile.ZIP_STORED
+                archive.writestr(info, data)
+        return buffer.getvalue()
+
+    @classmethod
+    async def export_bundle(cls, db: AsyncSession, project_id: UUID, bundle: str = "single") -> Dict[str, Any]:
+        """
+        导出项目的离线HTML包并上传到对象存储
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            bundle: single（单个HTML，另存 .gz/.br 预压缩版本）或 zip
+
+        Returns:
+            {"project_id", "format", "key", "size", "pages", "cached"}
+
+        Raises:
+            ValueError: 格式不支持或项目没有幻灯片
+        """
+        if bundle not in BUNDLE_FORMATS:
+            raise ValueError(f"Unsupported bundle format: {bundle}")
+        slides, theme, title, key = await cls.current_bundle(db, project_id, bundle)
+        if not slides:
+            raise ValueError("Project has no slides")
+        result = {"project_id": str(project_id), "format": bundle, "key": key, "pages": len(slides)}
+
+        size = await storage_service.size(key)
+        if size is not None:
+            return {**result, "size": size, "cached": True}
+
+        parts = await cls._collect(slides, theme)
+        if bundle == "single":
+            data, _ = (await asyncio.to_thread(cls._build_single, parts, title))["deck.html"]
+            # 预压缩版本先上传，主文件最后写入（存在即表示整组可用）
+            for suffix, compressed in (await asyncio.to_thread(HTMLBundler.precompress, data)).items():
+                await storage_service.put_bytes(f"{key}.{suffix}", compressed, "text/html; charset=utf-8")
+            await storage_service.put_bytes(key, data, "text/html; charset=utf-8")
+        else:
+            files = await asyncio.to_thread(cls._build_zip, parts, title)
+            data = await asyncio.to_thread(cls.pack_zip, files)
+            await storage_service.put_bytes(key, data, "application/zip")
+
+        logger.info(
+            f"Exported {bundle} HTML bundle for project {project_id}: {len(slides)} slides, "
+            f"{len(parts['table'].files)} assets, {len(data)} bytes"
+        )
+        return {**result, "size": len(data), "cached": False}
@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+from playwright.async_api import Error as PlaywrightError
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.slide import Slide
+from app.services.browser_pool import browser_pool
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service
+from app.services.theme_service import ThemeService
+from app.services.thumbnail_service import ThumbnailService
+from app.utils.theme_stylesheet import ThemeStylesheet
+
+logger = logging.getLogger(__name__)
+
+# 在已加载主题的页面中替换<body>，等待字体和图片加载完成
+SWAP_BODY_SCRIPT = """
+async (html) => {
+  const doc = new DOMParser().parseFromString(html, 'text/html');
+  const body = document.body;
+  for (const attr of Array.from(body.attributes)) body.removeAttribute(attr.name);
+  for (const attr of Array.from(doc.body.attributes)) body.setAttribute(attr.name, attr.value);
+  body.innerHTML = doc.body.innerHTML;
+  await document.fonts.ready;
+  await Promise.all(Array.from(document.images).filter(img => !img.complete).map(
+    img => new Promise(resolve => { img.onload = img.onerror = resolve; })
+  ));
+}
+"""
+
+# 含内联脚本的页面（如图表）需要完整加载才能执行脚本，不能直接替换<body>
+_INLINE_SCRIPT = re.compile(r"<script\b(?![^>]*\bsrc=)", re.IGNORECASE)
+
+ImageCallback = Callable[[int, bytes], Awaitable[None]]
+
+
+class DeckRenderService:
+    """
+    整套幻灯片批量渲染：主题只在每个页面加载一次，之后逐页替换<body>截图，
+    多个预热页面并行处理，每页截一张整页图并由此编码出各尺寸变体
+    """
+
+    @classmethod
+    def needs_full_load(cls, body: str) -> bool:
+        """页面是否需要完整加载（含内联脚本或是旧版完整文档）"""
+        return bool(_INLINE_SCRIPT.search(body or "")) or ThemeStylesheet.is_document(body)
+
+    @classmethod
+    async def _render_chunk(
+        cls,
+        theme: Dict[str, Any],
+        items: List[tuple],
+        on_image: ImageCallback,
+        screenshot_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        在一个预热页面中依次渲染 [(序号, 页面HTML), ...]
+
+        单页出错只跳过该页（不调用 on_image），其余页面继续渲染；出现过浏览器错误时，
+        全部页面处理完后重新抛出，由浏览器池丢弃可能已损坏的页面
+        """
+        width, height = settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT
+        broken: Optional[PlaywrightError] = None
+        async with browser_pool.page() as page:
+            await page.set_viewport_size({"width": width, "height": height})
+            shell_loaded = False
+            for index, body in items:
+                try:
+                    if cls.needs_full_load(body):
+                        shell_loaded = False
+                        await browser_pool.load(page, ThemeStylesheet.compose(theme, body))
+                    else:
+                        if not shell_loaded:
+                            # 主题head（字体、图标、共享样式）每个页面只加载一次
+                            await browser_pool.load(page, ThemeStylesheet.compose(theme, "<body></body>"))
+                            shell_loaded = True
+                        await browser_pool.within_deadline(page.evaluate(SWAP_BODY_SCRIPT, body))
+                    image = await page.screenshot(
+                        full_page=False,
+                        clip={"x": 0, "y": 0, "width": width, "height": height},
+                        **(screenshot_options or {})
+                    )
+                    await on_image(index, image)
+                except Exception as e:
+                    logger.warning(f"Deck render failed for slide #{index}: {e}")
+                    # 出错后页面状态未知，下一页重新加载主题
+                    shell_loaded = False
+                    if isinstance(e, PlaywrightError):
+                        broken = e
+            if broken is not None:
+                raise broken
+
+    @classmethod
+    async def render_images(
+        cls,
+        theme: Dict[str, Any],
+        bodies: List[str],
+        on_image: ImageCallback,
+        screenshot_options: Optional[Dict[str, Any]] = None
+    ) -> List[int]:
+        """
+        渲染多张页面的整页截图
+
+        Args:
+            theme: 项目主题
+            bodies: 页面HTML（只包含<body>）
+            on_image: 每张截图完成后的回调 (序号, 图片字节)
+            screenshot_options: 截图参数（默认PNG，如 {"type": "jpeg", "quality": 90}）
+
+        Returns:
+            渲染失败的页面序号
+        """
+        if not bodies:
+            return []
+        # 字体子集、预编译CSS覆盖全部页面时才使用，之后每页合成不再重复检查
+        theme = ThemeStylesheet.prepare(theme, bodies)
+        done = set()
+
+        async def record(index: int, image: bytes):
+            await on_image(index, image)
+            done.add(index)
+
+        lanes = min(browser_pool.size, len(bodies))
+        items = list(enumerate(bodies))
+        results = await asyncio.gather(
+            *(cls._render_chunk(theme, items[lane::lanes], record, screenshot_options) for lane in range(lanes)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Deck render lane failed: {result}")
+        return [index for index in range(len(bodies)) if index not in done]
+
+    @classmethod
+    async def render_deck(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        渲染项目的全部幻灯片，生成整页图片和各尺寸缩略图变体并写回 thumbnail_url
+
+        图片按内容哈希存储，内容未变化的页面直接复用已有图片。
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            on_progress: 每完成一页的回调 {"project_id", "done", "total", "slide"}
+
+        Returns:
+            {"project_id", "total", "rendered", "cached", "failed", "slides": [...]}
+        """
+        slides = await SlideService.get_slides_by_project(db, project_id)
+        # 渲染期间页面可能被修改，写回缩略图时按加载时的内容哈希比对
+        loaded_hashes = [slide.content_hash for slide in slides]
+        theme = await ThemeService.get_theme(db, project_id) or ThemeService.default_theme()
+        digests = [ThumbnailService.render_digest(slide.html_content, theme["hash"]) for slide in slides]
+        entries: List[Optional[Dict[str, Any]]] = [None] * len(slides)
+        done = 0
+
+        async def finish(index: int, cached: bool):
+            nonlocal done
+            variants = ThumbnailService.variant_urls(digests[index])
+            primary = ThumbnailService.primary_url(variants)
+            entries[index] = {
+                "slide_id": str(slides[index].id),
+                "index": index,
+                "image_url": next(iter(variants["full"].values())) if "full" in variants else primary,
+                "thumbnail_url": primary,
+                "thumbnail_variants": variants,
+                "cached": cached
+            }
+            done += 1
+            if on_progress:
+                await on_progress({
+                    "project_id": str(project_id),
+                    "done": done,
+                    "total": len(slides),
+                    "slide": entries[index]
+                })
+
+        existing = await asyncio.gather(
+            *(storage_service.exists(ThumbnailService.manifest_key(digest)) for digest in digests)
+        )
+        pending = []
+        for index in range(len(slides)):
+            if existing[index]:
+                await finish(index, cached=True)
+            else:
+                pending.append(index)
+
+        async def store(position: int, image: bytes):
+            index = pending[position]
+            await ThumbnailService.store_variants(digests[index], image)
+            await finish(index, cached=False)
+
+        failed = await cls.render_images(theme, [slides[index].html_content for index in pending], store)
+
+        stale = 0
+        for slide, content_hash, entry in zip(slides, loaded_hashes, entries):
+            if not entry or slide.thumbnail_url == entry["thumbnail_url"]:
+                continue
+            # 只在内容未变化时写回，渲染期间已修改的页面保留单页缩略图任务的结果
+            result = await db.execute(
+                update(Slide)
+                .where(Slide.id == slide.id, Slide.content_hash.is_not_distinct_from(content_hash))
+                .values(thumbnail_url=entry["thumbnail_url"], thumbnail_variants=entry["thumbnail_variants"])
+                .execution_options(synchronize_session=False)
+            )
+            stale += result.rowcount == 0
+        await db.commit()
+
+        rendered = [entry for entry in entries if entry]
+        logger.info(
+            f"Rendered deck for project {project_id}: {len(slides)} slides, "
+            f"{sum(not entry['cached'] for entry in rendered)} rendered, {len(failed)} failed, "
+            f"{stale} changed during render"
+        )
+        return {
+            "project_id": str(project_id),
+            "total": len(slides),
+            "rendered": sum(not entry["cached"] for entry in rendered),
+            "cached": sum(entry["cached"] for entry in rendered),
+            "failed": [str(slides[pending[position]].id) for position in failed],
+            "slides": rendered
+        }
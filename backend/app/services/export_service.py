@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.slide import Slide
+from app.services.deck_render_service import DeckRenderService
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service
+from app.services.theme_service import ThemeService
+from app.utils.html_sanitizer import HTMLSanitizer
+from app.utils.pdf_writer import PDFImageWriter
+
+logger = logging.getLogger(__name__)
+
+
+class ExportService:
+    """
+    整套幻灯片导出
+
+    PDF由浏览器池并行截图（Chromium直接输出JPEG），每完成一页即写入临时文件中的PDF，
+    完成后上传到对象存储。对象键按页面内容和主题哈希，内容未变化时再次导出直接复用
+    """
+
+    @classmethod
+    def deck_digest(cls, slides: List[Slide], theme_hash: str, spec: str) -> str:
+        """
+        整套内容哈希：各页规范化HTML、页序、主题和导出参数
+
+        Args:
+            slides: 按页序排列的幻灯片
+            theme_hash: 主题哈希
+            spec: 导出格式及参数（不同格式的导出互不复用）
+        """
+        digest = hashlib.sha256(
+            f"{theme_hash}\n{settings.SLIDE_WIDTH}x{settings.SLIDE_HEIGHT}|{spec}".encode("utf-8")
+        )
+        for slide in slides:
+            digest.update(b"\x00")
+            digest.update(HTMLSanitizer.canonicalize(slide.html_content).encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def pdf_key(cls, project_id: UUID, digest: str) -> str:
+        return f"exports/{project_id}/{digest}.pdf"
+
+    @classmethod
+    async def current_pdf(cls, db: AsyncSession, project_id: UUID) -> Tuple[List[Slide], Dict[str, Any], str]:
+        """
+        当前内容对应的PDF对象键
+
+        Returns:
+            (幻灯片列表, 主题, 对象键)
+        """
+        slides = await SlideService.get_slides_by_project(db, project_id)
+        theme = await ThemeService.get_theme(db, project_id) or ThemeService.default_theme()
+        return slides, theme, cls.pdf_key(
+            project_id, cls.deck_digest(slides, theme["hash"], f"pdf|{settings.EXPORT_PDF_QUALITY}")
+        )
+
+    @classmethod
+    async def export_pdf(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        on_progress: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        导出项目的PDF（每页1280x720截图，按页序组装）
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            on_progress: 每完成一页的回调 {"project_id", "done", "total"}
+
+        Returns:
+            {"project_id", "key", "size", "pages", "cached"}
+
+        Raises:
+            ValueError: 项目没有幻灯片
+            RuntimeError: 有页面渲染失败
+        """
+        slides, theme, key = await cls.current_pdf(db, project_id)
+        if not slides:
+            raise ValueError("Project has no slides")
+        result = {"project_id": str(project_id), "key": key, "pages": len(slides)}
+
+        size = await storage_service.size(key)
+        if size is not None:
+            return {**result, "size": size, "cached": True}
+
+        width, height = settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT
+        with tempfile.TemporaryFile() as file:
+            writer = PDFImageWriter(file)
+            done = 0
+
+            async def add_page(index: int, image: bytes):
+                nonlocal done
+                writer.add_page(image, width, height, index)
+                done += 1
+                if on_progress:
+                    await on_progress({"project_id": str(project_id), "done": done, "total": len(slides)})
+
+            failed = await DeckRenderService.render_images(
+                theme,
+                [slide.html_content for slide in slides],
+                add_page,
+                {"type": "jpeg", "quality": settings.EXPORT_PDF_QUALITY}
+            )
+            if failed:
+                raise RuntimeError(f"Failed to render slides {[index + 1 for index in failed]}")
+
+            size = writer.close()
+            file.seek(0)
+            await storage_service.put_stream(key, file, size, "application/pdf")
+
+        logger.info(f"Exported PDF for project {project_id}: {len(slides)} pages, {size} bytes")
+        return {**result, "size": size, "cached": False}
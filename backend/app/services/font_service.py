@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urljoin, urlsplit
+from uuid import UUID
+from bs4 import BeautifulSoup
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.services.redis_service import redis_service
+from app.services.render_asset_cache import render_asset_cache
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service, PUBLIC_PREFIX
+from app.services.theme_service import ThemeService
+from app.utils.font_subsetter import FontSubsetter
+from app.utils.html_bundler import HTMLBundler
+from app.utils.theme_stylesheet import ThemeStylesheet
+
+logger = logging.getLogger(__name__)
+
+
+class FontService:
+    """
+    整套幻灯片的字体子集化
+
+    收集整套页面用到的字符，为主题中的大字体（MiSans等字体CSS链接、主题共享规则中的 @font-face）
+    生成WOFF2子集并存入对象存储（按 字体内容 + 字符集 哈希缓存），结果记在主题的 fonts 字段中，
+    渲染和预览时由 ThemeStylesheet.apply_fonts 替换原字体。页面写入后由缩略图任务发现缺字并防抖投递
+    """
+
+    TASK_NAME = "app.tasks.subset_deck_fonts"
+
+    @classmethod
+    def token_key(cls, project_id: str) -> str:
+        return f"fonts:token:{project_id}"
+
+    @classmethod
+    def needs_subset(cls, theme: Dict[str, Any], bodies: List[str]) -> bool:
+        """主题的字体子集是否需要重新生成（主题已变化，或有子集的字体缺少页面中的字符）"""
+        if not settings.FONT_SUBSET_ENABLED or not FontSubsetter.available():
+            return False
+        fonts = theme.get("fonts")
+        if not fonts or fonts.get("theme") != theme["hash"]:
+            return True
+        if not fonts.get("head") and not fonts.get("rules"):
+            return False
+        return not FontSubsetter.covers(fonts.get("coverage", ""), bodies)
+
+    @classmethod
+    async def schedule(cls, project_id: Any) -> bool:
+        """投递字体子集任务（同一项目在防抖时间内只执行最后一次）"""
+        # 延迟导入，避免服务模块与任务模块循环导入
+        from app.worker import celery_app
+
+        project_id = str(project_id)
+        token = uuid.uuid4().hex
+        try:
+            await redis_service.set_value(cls.token_key(project_id), token, settings.THUMBNAIL_TOKEN_TTL)
+            celery_app.send_task(
+                cls.TASK_NAME,
+                args=[project_id, token],
+                countdown=settings.FONT_SUBSET_DEBOUNCE,
+                queue=settings.THUMBNAIL_QUEUE
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to schedule font subsetting for project {project_id}: {e}")
+            return False
+
+    @classmethod
+    async def is_current(cls, project_id: str, token: str) -> bool:
+        return await redis_service.get_value(cls.token_key(project_id)) == token
+
+    @classmethod
+    def subset_key(cls, font: bytes, codepoints: Set[int]) -> str:
+        font_hash = hashlib.sha256(font).hexdigest()[:16]
+        return f"{PUBLIC_PREFIX}fonts/{font_hash}/{FontSubsetter.glyph_key(codepoints)}.woff2"
+
+    @classmethod
+    async def _subset_face(
+        cls,
+        face: Dict[str, Any],
+        base_url: str,
+        codepoints: Set[int],
+        semaphore: asyncio.Semaphore
+    ) -> Optional[str]:
+        """
+        生成一个 @font-face 的子集
+
+        Returns:
+            指向子集的新规则；字体中没有用到的字符时返回空字符串（整条规则删除）
+
+        Raises:
+            Exception: 字体下载或子集化失败（调用方保留原字体）
+        """
+        urls = [urljoin(base_url, url) for url in face["urls"] if not url.startswith("data:")]
+        if not urls:
+            raise ValueError("font-face without downloadable source")
+        _, font = await render_asset_cache.fetch(urls[0])
+
+        ranges = HTMLBundler.parse_unicode_range(face["descriptors"].get("unicode-range", ""))
+        wanted = {code for code in codepoints if not ranges or any(first <= code <= last for first, last in ranges)}
+        if not wanted:
+            return ""
+
+        key = cls.subset_key(font, wanted)
+        if not await storage_service.exists(key):
+            async with semaphore:
+                data = await asyncio.to_thread(FontSubsetter.subset, font, wanted)
+            if data is None:
+                return ""
+            await storage_service.put_bytes(key, data, "font/woff2")
+            logger.info(f"Subset font {urls[0]}: {len(font)} -> {len(data)} bytes, {len(wanted)} characters")
+        return FontSubsetter.font_face(face["descriptors"], storage_service.public_url(key))
+
+    @classmethod
+    async def _subset_source(cls, css: str, base_url: str, codepoints: Set[int], semaphore: asyncio.Semaphore) -> str:
+        """子集化一段CSS中的全部 @font-face（任一失败时抛出异常，整段保留原样）"""
+        faces = FontSubsetter.parse_font_faces(css)
+        rules = await asyncio.gather(*(cls._subset_face(face, base_url, codepoints, semaphore) for face in faces))
+        return "\n".join(rule for rule in rules if rule)
+
+    @classmethod
+    async def subset_deck(cls, db: AsyncSession, project_id: UUID) -> Dict[str, Any]:
+        """
+        按整套页面用到的字符生成主题字体子集，写入主题的 fonts 字段
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+
+        Returns:
+            {"project_id", "sources", "failed", "characters"}
+        """
+        slides = await SlideService.get_slides_by_project(db, project_id)
+        theme = await ThemeService.get_theme(db, project_id) or ThemeService.default_theme()
+        codepoints = FontSubsetter.codepoints(slide.html_content for slide in slides)
+        semaphore = asyncio.Semaphore(settings.FONT_SUBSET_CONCURRENCY)
+        css_parts: List[str] = []
+        head: List[str] = []
+        rules: List[str] = []
+        failed = 0
+
+        # 1. 字体CSS链接（只处理配置中的字体服务，Google Fonts 已按 unicode-range 分片）
+        for tag in theme["head"]:
+            node = BeautifulSoup(tag, "html.parser").find("link")
+            if node is None or "stylesheet" not in (node.get("rel") or []):
+                continue
+            href = node.get("href", "")
+            if urlsplit(href).hostname not in settings.FONT_SUBSET_CSS_HOSTS:
+                continue
+            try:
+                _, css = await render_asset_cache.fetch(href)
+                css_parts.append(await cls._subset_source(css.decode("utf-8", "replace"), href, codepoints, semaphore))
+                head.append(ThemeStylesheet.tag_key(tag))
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Font subsetting skipped for {href}: {e}")
+
+        # 2. 主题共享规则中的 @font-face（如抖音黑体）
+        for rule in theme["shared_rules"]:
+            if not rule.lower().startswith("@font-face"):
+                continue
+            try:
+                css_parts.append(await cls._subset_source(rule, settings.ASSET_BASE_URL, codepoints, semaphore))
+                rules.append(rule)
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Font subsetting skipped for rule {rule[:80]}: {e}")
+
+        fonts = {
+            "theme": theme["hash"],
+            "css": "\n".join(part for part in css_parts if part),
+            "head": head,
+            "rules": rules,
+            "coverage": FontSubsetter.coverage(codepoints),
+        }
+        await ThemeService.save_fonts(db, project_id, fonts)
+        await db.commit()
+
+        logger.info(
+            f"Subset fonts for project {project_id}: {len(head) + len(rules)} sources, "
+            f"{failed} failed, {len(codepoints)} characters"
+        )
+        return {
+            "project_id": str(project_id),
+            "sources": len(head) + len(rules),
+            "failed": failed,
+            "characters": len(codepoints),
+        }
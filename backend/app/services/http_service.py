@@ -0,0 +1,282 @@
+import asyncio
+import ipaddress
+import socket
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpcore
+import httpx
+from app.config import settings
+from app.services.resilience import jittered_backoff
+
+logger = logging.getLogger(__name__)
+
+# 幂等方法与可重试的状态码
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+# 抓取模型给出的地址时允许的协议与端口
+PUBLIC_PORTS = {"http": 80, "https": 443}
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """带TTL缓存的DNS解析网络后端，同一进程内所有连接共享解析结果"""
+
+    def __init__(self, ttl: float):
+        self._backend = httpcore.AnyIOBackend()
+        self._ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        """解析主机名，命中缓存时直接返回"""
+        key = (host, port)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[key] = (now + self._ttl, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError:
+            # 解析失败时交给底层后端处理，以便抛出标准的ConnectError
+            addresses = [host]
+
+        last_error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                # TLS的SNI仍使用原始主机名，这里只替换TCP连接地址
+                return await self._backend.connect_tcp(
+                    address,
+                    port,
+                    timeout=timeout,
+                    local_address=local_address,
+                    socket_options=socket_options,
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+                self._cache.pop((host, port), None)
+
+        raise last_error
+
+    async def connect_unix_socket(self, path: str, timeout: Optional[float] = None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class _PooledTransport(httpx.AsyncHTTPTransport):
+    """使用共享DNS缓存后端的连接池传输层"""
+
+    def __init__(self, network_backend: httpcore.AsyncNetworkBackend, limits: httpx.Limits, http2: bool, retries: int):
+        super().__init__(limits=limits, http2=http2, retries=retries)
+        # AsyncHTTPTransport不暴露network_backend参数，这里按相同配置重建连接池
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(http2=http2),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=True,
+            http2=http2,
+            retries=retries,
+            network_backend=network_backend,
+        )
+
+
+class ToolHTTPService:
+    """Agent工具共享HTTP客户端（每个Worker进程一个连接池）"""
+
+    def __init__(self):
+        self.client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dns_backend = CachingDNSBackend(ttl=settings.TOOL_HTTP_DNS_TTL)
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """创建带连接池、HTTP/2和keep-alive的客户端"""
+        limits = httpx.Limits(
+            max_connections=settings.TOOL_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.TOOL_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.TOOL_HTTP_KEEPALIVE_EXPIRY,
+        )
+        transport = _PooledTransport(
+            network_backend=self._dns_backend,
+            limits=limits,
+            http2=settings.TOOL_HTTP_HTTP2,
+            retries=settings.TOOL_HTTP_CONNECT_RETRIES,
+        )
+        return httpx.AsyncClient(
+            transport=transport,
+            timeout=httpx.Timeout(
+                settings.TOOL_HTTP_TIMEOUT,
+                connect=settings.TOOL_HTTP_CONNECT_TIMEOUT,
+            ),
+            headers={"User-Agent": settings.TOOL_HTTP_USER_AGENT},
+        )
+
+    async def startup(self):
+        """初始化客户端（Worker进程启动时调用）"""
+        loop = asyncio.get_running_loop()
+        if self.client is not None and self._loop is loop:
+            return
+
+        self.client = self._build_client()
+        self._loop = loop
+        self._host_semaphores = {}
+        logger.info("Tool HTTP client started")
+
+    async def shutdown(self):
+        """关闭客户端并释放连接（Worker进程退出时调用）"""
+        if self.client is not None:
+            try:
+                await self.client.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close tool HTTP client: {e}")
+        self.client = None
+        self._loop = None
+        self._host_semaphores = {}
+        logger.info("Tool HTTP client closed")
+
+    @staticmethod
+    async def _discard_client(client: httpx.AsyncClient):
+        """关闭绑定在旧事件循环上的客户端；旧循环已关闭而无法正常关闭时直接关闭底层套接字"""
+        try:
+            await client.aclose()
+            return
+        except Exception as e:
+            logger.debug(f"Stale tool HTTP client did not close cleanly: {e!r}")
+
+        pool = getattr(client._transport, "_pool", None)
+        for connection in list(getattr(pool, "connections", [])):
+            stream = getattr(getattr(connection, "_connection", None), "_network_stream", None)
+            sock = stream.get_extra_info("socket") if stream is not None else None
+            if sock is not None:
+                sock.close()
+
+    async def get_client(self) -> httpx.AsyncClient:
+        """获取当前事件循环上的客户端，事件循环变化时关闭旧客户端并重新创建"""
+        if self.client is None or self._loop is not asyncio.get_running_loop():
+            stale, self.client = self.client, None
+            if stale is not None:
+                await self._discard_client(stale)
+            await self.startup()
+        return self.client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """获取单个主机的并发连接限制"""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.TOOL_HTTP_PER_HOST_LIMIT)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def is_public_url(self, url: str) -> bool:
+        """
+        URL是否指向公网地址（http/https、默认端口，解析出的全部地址都不是内网/回环/链路本地/保留/组播地址）
+
+        解析结果写入DNS缓存，随后的连接使用同一批地址，不会在检查和连接之间被重新解析到内网
+        """
+        parts = urlsplit(url)
+        try:
+            port = parts.port
+        except ValueError:
+            return False
+        default_port = PUBLIC_PORTS.get(parts.scheme)
+        if default_port is None or not parts.hostname or port not in (None, default_port):
+            return False
+
+        try:
+            addresses = [ipaddress.ip_address(parts.hostname)]
+        except ValueError:
+            try:
+                addresses = [ipaddress.ip_address(address) for address in
+                             await self._dns_backend._resolve(parts.hostname, default_port)]
+            except (OSError, ValueError):
+                return False
+
+        for address in addresses:
+            if address.version == 6 and address.ipv4_mapped:
+                address = address.ipv4_mapped
+            if (not address.is_global or address.is_private or address.is_loopback or address.is_link_local
+                    or address.is_reserved or address.is_multicast):
+                return False
+        return bool(addresses)
+
+    @staticmethod
+    def _backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """计算带抖动的指数退避时间，优先遵循Retry-After"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), settings.TOOL_HTTP_BACKOFF_MAX)
+
+        return jittered_backoff(attempt, settings.TOOL_HTTP_BACKOFF_BASE, settings.TOOL_HTTP_BACKOFF_MAX)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        发送请求，幂等方法在网络错误或临时错误状态码时自动重试
+
+        Args:
+            method: HTTP方法
+            url: 请求URL
+            **kwargs: 透传给httpx的参数
+
+        Returns:
+            响应对象
+        """
+        client = await self.get_client()
+        method = method.upper()
+        max_retries = settings.TOOL_HTTP_MAX_RETRIES if method in IDEMPOTENT_METHODS else 0
+
+        attempt = 0
+        while True:
+            try:
+                async with self._host_semaphore(url):
+                    response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Tool HTTP {method} {url} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                    return response
+                delay = self._backoff_delay(attempt, response)
+                logger.warning(f"Tool HTTP {method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """发送GET请求"""
+        return await self.request("GET", url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """以流式方式发送请求（用于下载大文件或只读取响应头）"""
+        client = await self.get_client()
+        async with self._host_semaphore(url):
+            async with client.stream(method, url, **kwargs) as response:
+                yield response
+
+
+# 全局实例
+http_service = ToolHTTPService()
@@ -0,0 +1,212 @@
+import hashlib
+import math
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.utils.text_tokenizer import TextTokenizer
+
+
+class ConversationIndex:
+    """单个对话内已访问页面的BM25段落索引"""
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self):
+        self.pages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.passages: Dict[int, Dict[str, Any]] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_length = 0
+        self._next_id = 0
+        self.touched_at = time.monotonic()
+
+    def add_page(self, handle: str, url: str, title: str, passages: List[str]):
+        """索引一个页面（同一句柄重复访问时覆盖旧内容）"""
+        if handle in self.pages:
+            self.remove_page(handle)
+
+        passage_ids = []
+        for position, text in enumerate(passages):
+            terms = Counter(TextTokenizer.tokenize(text))
+            passage_id = self._next_id
+            self._next_id += 1
+            self.passages[passage_id] = {
+                "handle": handle,
+                "index": position,
+                "text": text,
+                "length": sum(terms.values()),
+                "terms": terms
+            }
+            self.total_length += sum(terms.values())
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[passage_id] = tf
+            passage_ids.append(passage_id)
+
+        self.pages[handle] = {"url": url, "title": title, "passage_ids": passage_ids}
+
+        # 超过页面上限时淘汰最早访问的页面
+        while len(self.pages) > settings.PASSAGE_INDEX_MAX_PAGES:
+            self.remove_page(next(iter(self.pages)))
+
+    def remove_page(self, handle: str):
+        """从索引中移除页面"""
+        page = self.pages.pop(handle, None)
+        if not page:
+            return
+        for passage_id in page["passage_ids"]:
+            passage = self.passages.pop(passage_id)
+            self.total_length -= passage["length"]
+            for term in passage["terms"]:
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(passage_id, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def search(self, query: str, handle: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        BM25检索
+
+        Args:
+            query: 查询文本
+            handle: 只在指定页面内检索，None表示检索对话内所有页面
+            limit: 返回段落数
+
+        Returns:
+            [{"handle", "index", "text", "score"}, ...] 按得分降序
+        """
+        if not self.passages:
+            return []
+
+        total = len(self.passages)
+        avg_length = self.total_length / total or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(TextTokenizer.tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, tf in postings.items():
+                if handle and self.passages[passage_id]["handle"] != handle:
+                    continue
+                length = self.passages[passage_id]["length"]
+                norm = tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * length / avg_length))
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * norm
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [self._passage_result(passage_id, score) for passage_id, score in ranked]
+
+    def read(self, handle: str, offset: int = 0, limit: int = 5) -> List[Dict[str, Any]]:
+        """按文档顺序读取页面段落"""
+        page = self.pages.get(handle)
+        if not page:
+            return []
+        return [self._passage_result(passage_id) for passage_id in page["passage_ids"][offset:offset + limit]]
+
+    def _passage_result(self, passage_id: int, score: Optional[float] = None) -> Dict[str, Any]:
+        passage = self.passages[passage_id]
+        result = {"handle": passage["handle"], "index": passage["index"], "text": passage["text"]}
+        if score is not None:
+            result["score"] = round(score, 3)
+        return result
+
+
+class PassageIndexService:
+    """按对话隔离的内存段落索引（进程内，按LRU和TTL淘汰）"""
+
+    def __init__(self):
+        self._indexes: "OrderedDict[str, ConversationIndex]" = OrderedDict()
+
+    @staticmethod
+    def make_handle(url: str) -> str:
+        """页面句柄：URL的短哈希（同一URL在任意Worker上得到相同句柄）"""
+        return "page_" + hashlib.sha1(url.encode()).hexdigest()[:10]
+
+    @staticmethod
+    def split_passages(blocks: List[str], max_chars: Optional[int] = None) -> List[str]:
+        """
+        将页面文本块合并切分为段落
+
+        Args:
+            blocks: 按DOM顺序提取的文本块
+            max_chars: 单个段落最大字符数
+
+        Returns:
+            段落列表（过长的块按句子边界切开，过短的块与相邻块合并）
+        """
+        max_chars = max_chars or settings.PASSAGE_MAX_CHARS
+        passages: List[str] = []
+        current = ""
+        for block in blocks:
+            block = " ".join(block.split())
+            if not block:
+                continue
+            pieces = [block]
+            if len(block) > max_chars:
+                pieces, piece = [], ""
+                for sentence in _split_sentences(block):
+                    if piece and len(piece) + len(sentence) > max_chars:
+                        pieces.append(piece)
+                        piece = ""
+                    piece = f"{piece} {sentence}".strip() if piece else sentence
+                if piece:
+                    pieces.append(piece)
+
+            for piece in pieces:
+                if current and len(current) + len(piece) + 1 > max_chars:
+                    passages.append(current)
+                    current = ""
+                current = f"{current} {piece}" if current else piece
+        if current:
+            passages.append(current)
+        return passages
+
+    def _evict(self):
+        now = time.monotonic()
+        expired = [key for key, index in self._indexes.items() if now - index.touched_at > settings.PASSAGE_INDEX_TTL]
+        for key in expired:
+            del self._indexes[key]
+        while len(self._indexes) > settings.PASSAGE_INDEX_MAX_CONVERSATIONS:
+            self._indexes.popitem(last=False)
+
+    def get(self, conversation_id: Optional[str], create: bool = False) -> Optional[ConversationIndex]:
+        """
+        获取对话索引
+
+        没有对话ID时不使用缓存：create 为True时返回只在本次调用中有效的临时索引，
+        避免不同对话的页面混在同一个共享索引中
+        """
+        if not conversation_id:
+            return ConversationIndex() if create else None
+
+        key = conversation_id
+        index = self._indexes.get(key)
+        if index is None and create:
+            index = ConversationIndex()
+            self._indexes[key] = index
+        if index is not None:
+            index.touched_at = time.monotonic()
+            self._indexes.move_to_end(key)
+        self._evict()
+        return index
+
+    def clear(self, conversation_id: str):
+        """清除对话索引"""
+        self._indexes.pop(conversation_id, None)
+
+
+def _split_sentences(text: str) -> List[str]:
+    """按中英文句末标点切分句子（保留标点）"""
+    sentences, start = [], 0
+    for i, char in enumerate(text):
+        if char in "。！？!?；;" or (char == "." and (i + 1 == len(text) or text[i + 1] == " ")):
+            sentences.append(text[start:i + 1].strip())
+            start = i + 1
+    if start < len(text):
+        sentences.append(text[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+# 全局实例
+passage_index = PassageIndexService()
@@ -0,0 +1,140 @@
+import logging
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.revision import ContentBlob
+from app.utils.payload_codec import PayloadCodec
+
+logger = logging.getLogger(__name__)
+
+
+class PayloadStore:
+    """
+    大字段分层存储：超过阈值的载荷压缩后按哈希写入内容块表，
+    热表行内只保留 {"$payload": 哈希, "size", "summary"} 引用，读取详情时再按需加载
+    """
+
+    REF_KEY = "$payload"
+
+    @classmethod
+    def is_ref(cls, value: Any) -> bool:
+        """是否为载荷引用"""
+        return isinstance(value, dict) and cls.REF_KEY in value
+
+    @classmethod
+    async def offload(cls, db: AsyncSession, value: Any, threshold: Optional[int] = None) -> Any:
+        """
+        载荷超过阈值时转存并返回引用，否则原样返回（调用方负责提交事务）
+
+        Args:
+            db: 数据库会话
+            value: 可JSON序列化的载荷
+            threshold: 字节阈值，默认 PAYLOAD_OFFLOAD_THRESHOLD
+
+        Returns:
+            原载荷或载荷引用
+        """
+        if value is None or cls.is_ref(value):
+            return value
+
+        data = PayloadCodec.encode(value)
+        if len(data) <= (threshold or settings.PAYLOAD_OFFLOAD_THRESHOLD):
+            return value
+
+        payload_hash = PayloadCodec.digest(data)
+        # 相同载荷只存一份
+        await db.execute(
+            insert(ContentBlob).values(
+                id=uuid.uuid4(),
+                hash=payload_hash,
+                data=zlib.compress(data, settings.REVISION_COMPRESS_LEVEL),
+                size=len(data)
+            ).on_conflict_do_nothing(index_elements=["hash"])
+        )
+        return {
+            cls.REF_KEY: payload_hash,
+            "size": len(data),
+            "summary": PayloadCodec.summarize(value, settings.PAYLOAD_SUMMARY_LENGTH)
+        }
+
+    @classmethod
+    async def load_many(cls, db: AsyncSession, values: List[Any]) -> List[Any]:
+        """
+        批量还原载荷（一次查询取回所有引用），非引用值原样返回
+
+        Raises:
+            ValueError: 引用的内容块不存在
+        """
+        hashes = {value[cls.REF_KEY] for value in values if cls.is_ref(value)}
+        if not hashes:
+            return list(values)
+
+        result = await db.execute(select(ContentBlob.hash, ContentBlob.data).where(ContentBlob.hash.in_(hashes)))
+        blobs: Dict[str, bytes] = {payload_hash: data for payload_hash, data in result.all()}
+        missing = hashes - set(blobs)
+        if missing:
+            raise ValueError(f"Payload references missing blobs: {sorted(missing)[:3]}")
+
+        return [
+            PayloadCodec.decode(zlib.decompress(blobs[value[cls.REF_KEY]])) if cls.is_ref(value) else value
+            for value in values
+        ]
+
+    @classmethod
+    async def load(cls, db: AsyncSession, value: Any) -> Any:
+        """还原单个载荷"""
+        return (await cls.load_many(db, [value]))[0]
+
+    @classmethod
+    async def offload_messages(
+        cls,
+        db: AsyncSession,
+        messages: List[dict],
+        stored: Optional[List[dict]] = None
+    ) -> List[dict]:
+        """
+        转存过大的对话消息：消息整体写入内容块，行内保留角色、摘要和引用
+
+        对话历史只会追加，stored 为读取时的行内消息列表：前面已转存过的消息直接沿用原引用，
+        每轮只处理新增的消息，不再重新序列化、压缩和写入整段历史
+
+        Args:
+            db: 数据库会话
+            messages: 完整的消息列表（已还原）
+            stored: 读取时 Conversation.messages 中的原始值
+
+        Returns:
+            可直接写入 Conversation.messages 的消息列表
+        """
+        stored = stored or []
+        result = []
+        for index, message in enumerate(messages):
+            if cls.REF_KEY in message:
+                result.append(message)
+                continue
+            previous = stored[index] if index < len(stored) else None
+            if (previous is not None and cls.REF_KEY in previous
+                    and previous.get("role") == message.get("role")
+                    and previous.get("tool_call_id") == message.get("tool_call_id")):
+                result.append(previous)
+                continue
+            ref = await cls.offload(db, message)
+            if not cls.is_ref(ref):
+                result.append(message)
+                continue
+            stub = {"role": message.get("role"), "content": ref.pop("summary"), cls.REF_KEY: ref}
+            if message.get("tool_call_id"):
+                stub["tool_call_id"] = message["tool_call_id"]
+            result.append(stub)
+        return result
+
+    @classmethod
+    async def load_messages(cls, db: AsyncSession, messages: List[dict]) -> List[dict]:
+        """还原对话消息（用于回放给模型的完整上下文）"""
+        refs = [message.get(cls.REF_KEY) for message in messages]
+        loaded = await cls.load_many(db, refs)
+        return [full if ref is not None else message for message, ref, full in zip(messages, refs, loaded)]
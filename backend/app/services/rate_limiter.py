@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import logging
+from typing import List, Optional
+import redis.asyncio as redis
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 多个令牌桶的原子预约：
+# 令牌足够时直接扣减；不足时如果等待时间不超过上限，则预扣（允许为负）并返回需要等待的秒数，
+# 相当于按到达顺序排队；超过上限时不扣减并返回负的等待时间
+TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local requested = tonumber(ARGV[1])
+local max_wait = tonumber(ARGV[2])
+local wait = 0
+local states = {}
+
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[1 + i * 2])
+    local capacity = tonumber(ARGV[2 + i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    states[i] = {tokens, rate, capacity}
+    if tokens < requested then
+        wait = math.max(wait, (requested - tokens) / rate)
+    end
+end
+
+if wait > max_wait then
+    return tostring(-wait)
+end
+
+for i, key in ipairs(KEYS) do
+    local tokens, rate, capacity = states[i][1], states[i][2], states[i][3]
+    redis.call('HSET', key, 'tokens', tokens - requested, 'ts', now)
+    redis.call('EXPIRE', key, math.ceil(capacity / rate + max_wait) + 60)
+end
+return tostring(wait)
+"""
+
+# 排队中被取消的调用归还预扣的令牌
+REFUND_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        redis.call('HINCRBYFLOAT', key, 'tokens', ARGV[1])
+    end
+end
+return 1
+"""
+
+
+class RateLimitExceeded(Exception):
+    """在截止时间内无法获得令牌"""
+
+    def __init__(self, provider: str, wait: float):
+        self.provider = provider
+        self.wait = wait
+        super().__init__(f"Rate limit for {provider} exceeded, would wait {wait:.2f}s")
+
+
+class DistributedRateLimiter:
+    """基于Redis的分布式令牌桶限流（所有Celery Worker共享）"""
+
+    def __init__(self):
+        self.redis_client: Optional[redis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._script = None
+        self._refund_script = None
+
+    def _get_client(self) -> redis.Redis:
+        """获取当前事件循环上的Redis客户端"""
+        loop = asyncio.get_running_loop()
+        if self.redis_client is None or self._loop is not loop:
+            self.redis_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._script = self.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+            self._refund_script = self.redis_client.register_script(REFUND_SCRIPT)
+            self._loop = loop
+        return self.redis_client
+
+    @staticmethod
+    def _bucket_keys(provider: str, api_key: Optional[str]) -> List[tuple]:
+        """
+        生成需要同时扣减的令牌桶：提供方总预算 + 单个API Key预算
+
+        Returns:
+            [(redis_key, rate, capacity), ...]
+        """
+        budget = settings.RATE_LIMITS.get(provider)
+        if not budget:
+            return []
+
+        buckets = []
+        if budget.get("rate"):
+            buckets.append((f"ratelimit:{provider}", budget["rate"], budget.get("burst", budget["rate"])))
+        if api_key and budget.get("key_rate"):
+            key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+            buckets.append((
+                f"ratelimit:{provider}:key:{key_hash}",
+                budget["key_rate"],
+                budget.get("key_burst", budget["key_rate"])
+            ))
+        return buckets
+
+    async def acquire(
+        self,
+        provider: str,
+        api_key: Optional[str] = None,
+        tokens: int = 1,
+        max_wait: Optional[float] = None
+    ) -> float:
+        """
+        获取令牌，不足时排队等待
+
+        Args:
+            provider: 提供方名称（对应 RATE_LIMITS 的键）
+            api_key: 使用的API Key（按Key单独限流）
+            tokens: 需要的令牌数
+            max_wait: 最长排队时间，默认 RATE_LIMIT_MAX_WAIT
+
+        Returns:
+            实际等待的秒数
+
+        Raises:
+            RateLimitExceeded: 排队时间会超过 max_wait
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0.0
+
+        buckets = self._bucket_keys(provider, api_key)
+        if not buckets:
+            return 0.0
+
+        max_wait = settings.RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        args = [tokens, max_wait]
+        for _, rate, capacity in buckets:
+            args.extend([rate, capacity])
+
+        try:
+            self._get_client()
+            wait = float(await self._script(keys=[key for key, _, _ in buckets], args=args))
+        except redis.RedisError as e:
+            # Redis不可用时放行，避免限流器本身成为故障点
+            logger.warning(f"Rate limiter unavailable, allowing {provider} call: {e}")
+            return 0.0
+
+        if wait < 0:
+            raise RateLimitExceeded(provider, -wait)
+
+        if wait > 0:
+            logger.info(f"Rate limited {provider}, queued for {wait:.2f}s")
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # 排队中被取消（如对冲落败的搜索请求）：令牌已预扣，归还给后面的调用
+                await asyncio.shield(self._refund(provider, buckets, tokens))
+                raise
+        return wait
+
+    async def _refund(self, provider: str, buckets: List[tuple], tokens: int):
+        """归还预扣的令牌"""
+        try:
+            await self._refund_script(keys=[key for key, _, _ in buckets], args=[tokens])
+        except redis.RedisError as e:
+            logger.warning(f"Failed to refund rate limit tokens for {provider}: {e}")
+
+
+# 全局实例
+rate_limiter = DistributedRateLimiter()
@@ -47,6 +47,18 @@ class RedisPubSubService:
             logger.error(f"Failed to publish message: {e}")
             raise
 
+    async def set_value(self, key: str, value: str, ttl: Optional[int] = None):
+        """写入键值（ttl为过期秒数）"""
+        if not self.redis_client:
+            await self.connect()
+        await self.redis_client.set(key, value, ex=ttl)
+
+    async def get_value(self, key: str) -> Optional[str]:
+        """读取键值，不存在时返回None"""
+        if not self.redis_client:
+            await self.connect()
+        return await self.redis_client.get(key)
+
     async def subscribe_channel(self, channel: str):
         """订阅频道"""
         if not self.pubsub:
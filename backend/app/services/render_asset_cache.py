@@ -0,0 +1,220 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote, urljoin, urlsplit
+from playwright.async_api import Route
+from app.config import settings
+from app.services.http_service import http_service
+from app.services.storage_service import storage_service, PUBLIC_PREFIX
+
+logger = logging.getLogger(__name__)
+
+# 下载允许列表资源时最多跟随的重定向次数（每一跳都要求在允许列表中）
+MAX_REDIRECTS = 5
+
+
+class BlockedAssetError(Exception):
+    """资源地址不在渲染资源允许列表中"""
+
+# 只缓存这些响应头（其余如Set-Cookie、Date对渲染无意义）
+CACHED_HEADERS = ("content-type", "access-control-allow-origin")
+
+
+class RenderAssetCache:
+    """
+    渲染用外部资源的本地磁盘缓存（字体、图标、CDN脚本）
+
+    浏览器池的每个页面拦截全部请求：
+    - 允许列表中的主机：命中缓存直接返回，未命中时下载一次并写入缓存
+    - 素材地址（{ASSET_BASE_URL}/api/assets/...）：直接从对象存储读取（Worker中该地址可能指向自身或不可达）
+    - data:/blob: 地址和素材服务的其它地址：照常加载
+    - 其它外部请求：严格模式下直接拒绝，保证渲染结果可复现、不依赖外网
+
+    缓存按内容寻址：blobs/{sha256} 存内容，urls/{sha1(url)}.json 记录URL到内容哈希和响应头的映射，
+    文件先写临时文件再原子改名，多个进程可以共享同一目录（也可以预先填充后挂载到隔离的渲染节点）
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.RENDER_ASSET_CACHE_DIR)
+        self.hosts = frozenset(host.lower() for host in settings.RENDER_ASSET_HOSTS)
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "blocked": 0, "errors": 0}
+
+    def allowed(self, url: str) -> bool:
+        """URL是否为允许列表中主机的 http/https 地址"""
+        parts = urlsplit(url)
+        return parts.scheme in ("http", "https") and (parts.hostname or "").lower() in self.hosts
+
+    def _index_path(self, url: str) -> Path:
+        return self.root / "urls" / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp, path)
+
+    def _read(self, url: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        try:
+            entry = json.loads(self._index_path(url).read_text(encoding="utf-8"))
+            return entry["headers"], self._blob_path(entry["sha256"]).read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write(self, url: str, headers: Dict[str, str], body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            self._write_atomic(blob, body)
+        entry = {"url": url, "sha256": digest, "headers": headers}
+        self._write_atomic(self._index_path(url), json.dumps(entry).encode("utf-8"))
+
+    async def _download(self, url: str, headers: Dict[str, str]) -> Tuple[Dict[str, str], bytes]:
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await http_service.get(
+                target,
+                headers=headers,
+                follow_redirects=False,
+                timeout=settings.RENDER_ASSET_FETCH_TIMEOUT
+            )
+            if not (response.is_redirect and response.headers.get("location")):
+                break
+            target = urljoin(target, response.headers["location"])
+            if not self.allowed(target):
+                raise BlockedAssetError(f"{url} redirects outside the render asset allowlist: {target}")
+        else:
+            raise BlockedAssetError(f"{url} redirects more than {MAX_REDIRECTS} times")
+        response.raise_for_status()
+        kept = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        kept.setdefault("access-control-allow-origin", "*")
+        await asyncio.to_thread(self._write, url, kept, response.content)
+        return kept, response.content
+
+    async def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], bytes]:
+        """
+        读取资源（未命中时下载并写入缓存，同一URL的并发请求只下载一次）
+
+        素材地址从对象存储读取；其它地址只下载允许列表中的主机（地址可能来自模型生成的页面）
+
+        Args:
+            url: 资源地址
+            headers: 下载时使用的请求头（Google Fonts按User-Agent返回不同的CSS）
+
+        Returns:
+            (响应头, 内容)
+
+        Raises:
+            BlockedAssetError: 地址不在允许列表中
+            FileNotFoundError: 素材不存在
+        """
+        key = self.asset_key(url)
+        if key is not None:
+            result = await storage_service.get_bytes(key)
+            if result is None:
+                raise FileNotFoundError(key)
+            data, content_type = result
+            return {"content-type": content_type, "access-control-allow-origin": "*"}, data
+        if not self.allowed(url):
+            self.stats["blocked"] += 1
+            raise BlockedAssetError(f"{url} is not in the render asset allowlist")
+
+        cached = await asyncio.to_thread(self._read, url)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return cached
+
+        self.stats["misses"] += 1
+        pending = self._pending.get(url)
+        if pending is None:
+            user_agent = (headers or {}).get("user-agent")
+            pending = asyncio.ensure_future(self._download(url, {"user-agent": user_agent} if user_agent else {}))
+            self._pending[url] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(url, None))
+        return await asyncio.shield(pending)
+
+    @staticmethod
+    def asset_key(url: str) -> Optional[str]:
+        """素材地址对应的对象存储键（与 /api/assets 路由相同的映射），不是素材地址时返回None"""
+        prefix = f"{settings.ASSET_BASE_URL.rstrip('/')}/api/assets/"
+        if not url.startswith(prefix):
+            return None
+        object_key = unquote(urlsplit(url[len(prefix):]).path)
+        if not object_key or ".." in object_key:
+            return None
+        return f"{PUBLIC_PREFIX}{object_key}"
+
+    async def _fulfill_asset(self, route: Route, key: str):
+        """从对象存储读取素材并直接返回给浏览器"""
+        try:
+            result = await storage_service.get_bytes(key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Render asset unavailable {key}: {e}")
+            await route.abort("failed")
+            return
+        if result is None:
+            await route.fulfill(status=404, headers={"access-control-allow-origin": "*"}, body=b"")
+            return
+        data, content_type = result
+        headers = {"content-type": content_type, "access-control-allow-origin": "*"}
+        await route.fulfill(status=200, headers=headers, body=data)
+
+    async def handle(self, route: Route):
+        """浏览器页面的请求拦截回调"""
+        url = route.request.url
+        key = self.asset_key(url)
+        if key is not None:
+            await self._fulfill_asset(route, key)
+            return
+
+        scheme = urlsplit(url).scheme
+        if scheme not in ("http", "https") or url.startswith(settings.ASSET_BASE_URL):
+            await route.continue_()
+            return
+
+        if not self.allowed(url):
+            if settings.RENDER_ASSET_STRICT:
+                self.stats["blocked"] += 1
+                logger.debug(f"Blocked render request to {url}")
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+            return
+
+        try:
+            headers, body = await self.fetch(url, route.request.headers)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Render asset unavailable {url}: {e}")
+            await route.abort("failed")
+            return
+        await route.fulfill(status=200, headers=headers, body=body)
+
+    async def warm(self, urls: Iterable[str]) -> int:
+        """
+        预先下载资源到缓存（渲染节点上线前执行一次）
+
+        Returns:
+            成功缓存的数量
+        """
+        urls = list(urls)
+        results = await asyncio.gather(*(self.fetch(url) for url in urls), return_exceptions=True)
+        for url, result in zip(urls, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to warm render asset {url}: {result}")
+        return sum(not isinstance(result, Exception) for result in results)
+
+
+# 全局实例（每个进程一个，磁盘目录可跨进程共享）
+render_asset_cache = RenderAssetCache()
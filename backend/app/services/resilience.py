@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+from prometheus_client import Counter, Gauge
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 熔断器状态指标：0=closed, 1=half_open, 2=open
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state (0=closed, 1=half_open, 2=open)",
+    ["dependency"],
+    multiprocess_mode="max"
+)
+BREAKER_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state transitions",
+    ["dependency", "state"]
+)
+BREAKER_REJECTIONS = Counter(
+    "circuit_breaker_rejections_total",
+    "Calls rejected while the circuit was open",
+    ["dependency"]
+)
+RETRY_ATTEMPTS = Counter(
+    "dependency_retry_attempts_total",
+    "Retries issued by the retry policy",
+    ["dependency"]
+)
+
+
+def jittered_backoff(attempt: int, base: float, maximum: float) -> float:
+    """带完全抖动的指数退避时间"""
+    return random.uniform(0, min(base * (2 ** attempt), maximum))
+
+
+class CircuitOpenError(Exception):
+    """熔断器处于打开状态，调用被快速拒绝"""
+
+    def __init__(self, dependency: str, retry_in: float):
+        self.dependency = dependency
+        self.retry_in = retry_in
+        super().__init__(f"{dependency} is unavailable (circuit open), retry in {retry_in:.0f}s")
+
+
+class CircuitBreaker:
+    """熔断器：连续失败达到阈值后打开，冷却后半开放行少量探测请求"""
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+        ignore_exceptions: Tuple[Type[BaseException], ...] = ()
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+        self.failure_exceptions = failure_exceptions
+        self.ignore_exceptions = ignore_exceptions
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+        BREAKER_STATE.labels(name).set(0)
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        logger.warning(f"Circuit breaker {self.name}: {self._state} -> {state}")
+        self._state = state
+        BREAKER_STATE.labels(self.name).set(self._STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(self.name, state).inc()
+
+    @property
+    def state(self) -> str:
+        """当前状态（打开超过冷却时间后自动转为半开）"""
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _before_call(self):
+        state = self.state
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probe_in_flight):
+            BREAKER_REJECTIONS.labels(self.name).inc()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(self.name, retry_in)
+        if state == self.HALF_OPEN:
+            self._probe_in_flight = True
+
+    def _on_success(self):
+        self._probe_in_flight = False
+        self.failures = 0
+        self._transition(self.CLOSED)
+
+    def _on_failure(self):
+        self._probe_in_flight = False
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._transition(self.OPEN)
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """通过熔断器执行调用"""
+        self._before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except self.ignore_exceptions:
+            # 本地限流等调用方自身的拒绝不代表依赖故障
+            self._probe_in_flight = False
+            raise
+        except self.failure_exceptions:
+            self._on_failure()
+            raise
+        except BaseException:
+            # 不计入失败的异常（如参数错误、任务取消）只释放半开探测名额
+            self._probe_in_flight = False
+            raise
+        self._on_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """状态快照"""
+        return {"state": self.state, "failures": self.failures}
+
+
+class RetryPolicy:
+    """幂等操作的抖动指数退避重试策略"""
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int = 3,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+    ):
+        self.name = name
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay if base_delay is not None else settings.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.RETRY_MAX_DELAY
+        self.retry_on = retry_on
+
+    async def call(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """执行调用，可重试的异常按退避时间重试；熔断打开时不重试"""
+        for attempt in range(self.max_attempts):
+            try:
+                return await func(*args, **kwargs)
+            except CircuitOpenError:
+                raise
+            except self.retry_on as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = jittered_backoff(attempt, self.base_delay, self.max_delay)
+                RETRY_ATTEMPTS.labels(self.name).inc()
+                logger.warning(
+                    f"{self.name} attempt {attempt + 1}/{self.max_attempts} failed ({e!r}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+
+
+# 进程内熔断器注册表
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(
+    name: str,
+    failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    ignore_exceptions: Tuple[Type[BaseException], ...] = ()
+) -> CircuitBreaker:
+    """获取（或创建）指定依赖的熔断器"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name, failure_exceptions=failure_exceptions, ignore_exceptions=ignore_exceptions)
+        _breakers[name] = breaker
+    return breaker
+
+
+async def resilient_call(
+    dependency: str,
+    func: Callable[..., Awaitable[Any]],
+    *args,
+    retry: Optional[RetryPolicy] = None,
+    failure_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+    ignore_exceptions: Tuple[Type[BaseException], ...] = (),
+    **kwargs
+) -> Any:
+    """
+    通过熔断器（可选重试）调用依赖
+
+    Args:
+        dependency: 依赖名称（熔断器和指标的标签）
+        func: 异步调用
+        retry: 重试策略，None表示不重试（非幂等操作）
+        failure_exceptions: 计入熔断失败的异常类型
+        ignore_exceptions: 不计入熔断失败的异常类型（优先于 failure_exceptions）
+    """
+    breaker = get_breaker(dependency, failure_exceptions, ignore_exceptions)
+    if retry is None:
+        return await breaker.call(func, *args, **kwargs)
+    return await retry.call(breaker.call, func, *args, **kwargs)
+
+
+def breaker_snapshot() -> Dict[str, Dict[str, Any]]:
+    """当前进程所有熔断器的状态"""
+    return {name: breaker.snapshot() for name, breaker in _breakers.items()}
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import uuid
+import zlib
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.revision import ContentBlob, SlideRevision
+from app.models.slide import Slide
+from app.utils.content_chunker import ContentChunker
+
+logger = logging.getLogger(__name__)
+
+
+class RevisionService:
+    """幻灯片版本服务：版本清单引用按哈希寻址的压缩内容块"""
+
+    @classmethod
+    def split(cls, html: str) -> List[bytes]:
+        """将HTML切分为内容块"""
+        return ContentChunker.chunk(
+            html.encode("utf-8"),
+            min_size=settings.REVISION_CHUNK_MIN_SIZE,
+            avg_size=settings.REVISION_CHUNK_AVG_SIZE,
+            max_size=settings.REVISION_CHUNK_MAX_SIZE
+        )
+
+    @classmethod
+    async def _store_chunks(cls, db: AsyncSession, chunks: List[bytes]) -> List[str]:
+        """
+        写入缺失的内容块（已存在的块直接复用）
+
+        Returns:
+            按顺序排列的块哈希
+        """
+        hashes = [hashlib.sha256(chunk).hexdigest() for chunk in chunks]
+        unique = dict(zip(hashes, chunks))
+
+        result = await db.execute(select(ContentBlob.hash).where(ContentBlob.hash.in_(list(unique))))
+        existing = set(result.scalars().all())
+        missing = [
+            {
+                "id": uuid.uuid4(),
+                "hash": chunk_hash,
+                "data": zlib.compress(chunk, settings.REVISION_COMPRESS_LEVEL),
+                "size": len(chunk)
+            }
+            for chunk_hash, chunk in unique.items()
+            if chunk_hash not in existing
+        ]
+        if missing:
+            # 并发写入相同内容块时以先写入者为准
+            await db.execute(insert(ContentBlob).values(missing).on_conflict_do_nothing(index_elements=["hash"]))
+        return hashes
+
+    @classmethod
+    async def record_revision(cls, db: AsyncSession, slide: Slide, source: str) -> Optional[SlideRevision]:
+        """
+        为幻灯片当前内容记录一个版本，并把当前版本指针指向它（调用方负责提交事务）
+
+        Args:
+            db: 数据库会话
+            slide: 已写入新内容的幻灯片
+            source: 版本来源（如 insert_page、patch_page、api）
+
+        Returns:
+            新版本；内容与当前版本相同时返回None
+        """
+        html = slide.html_content or ""
+        content_hash = slide.content_hash or hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+        # 确保幻灯片已写入，版本才能引用它
+        await db.flush()
+
+        # 锁定幻灯片行并重新读取当前版本指针：同一页面的并发写入（API与Agent）在这里排队，
+        # 版本号 max+1 不会冲突，父版本也是对方提交后的最新版本
+        result = await db.execute(
+            select(Slide.current_revision_id).where(Slide.id == slide.id).with_for_update()
+        )
+        slide.current_revision_id = result.scalar_one_or_none()
+
+        if slide.current_revision_id:
+            current = await db.get(SlideRevision, slide.current_revision_id)
+            if current and current.content_hash == content_hash:
+                return None
+
+        chunk_hashes = await cls._store_chunks(db, cls.split(html))
+        result = await db.execute(
+            select(func.coalesce(func.max(SlideRevision.revision_number), 0))
+            .where(SlideRevision.slide_id == slide.id)
+        )
+        revision = SlideRevision(
+            id=uuid.uuid4(),
+            slide_id=slide.id,
+            parent_id=slide.current_revision_id,
+            revision_number=result.scalar_one() + 1,
+            content_hash=content_hash,
+            chunks=chunk_hashes,
+            size=len(html.encode("utf-8")),
+            source=source
+        )
+        db.add(revision)
+        await db.flush()
+        slide.current_revision_id = revision.id
+        return revision
+
+    @classmethod
+    async def record_revisions(cls, db: AsyncSession, slides: List[Slide], source: str) -> List[Optional[SlideRevision]]:
+        """为多张幻灯片记录版本（调用方负责提交事务）"""
+        return [await cls.record_revision(db, slide, source) for slide in slides]
+
+    @classmethod
+    async def list_revisions(cls, db: AsyncSession, slide_id: UUID) -> List[SlideRevision]:
+        """获取幻灯片的版本列表（新版本在前）"""
+        result = await db.execute(
+            select(SlideRevision)
+            .where(SlideRevision.slide_id == slide_id)
+            .order_by(SlideRevision.revision_number.desc())
+        )
+        return list(result.scalars().all())
+
+    @classmethod
+    async def get_revision(cls, db: AsyncSession, slide_id: UUID, revision_id: UUID) -> Optional[SlideRevision]:
+        """获取幻灯片的指定版本"""
+        result = await db.execute(
+            select(SlideRevision).where(
+                SlideRevision.id == revision_id,
+                SlideRevision.slide_id == slide_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def load_html(cls, db: AsyncSession, revision: SlideRevision) -> str:
+        """按版本清单读取并解压内容块，还原HTML"""
+        result = await db.execute(
+            select(ContentBlob.hash, ContentBlob.data).where(ContentBlob.hash.in_(set(revision.chunks)))
+        )
+        blobs: Dict[str, bytes] = {chunk_hash: zlib.decompress(data) for chunk_hash, data in result.all()}
+        missing = [chunk_hash for chunk_hash in revision.chunks if chunk_hash not in blobs]
+        if missing:
+            raise ValueError(f"Revision {revision.id} references missing chunks: {missing[:3]}")
+        return b"".join(blobs[chunk_hash] for chunk_hash in revision.chunks).decode("utf-8")
+
+    @classmethod
+    async def restore_revision(cls, db: AsyncSession, slide: Slide, revision: SlideRevision) -> Slide:
+        """
+        恢复到指定版本：切换当前版本指针并同步页面内容，不产生新的版本或内容块
+
+        Args:
+            db: 数据库会话
+            slide: 幻灯片
+            revision: 要恢复的版本
+
+        Returns:
+            恢复后的幻灯片
+        """
+        html = await cls.load_html(db, revision)
+
+        # 与 record_revision 相同：锁定幻灯片行，和同一页面的并发写入排队，避免版本指针被对方覆盖
+        await db.execute(select(Slide.id).where(Slide.id == slide.id).with_for_update())
+        slide.html_content = html
+        slide.current_revision_id = revision.id
+        await db.commit()
+        await db.refresh(slide)
+        logger.info(f"Restored slide {slide.id} to revision #{revision.revision_number}")
+        return slide
@@ -0,0 +1,330 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from app.config import BASE_DIR, settings
+from app.services.http_service import http_service
+from app.services.rate_limiter import RateLimitExceeded, rate_limiter
+from app.services.resilience import resilient_call
+
+logger = logging.getLogger(__name__)
+
+
+class SearchProviderError(Exception):
+    """搜索提供方调用失败"""
+    pass
+
+
+class SearchProvider:
+    """
+    搜索提供方接口
+
+    所有实现返回统一格式：
+    - 网页结果: {"title", "link", "snippet", "display_link"}
+    - 图片结果: {"url", "thumbnail", "title", "source", "width", "height"}
+    """
+
+    name: str = "base"
+
+    async def web_search(self, query: str, num: int = 10, recency_days: int = -1) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def image_search(self, query: str, gl: str = "cn", num: int = 10) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class SerpAPIProvider(SearchProvider):
+    """SerpAPI (Google) 搜索"""
+
+    name = "serpapi"
+    endpoint = "https://serpapi.com/search"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+
+    async def _get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        await rate_limiter.acquire(self.name, self.api_key)
+        response = await http_service.get(self.endpoint, params={**params, "api_key": self.api_key})
+        if response.status_code != 200:
+            raise SearchProviderError(f"SerpAPI HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def web_search(self, query: str, num: int = 10, recency_days: int = -1) -> List[Dict[str, Any]]:
+        params = {"engine": "google", "q": query, "num": num}
+        if recency_days > 0:
+            params["tbs"] = f"qdr:d{max(recency_days, 1)}"
+
+        data = await self._get(params)
+        return [
+            {
+                "title": item.get("title", ""),
+                "link": item.get("link", ""),
+                "snippet": item.get("snippet", ""),
+                "display_link": item.get("displayed_link", "")
+            }
+            for item in data.get("organic_results", [])[:num]
+        ]
+
+    async def image_search(self, query: str, gl: str = "cn", num: int = 10) -> List[Dict[str, Any]]:
+        data = await self._get({"engine": "google_images", "q": query, "gl": gl, "num": num})
+        return [
+            {
+                "url": item.get("original"),
+                "thumbnail": item.get("thumbnail"),
+                "title": item.get("title", ""),
+                "source": item.get("source", ""),
+                "width": item.get("original_width"),
+                "height": item.get("original_height")
+            }
+            for item in data.get("images_results", [])[:num]
+        ]
+
+
+class SearxngProvider(SearchProvider):
+    """自建SearXNG实例（JSON接口）"""
+
+    name = "searxng"
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    @staticmethod
+    def _time_range(recency_days: int) -> Optional[str]:
+        if recency_days <= 0:
+            return None
+        if recency_days <= 1:
+            return "day"
+        if recency_days <= 7:
+            return "week"
+        if recency_days <= 31:
+            return "month"
+        return "year"
+
+    async def _get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        await rate_limiter.acquire(self.name)
+        response = await http_service.get(f"{self.base_url}/search", params={**params, "format": "json"})
+        if response.status_code != 200:
+            raise SearchProviderError(f"SearXNG HTTP {response.status_code}")
+        return response.json()
+
+    async def web_search(self, query: str, num: int = 10, recency_days: int = -1) -> List[Dict[str, Any]]:
+        params = {"q": query, "categories": "general"}
+        time_range = self._time_range(recency_days)
+        if time_range:
+            params["time_range"] = time_range
+
+        data = await self._get(params)
+        return [
+            {
+                "title": item.get("title", ""),
+                "link": item.get("url", ""),
+                "snippet": item.get("content", ""),
+                "display_link": (item.get("parsed_url") or ["", ""])[1]
+            }
+            for item in data.get("results", [])[:num]
+        ]
+
+    async def image_search(self, query: str, gl: str = "cn", num: int = 10) -> List[Dict[str, Any]]:
+        data = await self._get({"q": query, "categories": "images"})
+        images = []
+        for item in data.get("results", [])[:num]:
+            width = height = None
+            resolution = (item.get("resolution") or "").replace("×", "x").split("x")
+            if len(resolution) == 2 and all(part.strip().isdigit() for part in resolution):
+                width, height = (int(part) for part in resolution)
+            images.append({
+                "url": item.get("img_src"),
+                "thumbnail": item.get("thumbnail_src"),
+                "title": item.get("title", ""),
+                "source": item.get("source") or item.get("engine", ""),
+                "width": width,
+                "height": height
+            })
+        return images
+
+
+class FixtureSearchProvider(SearchProvider):
+    """
+    本地夹具搜索（测试和基准使用）
+
+    从 fixture_dir 下的 web.json / images.json 读取 {查询: 结果列表}，
+    未命中的查询使用 "*" 键的结果；可配置模拟延迟
+    """
+
+    def __init__(self, fixture_dir: str, latency_ms: int = 0, name: str = "fixture"):
+        self.name = name
+        self.fixture_dir = fixture_dir
+        self.latency_ms = latency_ms
+        self._cache: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+    def _load(self, kind: str) -> Dict[str, List[Dict[str, Any]]]:
+        if kind not in self._cache:
+            path = os.path.join(self.fixture_dir, f"{kind}.json")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._cache[kind] = json.load(f)
+            except FileNotFoundError:
+                self._cache[kind] = {}
+        return self._cache[kind]
+
+    async def _lookup(self, kind: str, query: str, num: int) -> List[Dict[str, Any]]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        fixtures = self._load(kind)
+        return [dict(item) for item in fixtures.get(query, fixtures.get("*", []))[:num]]
+
+    async def web_search(self, query: str, num: int = 10, recency_days: int = -1) -> List[Dict[str, Any]]:
+        return await self._lookup("web", query, num)
+
+    async def image_search(self, query: str, gl: str = "cn", num: int = 10) -> List[Dict[str, Any]]:
+        return await self._lookup("images", query, num)
+
+
+class LatencyTracker:
+    """滑动窗口延迟统计，用于计算对冲请求的触发时间"""
+
+    def __init__(self, window: int = 100):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self) -> float:
+        """样本足够时使用p95，否则使用默认对冲延迟"""
+        if len(self.samples) < settings.SEARCH_HEDGE_MIN_SAMPLES:
+            return settings.SEARCH_HEDGE_DEFAULT_DELAY
+        return max(self.percentile(0.95), settings.SEARCH_HEDGE_MIN_DELAY)
+
+
+class SearchService:
+    """多提供方搜索：超过主提供方p95延迟时对冲请求备用方，失败时自动切换"""
+
+    def __init__(self, providers: Optional[List[SearchProvider]] = None):
+        self._providers = providers
+        self._trackers: Dict[str, LatencyTracker] = {}
+
+    @property
+    def providers(self) -> List[SearchProvider]:
+        """按配置顺序创建可用的提供方（延迟初始化）"""
+        if self._providers is None:
+            self._providers = build_providers()
+        return self._providers
+
+    def _tracker(self, provider: SearchProvider) -> LatencyTracker:
+        if provider.name not in self._trackers:
+            self._trackers[provider.name] = LatencyTracker()
+        return self._trackers[provider.name]
+
+    async def _call(self, provider: SearchProvider, method: str, *args) -> List[Dict[str, Any]]:
+        start = time.monotonic()
+        try:
+            # 提供方熔断打开时快速失败，由对冲逻辑切换到下一个提供方；本地限流排队超时不是提供方故障，不计入熔断
+            result = await resilient_call(
+                f"search:{provider.name}",
+                getattr(provider, method),
+                *args,
+                ignore_exceptions=(RateLimitExceeded,)
+            )
+        except asyncio.CancelledError:
+            # 被对冲取消的慢请求也计入延迟（至少已等待的时间），否则p95会越来越低、对冲越来越早
+            self._tracker(provider).record(time.monotonic() - start)
+            raise
+        self._tracker(provider).record(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, method: str, *args) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        对冲调用
+
+        Returns:
+            (结果列表, 实际返回结果的提供方名称)
+        """
+        providers = list(self.providers)
+        if not providers:
+            raise SearchProviderError("No search provider configured")
+
+        backups = iter(providers[1:])
+        tasks: Dict[asyncio.Task, SearchProvider] = {}
+        errors: List[str] = []
+
+        def launch(provider: SearchProvider):
+            tasks[asyncio.create_task(self._call(provider, method, *args))] = provider
+
+        launch(providers[0])
+        hedge_delay: Optional[float] = self._tracker(providers[0]).hedge_delay() if len(providers) > 1 else None
+
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks.keys(),
+                    timeout=hedge_delay,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    # 主提供方超过p95仍未返回，向下一个提供方发送对冲请求
+                    backup = next(backups, None)
+                    if backup:
+                        logger.info(f"Search {method} hedged to {backup.name} after {hedge_delay:.2f}s")
+                        launch(backup)
+                    hedge_delay = None
+                    continue
+
+                for task in done:
+                    provider = tasks.pop(task)
+                    if task.exception() is None:
+                        return task.result(), provider.name
+
+                    errors.append(f"{provider.name}: {task.exception()!r}")
+                    logger.warning(f"Search provider {provider.name} failed: {task.exception()!r}")
+                    # 失败时立即切换到下一个提供方
+                    backup = next(backups, None)
+                    if backup:
+                        launch(backup)
+
+            raise SearchProviderError("; ".join(errors))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def web_search(self, query: str, num: int = 10, recency_days: int = -1) -> List[Dict[str, Any]]:
+        """网页搜索"""
+        results, provider = await self._hedged("web_search", query, num, recency_days)
+        logger.info(f"Web search served by {provider}: {query}")
+        return results
+
+    async def image_search(self, query: str, gl: str = "cn", num: int = 10) -> List[Dict[str, Any]]:
+        """图片搜索"""
+        results, provider = await self._hedged("image_search", query, gl, num)
+        logger.info(f"Image search served by {provider}: {query}")
+        return results
+
+
+def build_providers() -> List[SearchProvider]:
+    """根据 SEARCH_PROVIDERS 配置构建提供方列表，跳过未配置凭据的提供方"""
+    providers: List[SearchProvider] = []
+    for name in settings.SEARCH_PROVIDERS:
+        if name == "serpapi" and settings.SERPAPI_KEY:
+            providers.append(SerpAPIProvider(settings.SERPAPI_KEY))
+        elif name == "searxng" and settings.SEARXNG_URL:
+            providers.append(SearxngProvider(settings.SEARXNG_URL))
+        elif name == "fixture":
+            # 相对路径按后端根目录解析（Worker、基准脚本的工作目录各不相同）
+            fixture_dir = os.path.join(BASE_DIR, settings.SEARCH_FIXTURE_DIR)
+            providers.append(FixtureSearchProvider(fixture_dir, settings.SEARCH_FIXTURE_LATENCY_MS))
+        else:
+            logger.warning(f"Search provider {name} is not configured, skipped")
+    return providers
+
+
+# 全局实例
+search_service = SearchService()
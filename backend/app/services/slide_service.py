@@ -1,14 +1,141 @@
-from typing import List, Optional
+import logging
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import String, cast, delete, func, literal, select, update
 from uuid import UUID
+from app.config import settings
+from app.models.project import Project
 from app.models.slide import Slide, SlideAsset
+from app.services.revision_service import RevisionService
+from app.services.theme_service import ThemeService
 from app.schemas.slide import SlideCreate, SlideUpdate, SlideAssetCreate, SlideAssetUpdate
+from app.utils.fractional_index import FractionalIndex
+
+logger = logging.getLogger(__name__)
 
 
 class SlideService:
     """幻灯片服务"""
 
+    @classmethod
+    async def _neighbour_positions(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        index: int,
+        exclude_id: Optional[UUID] = None
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        获取展示序号 index 处插入位置两侧的排序键
+
+        Returns:
+            (前一张的键, 后一张的键)，None表示在最前或最后
+        """
+        query = select(Slide.position).where(Slide.project_id == project_id)
+        if exclude_id is not None:
+            query = query.where(Slide.id != exclude_id)
+
+        if index <= 0:
+            result = await db.execute(query.order_by(Slide.position).limit(1))
+            return None, result.scalar_one_or_none()
+
+        result = await db.execute(query.order_by(Slide.position).offset(index - 1).limit(2))
+        positions = list(result.scalars().all())
+        if not positions:
+            # 超出末尾时追加到最后
+            result = await db.execute(query.order_by(Slide.position.desc()).limit(1))
+            return result.scalar_one_or_none(), None
+        return positions[0], positions[1] if len(positions) > 1 else None
+
+    @classmethod
+    async def _lock_project(cls, db: AsyncSession, project_id: UUID):
+        """锁定项目行，串行化同一项目的批量改写排序键操作"""
+        await db.execute(select(Project.id).where(Project.id == project_id).with_for_update())
+
+    @classmethod
+    async def _write_positions(cls, db: AsyncSession, positions: Dict[UUID, str]):
+        """
+        批量改写排序键
+
+        先把受影响的行改为临时键（"~"不在键字符集中，不会与正式键冲突），
+        再写入新键，避免新旧键互换时触发唯一约束
+        """
+        if not positions:
+            return
+        await db.execute(
+            update(Slide)
+            .where(Slide.id.in_(list(positions)))
+            .values(position=literal("~") + cast(Slide.id, String))
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(Slide),
+            [{"id": slide_id, "position": position} for slide_id, position in positions.items()]
+        )
+
+    @classmethod
+    async def _flush_with_retry(cls, db: AsyncSession, assign_positions, objects: List[Slide]):
+        """
+        分配排序键并写入；并发写入占用了同一个键时重新读取相邻键重试
+
+        Args:
+            assign_positions: 为objects计算并设置position的协程函数
+            objects: 待写入的幻灯片
+        """
+        for attempt in range(settings.SLIDE_POSITION_RETRIES):
+            await assign_positions()
+            try:
+                async with db.begin_nested():
+                    db.add_all(objects)
+                    await db.flush()
+                return
+            except IntegrityError:
+                if attempt == settings.SLIDE_POSITION_RETRIES - 1:
+                    raise
+                logger.info("Slide position taken by a concurrent write, retrying")
+
+    @classmethod
+    async def _maybe_rebalance(cls, db: AsyncSession, project_id: UUID, slides: List[Slide]):
+        """键长度超过上限时重新均匀分配整个项目的排序键"""
+        if any(len(slide.position) > settings.SLIDE_POSITION_MAX_LENGTH for slide in slides):
+            await cls.rebalance_positions(db, project_id)
+            for slide in slides:
+                await db.refresh(slide, ["position"])
+
+    @classmethod
+    async def insert_slide(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        index: int,
+        html_content: str,
+        style_config: Optional[dict] = None
+    ) -> Slide:
+        """
+        在展示序号 index 处插入幻灯片（只写入新行，调用方负责提交事务）
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            index: 插入位置，超出末尾时追加
+            html_content: 页面HTML
+            style_config: 样式配置
+
+        Returns:
+            新幻灯片（index 为实际展示序号）
+        """
+        slide = Slide(project_id=project_id, html_content=html_content, style_config=style_config or {})
+
+        async def assign():
+            lower, upper = await cls._neighbour_positions(db, project_id, index)
+            slide.position = FractionalIndex.between(lower, upper)
+
+        await cls._flush_with_retry(db, assign, [slide])
+        await cls._maybe_rebalance(db, project_id, [slide])
+        slide.index = await cls._display_index(db, project_id, slide.position)
+        return slide
+
     @classmethod
     async def create_slide(
         cls,
@@ -16,19 +143,83 @@ class SlideService:
         project_id: UUID,
         slide_data: SlideCreate
     ) -> Slide:
-        """创建幻灯片"""
-        slide = Slide(
-            project_id=project_id,
-            index=slide_data.index,
-            html_content=slide_data.html_content,
-            style_config=slide_data.style_config
+        """创建幻灯片（公共head部分并入项目主题）"""
+        html_content, = await ThemeService.absorb_pages(db, project_id, [slide_data.html_content])
+        slide = await cls.insert_slide(
+            db,
+            project_id,
+            slide_data.index,
+            html_content,
+            slide_data.style_config
         )
-
-        db.add(slide)
+        await RevisionService.record_revision(db, slide, "api")
         await db.commit()
         await db.refresh(slide)
         return slide
 
+    @classmethod
+    async def bulk_create_slides(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        pages: List[dict]
+    ) -> List[Slide]:
+        """
+        批量插入幻灯片（一次插入，调用方负责提交事务）
+
+        页面按 index 升序依次插入到对应展示位置，插入到同一空隙的连续页面一次分配排序键。
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            pages: [{"index", "html_content"}, ...]
+
+        Returns:
+            创建的幻灯片列表（与pages顺序一致，index 为实际展示序号）
+        """
+        slides = [
+            Slide(project_id=project_id, html_content=page["html_content"], style_config=page.get("style_config") or {})
+            for page in pages
+        ]
+        placement = sorted(range(len(pages)), key=lambda i: pages[i]["index"])
+
+        async def assign():
+            result = await db.execute(
+                select(Slide.position).where(Slide.project_id == project_id).order_by(Slide.position)
+            )
+            order: List = list(result.scalars().all())
+            for i in placement:
+                order.insert(min(max(pages[i]["index"], 0), len(order)), slides[i])
+
+            # 同一空隙中的连续新页面一次生成排序键
+            lower, run = None, []
+            for item in order + [None]:
+                if isinstance(item, Slide):
+                    run.append(item)
+                    continue
+                for slide, position in zip(run, FractionalIndex.n_between(lower, item, len(run))):
+                    slide.position = position
+                lower, run = item, []
+
+            for display_index, item in enumerate(order):
+                if isinstance(item, Slide):
+                    item.index = display_index
+
+        await cls._flush_with_retry(db, assign, slides)
+        await cls._maybe_rebalance(db, project_id, slides)
+        return slides
+
+    @classmethod
+    async def _display_index(cls, db: AsyncSession, project_id: UUID, position: str) -> int:
+        """计算排序键对应的展示序号"""
+        result = await db.execute(
+            select(func.count()).select_from(Slide).where(
+                Slide.project_id == project_id,
+                Slide.position < position
+            )
+        )
+        return result.scalar_one()
+
     @classmethod
     async def get_slide(cls, db: AsyncSession, slide_id: UUID, project_id: UUID) -> Optional[Slide]:
         """获取幻灯片"""
@@ -38,15 +229,62 @@ class SlideService:
                 Slide.project_id == project_id
             )
         )
-        return result.scalar_one_or_none()
+        slide = result.scalar_one_or_none()
+        if slide:
+            slide.index = await cls._display_index(db, project_id, slide.position)
+        return slide
+
+    @classmethod
+    async def get_slide_by_index(cls, db: AsyncSession, project_id: UUID, index: int) -> Optional[Slide]:
+        """按展示序号获取幻灯片"""
+        if index < 0:
+            return None
+        result = await db.execute(
+            select(Slide)
+            .where(Slide.project_id == project_id)
+            .order_by(Slide.position)
+            .offset(index)
+            .limit(1)
+        )
+        slide = result.scalar_one_or_none()
+        if slide:
+            slide.index = index
+        return slide
 
     @classmethod
     async def get_slides_by_project(cls, db: AsyncSession, project_id: UUID) -> List[Slide]:
         """获取项目的幻灯片列表"""
         result = await db.execute(
-            select(Slide).where(Slide.project_id == project_id).order_by(Slide.index)
+            select(Slide).where(Slide.project_id == project_id).order_by(Slide.position)
         )
-        return list(result.scalars().all())
+        slides = list(result.scalars().all())
+        for index, slide in enumerate(slides):
+            slide.index = index
+        return slides
+
+    @classmethod
+    async def get_slide_summaries(cls, db: AsyncSession, project_id: UUID) -> List[dict]:
+        """
+        获取项目的幻灯片摘要列表（只读取哈希/大小/摘要列，不加载整页HTML）
+
+        Returns:
+            [{"id", "index", "position", "content_hash", "content_size", "summary", ...}, ...]
+        """
+        result = await db.execute(
+            select(
+                Slide.id,
+                Slide.project_id,
+                Slide.position,
+                Slide.content_hash,
+                Slide.content_size,
+                Slide.summary,
+                Slide.thumbnail_url,
+                Slide.thumbnail_variants,
+                Slide.current_revision_id,
+                Slide.updated_at
+            ).where(Slide.project_id == project_id).order_by(Slide.position)
+        )
+        return [{**row._asdict(), "index": index} for index, row in enumerate(result.all())]
 
     @classmethod
     async def update_slide(
@@ -64,12 +302,16 @@ class SlideService:
 
         # 更新字段
         update_data = slide_data.dict(exclude_unset=True)
-        if update_data:
-            await db.execute(
-                update(Slide)
-                .where(Slide.id == slide_id, Slide.project_id == project_id)
-                .values(**update_data)
+        if update_data.get("html_content"):
+            update_data["html_content"], = await ThemeService.absorb_pages(
+                db, project_id, [update_data["html_content"]], count_rules=False
             )
+        if update_data:
+            # 通过ORM属性赋值，内容哈希/大小/摘要随 html_content 一起更新
+            for field, value in update_data.items():
+                setattr(slide, field, value)
+            if "html_content" in update_data:
+                await RevisionService.record_revision(db, slide, "api")
             await db.commit()
             await db.refresh(slide)
 
@@ -87,6 +329,54 @@ class SlideService:
         await db.commit()
         return result.rowcount > 0
 
+    @classmethod
+    async def delete_slides_by_index(cls, db: AsyncSession, project_id: UUID, indexes: List[int]) -> int:
+        """
+        按展示序号删除幻灯片（调用方负责提交事务）
+
+        Returns:
+            删除的数量
+        """
+        result = await db.execute(
+            select(Slide.id).where(Slide.project_id == project_id).order_by(Slide.position)
+        )
+        ids = list(result.scalars().all())
+        targets = [ids[i] for i in set(indexes) if 0 <= i < len(ids)]
+        if not targets:
+            return 0
+
+        result = await db.execute(delete(Slide).where(Slide.id.in_(targets)))
+        return result.rowcount
+
+    @classmethod
+    async def move_slide(
+        cls,
+        db: AsyncSession,
+        slide_id: UUID,
+        project_id: UUID,
+        index: int
+    ) -> Optional[Slide]:
+        """
+        把幻灯片移动到展示序号 index（只改写被移动的一行）
+
+        Returns:
+            移动后的幻灯片，不存在时返回None
+        """
+        slide = await cls.get_slide(db, slide_id, project_id)
+        if not slide:
+            return None
+
+        async def assign():
+            lower, upper = await cls._neighbour_positions(db, project_id, index, exclude_id=slide.id)
+            slide.position = FractionalIndex.between(lower, upper)
+
+        await cls._flush_with_retry(db, assign, [slide])
+        await cls._maybe_rebalance(db, project_id, [slide])
+        await db.commit()
+        await db.refresh(slide)
+        slide.index = await cls._display_index(db, project_id, slide.position)
+        return slide
+
     @classmethod
     async def reorder_slides(
         cls,
@@ -94,20 +384,68 @@ class SlideService:
         project_id: UUID,
         slide_orders: List[dict]
     ) -> bool:
-        """重新排序幻灯片"""
+        """
+        重新排序幻灯片
+
+        保留最长的相对顺序未变的子序列，只为其余幻灯片在相邻键之间生成新键。
+
+        Args:
+            slide_orders: [{"id", "index"}, ...]，未列出的幻灯片保持原有相对顺序排在最后
+        """
         try:
-            for order_data in slide_orders:
-                await db.execute(
-                    update(Slide)
-                    .where(Slide.id == order_data["id"], Slide.project_id == project_id)
-                    .values(index=order_data["index"])
-                )
+            await cls._lock_project(db, project_id)
+            result = await db.execute(
+                select(Slide.id, Slide.position).where(Slide.project_id == project_id).order_by(Slide.position)
+            )
+            current = list(result.all())
+            rank = {slide_id: i for i, (slide_id, _) in enumerate(current)}
+
+            requested = [
+                UUID(str(order["id"]))
+                for order in sorted(slide_orders, key=lambda order: order["index"])
+                if UUID(str(order["id"])) in rank
+            ]
+            listed = set(requested)
+            desired = list(dict.fromkeys(requested)) + [slide_id for slide_id, _ in current if slide_id not in listed]
+
+            kept = {
+                desired[i]
+                for i in FractionalIndex.longest_increasing_subsequence([rank[slide_id] for slide_id in desired])
+            }
+            old_positions = dict(current)
+
+            new_positions: Dict[UUID, str] = {}
+            lower, run = None, []
+            for slide_id in desired + [None]:
+                if slide_id is not None and slide_id not in kept:
+                    run.append(slide_id)
+                    continue
+                upper = old_positions[slide_id] if slide_id is not None else None
+                for moved_id, position in zip(run, FractionalIndex.n_between(lower, upper, len(run))):
+                    new_positions[moved_id] = position
+                lower, run = upper, []
+
+            await cls._write_positions(db, new_positions)
+            if any(len(position) > settings.SLIDE_POSITION_MAX_LENGTH for position in new_positions.values()):
+                await cls.rebalance_positions(db, project_id)
             await db.commit()
             return True
-        except Exception:
+        except Exception as e:
+            logger.error(f"Reorder slides failed for project {project_id}: {e}")
             await db.rollback()
             return False
 
+    @classmethod
+    async def rebalance_positions(cls, db: AsyncSession, project_id: UUID):
+        """重新均匀分配项目所有幻灯片的排序键（键过长时才需要，调用方负责提交事务）"""
+        await cls._lock_project(db, project_id)
+        result = await db.execute(
+            select(Slide.id).where(Slide.project_id == project_id).order_by(Slide.position)
+        )
+        ids = list(result.scalars().all())
+        await cls._write_positions(db, dict(zip(ids, FractionalIndex.spread(len(ids)))))
+        logger.info(f"Rebalanced {len(ids)} slide positions for project {project_id}")
+
 
 class SlideAssetService:
     """幻灯片素材服务"""
@@ -0,0 +1,154 @@
+import asyncio
+import io
+import logging
+from typing import AsyncIterator, BinaryIO, Optional
+from minio import Minio
+from minio.error import S3Error
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 通过 /api/assets 对外提供的对象前缀
+PUBLIC_PREFIX = "assets/"
+
+
+class ObjectStorageService:
+    """MinIO对象存储服务"""
+
+    def __init__(self):
+        self.client: Optional[Minio] = None
+        self.bucket = settings.MINIO_BUCKET
+        self._bucket_ready = False
+
+    def _get_client(self) -> Minio:
+        """获取MinIO客户端（同步，仅在线程池中使用）"""
+        if self.client is None:
+            self.client = Minio(
+                settings.MINIO_ENDPOINT,
+                access_key=settings.MINIO_ACCESS_KEY,
+                secret_key=settings.MINIO_SECRET_KEY,
+                secure=settings.MINIO_SECURE
+            )
+        if not self._bucket_ready:
+            if not self.client.bucket_exists(self.bucket):
+                self.client.make_bucket(self.bucket)
+                logger.info(f"Created MinIO bucket: {self.bucket}")
+            self._bucket_ready = True
+        return self.client
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self._get_client().stat_object(self.bucket, key)
+            return True
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return False
+            raise
+
+    def _put_bytes(self, key: str, data: bytes, content_type: str):
+        self._get_client().put_object(
+            self.bucket,
+            key,
+            io.BytesIO(data),
+            length=len(data),
+            content_type=content_type
+        )
+
+    def _put_stream(self, key: str, stream: BinaryIO, length: int, content_type: str):
+        self._get_client().put_object(
+            self.bucket,
+            key,
+            stream,
+            length=length,
+            content_type=content_type
+        )
+
+    def _size(self, key: str) -> Optional[int]:
+        try:
+            return self._get_client().stat_object(self.bucket, key).size
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise
+
+    def _open(self, key: str, offset: int, length: int):
+        return self._get_client().get_object(self.bucket, key, offset=offset, length=length)
+
+    def _get_bytes(self, key: str) -> Optional[tuple]:
+        try:
+            response = self._get_client().get_object(self.bucket, key)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise
+        try:
+            content_type = response.headers.get("Content-Type", "application/octet-stream")
+            return response.read(), content_type
+        finally:
+            response.close()
+            response.release_conn()
+
+    async def exists(self, key: str) -> bool:
+        """检查对象是否存在"""
+        return await asyncio.to_thread(self._exists, key)
+
+    async def put_bytes(self, key: str, data: bytes, content_type: str = "application/octet-stream"):
+        """上传字节数据"""
+        await asyncio.to_thread(self._put_bytes, key, data, content_type)
+        logger.debug(f"Stored object {key} ({len(data)} bytes)")
+
+    async def put_stream(self, key: str, stream: BinaryIO, length: int, content_type: str = "application/octet-stream"):
+        """从文件对象上传（大文件由MinIO客户端分片上传，不整体读入内存）"""
+        await asyncio.to_thread(self._put_stream, key, stream, length, content_type)
+        logger.debug(f"Stored object {key} ({length} bytes)")
+
+    async def size(self, key: str) -> Optional[int]:
+        """对象字节数，对象不存在时返回None"""
+        return await asyncio.to_thread(self._size, key)
+
+    async def iter_range(
+        self,
+        key: str,
+        offset: int = 0,
+        length: int = 0,
+        chunk_size: int = 256 * 1024
+    ) -> AsyncIterator[bytes]:
+        """
+        分块读取对象的一段字节
+
+        Args:
+            key: 对象键
+            offset: 起始偏移
+            length: 读取长度（0表示读到末尾）
+            chunk_size: 每块大小
+        """
+        response = await asyncio.to_thread(self._open, key, offset, length)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(response.read, chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            response.close()
+            response.release_conn()
+
+    async def get_bytes(self, key: str) -> Optional[tuple]:
+        """
+        读取对象
+
+        Returns:
+            (数据, Content-Type)，对象不存在时返回None
+        """
+        return await asyncio.to_thread(self._get_bytes, key)
+
+    @staticmethod
+    def public_url(key: str) -> str:
+        """获取对象的稳定访问URL（经由后端 /api/assets 提供，路径中去掉公共前缀 assets/）"""
+        if key.startswith(PUBLIC_PREFIX):
+            key = key[len(PUBLIC_PREFIX):]
+        return f"{settings.ASSET_BASE_URL.rstrip('/')}/api/assets/{key}"
+
+
+# 全局实例
+storage_service = ObjectStorageService()
@@ -0,0 +1,98 @@
+import logging
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.services.browser_pool import browser_pool
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service, PUBLIC_PREFIX
+from app.services.theme_service import ThemeService
+from app.utils.tailwind_css import TailwindCSS, READY_SCRIPT, EXTRACT_SCRIPT
+from app.utils.theme_stylesheet import ThemeStylesheet
+
+logger = logging.getLogger(__name__)
+
+
+class TailwindService:
+    """
+    Tailwind 工具类预编译
+
+    规划选择了Tailwind时页面通过 Play CDN 脚本在浏览器中即时生成CSS，每次预览和渲染都要重新生成。
+    页面写入后（缩略图任务中）扫描整套页面用到的类名，用浏览器池中的页面运行一次同一脚本，
+    取出生成的CSS存入对象存储（按 脚本 + 配置 + 类名集合 哈希缓存），结果记在主题的 tailwind 字段中，
+    渲染和预览时由 ThemeStylesheet.apply_tailwind 用静态CSS替换运行时脚本
+    """
+
+    @classmethod
+    def needs_compile(cls, theme: Dict[str, Any], bodies: List[str]) -> bool:
+        """主题使用 Play CDN 且预编译CSS缺失或不覆盖页面时需要重新编译"""
+        if not settings.TAILWIND_PRECOMPILE_ENABLED:
+            return False
+        script = TailwindCSS.runtime_script(theme["head"], settings.TAILWIND_CDN_HOSTS)
+        if script is None:
+            return False
+        record = theme.get("tailwind")
+        if not record or record.get("script") != ThemeStylesheet.tag_key(script):
+            return True
+        return not TailwindCSS.covers(record, bodies)
+
+    @classmethod
+    def css_key(cls, digest: str) -> str:
+        return f"{PUBLIC_PREFIX}tailwind/{digest}.css"
+
+    @classmethod
+    async def _generate(cls, html: str) -> str:
+        """在浏览器池中加载编译页面，取出 Play CDN 生成的CSS"""
+        async with browser_pool.page() as page:
+            await page.set_content(html, wait_until="load")
+            await page.wait_for_function(READY_SCRIPT, timeout=settings.TAILWIND_COMPILE_TIMEOUT * 1000)
+            return await page.evaluate(EXTRACT_SCRIPT)
+
+    @classmethod
+    async def compile_deck(cls, db: AsyncSession, project_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        按整套页面用到的工具类生成静态CSS，写入主题的 tailwind 字段
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+
+        Returns:
+            更新后的主题；主题不使用 Play CDN 或各页面的 tailwind.config 不一致时返回None（保留运行时脚本）
+
+        Raises:
+            Exception: 编译页面加载或生成超时
+        """
+        theme = await ThemeService.get_theme(db, project_id) or ThemeService.default_theme()
+        script = TailwindCSS.runtime_script(theme["head"], settings.TAILWIND_CDN_HOSTS)
+        if script is None:
+            return None
+
+        bodies = [slide.html_content or "" for slide in await SlideService.get_slides_by_project(db, project_id)]
+        configs = {TailwindCSS.config(body) for body in bodies}
+        if len(configs) > 1:
+            logger.info(f"Tailwind precompile skipped for project {project_id}: slides use different configs")
+            return None
+        config = configs.pop() if configs else ""
+        classes = TailwindCSS.classes(bodies)
+
+        key = cls.css_key(TailwindCSS.digest(script, config, classes))
+        cached = await storage_service.exists(key)
+        if not cached:
+            css = await cls._generate(TailwindCSS.compile_page(script, config, classes))
+            await storage_service.put_bytes(key, css.encode("utf-8"), "text/css")
+
+        record = {
+            "script": ThemeStylesheet.tag_key(script),
+            "config": TailwindCSS.config_key(config),
+            "classes": sorted(classes),
+            "url": storage_service.public_url(key),
+        }
+        theme = await ThemeService.save_tailwind(db, project_id, record)
+        await db.commit()
+
+        logger.info(
+            f"{'Reused' if cached else 'Compiled'} Tailwind CSS for project {project_id}: "
+            f"{len(classes)} classes, {len(bodies)} slides"
+        )
+        return theme
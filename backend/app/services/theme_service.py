@@ -0,0 +1,156 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.project import Project
+from app.models.slide import Slide
+from app.utils.theme_stylesheet import ThemeStylesheet
+
+logger = logging.getLogger(__name__)
+
+
+class ThemeService:
+    """项目共享主题服务：主题只在项目上存一份，页面只保存<body>，渲染时合成"""
+
+    @classmethod
+    def default_theme(cls) -> Dict[str, Any]:
+        """没有规划时使用的默认主题"""
+        return ThemeStylesheet.build({}, settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT)
+
+    @classmethod
+    async def _locked_project(cls, db: AsyncSession, project_id: UUID) -> Project:
+        """锁定并重新读取项目行，串行化同一项目的主题更新"""
+        result = await db.execute(
+            select(Project)
+            .where(Project.id == project_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        project = result.scalar_one_or_none()
+        if not project:
+            raise ValueError(f"Project {project_id} not found")
+        return project
+
+    @classmethod
+    async def save_plan_theme(cls, db: AsyncSession, project_id: UUID, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        根据 think 规划生成或更新项目主题（调用方负责提交事务）
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            plan: 规划参数
+
+        Returns:
+            主题
+        """
+        project = await cls._locked_project(db, project_id)
+        rebuilt = ThemeStylesheet.build(plan, settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT)
+        project.theme = ThemeStylesheet.merge(project.theme, rebuilt)
+        logger.info(f"Saved theme {project.theme['hash']} for project {project_id}")
+        return project.theme
+
+    @classmethod
+    async def absorb_pages(
+        cls,
+        db: AsyncSession,
+        project_id: UUID,
+        htmls: List[str],
+        count_rules: bool = True
+    ) -> List[str]:
+        """
+        把页面中的公共head部分并入项目主题，返回只包含<body>的页面（调用方负责提交事务）
+
+        Args:
+            db: 数据库会话
+            project_id: 项目ID
+            htmls: 模型输出的页面HTML
+            count_rules: 是否累计规则出现次数（重写已有页面时为False）
+
+        Returns:
+            页面HTML列表（与输入一一对应）
+        """
+        # 解析HTML不依赖主题，在锁外完成
+        documents = [ThemeStylesheet.split_document(html) for html in htmls]
+        if not any(documents):
+            return list(htmls)
+
+        # 先按未加锁读取的主题合并：大多数页面不会带来新的head标签或共享规则，主题不变时无需加锁。
+        # 共享规则只增不减，按旧主题删掉的规则在新主题中仍然存在
+        project = await db.get(Project, project_id)
+        if not project:
+            raise ValueError(f"Project {project_id} not found")
+        snapshot = project.theme or cls.default_theme()
+        theme, bodies = cls._merge_documents(snapshot, htmls, documents, count_rules)
+        if theme == snapshot and project.theme:
+            return bodies
+
+        # 主题有变化时才锁定项目行，按最新主题重新合并（锁内只有字符串处理）
+        project = await cls._locked_project(db, project_id)
+        theme, bodies = cls._merge_documents(project.theme or cls.default_theme(), htmls, documents, count_rules)
+        # 重新赋值整个字典，JSONB列才会被标记为已修改
+        project.theme = theme
+        return bodies
+
+    @staticmethod
+    def _merge_documents(
+        theme: Dict[str, Any],
+        htmls: List[str],
+        documents: List[Optional[Dict[str, Any]]],
+        count_rules: bool
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """依次把已解析的页面并入主题，不是完整文档的页面原样返回"""
+        bodies = []
+        for html, document in zip(htmls, documents):
+            if document is None:
+                bodies.append(html)
+                continue
+            theme, body = ThemeStylesheet.merge_document(theme, document, count_rules)
+            bodies.append(body)
+        return theme, bodies
+
+    @classmethod
+    async def save_fonts(cls, db: AsyncSession, project_id: UUID, fonts: Dict[str, Any]):
+        """
+        保存主题的字体子集（调用方负责提交事务）
+
+        fonts 中记录了生成时的主题哈希，主题此后有变化时子集不会被使用，等待重新生成
+        """
+        project = await cls._locked_project(db, project_id)
+        theme = dict(project.theme or cls.default_theme())
+        theme["fonts"] = fonts
+        project.theme = theme
+
+    @classmethod
+    async def save_tailwind(cls, db: AsyncSession, project_id: UUID, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        保存主题的Tailwind预编译结果（调用方负责提交事务）
+
+        Returns:
+            更新后的主题
+        """
+        project = await cls._locked_project(db, project_id)
+        theme = dict(project.theme or cls.default_theme())
+        theme["tailwind"] = record
+        project.theme = theme
+        return theme
+
+    @classmethod
+    async def get_theme(cls, db: AsyncSession, project_id: UUID) -> Optional[Dict[str, Any]]:
+        """获取项目主题"""
+        result = await db.execute(select(Project.theme).where(Project.id == project_id))
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def render_slide(cls, db: AsyncSession, slide: Slide, title: str = "") -> str:
+        """合成可独立渲染的页面HTML"""
+        theme = await cls.get_theme(db, slide.project_id)
+        return ThemeStylesheet.compose(theme or cls.default_theme(), slide.html_content, title)
+
+    @classmethod
+    async def render_slides(cls, db: AsyncSession, project_id: UUID, slides: List[Slide], title: str = "") -> List[str]:
+        """批量合成页面HTML（主题只读取一次）"""
+        theme = await cls.get_theme(db, project_id) or cls.default_theme()
+        return [ThemeStylesheet.compose(theme, slide.html_content, title) for slide in slides]
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.slide import Slide
+from app.services.browser_pool import browser_pool
+from app.services.font_service import FontService
+from app.services.redis_service import redis_service
+from app.services.slide_service import SlideService
+from app.services.storage_service import storage_service
+from app.services.tailwind_service import TailwindService
+from app.services.theme_service import ThemeService
+from app.utils.html_sanitizer import HTMLSanitizer
+from app.utils.theme_stylesheet import ThemeStylesheet
+from app.utils.thumbnail import ThumbnailGenerator
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailService:
+    """
+    幻灯片缩略图服务：页面写入后投递渲染任务到独立队列，一次整页截图编码为多个尺寸/格式的变体，
+    分别上传到对象存储
+
+    防抖：每次投递都为幻灯片写入新的任务令牌，任务延迟 THUMBNAIL_DEBOUNCE 秒执行，
+    执行时令牌已被后续写入替换则直接跳过，连续修改同一页面只渲染最后一次
+    """
+
+    TASK_NAME = "app.tasks.render_slide_thumbnail"
+
+    @classmethod
+    def token_key(cls, slide_id: str) -> str:
+        return f"thumbnail:token:{slide_id}"
+
+    @classmethod
+    def variant_sizes(cls) -> Dict[str, Tuple[int, int]]:
+        """变体名 -> (宽, 高)，高度按页面比例计算"""
+        return {
+            name: (width, round(width * settings.SLIDE_HEIGHT / settings.SLIDE_WIDTH))
+            for name, width in settings.THUMBNAIL_VARIANTS.items()
+        }
+
+    @classmethod
+    def formats(cls) -> List[str]:
+        """输出格式（当前环境不支持配置的格式时退回PNG）"""
+        return ThumbnailGenerator.supported_formats(settings.THUMBNAIL_FORMATS) or ["png"]
+
+    @classmethod
+    def render_digest(cls, html: str, theme_hash: str) -> str:
+        """
+        渲染内容哈希：规范化HTML、主题、截图尺寸和变体配置
+
+        只改了空白/属性顺序的页面哈希不变；不同项目中相同的页面共用一组图片
+
+        Returns:
+            sha256十六进制字符串
+        """
+        spec = f"{settings.SLIDE_WIDTH}x{settings.SLIDE_HEIGHT}|{sorted(cls.variant_sizes().items())}|" \
+            f"{cls.formats()}|{sorted(settings.THUMBNAIL_QUALITY.items())}"
+        content = f"{HTMLSanitizer.canonicalize(html)}\n{theme_hash}\n{spec}"
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _prefix(cls, digest: str) -> str:
+        return f"assets/thumbnails/{digest[:2]}/{digest}"
+
+    @classmethod
+    def manifest_key(cls, digest: str) -> str:
+        """变体清单对象键（所有变体上传完成后最后写入，存在即表示整组可用）"""
+        return f"{cls._prefix(digest)}/manifest.json"
+
+    @classmethod
+    def variant_urls(cls, digest: str) -> Dict[str, Dict[str, str]]:
+        """各变体的访问URL {"grid": {"webp": url, "avif": url}, ...}"""
+        return {
+            name: {
+                fmt: storage_service.public_url(f"{cls._prefix(digest)}/{name}-{width}.{fmt}")
+                for fmt in cls.formats()
+            }
+            for name, (width, _) in cls.variant_sizes().items()
+        }
+
+    @classmethod
+    def primary_url(cls, variants: Dict[str, Dict[str, str]]) -> str:
+        """写入 thumbnail_url 的主变体（默认 grid 的首选格式）"""
+        urls = variants.get(settings.THUMBNAIL_PRIMARY_VARIANT) or next(iter(variants.values()))
+        return urls[cls.formats()[0]]
+
+    @classmethod
+    async def store_variants(cls, digest: str, screenshot: bytes) -> Dict[str, Dict[str, str]]:
+        """
+        由整页截图编码全部变体（线程池中执行）并分别上传
+
+        Args:
+            digest: 渲染内容哈希
+            screenshot: 整页截图PNG字节
+
+        Returns:
+            各变体的访问URL
+        """
+        sizes = cls.variant_sizes()
+        encoded = await ThumbnailGenerator.encode_variants_async(
+            screenshot, sizes, cls.formats(), settings.THUMBNAIL_QUALITY
+        )
+        await asyncio.gather(*(
+            storage_service.put_bytes(f"{cls._prefix(digest)}/{name}-{sizes[name][0]}.{fmt}", data, f"image/{fmt}")
+            for name, by_format in encoded.items()
+            for fmt, data in by_format.items()
+        ))
+        variants = cls.variant_urls(digest)
+        manifest = {
+            "variants": variants,
+            "bytes": {name: {fmt: len(data) for fmt, data in by_format.items()} for name, by_format in encoded.items()}
+        }
+        await storage_service.put_bytes(
+            cls.manifest_key(digest), json.dumps(manifest).encode("utf-8"), "application/json"
+        )
+        return variants
+
+    @classmethod
+    async def schedule(cls, slide_ids: Iterable[Any], conversation_id: Optional[str] = None) -> int:
+        """
+        投递缩略图渲染任务（在页面写入的事务提交之后调用，失败不影响写入）
+
+        Args:
+            slide_ids: 幻灯片ID
+            conversation_id: 对话ID，渲染完成后在该对话的SSE流上发送 thumbnail_ready
+
+        Returns:
+            投递的任务数
+        """
+        # 延迟导入，避免工具模块与任务模块循环导入
+        from app.worker import celery_app
+
+        scheduled = 0
+        for slide_id in dict.fromkeys(str(slide_id) for slide_id in slide_ids):
+            token = uuid.uuid4().hex
+            try:
+                await redis_service.set_value(cls.token_key(slide_id), token, settings.THUMBNAIL_TOKEN_TTL)
+                celery_app.send_task(
+                    cls.TASK_NAME,
+                    args=[slide_id, token, conversation_id],
+                    countdown=settings.THUMBNAIL_DEBOUNCE,
+                    queue=settings.THUMBNAIL_QUEUE
+                )
+                scheduled += 1
+            except Exception as e:
+                logger.warning(f"Failed to schedule thumbnail for slide {slide_id}: {e}")
+        return scheduled
+
+    @classmethod
+    async def is_current(cls, slide_id: str, token: str) -> bool:
+        """任务令牌是否仍是该幻灯片最新的一次投递"""
+        return await redis_service.get_value(cls.token_key(slide_id)) == token
+
+    @classmethod
+    async def render(cls, db: AsyncSession, slide_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        渲染整页截图并生成各尺寸变体，写回 thumbnail_url / thumbnail_variants（相同内容已渲染过时跳过）
+
+        Args:
+            db: 数据库会话
+            slide_id: 幻灯片ID
+
+        Returns:
+            {"slide_id", "project_id", "index", "thumbnail_url", "thumbnail_variants", "cached"}，
+            幻灯片已删除时返回None
+        """
+        slide = await db.get(Slide, slide_id)
+        if slide is None:
+            return None
+
+        theme = await ThemeService.get_theme(db, slide.project_id) or ThemeService.default_theme()
+        # 页面中出现字体子集没有的字符时重新生成子集（本次渲染使用完整字体）
+        if FontService.needs_subset(theme, [slide.html_content]):
+            await FontService.schedule(slide.project_id)
+        # 页面用到了预编译CSS之外的Tailwind工具类：先重新编译整套的CSS，本次截图即不再在浏览器中即时生成
+        if TailwindService.needs_compile(theme, [slide.html_content]):
+            try:
+                theme = await TailwindService.compile_deck(db, slide.project_id) or theme
+            except Exception as e:
+                logger.warning(f"Tailwind precompile failed for project {slide.project_id}: {e}")
+        digest = cls.render_digest(slide.html_content, theme["hash"])
+        variants = cls.variant_urls(digest)
+        url = cls.primary_url(variants)
+
+        # 内容未变化（或其它页面已渲染过相同内容）时直接复用已存储的变体
+        cached = slide.thumbnail_url == url or await storage_service.exists(cls.manifest_key(digest))
+        if not cached:
+            html = ThemeStylesheet.compose(theme, slide.html_content)
+            screenshot = await browser_pool.screenshot(html, settings.SLIDE_WIDTH, settings.SLIDE_HEIGHT)
+            await cls.store_variants(digest, screenshot)
+
+        if slide.thumbnail_url != url or slide.thumbnail_variants != variants:
+            slide.thumbnail_url = url
+            slide.thumbnail_variants = variants
+            await db.commit()
+
+        logger.info(f"{'Reused' if cached else 'Rendered'} thumbnail for slide {slide_id}: {digest[:16]}")
+        return {
+            "slide_id": str(slide.id),
+            "project_id": str(slide.project_id),
+            "index": await SlideService._display_index(db, slide.project_id, slide.position),
+            "thumbnail_url": slide.thumbnail_url,
+            "thumbnail_variants": slide.thumbnail_variants,
+            "cached": cached
+        }
+
+    @classmethod
+    async def notify(
+        cls,
+        event: Dict[str, Any],
+        conversation_id: Optional[str] = None,
+        event_type: str = "thumbnail_ready"
+    ):
+        """通过SSE通知前端渲染结果（有对话时发到对话频道，否则发到项目频道）"""
+        channel = f"conversation:{conversation_id}" if conversation_id else f"project:{event['project_id']}"
+        await redis_service.publish_message(channel, {"type": event_type, "data": event})
@@ -1,16 +1,21 @@
 """
 异步任务定义
 """
-from app.worker import celery_app
+from app.worker import celery_app, run_async
 from app.agent.core import PPTAgent
 from app.services.redis_service import redis_service
 from app.services.agent_service import AgentService
+from app.services.thumbnail_service import ThumbnailService
+from app.services.deck_render_service import DeckRenderService
+from app.services.export_service import ExportService
+from app.services.bundle_service import BundleService
+from app.services.font_service import FontService
+from app.database import async_session_maker
 from app.database import get_db
 from app.config import settings
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 import logging
-import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -56,7 +61,8 @@ def process_agent_message(self, conversation_id: str, message: str, user_id: str
                         )
                         return
 
-                    conversation_history = conversation.messages or []
+                    stored_messages = list(conversation.messages or [])
+                    conversation_history = await AgentService.load_conversation_messages(db, conversation)
 
                     # 创建Agent实例并处理消息流
                     agent = PPTAgent(redis_service, conversation_id)
@@ -73,7 +79,8 @@ def process_agent_message(self, conversation_id: str, message: str, user_id: str
                     await AgentService.update_conversation_messages(
                         db,
                         UUID(conversation_id),
-                        updated_history
+                        updated_history,
+                        stored_messages=stored_messages
                     )
 
                     logger.info(f"Successfully processed agent message for conversation {conversation_id}")
@@ -106,8 +113,199 @@ def process_agent_message(self, conversation_id: str, message: str, user_id: str
         finally:
             await redis_service.disconnect()
 
-    # 运行异步任务
-    return asyncio.run(_process())
+    # 在Worker常驻事件循环中运行异步任务（复用进程级连接池）
+    return run_async(_process())
+
+@celery_app.task(bind=True, ignore_result=True)
+def render_slide_thumbnail(self, slide_id: str, token: str, conversation_id: str = None):
+    """
+    渲染幻灯片缩略图（thumbnails 队列，防抖：令牌已被后续写入替换时跳过）
+
+    Args:
+        slide_id: 幻灯片ID
+        token: 投递时写入的任务令牌
+        conversation_id: 对话ID（可选，用于推送 thumbnail_ready 事件）
+    """
+    async def _render():
+        try:
+            await redis_service.connect()
+            if not await ThumbnailService.is_current(slide_id, token):
+                logger.debug(f"Skipping superseded thumbnail job for slide {slide_id}")
+                return {"status": "skipped", "slide_id": slide_id}
+
+            async with async_session_maker() as db:
+                event = await ThumbnailService.render(db, UUID(slide_id))
+            if event is None:
+                return {"status": "missing", "slide_id": slide_id}
+
+            await ThumbnailService.notify(event, conversation_id)
+            return {"status": "success", "slide_id": slide_id}
+
+        except Exception as e:
+            logger.error(f"Error rendering thumbnail for slide {slide_id}: {e}", exc_info=True)
+            return {"status": "error", "slide_id": slide_id, "error": str(e)}
+        finally:
+            await redis_service.disconnect()
+
+    return run_async(_render())
+
+@celery_app.task(bind=True, ignore_result=True)
+def subset_deck_fonts(self, project_id: str, token: str):
+    """
+    按整套页面用到的字符生成主题字体子集（thumbnails 队列，防抖：令牌已被替换时跳过）
+
+    Args:
+        project_id: 项目ID
+        token: 投递时写入的任务令牌
+    """
+    async def _subset():
+        try:
+            await redis_service.connect()
+            if not await FontService.is_current(project_id, token):
+                logger.debug(f"Skipping superseded font subsetting job for project {project_id}")
+                return {"status": "skipped", "project_id": project_id}
+
+            async with async_session_maker() as db:
+                result = await FontService.subset_deck(db, UUID(project_id))
+            return {"status": "success", **result}
+
+        except Exception as e:
+            logger.error(f"Error subsetting fonts for project {project_id}: {e}", exc_info=True)
+            return {"status": "error", "project_id": project_id, "error": str(e)}
+        finally:
+            await redis_service.disconnect()
+
+    return run_async(_subset())
+
+@celery_app.task(bind=True)
+def render_deck(self, project_id: str, conversation_id: str = None):
+    """
+    批量渲染整套幻灯片的整页图片和缩略图（thumbnails 队列）
+
+    每完成一页推送 deck_render_progress，全部完成后推送 deck_render_complete
+
+    Args:
+        project_id: 项目ID
+        conversation_id: 对话ID（可选，事件发到该对话的SSE流，否则发到项目频道）
+
+    Returns:
+        dict: 渲染结果
+    """
+    async def _render():
+        try:
+            await redis_service.connect()
+
+            async def progress(event):
+                await ThumbnailService.notify(event, conversation_id, "deck_render_progress")
+
+            async with async_session_maker() as db:
+                result = await DeckRenderService.render_deck(db, UUID(project_id), progress)
+            await ThumbnailService.notify(result, conversation_id, "deck_render_complete")
+            return {"status": "success", **result}
+
+        except Exception as e:
+            logger.error(f"Error rendering deck for project {project_id}: {e}", exc_info=True)
+            try:
+                await ThumbnailService.notify(
+                    {"project_id": project_id, "message": str(e)}, conversation_id, "error"
+                )
+            except Exception:
+                pass
+            return {"status": "error", "project_id": project_id, "error": str(e)}
+        finally:
+            await redis_service.disconnect()
+
+    return run_async(_render())
+
+@celery_app.task(bind=True)
+def export_deck_pdf(self, project_id: str, conversation_id: str = None):
+    """
+    导出整套幻灯片为PDF并上传到对象存储（thumbnails 队列）
+
+    每完成一页推送 export_progress，上传完成后推送 export_complete
+
+    Args:
+        project_id: 项目ID
+        conversation_id: 对话ID（可选，事件发到该对话的SSE流，否则发到项目频道）
+
+    Returns:
+        dict: 导出结果
+    """
+    async def _export():
+        try:
+            await redis_service.connect()
+
+            async def progress(event):
+                await ThumbnailService.notify(event, conversation_id, "export_progress")
+
+            async with async_session_maker() as db:
+                result = await ExportService.export_pdf(db, UUID(project_id), progress)
+            event = {
+                "project_id": project_id,
+                "format": "pdf",
+                "pages": result["pages"],
+                "size": result["size"],
+                "url": f"/api/projects/{project_id}/export/pdf"
+            }
+            await ThumbnailService.notify(event, conversation_id, "export_complete")
+            return {"status": "success", **result}
+
+        except Exception as e:
+            logger.error(f"Error exporting PDF for project {project_id}: {e}", exc_info=True)
+            try:
+                await ThumbnailService.notify(
+                    {"project_id": project_id, "message": str(e)}, conversation_id, "error"
+                )
+            except Exception:
+                pass
+            return {"status": "error", "project_id": project_id, "error": str(e)}
+        finally:
+            await redis_service.disconnect()
+
+    return run_async(_export())
+
+@celery_app.task(bind=True)
+def export_deck_html(self, project_id: str, bundle: str = "single", conversation_id: str = None):
+    """
+    导出整套幻灯片为离线HTML包并上传到对象存储，完成后推送 export_complete
+
+    Args:
+        project_id: 项目ID
+        bundle: single（单个HTML文件）或 zip
+        conversation_id: 对话ID（可选，事件发到该对话的SSE流，否则发到项目频道）
+
+    Returns:
+        dict: 导出结果
+    """
+    async def _export():
+        try:
+            await redis_service.connect()
+
+            async with async_session_maker() as db:
+                result = await BundleService.export_bundle(db, UUID(project_id), bundle)
+            event = {
+                "project_id": project_id,
+                "format": bundle,
+                "pages": result["pages"],
+                "size": result["size"],
+                "url": f"/api/projects/{project_id}/export/html?bundle={bundle}"
+            }
+            await ThumbnailService.notify(event, conversation_id, "export_complete")
+            return {"status": "success", **result}
+
+        except Exception as e:
+            logger.error(f"Error exporting HTML bundle for project {project_id}: {e}", exc_info=True)
+            try:
+                await ThumbnailService.notify(
+                    {"project_id": project_id, "message": str(e)}, conversation_id, "error"
+                )
+            except Exception:
+                pass
+            return {"status": "error", "project_id": project_id, "error": str(e)}
+        finally:
+            await redis_service.disconnect()
+
+    return run_async(_export())
 
 @celery_app.task(bind=True)
 def generate_ppt_content(self, project_id: str, user_id: str):
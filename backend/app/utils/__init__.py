@@ -1,9 +1,31 @@
 from .html_processor import HTMLProcessor
+from .html_sanitizer import HTMLSanitizer, SanitizePolicy
 from .thumbnail import ThumbnailGenerator
 from .validators import DataValidator
+from .image_hash import ImageHasher
+from .image_probe import ImageProbe
+from .image_ranker import ImageRanker
+from .text_tokenizer import TextTokenizer
+from .fractional_index import FractionalIndex
+from .html_patcher import HTMLPatcher, PatchError
+from .content_chunker import ContentChunker
+from .payload_codec import PayloadCodec
+from .theme_stylesheet import ThemeStylesheet
 
 __all__ = [
     "HTMLProcessor",
+    "HTMLSanitizer",
+    "SanitizePolicy",
     "ThumbnailGenerator",
-    "DataValidator"
+    "DataValidator",
+    "ImageHasher",
+    "ImageProbe",
+    "ImageRanker",
+    "TextTokenizer",
+    "FractionalIndex",
+    "HTMLPatcher",
+    "PatchError",
+    "ContentChunker",
+    "PayloadCodec",
+    "ThemeStylesheet"
 ]
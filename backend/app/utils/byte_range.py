@@ -0,0 +1,43 @@
+import re
+from typing import Optional, Tuple
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class ByteRange:
+    """HTTP Range 请求头解析（只支持单个区间）"""
+
+    @staticmethod
+    def parse(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+        """
+        解析 Range 请求头
+
+        格式错误或多区间请求按规范忽略，返回整个文件
+
+        Args:
+            header: Range 请求头，如 "bytes=0-1023"、"bytes=1024-"、"bytes=-512"
+            size: 文件字节数
+
+        Returns:
+            (起始, 结束) 闭区间；不是区间请求时返回None
+
+        Raises:
+            ValueError: 区间超出文件范围（应返回416）
+        """
+        match = _RANGE.match((header or "").strip())
+        if not match or match.group(1) == match.group(2) == "":
+            return None
+
+        first, last = match.groups()
+        if first == "":
+            # 后缀区间：最后N个字节
+            length = int(last)
+            if length == 0 or size == 0:
+                raise ValueError("Unsatisfiable range")
+            return max(size - length, 0), size - 1
+
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            raise ValueError("Unsatisfiable range")
+        return start, end
@@ -0,0 +1,48 @@
+from typing import List
+import hashlib
+import re
+
+# Gear哈希表（由固定种子生成，保证各进程切分结果一致）
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], "big") for i in range(256)]
+_MASK64 = (1 << 64) - 1
+
+# 固定切分点：样式和文档头通常在多页之间完全相同，单独成块便于去重
+_ANCHOR_PATTERN = re.compile(rb"</style>|</head>|<body[^>]*>", re.IGNORECASE)
+
+
+class ContentChunker:
+    """内容定义分块（CDC）：局部修改只影响附近的块，相同的样板内容得到相同的块"""
+
+    @staticmethod
+    def chunk(data: bytes, min_size: int = 512, avg_size: int = 2048, max_size: int = 8192) -> List[bytes]:
+        """
+        切分内容
+
+        Args:
+            data: 原始字节
+            min_size: 最小块大小
+            avg_size: 平均块大小（必须为2的幂）
+            max_size: 最大块大小
+
+        Returns:
+            块列表，按顺序拼接即为原始内容
+        """
+        segments, start = [], 0
+        for match in _ANCHOR_PATTERN.finditer(data):
+            segments.append(data[start:match.end()])
+            start = match.end()
+        segments.append(data[start:])
+
+        mask = avg_size - 1
+        chunks: List[bytes] = []
+        for segment in segments:
+            chunk_start, rolling = 0, 0
+            for i, byte in enumerate(segment):
+                rolling = ((rolling << 1) + _GEAR[byte]) & _MASK64
+                length = i + 1 - chunk_start
+                if length >= max_size or (length >= min_size and rolling & mask == 0):
+                    chunks.append(segment[chunk_start:i + 1])
+                    chunk_start, rolling = i + 1, 0
+            if chunk_start < len(segment):
+                chunks.append(segment[chunk_start:])
+        return chunks
@@ -0,0 +1,114 @@
+import hashlib
+import io
+import re
+from typing import Dict, Iterable, List, Optional, Set
+from app.utils.html_bundler import HTMLBundler
+
+try:
+    # 可选依赖：未安装时不做字体子集化，渲染使用完整字体
+    from fontTools import subset as font_subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    font_subset = None
+    TTFont = None
+
+_FONT_FACE = re.compile(r"@font-face\s*\{([^}]*)\}", re.IGNORECASE)
+_CSS_URL = re.compile(r"url\(\s*(['\"]?)([^'\")]+?)\1\s*\)")
+
+# 子集中始终保留的字符：可打印ASCII和常用中文标点（页面后续小改动时不必重新生成）
+BASE_CHARACTERS = "".join(chr(code) for code in range(0x20, 0x7F)) + "，。、；：？！“”‘’（）《》【】—…·"
+
+
+class FontSubsetter:
+    """字体子集化：解析 @font-face，按页面用到的字符生成WOFF2子集"""
+
+    @staticmethod
+    def available() -> bool:
+        """是否安装了 fontTools"""
+        return font_subset is not None
+
+    @staticmethod
+    def codepoints(htmls: Iterable[str]) -> Set[int]:
+        """页面文字用到的字符（加上 BASE_CHARACTERS）"""
+        return HTMLBundler.codepoints(htmls) | {ord(char) for char in BASE_CHARACTERS}
+
+    @staticmethod
+    def coverage(codepoints: Set[int]) -> str:
+        """把字符集写成紧凑字符串（省略始终包含的ASCII），保存在主题中用于判断子集是否够用"""
+        return "".join(chr(code) for code in sorted(codepoints) if code >= 0x7F)
+
+    @staticmethod
+    def covers(coverage: str, htmls: Iterable[str]) -> bool:
+        """子集是否覆盖页面中的全部字符"""
+        covered = {ord(char) for char in coverage}
+        return all(code < 0x7F or code in covered for code in HTMLBundler.codepoints(htmls))
+
+    @staticmethod
+    def glyph_key(codepoints: Iterable[int]) -> str:
+        """字符集哈希（子集文件缓存键的一部分）"""
+        content = ",".join(f"{code:x}" for code in sorted(codepoints))
+        return hashlib.sha256(content.encode("ascii")).hexdigest()[:16]
+
+    @staticmethod
+    def parse_font_faces(css: str) -> List[Dict[str, object]]:
+        """
+        解析CSS中的 @font-face
+
+        Returns:
+            [{"rule": 原始规则, "descriptors": {名称: 值}（不含src）, "urls": [src中的地址]}]
+        """
+        faces = []
+        for match in _FONT_FACE.finditer(css):
+            descriptors: Dict[str, str] = {}
+            urls: List[str] = []
+            for declaration in match.group(1).split(";"):
+                name, _, value = declaration.partition(":")
+                name, value = name.strip().lower(), value.strip()
+                if not name or not value:
+                    continue
+                if name == "src":
+                    urls = [url.group(2).strip() for url in _CSS_URL.finditer(value)]
+                else:
+                    descriptors[name] = value
+            faces.append({"rule": match.group(0), "descriptors": descriptors, "urls": urls})
+        return faces
+
+    @staticmethod
+    def font_face(descriptors: Dict[str, str], url: str) -> str:
+        """生成指向子集文件的 @font-face"""
+        declarations = [f"{name}: {value};" for name, value in descriptors.items() if name != "font-display"]
+        return (
+            "@font-face { " + " ".join(declarations)
+            + f" src: url('{url}') format('woff2'); font-display: swap; }}"
+        )
+
+    @staticmethod
+    def subset(data: bytes, codepoints: Set[int]) -> Optional[bytes]:
+        """
+        生成只包含指定字符的WOFF2子集（CPU密集，应在线程中调用）
+
+        Args:
+            data: 原始字体（TTF/OTF/WOFF/WOFF2）
+            codepoints: 需要保留的字符
+
+        Returns:
+            WOFF2字节；字体中没有任何需要的字符时返回None
+        """
+        font = TTFont(io.BytesIO(data))
+        unicodes = set(font.getBestCmap() or {}) & codepoints
+        if not unicodes:
+            return None
+
+        options = font_subset.Options()
+        options.flavor = "woff2"
+        options.layout_features = ["*"]
+        options.hinting = False
+        options.desubroutinize = True
+        subsetter = font_subset.Subsetter(options)
+        subsetter.populate(unicodes=unicodes)
+        subsetter.subset(font)
+
+        buffer = io.BytesIO()
+        font.flavor = "woff2"
+        font.save(buffer)
+        return buffer.getvalue()
@@ -0,0 +1,125 @@
+from typing import List, Optional
+
+# Base62字符按ASCII升序排列，与数据库 "C" 排序规则下的字符串比较一致
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+
+
+class FractionalIndex:
+    """
+    分数排序键：键是 (0, 1) 区间内的Base62小数（省略 "0." 前缀和末尾的0），
+    任意两个键之间总能生成新键，插入和移动只需要写入被操作的行
+    """
+
+    @staticmethod
+    def between(lower: Optional[str], upper: Optional[str]) -> str:
+        """
+        生成严格位于 lower 与 upper 之间的键
+
+        Args:
+            lower: 下界键，None表示最前
+            upper: 上界键，None表示最后
+
+        Returns:
+            新键
+
+        Raises:
+            ValueError: lower >= upper 或键格式非法
+        """
+        lower = lower or ""
+        for key in (lower, upper):
+            if key is not None and (key.endswith("0") or any(char not in DIGITS for char in key)):
+                raise ValueError(f"Invalid fractional index key: {key!r}")
+        if upper is not None and (not upper or upper <= lower):
+            raise ValueError(f"Invalid key range: {lower!r} .. {upper!r}")
+        return FractionalIndex._midpoint(lower, upper)
+
+    @staticmethod
+    def _midpoint(lower: str, upper: Optional[str]) -> str:
+        if upper is not None:
+            # 跳过公共前缀（lower不足的位视为0）
+            prefix = 0
+            while prefix < len(upper) and (lower[prefix] if prefix < len(lower) else "0") == upper[prefix]:
+                prefix += 1
+            if prefix > 0:
+                return upper[:prefix] + FractionalIndex._midpoint(lower[prefix:], upper[prefix:])
+
+        low_digit = DIGITS.index(lower[0]) if lower else 0
+        high_digit = DIGITS.index(upper[0]) if upper is not None else BASE
+        if high_digit - low_digit > 1:
+            return DIGITS[(low_digit + high_digit + 1) // 2]
+
+        # 首位相邻：上界更长时取上界首位即可，否则在下界首位之后继续细分
+        if upper is not None and len(upper) > 1:
+            return upper[0]
+        return DIGITS[low_digit] + FractionalIndex._midpoint(lower[1:], None)
+
+    @staticmethod
+    def n_between(lower: Optional[str], upper: Optional[str], count: int) -> List[str]:
+        """
+        在 lower 与 upper 之间生成 count 个递增键（二分生成，键长按对数增长）
+
+        Returns:
+            递增的键列表
+        """
+        if count <= 0:
+            return []
+        middle = FractionalIndex.between(lower, upper)
+        left = FractionalIndex.n_between(lower, middle, count // 2)
+        right = FractionalIndex.n_between(middle, upper, count - count // 2 - 1)
+        return left + [middle] + right
+
+    @staticmethod
+    def spread(count: int) -> List[str]:
+        """
+        生成 count 个均匀分布的等宽键（重新平衡时使用）
+
+        Returns:
+            递增的键列表
+        """
+        width = 1
+        while BASE ** width <= count * 2:
+            width += 1
+        step = BASE ** width // (count + 1)
+
+        keys = []
+        for i in range(1, count + 1):
+            value = step * i
+            digits = []
+            for _ in range(width):
+                value, remainder = divmod(value, BASE)
+                digits.append(DIGITS[remainder])
+            keys.append("".join(reversed(digits)).rstrip("0"))
+        return keys
+
+    @staticmethod
+    def longest_increasing_subsequence(values: List[int]) -> List[int]:
+        """
+        最长严格递增子序列（O(n log n)），重新排序时用于找出无需改写的行
+
+        Returns:
+            子序列元素在 values 中的下标
+        """
+        tails: List[int] = []
+        previous = [-1] * len(values)
+        for i, value in enumerate(values):
+            low, high = 0, len(tails)
+            while low < high:
+                mid = (low + high) // 2
+                if values[tails[mid]] < value:
+                    low = mid + 1
+                else:
+                    high = mid
+            if low > 0:
+                previous[i] = tails[low - 1]
+            if low == len(tails):
+                tails.append(i)
+            else:
+                tails[low] = i
+
+        result = []
+        i = tails[-1] if tails else -1
+        while i != -1:
+            result.append(i)
+            i = previous[i]
+        return result[::-1]
@@ -0,0 +1,207 @@
+import bisect
+import gzip
+import html as html_lib
+import json
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+from bs4 import BeautifulSoup
+
+try:
+    # 可选依赖：没有时只生成gzip预压缩版本
+    import brotli
+except ImportError:
+    brotli = None
+
+# 离线包中资源的占位引用，最终按打包方式替换为相对路径或 data: 地址
+ASSET_REF = "bundle:"
+
+_CSS_URL = re.compile(r"url\(\s*(['\"]?)([^'\")]+?)\1\s*\)")
+_FONT_FACE = re.compile(r"@font-face\s*\{[^}]*\}", re.IGNORECASE)
+_UNICODE_RANGE = re.compile(r"unicode-range\s*:\s*([^;}]+)", re.IGNORECASE)
+
+# 预压缩的文本类型
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+NAVIGATOR_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+html, body { margin: 0; height: 100%; background: #1f2329; overflow: hidden; font-family: sans-serif; }
+#viewport { position: absolute; inset: 0 0 48px 0; display: flex; align-items: center; justify-content: center; }
+#stage { width: __WIDTH__px; height: __HEIGHT__px; flex: none; transform-origin: center; box-shadow: 0 4px 24px rgba(0,0,0,.4); }
+#frame { width: 100%; height: 100%; border: 0; background: #fff; }
+#bar { position: absolute; left: 0; right: 0; bottom: 0; height: 48px; display: flex; align-items: center; justify-content: center; gap: 16px; color: #e8eaed; }
+#bar button { background: #2f343b; color: inherit; border: 0; border-radius: 4px; padding: 6px 14px; cursor: pointer; }
+</style>
+</head>
+<body>
+<div id="viewport"><div id="stage"><iframe id="frame" title="slide"></iframe></div></div>
+<div id="bar"><button id="prev">&#8592;</button><span id="counter"></span><button id="next">&#8594;</button></div>
+<script type="application/json" id="deck">__DECK__</script>
+<script>
+(function () {
+  var deck = JSON.parse(document.getElementById('deck').textContent);
+  var frame = document.getElementById('frame');
+  var stage = document.getElementById('stage');
+  var counter = document.getElementById('counter');
+  var current = 0;
+  function resolve(text) {
+    return text.replace(/bundle:([0-9a-f]+\\.[a-z0-9]+)/g, function (ref, name) { return deck.assets[name] || ref; });
+  }
+  function show(index) {
+    current = Math.max(0, Math.min(deck.slides.length - 1, index));
+    var slide = deck.slides[current];
+    if (deck.mode === 'single') {
+      frame.srcdoc = resolve(slide.doc || deck.shell.replace('<body></body>', function () { return slide.body; }));
+    } else {
+      frame.src = slide;
+    }
+    counter.textContent = (current + 1) + ' / ' + deck.slides.length;
+    history.replaceState(null, '', '#' + (current + 1));
+  }
+  function fit() {
+    var scale = Math.min(innerWidth / __WIDTH__, (innerHeight - 48) / __HEIGHT__);
+    stage.style.transform = 'scale(' + scale + ')';
+  }
+  document.getElementById('prev').onclick = function () { show(current - 1); };
+  document.getElementById('next').onclick = function () { show(current + 1); };
+  document.addEventListener('keydown', function (event) {
+    if (['ArrowRight', 'PageDown', ' '].indexOf(event.key) >= 0) show(current + 1);
+    else if (['ArrowLeft', 'PageUp'].indexOf(event.key) >= 0) show(current - 1);
+    else if (event.key === 'Home') show(0);
+    else if (event.key === 'End') show(deck.slides.length - 1);
+  });
+  addEventListener('resize', fit);
+  fit();
+  show((parseInt(location.hash.slice(1), 10) || 1) - 1);
+})();
+</script>
+</body>
+</html>
+"""
+
+
+class HTMLBundler:
+    """离线HTML包的文本处理：字体子集筛选、URL改写、导航页和预压缩"""
+
+    @staticmethod
+    def codepoints(htmls: Iterable[str]) -> Set[int]:
+        """页面中用到的字符（始终包含可打印ASCII，覆盖样式中的数字、符号等）"""
+        used = set(range(0x20, 0x7F))
+        for html in htmls:
+            used.update(ord(char) for char in BeautifulSoup(html or "", "html.parser").get_text())
+        return used
+
+    @staticmethod
+    def parse_unicode_range(value: str) -> List[Tuple[int, int]]:
+        """解析 unicode-range（U+4E00-9FFF、U+00??、U+0131）为闭区间列表"""
+        ranges = []
+        for part in value.split(","):
+            part = part.strip().upper()
+            if not part.startswith("U+"):
+                continue
+            part = part[2:]
+            try:
+                if "?" in part:
+                    ranges.append((int(part.replace("?", "0"), 16), int(part.replace("?", "F"), 16)))
+                elif "-" in part:
+                    first, last = part.split("-", 1)
+                    ranges.append((int(first, 16), int(last, 16)))
+                else:
+                    ranges.append((int(part, 16), int(part, 16)))
+            except ValueError:
+                continue
+        return ranges
+
+    @staticmethod
+    def filter_font_faces(css: str, codepoints: Set[int]) -> str:
+        """
+        删除 unicode-range 与页面文字没有交集的 @font-face
+
+        Google Fonts 把CJK字体按 unicode-range 切成上百个分片，只保留用到的分片即可
+
+        Args:
+            css: 字体CSS
+            codepoints: 页面中用到的字符
+
+        Returns:
+            筛选后的CSS
+        """
+        used = sorted(codepoints)
+
+        def keep(block: str) -> bool:
+            match = _UNICODE_RANGE.search(block)
+            if not match:
+                return True
+            for first, last in HTMLBundler.parse_unicode_range(match.group(1)):
+                position = bisect.bisect_left(used, first)
+                if position < len(used) and used[position] <= last:
+                    return True
+            return False
+
+        return _FONT_FACE.sub(lambda match: match.group(0) if keep(match.group(0)) else "", css)
+
+    @staticmethod
+    def css_urls(css: str) -> List[str]:
+        """CSS中 url(...) 引用的外部地址（去重，忽略 data:）"""
+        urls = [match.group(2).strip() for match in _CSS_URL.finditer(css)]
+        return [url for url in dict.fromkeys(urls) if not url.startswith("data:")]
+
+    @staticmethod
+    def prefixed_urls(html: str, prefix: str) -> List[str]:
+        """HTML中以 prefix 开头的地址（如素材服务地址，去重）"""
+        return list(dict.fromkeys(re.findall(re.escape(prefix) + r"[^\"'()\s<>&]+", html or "")))
+
+    @staticmethod
+    def replace_urls(text: str, mapping: Dict[str, str]) -> str:
+        """按映射替换地址（长地址优先，避免前缀相同的地址互相干扰）"""
+        for url in sorted(mapping, key=len, reverse=True):
+            text = text.replace(url, mapping[url])
+        return text
+
+    @staticmethod
+    def resolve_refs(text: str, prefix: str) -> str:
+        """把资源占位引用替换为相对路径"""
+        return text.replace(ASSET_REF, prefix)
+
+    @staticmethod
+    def navigator(title: str, deck: Dict, width: int, height: int) -> str:
+        """
+        生成幻灯片导航页（键盘/按钮翻页，按窗口缩放）
+
+        Args:
+            title: 标题
+            deck: {"mode": "single"|"zip", "slides": [...], "shell"?: str, "assets"?: {name: data URI}}
+            width: 页面宽度
+            height: 页面高度
+        """
+        data = json.dumps(deck, ensure_ascii=False, separators=(",", ":"))
+        # 避免JSON中的 </script>、<!-- 提前结束或改变<script>的解析状态
+        data = data.replace("</", "<\\/").replace("<!--", "<\\u0021--")
+        return (
+            NAVIGATOR_TEMPLATE
+            .replace("__TITLE__", html_lib.escape(title))
+            .replace("__WIDTH__", str(width))
+            .replace("__HEIGHT__", str(height))
+            .replace("__DECK__", data)
+        )
+
+    @staticmethod
+    def compressible(content_type: str) -> bool:
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def precompress(data: bytes) -> Dict[str, bytes]:
+        """
+        生成预压缩版本（静态服务器可直接发送，无需实时压缩）
+
+        Returns:
+            {"gz": gzip字节, "br": brotli字节（安装了brotli时）}
+        """
+        variants = {"gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(data, quality=11)
+        return variants
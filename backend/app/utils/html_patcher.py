@@ -0,0 +1,183 @@
+from typing import Any, Dict, List, Tuple
+from bs4 import BeautifulSoup, Tag
+from soupsieve import SelectorSyntaxError
+from app.utils.html_sanitizer import SAFE_URL, URL_ATTRIBUTES
+
+# 变更摘要中每段HTML的最大长度
+SNIPPET_LENGTH = 300
+
+# insert_html 支持的插入位置
+INSERT_POSITIONS = {"before", "after", "prepend", "append"}
+
+# 补丁片段中不允许出现的可执行元素（页面自身的图表脚本由整页写入工具生成，不经过补丁）
+UNSAFE_TAGS = {"script", "iframe", "object", "embed"}
+
+
+class PatchError(ValueError):
+    """补丁操作无法应用"""
+
+    def __init__(self, index: int, message: str):
+        self.index = index
+        super().__init__(f"operation {index}: {message}")
+
+
+class HTMLPatcher:
+    """按CSS选择器对HTML做局部修改"""
+
+    @staticmethod
+    def parse_style(style: str) -> Dict[str, str]:
+        """解析内联样式为 {属性: 值}（保持原顺序）"""
+        declarations = {}
+        for declaration in (style or "").split(";"):
+            name, sep, value = declaration.partition(":")
+            if sep and name.strip():
+                declarations[name.strip().lower()] = value.strip()
+        return declarations
+
+    @staticmethod
+    def format_style(declarations: Dict[str, str]) -> str:
+        """内联样式字典转字符串"""
+        return "; ".join(f"{name}: {value}" for name, value in declarations.items())
+
+    @staticmethod
+    def _snippet(node) -> str:
+        text = str(node)
+        return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH] + "..."
+
+    @staticmethod
+    def safe_attr(name: str, value: str) -> bool:
+        """属性是否可以写入（拒绝 on* 事件处理器和 javascript: 等不安全地址）"""
+        name = name.lower()
+        if name.startswith("on"):
+            return False
+        return name not in URL_ATTRIBUTES or SAFE_URL.match(value.strip()) is not None
+
+    @staticmethod
+    def _fragment(html: str, index: int) -> List:
+        """解析要插入的HTML片段（删除脚本类元素、事件处理器和不安全的地址）"""
+        soup = BeautifulSoup(html or "", "html.parser")
+        for node in soup.find_all(UNSAFE_TAGS):
+            node.decompose()
+        for node in soup.find_all(True):
+            for name, value in list(node.attrs.items()):
+                value = " ".join(value) if isinstance(value, list) else str(value)
+                if not HTMLPatcher.safe_attr(name, value):
+                    del node[name]
+        nodes = [node for node in soup.contents if isinstance(node, Tag) or str(node).strip()]
+        if not nodes:
+            raise PatchError(index, "html fragment is empty")
+        return nodes
+
+    @staticmethod
+    def _apply_one(soup: BeautifulSoup, index: int, operation: Dict[str, Any]) -> Dict[str, Any]:
+        op = operation.get("op")
+        selector = operation.get("selector")
+        if not selector:
+            raise PatchError(index, "selector is required")
+
+        try:
+            targets = soup.select(selector) if operation.get("all") else [soup.select_one(selector)]
+        except SelectorSyntaxError as e:
+            raise PatchError(index, f"invalid selector {selector!r}: {e}")
+        targets = [target for target in targets if target is not None]
+        if not targets:
+            raise PatchError(index, f"selector {selector!r} matched nothing")
+
+        before = [HTMLPatcher._snippet(target) for target in targets]
+        after = []
+        for target in targets:
+            if op == "set_text":
+                target.string = str(operation.get("text", ""))
+                after.append(HTMLPatcher._snippet(target))
+
+            elif op == "set_attr":
+                name = operation.get("name")
+                if not name:
+                    raise PatchError(index, "name is required for set_attr")
+                if operation.get("value") is None:
+                    target.attrs.pop(name, None)
+                elif not HTMLPatcher.safe_attr(name, str(operation["value"])):
+                    raise PatchError(index, f"attribute {name!r} is not allowed")
+                else:
+                    target[name] = str(operation["value"])
+                after.append(HTMLPatcher._snippet(target))
+
+            elif op == "set_style":
+                prop = (operation.get("property") or "").strip().lower()
+                if not prop:
+                    raise PatchError(index, "property is required for set_style")
+                declarations = HTMLPatcher.parse_style(target.get("style", ""))
+                if operation.get("value") in (None, ""):
+                    declarations.pop(prop, None)
+                else:
+                    declarations[prop] = str(operation["value"])
+                if declarations:
+                    target["style"] = HTMLPatcher.format_style(declarations)
+                else:
+                    target.attrs.pop("style", None)
+                after.append(HTMLPatcher._snippet(target))
+
+            elif op == "replace_html":
+                nodes = HTMLPatcher._fragment(operation.get("html"), index)
+                for node in nodes:
+                    target.insert_before(node)
+                target.extract()
+                after.append("".join(HTMLPatcher._snippet(node) for node in nodes))
+
+            elif op == "insert_html":
+                position = operation.get("position", "append")
+                if position not in INSERT_POSITIONS:
+                    raise PatchError(index, f"position must be one of {sorted(INSERT_POSITIONS)}")
+                nodes = HTMLPatcher._fragment(operation.get("html"), index)
+                if position == "before":
+                    for node in nodes:
+                        target.insert_before(node)
+                elif position == "after":
+                    for node in reversed(nodes):
+                        target.insert_after(node)
+                elif position == "prepend":
+                    for offset, node in enumerate(nodes):
+                        target.insert(offset, node)
+                else:
+                    for node in nodes:
+                        target.append(node)
+                after.append(HTMLPatcher._snippet(target.parent if position in ("before", "after") else target))
+
+            elif op == "remove":
+                target.decompose()
+                after.append("")
+
+            else:
+                raise PatchError(index, f"unknown op {op!r}")
+
+        return {"op": op, "selector": selector, "matched": len(targets), "before": before, "after": after}
+
+    @staticmethod
+    def apply(html: str, operations: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        依次应用补丁操作（任一操作失败则整体失败）
+
+        支持的操作（默认只作用于第一个匹配元素，"all": true 时作用于全部匹配）：
+        - set_text: {"selector", "text"} 替换元素文本
+        - set_attr: {"selector", "name", "value"} 设置属性，value为null时删除
+        - set_style: {"selector", "property", "value"} 设置内联样式属性，value为空时删除
+        - replace_html: {"selector", "html"} 用HTML片段替换元素
+        - insert_html: {"selector", "html", "position"} 在 before/after/prepend/append 位置插入片段
+        - remove: {"selector"} 删除元素
+
+        Args:
+            html: 原始HTML
+            operations: 操作列表
+
+        Returns:
+            (修改后的HTML, 每个操作的变更摘要)
+
+        Raises:
+            PatchError: 操作无法应用
+        """
+        if not operations:
+            raise PatchError(0, "operations must not be empty")
+
+        soup = BeautifulSoup(html, "html.parser")
+        changes = [HTMLPatcher._apply_one(soup, i, operation) for i, operation in enumerate(operations)]
+        return str(soup), changes
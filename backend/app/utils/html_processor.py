@@ -1,6 +1,6 @@
 from typing import Dict, Any
-import re
 from bs4 import BeautifulSoup
+from .html_sanitizer import HTMLSanitizer
 
 
 class HTMLProcessor:
@@ -8,22 +8,10 @@ class HTMLProcessor:
 
     @staticmethod
     def clean_html(html: str) -> str:
-        """清理HTML内容"""
+        """清理HTML内容（压缩空白、移除空的p/div/span，单遍完成）"""
         if not html:
             return ""
-
-        # 移除多余的空白字符
-        html = re.sub(r'\s+', ' ', html.strip())
-
-        # 移除空标签
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # 移除空的p, div, span等标签
-        for tag in soup.find_all(['p', 'div', 'span']):
-            if not tag.get_text().strip() and not tag.find_all():
-                tag.decompose()
-
-        return str(soup)
+        return HTMLSanitizer.process(html, policy=None, clean=True)[0]
 
     @staticmethod
     def extract_text_from_html(html: str) -> str:
@@ -36,12 +24,10 @@ class HTMLProcessor:
 
     @staticmethod
     def validate_html_structure(html: str) -> bool:
-        """验证HTML结构是否有效"""
+        """验证HTML结构是否有效（至少包含一个元素）"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            # 检查是否有基本的HTML结构
-            return bool(soup.find())
-        except:
+            return HTMLSanitizer.has_element(html)
+        except Exception:
             return False
 
     @staticmethod
@@ -176,38 +162,7 @@ class HTMLProcessor:
 
     @staticmethod
     def sanitize_html(html: str) -> str:
-        """清理不安全的HTML内容"""
+        """清理不安全的HTML内容（按允许列表过滤元素和属性）"""
         if not html:
             return ""
-
-        # 只允许安全的标签和属性
-        allowed_tags = {
-            'div', 'span', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-            'ul', 'ol', 'li', 'strong', 'em', 'b', 'i', 'br',
-            'img', 'a'
-        }
-
-        allowed_attrs = {
-            'style': True,
-            'src': True,
-            'alt': True,
-            'href': True,
-            'target': True
-        }
-
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # 移除不允许的标签
-        for tag in soup.find_all():
-            if tag.name not in allowed_tags:
-                tag.unwrap()
-            else:
-                # 移除不允许的属性
-                attrs_to_remove = []
-                for attr in tag.attrs:
-                    if attr not in allowed_attrs:
-                        attrs_to_remove.append(attr)
-                for attr in attrs_to_remove:
-                    del tag[attr]
-
-        return str(soup)
+        return HTMLSanitizer.process(html, clean=False)[0]
@@ -0,0 +1,349 @@
+import html as html_lib
+import re
+from html.parser import HTMLParser
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"
+})
+
+# 空白按原样保留的元素
+PREFORMATTED_TAGS = frozenset({"pre", "textarea", "script", "style"})
+
+# 没有文本和子元素时删除的元素
+EMPTY_REMOVABLE_TAGS = frozenset({"p", "div", "span"})
+
+# 不在允许列表中时连同内容一起删除的元素（其余不允许的元素只去掉标签、保留内容）
+DROP_CONTENT_TAGS = frozenset({"script", "style", "iframe", "object", "embed", "noscript", "template", "head", "title"})
+
+# 值为URL的属性，只允许安全协议
+URL_ATTRIBUTES = frozenset({"href", "src", "action", "formaction", "poster", "xlink:href"})
+SAFE_URL = re.compile(r"^(?:https?:|mailto:|tel:|data:image/|/|#|\.{0,2}/|[^:/?#]*(?:[/?#]|$))", re.IGNORECASE)
+
+# 块级及不参与行内排版的元素，两侧的空白不影响渲染
+BLOCK_TAGS = frozenset({
+    "html", "head", "body", "title", "meta", "link", "style", "script", "noscript", "template",
+    "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd",
+    "section", "article", "header", "footer", "nav", "main", "aside", "figure", "figcaption",
+    "blockquote", "pre", "hr", "br", "table", "thead", "tbody", "tfoot", "tr", "td", "th", "form"
+})
+
+_WHITESPACE = re.compile(r"\s+")
+_STYLE_PUNCTUATION = re.compile(r"\s*([:;,])\s*")
+
+
+class SanitizePolicy:
+    """允许列表策略：只保留列出的元素和属性"""
+
+    def __init__(
+        self,
+        tags: Iterable[str],
+        attributes: Iterable[str],
+        drop_content: Iterable[str] = DROP_CONTENT_TAGS,
+        keep_comments: bool = False
+    ):
+        self.tags: FrozenSet[str] = frozenset(tags)
+        self.attributes: FrozenSet[str] = frozenset(attributes)
+        self.drop_content: FrozenSet[str] = frozenset(drop_content) - self.tags
+        self.keep_comments = keep_comments
+
+
+# 默认策略（与原 HTMLProcessor.sanitize_html 的允许列表一致）
+DEFAULT_POLICY = SanitizePolicy(
+    tags={
+        "div", "span", "p", "h1", "h2", "h3", "h4", "h5", "h6",
+        "ul", "ol", "li", "strong", "em", "b", "i", "br",
+        "img", "a"
+    },
+    attributes={"style", "src", "alt", "href", "target"}
+)
+
+
+class _StreamingPass(HTMLParser):
+    """
+    单遍处理：边分词边按策略过滤、压缩空白并删除空元素，同时统计结构信息。
+    不构建DOM树，输出缓冲按元素起点记录偏移，空元素在结束标签处直接回退。
+    """
+
+    def __init__(self, policy: Optional[SanitizePolicy], clean: bool):
+        super().__init__(convert_charrefs=False)
+        self.policy = policy
+        self.clean = clean
+        self.out: List[str] = []
+        # 打开的元素栈：[标签名, 是否输出, 输出起点, 是否有内容]
+        self.stack: List[List[Any]] = []
+        self.drop_depth = 0
+        self.preformatted = 0
+        self.stats = {"elements": 0, "removed_tags": 0, "removed_attrs": 0, "removed_empty": 0}
+
+    # ---- 辅助 ----
+
+    def _mark_content(self):
+        for frame in reversed(self.stack):
+            if frame[1]:
+                frame[3] = True
+                return
+
+    def _allowed(self, tag: str) -> bool:
+        return self.policy is None or tag in self.policy.tags
+
+    def _attrs(self, attrs: List[Tuple[str, Optional[str]]]) -> str:
+        parts = []
+        for name, value in attrs:
+            if self.policy is not None:
+                if name not in self.policy.attributes or name.startswith("on"):
+                    self.stats["removed_attrs"] += 1
+                    continue
+                if name in URL_ATTRIBUTES and value and not SAFE_URL.match(value.strip()):
+                    self.stats["removed_attrs"] += 1
+                    continue
+            if value is None:
+                parts.append(f" {name}")
+            else:
+                parts.append(f' {name}="{html_lib.escape(value, quote=True)}"')
+        return "".join(parts)
+
+    def _emit_start(self, tag: str, attrs):
+        void = tag in VOID_TAGS
+        if self.drop_depth:
+            if not void:
+                self.drop_depth += 1
+            return
+
+        if not self._allowed(tag):
+            self.stats["removed_tags"] += 1
+            if void:
+                return
+            if tag in self.policy.drop_content:
+                self.drop_depth = 1
+            else:
+                # 只去掉标签，内容归属到外层元素
+                self.stack.append([tag, False, len(self.out), False])
+            return
+
+        self.stats["elements"] += 1
+        start = len(self.out)
+        self.out.append(f"<{tag}{self._attrs(attrs)}>")
+        if void:
+            self._mark_content()
+            return
+        if tag in PREFORMATTED_TAGS:
+            self.preformatted += 1
+        self.stack.append([tag, True, start, False])
+
+    # ---- HTMLParser 回调 ----
+
+    def handle_starttag(self, tag, attrs):
+        self._emit_start(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        # 非空元素的自闭合写法（如 <div/>）按开始+结束处理
+        self._emit_start(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if self.drop_depth:
+            self.drop_depth -= 1
+            return
+        if not any(frame[0] == tag for frame in self.stack):
+            # 多余的结束标签
+            return
+        while self.stack:
+            name, emitted, start, has_content = self.stack.pop()
+            self._close(name, emitted, start, has_content)
+            if name == tag:
+                break
+
+    def _close(self, name: str, emitted: bool, start: int, has_content: bool):
+        if not emitted:
+            return
+        if name in PREFORMATTED_TAGS:
+            self.preformatted -= 1
+        if self.clean and name in EMPTY_REMOVABLE_TAGS and not has_content:
+            del self.out[start:]
+            self.stats["elements"] -= 1
+            self.stats["removed_empty"] += 1
+            return
+        self.out.append(f"</{name}>")
+        self._mark_content()
+
+    def handle_data(self, data):
+        if self.drop_depth:
+            return
+        if self.clean and not self.preformatted:
+            data = _WHITESPACE.sub(" ", data)
+            if not data.strip():
+                # 纯空白：相邻已有空白时省略
+                if not self.out or self.out[-1].endswith(" "):
+                    return
+                data = " "
+        in_raw_text = self.stack and self.stack[-1][1] and self.stack[-1][0] in ("script", "style")
+        self.out.append(data if in_raw_text else html_lib.escape(html_lib.unescape(data), quote=False))
+        if data.strip():
+            self._mark_content()
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+    def handle_comment(self, data):
+        if not self.drop_depth and self.policy is not None and self.policy.keep_comments:
+            self.out.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        if not self.drop_depth and self._allowed("html"):
+            self.out.append(f"<!{decl}>")
+
+    def finish(self) -> str:
+        self.close()
+        # 补全未闭合的元素
+        while self.stack:
+            self._close(*self.stack.pop())
+        text = "".join(self.out)
+        return text.strip() if self.clean else text
+
+
+class _CanonicalPass(HTMLParser):
+    """
+    规范化HTML用于比较渲染结果是否相同：属性排序、class排序、压缩空白、去掉注释，
+    块级元素两侧的空白直接丢弃（不改变渲染结果的差异都会被抹平）
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: List[str] = []
+        self.raw: Optional[str] = None
+        self.preformatted = 0
+        self.pending_space = False
+        self.after_block = True
+
+    def _attrs(self, attrs: List[Tuple[str, Optional[str]]]) -> str:
+        parts = []
+        for name, value in sorted(attrs, key=lambda attr: attr[0]):
+            if value is None:
+                parts.append(f" {name}")
+                continue
+            if name == "class":
+                value = " ".join(sorted(set(value.split())))
+            elif name == "style":
+                value = _STYLE_PUNCTUATION.sub(r"\1", " ".join(value.split())).rstrip(";")
+            parts.append(f' {name}="{html_lib.escape(value, quote=True)}"')
+        return "".join(parts)
+
+    def _boundary(self, tag: str):
+        """遇到标签时决定之前挂起的空白是否保留"""
+        block = tag in BLOCK_TAGS
+        if self.pending_space and not block and not self.after_block:
+            self.out.append(" ")
+        self.pending_space = False
+        self.after_block = block
+
+    def handle_starttag(self, tag, attrs):
+        self._boundary(tag)
+        self.out.append(f"<{tag}{self._attrs(attrs)}>")
+        if tag in PREFORMATTED_TAGS:
+            self.preformatted += 1
+            if tag in ("script", "style"):
+                self.raw = tag
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        self._boundary(tag)
+        self.out.append(f"</{tag}>")
+        if tag in PREFORMATTED_TAGS and self.preformatted:
+            self.preformatted -= 1
+            self.raw = None
+
+    def handle_data(self, data):
+        if self.raw == "style":
+            self.out.append(" ".join(data.split()))
+            return
+        if self.raw == "script":
+            self.out.append(data.strip())
+            return
+        if self.preformatted:
+            self.out.append(html_lib.escape(data, quote=False))
+            return
+
+        text = " ".join(data.split())
+        if not text:
+            self.pending_space = self.pending_space or bool(data)
+            return
+        if (self.pending_space or data[0].isspace()) and not self.after_block:
+            self.out.append(" ")
+        self.out.append(html_lib.escape(text, quote=False))
+        self.pending_space = data[-1].isspace()
+        self.after_block = False
+
+    def handle_decl(self, decl):
+        self.out.append(f"<!{decl.lower()}>")
+
+    def finish(self) -> str:
+        self.close()
+        return "".join(self.out)
+
+
+class HTMLSanitizer:
+    """基于分词器的单遍HTML处理：按允许列表过滤、清理空白与空元素、校验结构"""
+
+    @staticmethod
+    def process(
+        html: str,
+        policy: Optional[SanitizePolicy] = DEFAULT_POLICY,
+        clean: bool = True
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        单遍处理HTML
+
+        Args:
+            html: 原始HTML
+            policy: 允许列表策略，None表示不过滤元素和属性
+            clean: 是否压缩空白并删除空的 p/div/span
+
+        Returns:
+            (处理后的HTML, {"valid", "elements", "removed_tags", "removed_attrs", "removed_empty"})
+        """
+        if not html:
+            return "", {"valid": False, "elements": 0, "removed_tags": 0, "removed_attrs": 0, "removed_empty": 0}
+
+        stream = _StreamingPass(policy, clean)
+        stream.feed(html)
+        output = stream.finish()
+        stats = dict(stream.stats, valid=stream.stats["elements"] > 0)
+        return output, stats
+
+    @staticmethod
+    def has_element(html: str) -> bool:
+        """是否包含至少一个元素（不过滤、不清理，只做结构检查）"""
+        if not html or "<" not in html:
+            return False
+        return HTMLSanitizer.process(html, policy=None, clean=False)[1]["valid"]
+
+    @staticmethod
+    def canonicalize(html: str) -> str:
+        """
+        规范化HTML（用于按内容判断渲染结果是否相同，如缩略图缓存键）
+
+        空白、属性顺序、class顺序、注释等不影响渲染的差异会被抹平；
+        pre/textarea 内容和脚本按原样保留。
+
+        Args:
+            html: HTML
+
+        Returns:
+            规范化后的HTML
+        """
+        if not html:
+            return ""
+        stream = _CanonicalPass()
+        stream.feed(html)
+        return stream.finish()
@@ -0,0 +1,58 @@
+from typing import Optional
+from PIL import Image
+import hashlib
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ImageHasher:
+    """图片哈希工具（内容哈希 + 感知哈希）"""
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """计算图片字节的SHA-256"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def perceptual_hash(data: bytes, hash_size: int = 8) -> Optional[str]:
+        """
+        计算差值感知哈希(dHash)
+
+        Args:
+            data: 图片字节
+            hash_size: 哈希边长，结果为 hash_size * hash_size 位
+
+        Returns:
+            十六进制哈希字符串，无法解码的图片（如SVG）返回None
+        """
+        try:
+            image = Image.open(io.BytesIO(data))
+            image.draft("L", (hash_size * 4, hash_size * 4))
+            image = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+        except Exception as e:
+            logger.debug(f"Perceptual hash skipped: {e}")
+            return None
+
+        pixels = list(image.getdata())
+        bits = 0
+        for row in range(hash_size):
+            offset = row * (hash_size + 1)
+            for col in range(hash_size):
+                bits = (bits << 1) | int(pixels[offset + col] > pixels[offset + col + 1])
+
+        return f"{bits:0{hash_size * hash_size // 4}x}"
+
+    @staticmethod
+    def hamming_distance(hash_a: str, hash_b: str) -> int:
+        """计算两个感知哈希的汉明距离"""
+        return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+    @staticmethod
+    def image_size(data: bytes) -> Optional[tuple]:
+        """读取图片尺寸 (width, height)，失败返回None"""
+        try:
+            return Image.open(io.BytesIO(data)).size
+        except Exception:
+            return None
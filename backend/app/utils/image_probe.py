@@ -0,0 +1,97 @@
+from typing import Optional, Dict, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# JPEG中携带图片尺寸的SOF标记（排除DHT/JPG/DAC）
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class ImageProbe:
+    """图片头解析工具：仅凭文件开头的少量字节识别格式和尺寸"""
+
+    @staticmethod
+    def _parse_jpeg(data: bytes) -> Optional[Dict[str, Any]]:
+        i = 2
+        while i + 9 < len(data):
+            if data[i] != 0xFF:
+                i += 1
+                continue
+            marker = data[i + 1]
+            if marker == 0xFF:
+                i += 1
+                continue
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                i += 2
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                height = int.from_bytes(data[i + 5:i + 7], "big")
+                width = int.from_bytes(data[i + 7:i + 9], "big")
+                return {"format": "jpeg", "width": width, "height": height}
+            i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+        return None
+
+    @staticmethod
+    def _parse_webp(data: bytes) -> Optional[Dict[str, Any]]:
+        chunk = data[12:16]
+        if chunk == b"VP8 " and len(data) >= 30:
+            width = int.from_bytes(data[26:28], "little") & 0x3FFF
+            height = int.from_bytes(data[28:30], "little") & 0x3FFF
+        elif chunk == b"VP8L" and len(data) >= 25:
+            bits = int.from_bytes(data[21:25], "little")
+            width = (bits & 0x3FFF) + 1
+            height = ((bits >> 14) & 0x3FFF) + 1
+        elif chunk == b"VP8X" and len(data) >= 30:
+            width = int.from_bytes(data[24:27], "little") + 1
+            height = int.from_bytes(data[27:30], "little") + 1
+        else:
+            return None
+        return {"format": "webp", "width": width, "height": height}
+
+    @staticmethod
+    def parse_header(data: bytes) -> Optional[Dict[str, Any]]:
+        """
+        解析图片头
+
+        Args:
+            data: 文件开头的字节（通常几KB即可，JPEG可能需要更多）
+
+        Returns:
+            {"format", "width", "height"}，无法识别时返回None
+        """
+        if not data:
+            return None
+
+        if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+            return {
+                "format": "png",
+                "width": int.from_bytes(data[16:20], "big"),
+                "height": int.from_bytes(data[20:24], "big")
+            }
+
+        if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+            return {
+                "format": "gif",
+                "width": int.from_bytes(data[6:8], "little"),
+                "height": int.from_bytes(data[8:10], "little")
+            }
+
+        if data.startswith(b"\xff\xd8"):
+            return ImageProbe._parse_jpeg(data)
+
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return ImageProbe._parse_webp(data)
+
+        if data.startswith(b"BM") and len(data) >= 26:
+            return {
+                "format": "bmp",
+                "width": int.from_bytes(data[18:22], "little", signed=True),
+                "height": abs(int.from_bytes(data[22:26], "little", signed=True))
+            }
+
+        head = data[:512].lstrip().lower()
+        if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+            # 矢量图没有固定像素尺寸
+            return {"format": "svg", "width": None, "height": None}
+
+        return None
@@ -0,0 +1,87 @@
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlsplit
+import math
+from app.config import settings
+from app.utils.text_tokenizer import TextTokenizer
+
+# 图片搜索中不区分意义的词
+_IMAGE_STOPWORDS = {"image", "images", "photo", "photos", "picture", "pictures", "图片", "照片"}
+
+# 各项得分权重
+_WEIGHTS = {"text": 0.4, "resolution": 0.25, "aspect": 0.15, "source": 0.2}
+
+
+class ImageRanker:
+    """图片候选本地排序（标题相关性、分辨率、宽高比、来源信誉）"""
+
+    @staticmethod
+    def tokenize(text: str) -> Set[str]:
+        """分词后的词项集合（去掉图片类泛化词）"""
+        return set(TextTokenizer.tokenize(text)) - _IMAGE_STOPWORDS
+
+    @staticmethod
+    def text_score(query_tokens: Set[str], image: Dict[str, Any]) -> float:
+        """查询词在标题和来源中的覆盖率"""
+        if not query_tokens:
+            return 0.0
+        image_tokens = ImageRanker.tokenize(f"{image.get('title', '')} {image.get('source', '')}")
+        return len(query_tokens & image_tokens) / len(query_tokens)
+
+    @staticmethod
+    def resolution_score(width: Optional[int], height: Optional[int]) -> float:
+        """与幻灯片画布尺寸的匹配度：达到画布尺寸得满分，尺寸未知时取中间值"""
+        if not width or not height:
+            return 0.5
+        return min(1.0, width / settings.SLIDE_WIDTH, height / settings.SLIDE_HEIGHT)
+
+    @staticmethod
+    def aspect_score(width: Optional[int], height: Optional[int]) -> float:
+        """宽高比与画布的接近程度（对数距离，3倍以上差距为0）"""
+        if not width or not height:
+            return 0.5
+        target = settings.SLIDE_WIDTH / settings.SLIDE_HEIGHT
+        distance = abs(math.log((width / height) / target))
+        return max(0.0, 1.0 - distance / math.log(3))
+
+    @staticmethod
+    def source_score(image: Dict[str, Any]) -> float:
+        """来源信誉：可信图库加分，带水印的商业图库减分"""
+        host = urlsplit(image.get("url") or "").netloc.lower()
+        text = f"{host} {(image.get('source') or '').lower()}"
+        if any(domain in text for domain in settings.IMAGE_WATERMARKED_SOURCES):
+            return 0.0
+        if any(domain in text for domain in settings.IMAGE_TRUSTED_SOURCES):
+            return 1.0
+        return 0.5
+
+    @staticmethod
+    def score(query_tokens: Set[str], image: Dict[str, Any]) -> float:
+        """综合得分（0~1），未验证可用性的图片降权"""
+        width, height = image.get("width"), image.get("height")
+        total = (
+            _WEIGHTS["text"] * ImageRanker.text_score(query_tokens, image)
+            + _WEIGHTS["resolution"] * ImageRanker.resolution_score(width, height)
+            + _WEIGHTS["aspect"] * ImageRanker.aspect_score(width, height)
+            + _WEIGHTS["source"] * ImageRanker.source_score(image)
+        )
+        if image.get("verified") is False:
+            total *= 0.8
+        return round(total, 4)
+
+    @staticmethod
+    def rank(images: List[Dict[str, Any]], query: str, top_k: int) -> List[Dict[str, Any]]:
+        """
+        按综合得分排序并返回前 top_k 张
+
+        Args:
+            images: 候选图片
+            query: 搜索查询
+            top_k: 返回数量
+
+        Returns:
+            带 score 字段的图片列表（得分相同时保持原顺序）
+        """
+        query_tokens = ImageRanker.tokenize(query)
+        scored = [{**image, "score": ImageRanker.score(query_tokens, image)} for image in images]
+        scored.sort(key=lambda image: image["score"], reverse=True)
+        return scored[:top_k]
@@ -0,0 +1,63 @@
+import hashlib
+import json
+import re
+from typing import Any
+
+# 摘要中剔除的HTML标签与脚本/样式块
+_SCRIPT_STYLE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r"<[^>]+>")
+
+
+class PayloadCodec:
+    """大字段载荷的序列化、哈希与摘要"""
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        """序列化为紧凑的UTF-8 JSON"""
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        """反序列化JSON载荷"""
+        return json.loads(data.decode("utf-8"))
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """载荷内容哈希（与内容块表使用相同的SHA-256）"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def truncate(text: str, length: int) -> str:
+        """压缩空白并截断到指定长度"""
+        text = " ".join(text.split())
+        return text if len(text) <= length else text[:length] + "..."
+
+    @staticmethod
+    def summarize(value: Any, length: int = 200) -> str:
+        """
+        生成载荷的简短摘要
+
+        Args:
+            value: 原始载荷（字符串或可JSON序列化的对象）
+            length: 摘要最大字符数
+
+        Returns:
+            摘要文本
+        """
+        if isinstance(value, str):
+            return PayloadCodec.truncate(value, length)
+        if isinstance(value, dict):
+            # 标量字段优先，便于在列表中看出载荷是什么
+            scalars = {key: item for key, item in value.items() if isinstance(item, (str, int, float, bool)) or item is None}
+            others = [key for key in value if key not in scalars]
+            text = json.dumps(scalars, ensure_ascii=False)
+            if others:
+                text += f" +{', '.join(others)}"
+            return PayloadCodec.truncate(text, length)
+        return PayloadCodec.truncate(json.dumps(value, ensure_ascii=False), length)
+
+    @staticmethod
+    def html_summary(html: str, length: int = 200) -> str:
+        """提取HTML可见文本作为摘要（正则剥离标签，不做完整解析）"""
+        text = _TAG.sub(" ", _SCRIPT_STYLE.sub(" ", html or ""))
+        return PayloadCodec.truncate(text, length)
@@ -0,0 +1,108 @@
+from typing import BinaryIO, Dict, List, Optional
+
+
+class PDFImageWriter:
+    """
+    增量写入的图片PDF（每页一张JPEG，DCTDecode直接嵌入，不重新编码）
+
+    每加入一页就把图片、内容流和页面对象写入文件，内存中只保留对象偏移；
+    页面可以乱序加入（并行渲染），页序由 position 决定，在 close() 时写入页面树
+    """
+
+    # 页面树对象号固定为2，页面对象写入时即可引用
+    CATALOG = 1
+    PAGES = 2
+
+    def __init__(self, file: BinaryIO, dpi: int = 96):
+        """
+        Args:
+            file: 可写的二进制文件对象（从当前位置开始写）
+            dpi: 像素换算为PDF点（1/72英寸）的分辨率，1280x720在96dpi下为13.33x7.5英寸
+        """
+        self.file = file
+        self.scale = 72 / dpi
+        self.offsets: Dict[int, int] = {}
+        self.pages: Dict[int, int] = {}
+        self.next_object = 3
+        self.start = file.tell()
+        self.closed = False
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes):
+        self.file.write(data)
+
+    def _begin(self, number: int):
+        self.offsets[number] = self.file.tell() - self.start
+        self._write(f"{number} 0 obj\n".encode("ascii"))
+
+    def _object(self, number: int, body: str):
+        self._begin(number)
+        self._write(f"{body}\nendobj\n".encode("ascii"))
+
+    def _stream(self, number: int, attributes: str, data: bytes):
+        self._begin(number)
+        self._write(f"<< {attributes} /Length {len(data)} >>\nstream\n".encode("ascii"))
+        self._write(data)
+        self._write(b"\nendstream\nendobj\n")
+
+    def _allocate(self, count: int) -> List[int]:
+        numbers = list(range(self.next_object, self.next_object + count))
+        self.next_object += count
+        return numbers
+
+    def add_page(self, jpeg: bytes, width: int, height: int, position: Optional[int] = None):
+        """
+        写入一页
+
+        Args:
+            jpeg: JPEG图片（RGB）
+            width: 图片像素宽度
+            height: 图片像素高度
+            position: 页序（默认追加到末尾）
+        """
+        if self.closed:
+            raise ValueError("PDF already closed")
+        if position is None:
+            position = max(self.pages, default=-1) + 1
+        if position in self.pages:
+            raise ValueError(f"Duplicate page position {position}")
+
+        image, content, page = self._allocate(3)
+        page_width = round(width * self.scale, 2)
+        page_height = round(height * self.scale, 2)
+        self._stream(
+            image,
+            f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode",
+            jpeg
+        )
+        self._stream(content, "", f"q {page_width} 0 0 {page_height} 0 0 cm /Im0 Do Q".encode("ascii"))
+        self._object(
+            page,
+            f"<< /Type /Page /Parent {self.PAGES} 0 R /MediaBox [0 0 {page_width} {page_height}] "
+            f"/Resources << /XObject << /Im0 {image} 0 R >> >> /Contents {content} 0 R >>"
+        )
+        self.pages[position] = page
+
+    def close(self) -> int:
+        """
+        写入页面树、目录和交叉引用表
+
+        Returns:
+            PDF总字节数
+        """
+        if not self.closed:
+            kids = " ".join(f"{self.pages[position]} 0 R" for position in sorted(self.pages))
+            self._object(self.PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>")
+            self._object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>")
+
+            xref = self.file.tell() - self.start
+            entries = [b"0000000000 65535 f \n"]
+            entries += [f"{self.offsets[number]:010d} 00000 n \n".encode("ascii") for number in range(1, self.next_object)]
+            self._write(f"xref\n0 {self.next_object}\n".encode("ascii") + b"".join(entries))
+            self._write(
+                f"trailer\n<< /Size {self.next_object} /Root {self.CATALOG} 0 R >>\n"
+                f"startxref\n{xref}\n%%EOF\n".encode("ascii")
+            )
+            self.closed = True
+        return self.file.tell() - self.start
@@ -0,0 +1,90 @@
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+from bs4 import BeautifulSoup
+
+_CLASS_ATTR = re.compile(r"""\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_INLINE_SCRIPT = re.compile(r"<script\b(?![^>]*\bsrc=)[^>]*>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+
+# Play CDN 生成完成的标志：Tailwind 的基础层总会输出 --tw- 变量
+READY_SCRIPT = "() => Array.from(document.querySelectorAll('style')).some(style => style.textContent.includes('--tw-'))"
+EXTRACT_SCRIPT = "() => Array.from(document.querySelectorAll('style')).map(style => style.textContent).join('\\n')"
+
+# 替换运行时脚本后，页面中的 tailwind.config = {...} 赋值仍需一个 tailwind 对象，避免脚本报错
+CONFIG_STUB = "<script>window.tailwind = window.tailwind || {};</script>"
+
+
+class TailwindCSS:
+    """Tailwind Play CDN 预编译：扫描页面用到的工具类，生成编译页面，判断预编译CSS是否覆盖页面"""
+
+    @staticmethod
+    def runtime_script(head: List[str], hosts: Iterable[str]) -> Optional[str]:
+        """主题head中的 Play CDN 脚本标签（没有时返回None）"""
+        hosts = set(hosts)
+        for tag in head:
+            node = BeautifulSoup(tag, "html.parser").find("script")
+            if node is not None and urlsplit(node.get("src", "")).hostname in hosts:
+                return tag
+        return None
+
+    @staticmethod
+    def classes(htmls: Iterable[str]) -> Set[str]:
+        """页面 class 属性中出现的全部类名"""
+        found: Set[str] = set()
+        for html in htmls:
+            for match in _CLASS_ATTR.finditer(html or ""):
+                found.update((match.group(1) if match.group(1) is not None else match.group(2)).split())
+        return found
+
+    @staticmethod
+    def config(html: str) -> str:
+        """页面中设置 tailwind.config 的内联脚本内容（没有时为空字符串）"""
+        scripts = [match.group(1).strip() for match in _INLINE_SCRIPT.finditer(html or "")]
+        return "\n".join(" ".join(script.split()) for script in scripts if "tailwind.config" in script)
+
+    @staticmethod
+    def config_key(config: str) -> str:
+        return hashlib.sha256(config.encode("utf-8")).hexdigest()[:16] if config else ""
+
+    @staticmethod
+    def digest(script: str, config: str, classes: Iterable[str]) -> str:
+        """预编译CSS的缓存键：CDN脚本 + 配置 + 类名集合"""
+        content = "\n".join([" ".join(script.split()), config] + sorted(classes))
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def compile_page(script: str, config: str, classes: Iterable[str]) -> str:
+        """
+        生成编译用页面：加载 Play CDN 脚本和页面配置，一个元素带上全部类名，
+        脚本生成的 <style> 即为只包含这些工具类的CSS
+
+        Args:
+            script: Play CDN 脚本标签
+            config: 页面中的 tailwind.config 脚本内容
+            classes: 整套页面用到的类名
+        """
+        class_attr = " ".join(sorted(classes)).replace("&", "&amp;").replace('"', "&quot;")
+        config_tag = f"<script>{config}</script>" if config else ""
+        return (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            + script + config_tag
+            + f'</head><body><div class="{class_attr}"></div></body></html>'
+        )
+
+    @staticmethod
+    def covers(record: Dict[str, Any], bodies: Iterable[str]) -> bool:
+        """预编译CSS是否覆盖页面（类名都已编译，且页面配置与编译时相同）"""
+        compiled = set(record.get("classes", []))
+        bodies = list(bodies)
+        if any(TailwindCSS.config_key(TailwindCSS.config(body)) != record.get("config", "") for body in bodies):
+            return False
+        return TailwindCSS.classes(bodies) <= compiled
+
+    @staticmethod
+    def head_tags(record: Dict[str, Any]) -> List[str]:
+        """替换 Play CDN 脚本的head标签"""
+        tags = [f'<link rel="stylesheet" href="{record["url"]}">']
+        if record.get("config"):
+            tags.append(CONFIG_STUB)
+        return tags
@@ -0,0 +1,35 @@
+from typing import List
+import re
+
+# 英文/数字词与连续的中日韩字符
+_WORD_PATTERN = re.compile(r"[a-z0-9]+|[一-鿿぀-ヿ가-힯]+")
+
+# 不参与匹配的常见虚词
+STOPWORDS = {
+    "a", "an", "the", "of", "and", "or", "in", "on", "at", "for", "with", "to", "is", "are",
+    "was", "were", "be", "by", "as", "it", "this", "that", "from",
+    "的", "了", "和", "与", "在", "是", "及"
+}
+
+
+class TextTokenizer:
+    """轻量分词（检索和排序使用，不依赖分词词典）"""
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """
+        分词：英文按单词，中日韩文本按字符二元组（单字时保留单字）
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            词项列表（保留重复，用于统计词频）
+        """
+        tokens: List[str] = []
+        for word in _WORD_PATTERN.findall((text or "").lower()):
+            if word.isascii() or len(word) == 1:
+                tokens.append(word)
+            else:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        return [token for token in tokens if token not in STOPWORDS]
@@ -0,0 +1,405 @@
+import copy
+import hashlib
+import html as html_lib
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from bs4 import BeautifulSoup, Comment
+from app.utils.font_subsetter import FontSubsetter
+from app.utils.tailwind_css import TailwindCSS
+
+# 字体方案：规划中的方案名关键字 -> 字体族与Google Fonts参数
+FONT_SCHEMES = {
+    "business": {
+        "keywords": ["business", "商务"],
+        "stack": "'MiSans', 'Roboto Flex', 'Source Code Pro', sans-serif",
+        "google": ["Roboto+Flex:wght@400;500;700", "Source+Code+Pro:wght@400;600"]
+    },
+    "retro": {
+        "keywords": ["retro", "复古"],
+        "stack": "'Source Han Serif SC', 'Noto Serif SC', 'Spectral', 'Quattrocento Sans', serif",
+        "google": ["Noto+Serif+SC:wght@400;700", "Spectral:wght@400;600", "Quattrocento+Sans:wght@400;700"]
+    },
+    "vibrant": {
+        "keywords": ["vibrant", "活力"],
+        "stack": "'Douyin Sans', 'MiSans', 'Archivo', 'BioRhyme', sans-serif",
+        "google": ["Archivo:wght@400;600;800", "BioRhyme:wght@400;700"]
+    }
+}
+
+MATERIAL_ICONS_LINK = '<link href="https://fonts.googleapis.com/icon?family=Material+Icons" rel="stylesheet">'
+
+# 一条作用于整个文档的CSS规则在多少张页面中出现后提升为主题共享规则
+PROMOTE_AFTER = 2
+
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+
+
+class ThemeStylesheet:
+    """
+    演示文稿共享主题：由规划生成的配色/字体/基础CSS，加上从页面<head>中提取的公共标签和规则。
+    页面只保存<body>（以及自身特有的样式），渲染/导出时再与主题合成完整文档。
+
+    主题结构：
+        {"hash", "palette", "font_stack", "head": [共享head标签], "base_css", "shared_rules": [规则],
+         "rule_counts": {规则哈希: 出现页数}}
+    """
+
+    @staticmethod
+    def normalize(fragment: str) -> str:
+        """压缩空白，用于比较标签/规则是否相同"""
+        return " ".join(fragment.split())
+
+    @staticmethod
+    def tag_key(tag: str) -> str:
+        """head标签的比较键：标签名 + 排序后的属性（忽略属性顺序与自闭合写法）"""
+        node = BeautifulSoup(tag, "html.parser").find()
+        if node is None:
+            return ThemeStylesheet.normalize(tag)
+        attrs = sorted(
+            (name, " ".join(value) if isinstance(value, list) else str(value))
+            for name, value in node.attrs.items()
+        )
+        return f"{node.name}{attrs}"
+
+    @staticmethod
+    def rule_key(rule: str) -> str:
+        return hashlib.sha1(ThemeStylesheet.normalize(rule).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def split_rules(css: str) -> List[str]:
+        """
+        将样式表切分为顶层规则（@media等嵌套块作为一条规则）
+
+        Returns:
+            规范化后的规则列表
+        """
+        css = _CSS_COMMENT.sub("", css or "")
+        rules, depth, start = [], 0, 0
+        for i, char in enumerate(css):
+            if char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    rules.append(css[start:i + 1])
+                    start = i + 1
+            elif char == ";" and depth == 0:
+                # @import / @charset 等无块语句
+                rules.append(css[start:i + 1])
+                start = i + 1
+        rules = [ThemeStylesheet.normalize(rule) for rule in rules]
+        return [rule for rule in rules if rule and rule != ";"]
+
+    @staticmethod
+    def build(plan: Dict[str, Any], width: int = 1280, height: int = 720) -> Dict[str, Any]:
+        """
+        根据 think 规划生成主题
+
+        Args:
+            plan: 规划参数（background_color/primary_color/accent_color/selected_font_scheme/use_material_icons）
+            width: 页面宽度
+            height: 页面最小高度
+
+        Returns:
+            主题字典
+        """
+        scheme_name = (plan.get("selected_font_scheme") or "").lower()
+        scheme = next(
+            (scheme for scheme in FONT_SCHEMES.values() if any(k in scheme_name for k in scheme["keywords"])),
+            FONT_SCHEMES["business"]
+        )
+        palette = {
+            "background": plan.get("background_color") or "#FEFEFE",
+            "primary": plan.get("primary_color") or "#44B54B",
+            "accent": plan.get("accent_color") or "#1399FF"
+        }
+
+        head = [
+            '<link rel="preconnect" href="https://fonts.googleapis.com">',
+            '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>',
+            '<link href="https://fonts.googleapis.com/css2?'
+            + "&".join(f"family={family}" for family in scheme["google"])
+            + '&display=swap" rel="stylesheet">'
+        ]
+        if plan.get("use_material_icons", True):
+            head.append(MATERIAL_ICONS_LINK)
+
+        base_css = "\n".join([
+            ":root { "
+            + " ".join(f"--theme-{name}: {value};" for name, value in palette.items())
+            + f" --theme-font: {scheme['stack']}; }}",
+            "html, body { margin: 0; padding: 0; }",
+            f"body {{ width: {width}px; min-height: {height}px; background: var(--theme-background); "
+            "font-family: var(--theme-font); }"
+        ])
+
+        return ThemeStylesheet.rehash({
+            "palette": palette,
+            "font_stack": scheme["stack"],
+            "head": [ThemeStylesheet.normalize(tag) for tag in head],
+            "base_css": base_css,
+            "shared_rules": [],
+            "rule_counts": {}
+        })
+
+    @staticmethod
+    def merge(previous: Optional[Dict[str, Any]], rebuilt: Dict[str, Any]) -> Dict[str, Any]:
+        """重新规划时保留已从页面中提取的共享标签与规则"""
+        if not previous:
+            return rebuilt
+        merged = copy.deepcopy(rebuilt)
+        keys = {ThemeStylesheet.tag_key(tag) for tag in merged["head"]}
+        merged["head"] += [tag for tag in previous.get("head", []) if ThemeStylesheet.tag_key(tag) not in keys]
+        merged["shared_rules"] = list(previous.get("shared_rules", []))
+        merged["rule_counts"] = dict(previous.get("rule_counts", {}))
+        return ThemeStylesheet.rehash(merged)
+
+    @staticmethod
+    def rehash(theme: Dict[str, Any]) -> Dict[str, Any]:
+        """按渲染相关内容计算主题哈希"""
+        content = "\n".join(theme["head"]) + theme["base_css"] + "\n".join(theme["shared_rules"])
+        theme["hash"] = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+        return theme
+
+    @staticmethod
+    def stylesheet(theme: Dict[str, Any]) -> str:
+        """主题CSS（基础样式 + 共享规则，@import 必须位于样式表开头）"""
+        imports = [rule for rule in theme["shared_rules"] if rule.lower().startswith("@import")]
+        rules = [rule for rule in theme["shared_rules"] if not rule.lower().startswith("@import")]
+        return "\n".join(imports + [theme["base_css"]] + rules)
+
+    @staticmethod
+    def is_document(html: str) -> bool:
+        """是否为带<head>的完整文档（旧版页面或模型原始输出）"""
+        return bool(re.search(r"<head[\s>]|<!doctype", html or "", re.IGNORECASE))
+
+    @staticmethod
+    def is_theme_rule(rule: str) -> bool:
+        """
+        是否为作用于整个文档的规则（:root/html/body选择器、@font-face、@import）
+
+        只有这类规则可以提升为主题共享规则；类选择器等页面规则即使在多张页面中出现，
+        在其它页面上也可能指向含义不同的元素，始终留在页面中
+        """
+        lowered = rule.lower()
+        if lowered.startswith(("@font-face", "@import")):
+            return True
+        if lowered.startswith("@") or "{" not in lowered:
+            return False
+        selectors = [selector.strip() for selector in lowered.split("{", 1)[0].split(",")]
+        return all(selector in (":root", "html", "body") for selector in selectors)
+
+    @staticmethod
+    def split_document(html: str) -> Optional[Dict[str, Any]]:
+        """
+        解析模型输出的整页HTML（不依赖主题，可以在锁外执行）
+
+        Returns:
+            {"head": [head标签], "rules": [样式规则], "scripts": [内联脚本], "body": <body>元素}，
+            不是完整文档时返回None
+        """
+        if not ThemeStylesheet.is_document(html):
+            return None
+
+        soup = BeautifulSoup(html, "html.parser")
+        head = soup.head
+        parts: Dict[str, Any] = {"head": [], "rules": [], "scripts": []}
+        if head:
+            for node in list(head.children):
+                if isinstance(node, Comment) or not getattr(node, "name", None):
+                    continue
+                if node.name == "style":
+                    parts["rules"] += ThemeStylesheet.split_rules(node.get_text())
+                elif node.name == "script" and not node.get("src"):
+                    parts["scripts"].append(str(node))
+                elif node.name in ("link", "meta", "script"):
+                    if node.name == "meta" and node.get("charset"):
+                        continue
+                    parts["head"].append(ThemeStylesheet.normalize(str(node)))
+
+        body = soup.body
+        if body is None:
+            body = soup.new_tag("body")
+            for node in list((head.next_siblings if head else soup.children)):
+                body.append(node.extract())
+        parts["body"] = str(body)
+        return parts
+
+    @staticmethod
+    def merge_document(
+        theme: Dict[str, Any],
+        parts: Dict[str, Any],
+        count_rules: bool = True
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        把 split_document 的结果并入主题（只做字符串处理）
+
+        - head标签并入主题head（按内容去重）
+        - 已是主题共享规则的样式删除；作用于整个文档的规则（见 is_theme_rule）
+          出现在 PROMOTE_AFTER 张页面后提升为共享规则，其余规则留在页面中
+        - 内联<script>保留在页面中
+
+        Args:
+            theme: 当前主题（不会被修改）
+            parts: split_document 的结果
+            count_rules: 是否累计规则出现次数（重写已有页面时不累计，避免同一页面重复计数）
+
+        Returns:
+            (更新后的主题, 只包含<body>的页面HTML)
+        """
+        theme = copy.deepcopy(theme)
+        head_keys = {ThemeStylesheet.tag_key(tag) for tag in theme["head"]}
+        for tag in parts["head"]:
+            key = ThemeStylesheet.tag_key(tag)
+            if key not in head_keys:
+                head_keys.add(key)
+                theme["head"].append(tag)
+
+        shared = set(theme["shared_rules"])
+        kept = []
+        for rule in dict.fromkeys(parts["rules"]):
+            if rule in shared:
+                continue
+            if not ThemeStylesheet.is_theme_rule(rule):
+                kept.append(rule)
+                continue
+            key = ThemeStylesheet.rule_key(rule)
+            count = theme["rule_counts"].get(key, 0)
+            if count_rules:
+                count += 1
+                theme["rule_counts"][key] = count
+            if count >= PROMOTE_AFTER:
+                theme["shared_rules"].append(rule)
+                shared.add(rule)
+            else:
+                kept.append(rule)
+
+        prefix = ""
+        if kept:
+            prefix += "<style>\n" + "\n".join(kept) + "\n</style>"
+        prefix += "".join(parts["scripts"])
+        body = parts["body"]
+        if prefix:
+            # <body>开始标签的属性值中的 > 已被转义，第一个 > 即为标签结尾
+            end = body.index(">") + 1
+            body = body[:end] + prefix + body[end:]
+
+        return ThemeStylesheet.rehash(theme), body
+
+    @staticmethod
+    def absorb(theme: Dict[str, Any], html: str, count_rules: bool = True) -> Tuple[Dict[str, Any], str]:
+        """
+        把模型输出的整页HTML拆成主题部分和页面部分（split_document + merge_document）
+
+        Args:
+            theme: 当前主题（不会被修改）
+            html: 模型输出的HTML
+            count_rules: 是否累计规则出现次数
+
+        Returns:
+            (更新后的主题, 只包含<body>的页面HTML)
+        """
+        parts = ThemeStylesheet.split_document(html)
+        if parts is None:
+            return theme, html
+        return ThemeStylesheet.merge_document(theme, parts, count_rules)
+
+    @staticmethod
+    def apply_fonts(theme: Dict[str, Any], bodies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        使用主题中已生成的字体子集（替换对应的字体CSS链接和 @font-face 规则）
+
+        子集覆盖页面全部字符时渲染结果与完整字体相同，因此主题哈希不变。
+        子集是为旧版主题生成的，或不覆盖 bodies 中的字符时，使用完整字体。
+
+        Args:
+            theme: 项目主题
+            bodies: 将要渲染的页面（None表示不检查覆盖，如前端预览）
+
+        Returns:
+            不含 fonts 字段的主题副本（再次调用不会重复处理）
+        """
+        fonts = theme.get("fonts")
+        if not fonts:
+            return theme
+        theme = {key: value for key, value in theme.items() if key != "fonts"}
+        if fonts.get("theme") != theme["hash"]:
+            return theme
+        if bodies is not None and not FontSubsetter.covers(fonts.get("coverage", ""), bodies):
+            return theme
+
+        replaced_tags = set(fonts.get("head", []))
+        replaced_rules = set(fonts.get("rules", []))
+        theme["head"] = [tag for tag in theme["head"] if ThemeStylesheet.tag_key(tag) not in replaced_tags]
+        theme["shared_rules"] = [rule for rule in theme["shared_rules"] if rule not in replaced_rules]
+        if fonts.get("css"):
+            theme["base_css"] = fonts["css"] + "\n" + theme["base_css"]
+        return theme
+
+    @staticmethod
+    def apply_tailwind(theme: Dict[str, Any], bodies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        使用主题中已预编译的Tailwind CSS（替换 Play CDN 运行时脚本，浏览器不再即时生成样式）
+
+        预编译CSS覆盖页面用到的全部工具类时样式与运行时生成的相同，因此主题哈希不变。
+        主题中已没有对应脚本，或 bodies 中有未编译的类名、不同的配置时，保留运行时脚本。
+
+        Args:
+            theme: 项目主题
+            bodies: 将要渲染的页面（None表示不检查覆盖）
+
+        Returns:
+            不含 tailwind 字段的主题副本
+        """
+        record = theme.get("tailwind")
+        if not record:
+            return theme
+        theme = {key: value for key, value in theme.items() if key != "tailwind"}
+        if bodies is not None and not TailwindCSS.covers(record, bodies):
+            return theme
+
+        head = []
+        for tag in theme["head"]:
+            if ThemeStylesheet.tag_key(tag) == record["script"]:
+                head += TailwindCSS.head_tags(record)
+            else:
+                head.append(tag)
+        theme["head"] = head
+        return theme
+
+    @staticmethod
+    def prepare(theme: Dict[str, Any], bodies: Optional[List[str]] = None) -> Dict[str, Any]:
+        """渲染前使用主题中已生成的字体子集和预编译CSS（见 apply_fonts / apply_tailwind）"""
+        return ThemeStylesheet.apply_tailwind(ThemeStylesheet.apply_fonts(theme, bodies), bodies)
+
+    @staticmethod
+    def wrap_body(body: str) -> str:
+        """页面片段补上<body>元素（已是<body>元素时原样返回）"""
+        if not re.match(r"\s*<body[\s>]", body, re.IGNORECASE):
+            body = f"<body>{body}</body>"
+        return body
+
+    @staticmethod
+    def compose(theme: Optional[Dict[str, Any]], body: str, title: str = "") -> str:
+        """
+        合成可独立渲染的完整HTML文档
+
+        Args:
+            theme: 项目主题，None时原样返回
+            body: 页面HTML（<body>元素或片段）
+            title: 文档标题
+
+        Returns:
+            完整HTML
+        """
+        if not theme or ThemeStylesheet.is_document(body):
+            return body
+        theme = ThemeStylesheet.prepare(theme, [body])
+        body = ThemeStylesheet.wrap_body(body)
+        return (
+            '<!DOCTYPE html><html lang="zh-CN"><head><meta charset="utf-8">'
+            + (f"<title>{html_lib.escape(title)}</title>" if title else "")
+            + "".join(theme["head"])
+            + f"<style>\n{ThemeStylesheet.stylesheet(theme)}\n</style>"
+            + f"</head>{body}</html>"
+        )
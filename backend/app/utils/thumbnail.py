@@ -1,17 +1,143 @@
-from typing import Optional
-import asyncio
-from playwright.async_api import async_playwright
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from PIL import Image
+import asyncio
 import io
 import base64
 import logging
+from app.config import settings
+from app.services.browser_pool import browser_pool
+
+try:
+    # 可选依赖：注册AVIF编码器（Pillow 11.2以前没有内置AVIF支持）
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
 
 logger = logging.getLogger(__name__)
 
+# 各格式的Pillow编码参数
+ENCODE_OPTIONS = {
+    "webp": {"format": "WEBP", "method": 4},
+    "avif": {"format": "AVIF", "speed": 8},
+    "png": {"format": "PNG", "optimize": True},
+}
+
+# 变体编码线程池：Pillow缩放和编码时释放GIL；Celery prefork子进程是守护进程，不能再创建进程池
+_encode_executor: Optional[ThreadPoolExecutor] = None
+
 
 class ThumbnailGenerator:
     """缩略图生成器"""
 
+    @staticmethod
+    async def render_png(
+        html_content: str,
+        width: int = 320,
+        height: int = 180,
+        scale: float = 1.0
+    ) -> bytes:
+        """
+        渲染HTML并缩放为PNG缩略图
+
+        Args:
+            html_content: 完整HTML文档
+            width: 缩略图宽度
+            height: 缩略图高度
+            scale: 缩放比例（视口为 width/scale x height/scale）
+
+        Returns:
+            PNG字节
+
+        Raises:
+            Exception: 渲染失败
+        """
+        viewport_width = int(width / scale)
+        viewport_height = int(height / scale)
+
+        # 复用进程级浏览器池中预热好的页面
+        screenshot = await browser_pool.screenshot(html_content, viewport_width, viewport_height)
+        return await asyncio.to_thread(ThumbnailGenerator.resize_png, screenshot, width, height)
+
+    @staticmethod
+    def resize_png(data: bytes, width: int, height: int) -> bytes:
+        """
+        把整页截图缩放为缩略图
+
+        Args:
+            data: 原始PNG字节
+            width: 缩略图宽度
+            height: 缩略图高度
+
+        Returns:
+            PNG字节
+        """
+        image = Image.open(io.BytesIO(data))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+
+    @staticmethod
+    def supported_formats(formats: List[str]) -> List[str]:
+        """过滤出当前Pillow可以编码的格式"""
+        Image.init()
+        return [fmt for fmt in formats if fmt in ENCODE_OPTIONS and ENCODE_OPTIONS[fmt]["format"] in Image.SAVE]
+
+    @staticmethod
+    def encode_variants(
+        data: bytes,
+        sizes: Dict[str, Tuple[int, int]],
+        formats: List[str],
+        quality: Dict[str, int]
+    ) -> Dict[str, Dict[str, bytes]]:
+        """
+        把一张整页截图编码为多个尺寸和格式的变体（CPU密集，应在线程池中调用）
+
+        Args:
+            data: 整页截图PNG字节
+            sizes: 变体名 -> (宽, 高)
+            formats: 输出格式（webp/avif/png），不支持的格式跳过
+            quality: 格式 -> 质量
+
+        Returns:
+            {变体名: {格式: 字节}}
+        """
+        source = Image.open(io.BytesIO(data)).convert("RGB")
+        formats = ThumbnailGenerator.supported_formats(formats)
+        variants: Dict[str, Dict[str, bytes]] = {}
+        for name, size in sizes.items():
+            image = source if source.size == size else source.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+            variants[name] = {}
+            for fmt in formats:
+                buffer = io.BytesIO()
+                options = dict(ENCODE_OPTIONS[fmt])
+                if fmt in quality:
+                    options["quality"] = quality[fmt]
+                image.save(buffer, **options)
+                variants[name][fmt] = buffer.getvalue()
+        return variants
+
+    @staticmethod
+    async def encode_variants_async(
+        data: bytes,
+        sizes: Dict[str, Tuple[int, int]],
+        formats: List[str],
+        quality: Dict[str, int]
+    ) -> Dict[str, Dict[str, bytes]]:
+        """在编码线程池中执行 encode_variants，不阻塞事件循环"""
+        global _encode_executor
+        if _encode_executor is None:
+            _encode_executor = ThreadPoolExecutor(
+                max_workers=settings.THUMBNAIL_ENCODE_THREADS,
+                thread_name_prefix="thumbnail-encode"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _encode_executor, ThumbnailGenerator.encode_variants, data, sizes, formats, quality
+        )
+
     @staticmethod
     async def generate_from_html(
         html_content: str,
@@ -32,47 +158,8 @@ class ThumbnailGenerator:
             base64编码的缩略图数据，如果失败返回None
         """
         try:
-            async with async_playwright() as p:
-                browser = await p.chromium.launch()
-                page = await browser.new_page()
-
-                # 设置视口大小
-                await page.set_viewport_size({
-                    "width": int(width / scale),
-                    "height": int(height / scale)
-                })
-
-                # 设置HTML内容
-                await page.set_content(html_content)
-
-                # 等待内容加载
-                await page.wait_for_load_state('networkidle')
-
-                # 截图
-                screenshot = await page.screenshot(
-                    full_page=False,
-                    clip={
-                        "x": 0,
-                        "y": 0,
-                        "width": int(width / scale),
-                        "height": int(height / scale)
-                    }
-                )
-
-                await browser.close()
-
-                # 处理图片
-                image = Image.open(io.BytesIO(screenshot))
-
-                # 调整大小
-                image = image.resize((width, height), Image.Resampling.LANCZOS)
-
-                # 转换为base64
-                buffer = io.BytesIO()
-                image.save(buffer, format='PNG')
-                image_base64 = base64.b64encode(buffer.getvalue()).decode()
-
-                return f"data:image/png;base64,{image_base64}"
+            data = await ThumbnailGenerator.render_png(html_content, width, height, scale)
+            return f"data:image/png;base64,{base64.b64encode(data).decode()}"
 
         except Exception as e:
             logger.error(f"Thumbnail generation error: {e}", exc_info=True)
@@ -97,12 +97,11 @@ class DataValidator:
         if not content:
             return ""
 
-        # 清理HTML
-        from .html_processor import HTMLProcessor
-        content = HTMLProcessor.sanitize_html(content)
+        # 过滤、清理与结构校验在同一遍中完成
+        from .html_sanitizer import HTMLSanitizer
+        content, stats = HTMLSanitizer.process(content)
 
-        # 验证结构
-        if not HTMLProcessor.validate_html_structure(content):
+        if not stats["valid"]:
             # 如果HTML无效，返回纯文本包装
             content = f"<div>{content}</div>"
 
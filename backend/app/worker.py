@@ -1,8 +1,20 @@
 """
 Celery异步任务配置
 """
+import asyncio
+import logging
+import os
+from typing import Optional
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
+from prometheus_client import CollectorRegistry, start_http_server
+from prometheus_client import multiprocess
 from app.config import settings
+from app.services.http_service import http_service
+from app.services.browser_pool import browser_pool
+from app.services.render_asset_cache import render_asset_cache
+
+logger = logging.getLogger(__name__)
 
 # 创建Celery应用实例
 celery_app = Celery(
@@ -19,8 +31,84 @@ celery_app.conf.update(
     result_serializer="json",
     timezone="UTC",
     enable_utc=True,
+    # 缩略图渲染走独立队列，由单独的Worker消费
+    task_routes={
+        "app.tasks.render_slide_thumbnail": {"queue": settings.THUMBNAIL_QUEUE},
+        "app.tasks.render_deck": {"queue": settings.THUMBNAIL_QUEUE},
+        "app.tasks.export_deck_pdf": {"queue": settings.THUMBNAIL_QUEUE},
+        "app.tasks.subset_deck_fonts": {"queue": settings.THUMBNAIL_QUEUE},
+    },
 )
 
+# Worker进程常驻事件循环，保证进程级连接池（HTTP等）可以跨任务复用
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    """获取当前Worker进程的事件循环"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+def run_async(coro):
+    """在Worker进程的常驻事件循环中运行协程"""
+    return get_worker_loop().run_until_complete(coro)
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs):
+    """Worker主进程启动：暴露Prometheus指标（重试、熔断状态等）"""
+    if not settings.ENABLE_METRICS:
+        return
+    registry = None
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # prefork子进程各自写指标文件，由主进程汇总
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    try:
+        if registry is None:
+            start_http_server(settings.WORKER_METRICS_PORT)
+        else:
+            start_http_server(settings.WORKER_METRICS_PORT, registry=registry)
+    except OSError as e:
+        logger.warning(f"Failed to start worker metrics server: {e}")
+
+
+def _consumes_queue(name: str) -> bool:
+    """当前Worker是否消费指定队列（-Q 参数在主进程中生效，子进程fork时继承）"""
+    return name in (celery_app.amqp.queues.consume_from or {})
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Worker子进程启动：初始化工具HTTP连接池；消费缩略图队列的Worker预热浏览器池和渲染资源缓存"""
+    run_async(http_service.startup())
+    if settings.BROWSER_POOL_PREWARM and _consumes_queue(settings.THUMBNAIL_QUEUE):
+        try:
+            run_async(browser_pool.startup())
+        except Exception as e:
+            # 浏览器不可用时不影响其它任务，渲染时再重试启动
+            logger.warning(f"Failed to prewarm browser pool: {e}")
+        if settings.RENDER_ASSET_CACHE_ENABLED:
+            # 字体/图标/CDN脚本提前写入本地缓存（已缓存时只读磁盘）
+            run_async(render_asset_cache.warm(settings.RENDER_ASSET_WARM_URLS))
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Worker子进程退出：关闭连接池和事件循环"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    run_async(http_service.shutdown())
+    run_async(browser_pool.shutdown())
+    _worker_loop.close()
+    _worker_loop = None
+
+
 # 导入任务模块
 try:
     import app.tasks
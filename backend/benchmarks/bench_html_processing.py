@@ -0,0 +1,113 @@
+"""
+HTML处理基准：原 BeautifulSoup 多遍实现 vs 分词器单遍实现
+
+语料为 tests/fixtures/slides 下的真实幻灯片，以及 HTMLProcessor.generate_slide_html 生成的页面；
+按页数放大成不同规模的演示文稿，测量每次写入时的 过滤 + 清理 + 校验 总耗时。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.bench_html_processing [--repeat 5] [--decks 1,10,50]
+"""
+import argparse
+import re
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, List
+from bs4 import BeautifulSoup
+from app.utils.html_processor import HTMLProcessor
+from app.utils.html_sanitizer import HTMLSanitizer
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "slides"
+
+LEGACY_ALLOWED_TAGS = {
+    'div', 'span', 'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'ul', 'ol', 'li', 'strong', 'em', 'b', 'i', 'br',
+    'img', 'a'
+}
+LEGACY_ALLOWED_ATTRS = {'style', 'src', 'alt', 'href', 'target'}
+
+
+def legacy_clean_html(html: str) -> str:
+    """原 HTMLProcessor.clean_html"""
+    html = re.sub(r'\s+', ' ', html.strip())
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all(['p', 'div', 'span']):
+        if not tag.get_text().strip() and not tag.find_all():
+            tag.decompose()
+    return str(soup)
+
+
+def legacy_sanitize_html(html: str) -> str:
+    """原 HTMLProcessor.sanitize_html"""
+    soup = BeautifulSoup(html, 'html.parser')
+    for tag in soup.find_all():
+        if tag.name not in LEGACY_ALLOWED_TAGS:
+            tag.unwrap()
+        else:
+            for attr in [attr for attr in tag.attrs if attr not in LEGACY_ALLOWED_ATTRS]:
+                del tag[attr]
+    return str(soup)
+
+
+def legacy_validate(html: str) -> bool:
+    """原 HTMLProcessor.validate_html_structure"""
+    return bool(BeautifulSoup(html, 'html.parser').find())
+
+
+def legacy_pipeline(html: str) -> str:
+    """原写入路径：clean_html，再由 DataValidator.validate_slide_content 过滤并校验"""
+    html = legacy_clean_html(html)
+    html = legacy_sanitize_html(html)
+    if not legacy_validate(html):
+        html = f"<div>{html}</div>"
+    return html
+
+
+def streaming_pipeline(html: str) -> str:
+    """单遍实现"""
+    html, stats = HTMLSanitizer.process(html)
+    return html if stats["valid"] else f"<div>{html}</div>"
+
+
+def load_corpus() -> List[str]:
+    """真实幻灯片 + 模板生成的页面"""
+    pages = [path.read_text(encoding="utf-8") for path in sorted(FIXTURES.glob("*.html"))]
+    pages.append(HTMLProcessor.generate_slide_html("封面", ["副标题"], is_cover=True))
+    pages.append(HTMLProcessor.generate_slide_html(
+        "要点",
+        [{"type": "bullet", "text": f"要点 {i}"} for i in range(6)],
+        image_url="https://example.com/a.jpg"
+    ))
+    return pages
+
+
+def measure(func: Callable[[str], str], deck: List[str], repeat: int) -> float:
+    """处理整套演示文稿的耗时中位数（毫秒）"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in deck:
+            func(page)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--decks", default="1,10,50", help="演示文稿规模（页数的倍数，逗号分隔）")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    corpus_bytes = sum(len(page.encode("utf-8")) for page in corpus)
+    print(f"corpus: {len(corpus)} pages, {corpus_bytes / 1024:.1f} KiB")
+    print(f"{'pages':>8} {'legacy ms':>12} {'streaming ms':>14} {'speedup':>9}")
+    for scale in (int(value) for value in args.decks.split(",")):
+        deck = corpus * scale
+        legacy = measure(legacy_pipeline, deck, args.repeat)
+        streaming = measure(streaming_pipeline, deck, args.repeat)
+        print(f"{len(deck):>8} {legacy:>12.2f} {streaming:>14.2f} {legacy / streaming:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+import pytest
+from app.config import settings
+from app.services.asset_service import AssetService
+from app.services.http_service import http_service
+from app.services.storage_service import storage_service
+
+
+def test_public_url_strips_public_prefix():
+    """测试对象键的公共前缀 assets/ 不会在URL中重复出现"""
+    base = settings.ASSET_BASE_URL.rstrip("/")
+
+    assert storage_service.public_url("assets/images/abc.png") == f"{base}/api/assets/images/abc.png"
+    assert storage_service.public_url("images/abc.png") == f"{base}/api/assets/images/abc.png"
+
+
+@pytest.mark.asyncio
+async def test_ingest_images_reuses_known_urls_and_rewrites_html(monkeypatch):
+    """测试已入库的URL直接复用，新图片下载一次，HTML中的地址全部改写"""
+    known_url = "https://cdn.example.com/known.jpg"
+    downloads = []
+
+    async def fake_load(db, project_id):
+        return [SimpleNamespace(meta_data={"original_url": known_url, "asset_url": "/local/known"})]
+
+    async def fake_ingest_one(url, known):
+        downloads.append(url)
+        return {"original_url": url, "asset_url": "/local/new"}
+
+    monkeypatch.setattr(AssetService, "_load_project_assets", fake_load)
+    monkeypatch.setattr(AssetService, "_ingest_one", fake_ingest_one)
+
+    html = (
+        f'<img src="{known_url}"><img src="https://cdn.example.com/new.png">'
+        '<div style="background-image: url(https://cdn.example.com/new.png)"></div>'
+    )
+    rewritten, records = await AssetService.ingest_images(None, "project", html)
+
+    assert downloads == ["https://cdn.example.com/new.png"]
+    assert "cdn.example.com" not in rewritten
+    assert rewritten.count("/local/new") == 2 and "/local/known" in rewritten
+    assert {record["dedup"] for record in records if record["asset_url"] == "/local/known"} == {"url"}
+
+@pytest.mark.asyncio
+async def test_ingest_images_batch_downloads_shared_urls_once(monkeypatch):
+    """测试批量入库时多页共用的图片只下载一次，并按页面返回素材记录"""
+    downloads = []
+
+    async def fake_load(db, project_id):
+        return []
+
+    async def fake_ingest_one(url, known):
+        downloads.append(url)
+        return {"original_url": url, "asset_url": f"/local/{len(downloads)}"}
+
+    monkeypatch.setattr(AssetService, "_load_project_assets", fake_load)
+    monkeypatch.setattr(AssetService, "_ingest_one", fake_ingest_one)
+
+    htmls = [
+        '<img src="https://cdn.example.com/a.jpg"><img src="https://cdn.example.com/b.jpg">',
+        '<div style="background-image: url(https://cdn.example.com/a.jpg)"></div>',
+        "<p>no images</p>",
+    ]
+    rewritten, records = await AssetService.ingest_images_batch(None, "project", htmls)
+
+    assert sorted(downloads) == ["https://cdn.example.com/a.jpg", "https://cdn.example.com/b.jpg"]
+    assert "https://cdn.example.com" not in rewritten[0] + rewritten[1]
+    assert [len(page) for page in records] == [2, 1, 0]
+    assert rewritten[2] == htmls[2]
+
+
+def test_rewrite_urls_keeps_longer_urls_sharing_a_prefix():
+    """测试一个地址是另一个地址的前缀时，只改写完整匹配的地址"""
+    html = (
+        '<img src="https://cdn.example.com/a.jpg"><img src="https://cdn.example.com/a.jpg?w=800">'
+        '<div style="background: url(\'https://cdn.example.com/a.jpg\')"></div>'
+    )
+    rewritten = AssetService.rewrite_urls(html, {"https://cdn.example.com/a.jpg": "/local/a"})
+
+    assert rewritten.count("/local/a") == 2
+    assert 'src="https://cdn.example.com/a.jpg?w=800"' in rewritten
+
+
+class FakeStream:
+    def __init__(self, status_code, headers=None, body=b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+
+    @property
+    def is_redirect(self):
+        return self.status_code in (301, 302, 303, 307, 308)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def aiter_bytes(self):
+        yield self.body
+
+
+@pytest.mark.asyncio
+async def test_download_refuses_internal_addresses_and_svg(monkeypatch):
+    """测试内网地址、非默认端口、重定向到内网的地址和SVG都不会被下载入库"""
+    responses = {
+        "https://cdn.example.com/redirect.png": FakeStream(302, {"Location": "http://127.0.0.1/secret.png"}),
+        "https://cdn.example.com/logo.svg": FakeStream(200, {"Content-Type": "image/svg+xml"}, b"<svg/>"),
+        "https://cdn.example.com/photo.png": FakeStream(200, {"Content-Type": "image/png"}, b"PNG"),
+    }
+    requested = []
+
+    async def fake_resolve(host, port):
+        return {"cdn.example.com": ["93.184.216.34"], "minio": ["172.18.0.3"], "localhost": ["127.0.0.1"]}[host]
+
+    def fake_stream(method, url, **kwargs):
+        requested.append(url)
+        assert kwargs["follow_redirects"] is False
+        return responses[url]
+
+    monkeypatch.setattr(http_service._dns_backend, "_resolve", fake_resolve)
+    monkeypatch.setattr(http_service, "stream", fake_stream)
+
+    for url in ("http://169.254.169.254/latest/meta-data/x.png", "http://minio/ppt-agent/a.png",
+                "http://localhost/a.png", "https://cdn.example.com:8443/a.png", "ftp://cdn.example.com/a.png",
+                "http://[::ffff:10.0.0.1]/a.png"):
+        assert await AssetService._download(url) is None
+    assert requested == []
+
+    assert await AssetService._download("https://cdn.example.com/redirect.png") is None
+    assert await AssetService._download("https://cdn.example.com/logo.svg") is None
+    assert await AssetService._download("https://cdn.example.com/photo.png") == (b"PNG", "image/png")
+    assert requested == [
+        "https://cdn.example.com/redirect.png", "https://cdn.example.com/logo.svg", "https://cdn.example.com/photo.png"
+    ]
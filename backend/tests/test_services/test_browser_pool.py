@@ -0,0 +1,120 @@
+import asyncio
+import pytest
+from app.services import browser_pool as browser_pool_module
+from app.services.browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    async def set_viewport_size(self, size):
+        pass
+
+    async def set_content(self, html, wait_until=None):
+        await asyncio.sleep(0.01)
+
+    async def evaluate(self, script, *args):
+        return True
+
+    async def screenshot(self, **kwargs):
+        return b"png"
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.page = FakePage()
+
+    async def new_page(self):
+        return self.page
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def close(self):
+        self.page.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.browsers = []
+        self.chromium = self
+
+    async def launch(self, **kwargs):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def fake_playwright(monkeypatch):
+    driver = FakePlaywright()
+
+    class Starter:
+        async def start(self):
+            return driver
+
+    monkeypatch.setattr(browser_pool_module, "async_playwright", lambda: Starter())
+    return driver
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_browser_and_recycles_pages(fake_playwright):
+    """测试浏览器只启动一次、并发受槽位数限制、页面渲染N次后回收"""
+    pool = BrowserPool(size=2, max_renders=3)
+    active = peak = 0
+
+    async def render():
+        nonlocal active, peak
+        async with pool.page() as page:
+            active += 1
+            peak = max(peak, active)
+            await page.set_content("<p>x</p>")
+            active -= 1
+
+    await asyncio.gather(*(render() for _ in range(10)))
+    assert len(fake_playwright.browsers) == 1
+    assert peak == 2
+    assert pool.stats["renders"] == 10
+    assert pool.stats["recycled"] >= 2
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pool_relaunches_after_browser_crash(fake_playwright):
+    """测试浏览器崩溃后自动重启并继续渲染"""
+    pool = BrowserPool(size=1)
+    assert await pool.screenshot("<p>1</p>", 320, 180) == b"png"
+
+    fake_playwright.browsers[0].connected = False
+    assert await pool.screenshot("<p>2</p>", 320, 180) == b"png"
+    assert len(fake_playwright.browsers) == 2
+    assert pool.stats["crashes"] == 1
+    await pool.shutdown()
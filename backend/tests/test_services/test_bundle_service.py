@@ -0,0 +1,95 @@
+import io
+import zipfile
+from types import SimpleNamespace
+import pytest
+from app.services import bundle_service as bundle_module
+from app.services.bundle_service import BundleService
+from app.services.render_asset_cache import RenderAssetCache
+from app.services.storage_service import storage_service
+from app.services.theme_service import ThemeService
+
+FONT_CSS = b"""@font-face { font-family: 'Roboto Flex'; src: url(https://fonts.gstatic.com/s/latin.woff2); unicode-range: U+0000-00FF; }
+@font-face { font-family: 'Roboto Flex'; src: url(https://fonts.gstatic.com/s/cyrillic.woff2); unicode-range: U+0400-045F; }"""
+
+
+class FakeAssetCache(RenderAssetCache):
+    """真实的允许列表与磁盘缓存，只替换网络下载"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    async def _download(self, url, headers):
+        self.calls.append(url)
+        if url.startswith("https://fonts.googleapis.com"):
+            return {"content-type": "text/css"}, FONT_CSS
+        if url.endswith(".woff2"):
+            return {"content-type": "font/woff2"}, b"wOF2" + url.encode("utf-8")
+        raise RuntimeError("offline")
+
+
+@pytest.fixture
+def deck(monkeypatch, tmp_path):
+    cache = FakeAssetCache(str(tmp_path))
+    monkeypatch.setattr(bundle_module, "render_asset_cache", cache)
+
+    async def get_bytes(key):
+        return b"\x89PNG same image", "image/png"
+
+    monkeypatch.setattr(bundle_module.storage_service, "get_bytes", get_bytes)
+    image = storage_service.public_url("assets/images/ab/abc.png")
+    other = storage_service.public_url("assets/images/cd/cde.png")
+    slides = [
+        SimpleNamespace(html_content=f'<body><h1>Intro</h1><img src="{image}"></body>'),
+        SimpleNamespace(html_content=f'<body style="background:url({other})"><p>End</p></body>'),
+    ]
+    return cache, slides
+
+
+@pytest.mark.asyncio
+async def test_zip_bundle_shares_stylesheet_and_deduplicates_assets(deck):
+    """zip包：共享deck.css，只打包用到的字体分片，内容相同的图片只存一份，文本文件附带预压缩版本"""
+    cache, slides = deck
+    parts = await BundleService._collect(slides, ThemeService.default_theme())
+    files = BundleService._build_zip(parts, "Deck")
+
+    assert "https://fonts.gstatic.com/s/cyrillic.woff2" not in cache.calls
+    assets = [path for path in files if path.startswith("assets/") and not path.endswith((".gz", ".br"))]
+    assert sorted(name.rsplit(".", 1)[1] for name in assets) == ["png", "woff2"]
+
+    first = files["slides/01.html"][0].decode("utf-8")
+    assert '<link rel="stylesheet" href="../deck.css">' in first and "fonts.googleapis.com" not in first
+    assert f'src="../{next(p for p in assets if p.endswith(".png"))}"' in first
+    assert b"url(assets/" in files["deck.css"][0]
+    assert "index.html.gz" in files and "deck.css.gz" in files
+
+    archive = zipfile.ZipFile(io.BytesIO(BundleService.pack_zip(files)))
+    assert archive.read("index.html") == files["index.html"][0]
+    assert BundleService.pack_zip(files) == BundleService.pack_zip(dict(reversed(files.items())))
+
+
+@pytest.mark.asyncio
+async def test_single_bundle_stores_each_asset_once(deck):
+    """单文件：外壳和资源表各一份，页面只保留占位引用"""
+    _, slides = deck
+    parts = await BundleService._collect(slides, ThemeService.default_theme())
+    html = BundleService._build_single(parts, "Deck")["deck.html"][0].decode("utf-8")
+
+    assert html.count("data:image/png;base64,") == 1
+    assert html.count("data:font/woff2;base64,") == 1
+    assert html.count("bundle:") >= 3
+
+
+@pytest.mark.asyncio
+async def test_only_allowlisted_and_local_head_assets_are_fetched(deck):
+    """head中的素材服务地址从对象存储读取，允许列表以外的外部地址不请求、保留原标签"""
+    cache, slides = deck
+    theme = ThemeService.default_theme()
+    internal = '<script src="http://169.254.169.254/latest/meta-data"></script>'
+    local = f'<link rel="stylesheet" href="{storage_service.public_url("assets/tailwind/abc.css")}">'
+    theme = {**theme, "head": theme["head"] + [internal, local]}
+
+    parts = await BundleService._collect(slides, theme)
+
+    assert not any("169.254.169.254" in url or "/api/assets/" in url for url in cache.calls)
+    assert internal in parts["head"] and local not in parts["head"]
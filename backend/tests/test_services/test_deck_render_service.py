@@ -0,0 +1,167 @@
+import uuid
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+import pytest
+from playwright.async_api import Error as PlaywrightError
+from app.services import deck_render_service as deck_module
+from app.services.deck_render_service import DeckRenderService
+from app.services.theme_service import ThemeService
+
+
+class FakePage:
+    def __init__(self):
+        self.loads = []
+        self.swaps = []
+        self.current = None
+
+    async def set_viewport_size(self, size):
+        pass
+
+    async def set_content(self, html, wait_until=None):
+        self.loads.append(html)
+        self.current = html
+
+    async def evaluate(self, script, body):
+        self.swaps.append(body)
+        self.current = body
+
+    async def screenshot(self, **kwargs):
+        return self.current.encode("utf-8")
+
+
+class FakePool:
+    def __init__(self, size):
+        self.size = size
+        self.pages = []
+
+    async def load(self, page, html):
+        await page.set_content(html)
+        return True
+
+    async def within_deadline(self, awaitable, deadline=None):
+        await awaitable
+        return True
+
+    @asynccontextmanager
+    async def page(self):
+        page = FakePage()
+        self.pages.append(page)
+        yield page
+
+
+@pytest.mark.asyncio
+async def test_theme_loaded_once_per_lane_and_bodies_swapped(monkeypatch):
+    """主题每个并行页面只加载一次，静态页面替换<body>，含脚本的页面完整加载"""
+    pool = FakePool(size=2)
+    monkeypatch.setattr(deck_module, "browser_pool", pool)
+    bodies = [
+        "<body><h1>封面</h1></body>",
+        "<body><p>目录</p></body>",
+        "<body><canvas></canvas><script>new Chart()</script></body>",
+        "<body><p>结尾</p></body>",
+        "<body><p>致谢</p></body>",
+    ]
+    images = {}
+
+    async def on_image(index, image):
+        images[index] = image
+
+    failed = await DeckRenderService.render_images(ThemeService.default_theme(), bodies, on_image)
+
+    assert failed == []
+    assert sorted(images) == list(range(len(bodies)))
+    assert images[0] == bodies[0].encode("utf-8")
+    assert len(pool.pages) == 2
+    # 第1个页面：封面、图表页、致谢；图表页之后需要重新加载主题
+    lane = pool.pages[0]
+    assert lane.swaps == [bodies[0], bodies[4]]
+    assert len(lane.loads) == 3 and "new Chart()" in lane.loads[1]
+    # 第2个页面：目录、结尾共用一次主题加载
+    assert len(pool.pages[1].loads) == 1 and pool.pages[1].swaps == [bodies[1], bodies[3]]
+
+
+@pytest.mark.asyncio
+async def test_failed_slide_does_not_abort_the_rest_of_the_lane(monkeypatch):
+    """某页处理或渲染出错时只有该页记为失败，同一浏览器页面中的其余幻灯片继续渲染"""
+    pool = FakePool(size=1)
+    monkeypatch.setattr(deck_module, "browser_pool", pool)
+    evaluate = FakePage.evaluate
+
+    async def flaky_evaluate(page, script, body):
+        if "broken" in body:
+            raise PlaywrightError("Execution context was destroyed")
+        await evaluate(page, script, body)
+
+    monkeypatch.setattr(FakePage, "evaluate", flaky_evaluate)
+    images = {}
+
+    async def on_image(index, image):
+        if index == 1:
+            raise RuntimeError("upload failed")
+        images[index] = image
+
+    bodies = ["<body>a</body>", "<body>b</body>", "<body>broken</body>", "<body>d</body>"]
+    failed = await DeckRenderService.render_images(ThemeService.default_theme(), bodies, on_image)
+
+    assert failed == [1, 2]
+    assert sorted(images) == [0, 3]
+    # 出错后重新加载主题再继续
+    assert len(pool.pages[0].loads) == 3
+
+
+class FakeResult:
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+
+
+class FakeDB:
+    """按当前内容哈希执行条件更新"""
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.written = {}
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        if self.hashes[params["id_1"]] != params["content_hash_1"]:
+            return FakeResult(0)
+        self.written[params["id_1"]] = params["thumbnail_url"]
+        return FakeResult(1)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_render_deck_skips_slides_edited_during_the_render(monkeypatch):
+    """渲染期间被修改的页面不写回旧内容的缩略图"""
+    slides = [
+        SimpleNamespace(id=uuid.uuid4(), html_content=f"<body>{text}</body>", content_hash=text,
+                        thumbnail_url=None, thumbnail_variants=None)
+        for text in ("a", "b")
+    ]
+    db = FakeDB({slide.id: slide.content_hash for slide in slides})
+
+    async def get_slides(db, project_id):
+        return slides
+
+    async def get_theme(db, project_id):
+        return None
+
+    async def exists(key):
+        return False
+
+    async def store_variants(digest, image):
+        # 第二页在渲染期间被用户修改
+        db.hashes[slides[1].id] = "edited"
+
+    monkeypatch.setattr(deck_module, "browser_pool", FakePool(size=1))
+    monkeypatch.setattr(deck_module.SlideService, "get_slides_by_project", get_slides)
+    monkeypatch.setattr(deck_module.ThemeService, "get_theme", get_theme)
+    monkeypatch.setattr(deck_module.storage_service, "exists", exists)
+    monkeypatch.setattr(deck_module.ThumbnailService, "store_variants", store_variants)
+
+    result = await DeckRenderService.render_deck(db, uuid.uuid4())
+
+    assert result["failed"] == [] and len(result["slides"]) == 2
+    assert list(db.written) == [slides[0].id]
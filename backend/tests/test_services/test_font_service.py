@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.services import font_service as font_module
+from app.services.font_service import FontService
+from app.services.render_asset_cache import BlockedAssetError, RenderAssetCache
+from app.utils.font_subsetter import FontSubsetter
+
+CSS = """@font-face { font-family: 'MiSans'; font-weight: 400; src: url(fonts/MiSans-Regular.woff2); }
+@font-face { font-family: 'MiSans'; src: url(fonts/MiSans-Latin.woff2); unicode-range: U+0400-04FF; }"""
+
+
+class FakeAssetCache:
+    async def fetch(self, url, headers=None):
+        return {"content-type": "font/woff2"}, url.encode("utf-8")
+
+
+class FakeStorage:
+    def __init__(self):
+        self.objects = {}
+
+    async def exists(self, key):
+        return key in self.objects
+
+    async def put_bytes(self, key, data, content_type="application/octet-stream"):
+        self.objects[key] = data
+
+    @staticmethod
+    def public_url(key):
+        return f"http://assets/{key}"
+
+
+@pytest.fixture
+def subsets(monkeypatch):
+    calls = []
+
+    def subset(data, codepoints):
+        calls.append((data, frozenset(codepoints)))
+        return b"wOF2" + data
+
+    monkeypatch.setattr(font_module, "render_asset_cache", FakeAssetCache())
+    monkeypatch.setattr(font_module, "storage_service", FakeStorage())
+    monkeypatch.setattr(FontSubsetter, "subset", staticmethod(subset))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_subset_source_caches_by_font_and_glyph_set(subsets):
+    """每个字体按用到的字符生成一次子集，字符集不变时复用；不含用到字符的分片删除"""
+    codepoints = FontSubsetter.codepoints(["<h1>季度报告</h1>"])
+    css = await FontService._subset_source(CSS, "https://cdn.cn.font.mi.com/font/css", codepoints, asyncio.Semaphore(1))
+
+    assert css.count("@font-face") == 1 and "font-weight: 400;" in css
+    assert "http://assets/assets/fonts/" in css and "MiSans-Latin" not in css
+    assert subsets[0][0] == b"https://cdn.cn.font.mi.com/font/fonts/MiSans-Regular.woff2"
+
+    again = await FontService._subset_source(CSS, "https://cdn.cn.font.mi.com/font/css", codepoints, asyncio.Semaphore(1))
+    assert again == css and len(subsets) == 1
+
+
+def test_needs_subset_when_theme_changes_or_characters_missing(monkeypatch):
+    """主题变化或页面出现子集之外的字符时需要重新生成"""
+    monkeypatch.setattr(FontSubsetter, "available", staticmethod(lambda: True))
+    fonts = {"theme": "t1", "css": "", "head": ["link|mi"], "rules": [], "coverage": "季度报告"}
+
+    assert FontService.needs_subset({"hash": "t1"}, ["<h1>报告</h1>"]) is True  # 还没有子集
+    assert FontService.needs_subset({"hash": "t1", "fonts": fonts}, ["<h1>报告</h1>"]) is False
+    assert FontService.needs_subset({"hash": "t1", "fonts": fonts}, ["<h1>年度</h1>"]) is True
+    assert FontService.needs_subset({"hash": "t2", "fonts": fonts}, ["<h1>报告</h1>"]) is True
+
+
+@pytest.mark.asyncio
+async def test_font_face_outside_allowlist_is_not_downloaded(tmp_path, monkeypatch):
+    """主题规则来自模型生成的页面，允许列表以外的 @font-face 地址不下载，整条规则保留原样"""
+    downloads = []
+
+    async def fake_download(url, headers):
+        downloads.append(url)
+        return {}, b""
+
+    cache = RenderAssetCache(str(tmp_path))
+    monkeypatch.setattr(cache, "_download", fake_download)
+    monkeypatch.setattr(font_module, "render_asset_cache", cache)
+
+    rule = "@font-face { font-family: 'Evil'; src: url(http://169.254.169.254/latest/meta-data); }"
+    codepoints = FontSubsetter.codepoints(["<h1>标题</h1>"])
+    with pytest.raises(BlockedAssetError):
+        await FontService._subset_source(rule, settings.ASSET_BASE_URL, codepoints, asyncio.Semaphore(1))
+    assert downloads == []
@@ -0,0 +1,135 @@
+import asyncio
+import socket
+import httpcore
+import httpx
+import pytest
+from app.config import settings
+from app.services import http_service as http_module
+from app.services.http_service import CachingDNSBackend, ToolHTTPService
+
+
+def _service(handler) -> ToolHTTPService:
+    """使用 MockTransport 的服务实例（绑定当前事件循环）"""
+    service = ToolHTTPService()
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    service._loop = asyncio.get_running_loop()
+    return service
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录重试退避时间，不实际等待"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(http_module.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+class FailingBackend:
+    async def connect_tcp(self, host, port, **kwargs):
+        raise httpcore.ConnectError("refused")
+
+
+@pytest.mark.asyncio
+async def test_dns_cache_reuses_resolution_until_ttl_or_connect_failure(monkeypatch):
+    """测试DNS解析结果在TTL内复用，过期或连接失败后重新解析"""
+    lookups = []
+
+    async def fake_getaddrinfo(host, port, type=0):
+        lookups.append(host)
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port))]
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", fake_getaddrinfo)
+    backend = CachingDNSBackend(ttl=60)
+
+    assert await backend._resolve("example.com", 443) == ["10.0.0.1"]
+    assert await backend._resolve("example.com", 443) == ["10.0.0.1"]
+    assert lookups == ["example.com"]
+
+    backend._backend = FailingBackend()
+    with pytest.raises(httpcore.ConnectError):
+        await backend.connect_tcp("example.com", 443)
+    await backend._resolve("example.com", 443)
+    assert lookups == ["example.com", "example.com"]
+
+    expired = CachingDNSBackend(ttl=0)
+    await expired._resolve("example.org", 80)
+    await expired._resolve("example.org", 80)
+    assert lookups.count("example.org") == 2
+
+
+@pytest.mark.asyncio
+async def test_per_host_limit_bounds_concurrency(monkeypatch):
+    """测试同一主机的并发请求数不超过限制，不同主机互不影响"""
+    monkeypatch.setattr(settings, "TOOL_HTTP_PER_HOST_LIMIT", 2)
+    active = {}
+    peak = {}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200)
+
+    service = _service(handler)
+    await asyncio.gather(
+        *(service.get(f"https://a.example.com/{i}") for i in range(6)),
+        *(service.get(f"https://b.example.com/{i}") for i in range(2)),
+    )
+
+    assert peak == {"a.example.com": 2, "b.example.com": 2}
+
+
+@pytest.mark.asyncio
+async def test_retry_with_backoff_for_idempotent_requests(monkeypatch, sleeps):
+    """测试GET在临时错误时按退避重试并遵循Retry-After，POST不重试"""
+    monkeypatch.setattr(settings, "TOOL_HTTP_MAX_RETRIES", 2)
+    responses = [httpx.Response(503, headers={"Retry-After": "3"}), httpx.Response(502), httpx.Response(200)]
+    calls = []
+
+    async def handler(request):
+        calls.append(request.method)
+        if request.method == "POST":
+            return httpx.Response(503)
+        return responses.pop(0)
+
+    service = _service(handler)
+    assert (await service.get("https://example.com/")).status_code == 200
+    assert sleeps[0] == 3.0 and 0 <= sleeps[1] <= settings.TOOL_HTTP_BACKOFF_MAX
+
+    assert (await service.request("POST", "https://example.com/")).status_code == 503
+    assert calls == ["GET", "GET", "GET", "POST"]
+
+
+@pytest.mark.asyncio
+async def test_transport_errors_retry_until_exhausted(monkeypatch, sleeps):
+    """测试网络错误重试次数用尽后抛出原异常"""
+    monkeypatch.setattr(settings, "TOOL_HTTP_MAX_RETRIES", 1)
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request.url.path)
+        raise httpx.ConnectError("down", request=request)
+
+    with pytest.raises(httpx.ConnectError):
+        await _service(handler).get("https://example.com/x")
+    assert len(attempts) == 2 and len(sleeps) == 1
+
+
+@pytest.mark.asyncio
+async def test_loop_change_closes_stale_client():
+    """测试事件循环变化时旧客户端先关闭再重建"""
+    service = ToolHTTPService()
+    stale = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    service.client = stale
+    service._loop = object()
+
+    client = await service.get_client()
+    assert stale.is_closed
+    assert client is not stale and service._loop is asyncio.get_running_loop()
+    await service.shutdown()
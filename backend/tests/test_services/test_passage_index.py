@@ -0,0 +1,45 @@
+from app.services.passage_index import ConversationIndex, PassageIndexService
+
+
+def test_split_passages_merges_short_blocks_and_splits_long_ones():
+    """测试短文本块合并、超长文本块按句子切分"""
+    blocks = ["标题", "第一段。", "A" * 50 + ". " + "B" * 50 + "."]
+    passages = PassageIndexService.split_passages(blocks, max_chars=60)
+    assert passages[0].startswith("标题 第一段。 AAA")
+    assert passages[1] == "B" * 50 + "."
+    assert all(len(passage) <= 60 for passage in passages)
+
+
+def test_bm25_search_within_page_and_across_pages():
+    """测试BM25检索返回最相关段落，并可限定在单个页面内"""
+    index = ConversationIndex()
+    index.add_page("page_a", "https://a.example", "A", [
+        "Cookie policy and site navigation links",
+        "The Forbidden City was built between 1406 and 1420 in Beijing",
+        "Subscribe to our newsletter",
+    ])
+    index.add_page("page_b", "https://b.example", "B", [
+        "Beijing weather forecast for the weekend",
+    ])
+
+    top = index.search("when was the Forbidden City built", limit=2)
+    assert top[0]["handle"] == "page_a" and top[0]["index"] == 1
+
+    scoped = index.search("Beijing", handle="page_b")
+    assert [passage["handle"] for passage in scoped] == ["page_b"]
+
+    index.remove_page("page_a")
+    assert index.search("Forbidden City") == []
+    assert index.read("page_b") == [{"handle": "page_b", "index": 0, "text": "Beijing weather forecast for the weekend"}]
+
+
+def test_indexes_are_not_shared_without_a_conversation():
+    """测试没有对话ID时不共享索引，有对话ID时按对话隔离"""
+    service = PassageIndexService()
+    anonymous = service.get(None, create=True)
+    anonymous.add_page("page_a", "https://a.example", "A", ["private passage"])
+
+    assert service.get(None) is None
+    assert not service.get(None, create=True).pages
+    assert service.get("conversation-1", create=True) is service.get("conversation-1")
+    assert service.get("conversation-2") is None
@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy.sql.dml import Insert
+from app.config import settings
+from app.services.payload_store import PayloadStore
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """内容块表：INSERT ... ON CONFLICT DO NOTHING 与按哈希批量查询"""
+
+    def __init__(self):
+        self.blobs = {}
+        self.inserts = 0
+        self.selects = 0
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        if isinstance(statement, Insert):
+            self.inserts += 1
+            self.blobs.setdefault(params["hash"], params["data"])
+            return FakeResult([])
+        self.selects += 1
+        return FakeResult([(h, self.blobs[h]) for h in params["hash_1"] if h in self.blobs])
+
+
+@pytest.fixture(autouse=True)
+def small_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "PAYLOAD_OFFLOAD_THRESHOLD", 64)
+
+
+@pytest.mark.asyncio
+async def test_offload_and_load_roundtrip():
+    """测试超过阈值的载荷转存为引用，相同载荷只存一份，批量还原只查询一次"""
+    db = FakeDB()
+    large = {"success": True, "content": "正文" * 100}
+
+    assert await PayloadStore.offload(db, {"success": True}) == {"success": True}
+    ref = await PayloadStore.offload(db, large)
+    again = await PayloadStore.offload(db, dict(large))
+
+    assert PayloadStore.is_ref(ref) and ref[PayloadStore.REF_KEY] == again[PayloadStore.REF_KEY]
+    assert len(db.blobs) == 1 and ref["size"] > 64 and len(ref["summary"]) <= settings.PAYLOAD_SUMMARY_LENGTH + 3
+    assert await PayloadStore.offload(db, ref) is ref
+
+    assert await PayloadStore.load_many(db, [ref, None, "x", again]) == [large, None, "x", large]
+    assert db.selects == 1
+
+    with pytest.raises(ValueError):
+        await PayloadStore.load(db, {PayloadStore.REF_KEY: "missing"})
+
+
+@pytest.mark.asyncio
+async def test_message_stubs_keep_role_and_tool_call_id():
+    """测试过大的消息转存为保留角色和 tool_call_id 的摘要，还原后与原消息相同"""
+    db = FakeDB()
+    messages = [
+        {"role": "user", "content": "做一份季度报告"},
+        {"role": "tool", "tool_call_id": "call_1", "content": "网页内容" * 100},
+        {"role": "assistant", "content": "结论" * 100},
+    ]
+
+    stored = await PayloadStore.offload_messages(db, messages)
+
+    assert stored[0] == messages[0]
+    assert stored[1]["role"] == "tool" and stored[1]["tool_call_id"] == "call_1"
+    assert PayloadStore.REF_KEY in stored[1] and "tool_call_id" not in stored[2]
+    assert "网页内容" * 100 not in str(stored)
+    assert await PayloadStore.load_messages(db, stored) == messages
+
+
+@pytest.mark.asyncio
+async def test_existing_stubs_reused_for_loaded_history():
+    """测试保存时已转存的历史消息沿用原引用，只转存新增的消息"""
+    db = FakeDB()
+    history = [{"role": "tool", "tool_call_id": "call_1", "content": "网页内容" * 100}]
+    stored = await PayloadStore.offload_messages(db, history)
+    inserts = db.inserts
+
+    loaded = await PayloadStore.load_messages(db, stored)
+    loaded.append({"role": "assistant", "content": "新的回答" * 100})
+    updated = await PayloadStore.offload_messages(db, loaded, stored)
+
+    assert updated[0] is stored[0]
+    assert db.inserts == inserts + 1
+    assert await PayloadStore.load_messages(db, updated) == loaded
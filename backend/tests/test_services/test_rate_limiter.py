@@ -0,0 +1,117 @@
+import asyncio
+import fakeredis
+import fakeredis.aioredis
+import pytest
+from app.config import settings
+from app.services import rate_limiter as rate_module
+from app.services.rate_limiter import (
+    DistributedRateLimiter, RateLimitExceeded, REFUND_SCRIPT, TOKEN_BUCKET_SCRIPT
+)
+
+_sleep = asyncio.sleep
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """使用 fakeredis（支持Lua脚本）的限流器"""
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "RATE_LIMITS", {
+        "search": {"rate": 2, "burst": 3},
+        "llm": {"rate": 0.01, "burst": 10, "key_rate": 0.01, "key_burst": 1},
+    })
+    instance = DistributedRateLimiter()
+    instance.redis_client = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    instance._script = instance.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+    instance._refund_script = instance.redis_client.register_script(REFUND_SCRIPT)
+    instance._get_client = lambda: instance.redis_client
+    return instance
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录排队等待时间，不实际等待"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(rate_module.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+async def _tokens(limiter, key):
+    return float(await limiter.redis_client.hget(key, "tokens"))
+
+
+async def _rewind(limiter, key, seconds):
+    """把令牌桶的上次更新时间提前，模拟时间流逝"""
+    ts = float(await limiter.redis_client.hget(key, "ts"))
+    await limiter.redis_client.hset(key, "ts", ts - seconds)
+
+
+@pytest.mark.asyncio
+async def test_burst_then_refill_at_rate(limiter):
+    """测试突发容量用完后按速率补充令牌，且不超过容量"""
+    for _ in range(3):
+        assert await limiter.acquire("search", max_wait=0) == 0.0
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await limiter.acquire("search", max_wait=0)
+    assert exc_info.value.wait == pytest.approx(0.5, abs=0.05)
+
+    await _rewind(limiter, "ratelimit:search", 1.0)
+    assert await limiter.acquire("search", max_wait=0) == 0.0
+    assert await limiter.acquire("search", max_wait=0) == 0.0
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("search", max_wait=0)
+
+    await _rewind(limiter, "ratelimit:search", 100.0)
+    await limiter.acquire("search", max_wait=0)
+    assert await _tokens(limiter, "ratelimit:search") == pytest.approx(2.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_per_key_and_global_buckets(limiter):
+    """测试单个API Key预算用完时其它Key仍可使用，两者都从提供方总预算中扣减"""
+    await limiter.acquire("llm", "key-a", max_wait=0)
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("llm", "key-a", max_wait=0)
+    await limiter.acquire("llm", "key-b", max_wait=0)
+
+    assert await _tokens(limiter, "ratelimit:llm") == pytest.approx(8.0, abs=0.05)
+    assert await limiter.acquire("unlimited", max_wait=0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_queue_within_max_wait_otherwise_fail_without_debit(limiter, sleeps):
+    """测试等待时间在上限内时预扣令牌排队，超过上限时直接失败且不扣减"""
+    for _ in range(3):
+        await limiter.acquire("search", max_wait=1)
+
+    wait = await limiter.acquire("search", max_wait=1)
+    assert wait == pytest.approx(0.5, abs=0.05) and sleeps == [wait]
+    assert await _tokens(limiter, "ratelimit:search") == pytest.approx(-1.0, abs=0.05)
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire("search", max_wait=0.5)
+    assert await _tokens(limiter, "ratelimit:search") == pytest.approx(-1.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_while_queued_refunds_token(limiter, monkeypatch):
+    """测试排队中被取消的调用归还预扣的令牌"""
+    for _ in range(3):
+        await limiter.acquire("search", max_wait=5)
+
+    async def hang(delay):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(rate_module.asyncio, "sleep", hang)
+    task = asyncio.create_task(limiter.acquire("search", max_wait=5))
+    for _ in range(20):
+        await _sleep(0)
+    assert await _tokens(limiter, "ratelimit:search") == pytest.approx(-1.0, abs=0.05)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert await _tokens(limiter, "ratelimit:search") == pytest.approx(0.0, abs=0.05)
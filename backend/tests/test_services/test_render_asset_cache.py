@@ -0,0 +1,143 @@
+import pytest
+from app.config import settings
+from app.services import render_asset_cache as cache_module
+from app.services.render_asset_cache import BlockedAssetError, RenderAssetCache
+
+
+class FakeResponse:
+    is_redirect = False
+
+    def __init__(self, content):
+        self.content = content
+        self.headers = {"content-type": "text/css", "set-cookie": "x=1"}
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeHTTP:
+    def __init__(self):
+        self.calls = []
+
+    async def get(self, url, **kwargs):
+        self.calls.append(url)
+        return FakeResponse(b"@font-face{}")
+
+
+class FakeRequest:
+    def __init__(self, url):
+        self.url = url
+        self.headers = {"user-agent": "HeadlessChrome"}
+
+
+class FakeRoute:
+    def __init__(self, url):
+        self.request = FakeRequest(url)
+        self.outcome = None
+
+    async def continue_(self):
+        self.outcome = ("continue",)
+
+    async def abort(self, reason):
+        self.outcome = ("abort", reason)
+
+    async def fulfill(self, status, headers, body):
+        self.outcome = ("fulfill", headers, body)
+
+
+@pytest.fixture
+def http(monkeypatch):
+    fake = FakeHTTP()
+    monkeypatch.setattr(cache_module, "http_service", fake)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_allowlisted_assets_downloaded_once_and_shared_by_content(tmp_path, http):
+    """允许列表中的资源只下载一次，内容相同的URL共用一个内容块"""
+    cache = RenderAssetCache(str(tmp_path))
+    first = FakeRoute("https://fonts.googleapis.com/css2?family=Roboto")
+    await cache.handle(first)
+    assert first.outcome == ("fulfill", {"content-type": "text/css", "access-control-allow-origin": "*"}, b"@font-face{}")
+
+    # 新实例模拟另一个进程：直接读磁盘缓存
+    again = FakeRoute("https://fonts.googleapis.com/css2?family=Roboto")
+    await RenderAssetCache(str(tmp_path)).handle(again)
+    assert again.outcome == first.outcome
+    assert http.calls == ["https://fonts.googleapis.com/css2?family=Roboto"]
+
+    await cache.fetch("https://cdn.jsdelivr.net/npm/same-content")
+    assert len(list((tmp_path / "blobs").rglob("*"))) == 2  # 一个目录 + 一个内容块
+    assert len(list((tmp_path / "urls").iterdir())) == 2
+
+
+@pytest.mark.asyncio
+async def test_unlisted_hosts_blocked_and_data_urls_pass_through(tmp_path, http, monkeypatch):
+    """严格模式拒绝允许列表以外的请求，data地址照常加载"""
+    monkeypatch.setattr(settings, "RENDER_ASSET_STRICT", True)
+    cache = RenderAssetCache(str(tmp_path))
+
+    tracker = FakeRoute("https://tracker.example.com/pixel.gif")
+    await cache.handle(tracker)
+    assert tracker.outcome == ("abort", "blockedbyclient")
+
+    inline = FakeRoute("data:image/png;base64,AAAA")
+    await cache.handle(inline)
+    assert inline.outcome == ("continue",)
+    assert http.calls == []
+
+
+@pytest.mark.asyncio
+async def test_local_assets_served_from_object_storage(tmp_path, http, monkeypatch):
+    """素材地址直接从对象存储读取，不经过网络（Worker中素材服务地址不可达）"""
+    objects = {"assets/images/a b.png": (b"PNG", "image/png")}
+    reads = []
+
+    async def fake_get_bytes(key):
+        reads.append(key)
+        return objects.get(key)
+
+    monkeypatch.setattr(cache_module.storage_service, "get_bytes", fake_get_bytes)
+    cache = RenderAssetCache(str(tmp_path))
+
+    asset = FakeRoute(f"{settings.ASSET_BASE_URL}/api/assets/images/a%20b.png?v=1")
+    await cache.handle(asset)
+    assert asset.outcome == ("fulfill", {"content-type": "image/png", "access-control-allow-origin": "*"}, b"PNG")
+
+    missing = FakeRoute(f"{settings.ASSET_BASE_URL}/api/assets/images/missing.png")
+    await cache.handle(missing)
+    assert missing.outcome == ("fulfill", {"access-control-allow-origin": "*"}, b"")
+
+    assert RenderAssetCache.asset_key(f"{settings.ASSET_BASE_URL}/api/assets/../secret") is None
+    assert reads == ["assets/images/a b.png", "assets/images/missing.png"] and http.calls == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_refuses_unlisted_hosts_and_redirects_out_of_the_allowlist(tmp_path, monkeypatch):
+    """fetch本身检查允许列表（调用方无法绕过），允许列表主机重定向到其它主机时同样拒绝"""
+    calls = []
+
+    class Redirect(FakeResponse):
+        is_redirect = True
+
+        def __init__(self, location):
+            super().__init__(b"")
+            self.headers = {"location": location}
+
+    async def fake_get(url, **kwargs):
+        calls.append(url)
+        return Redirect("http://169.254.169.254/latest/meta-data")
+
+    monkeypatch.setattr(cache_module.http_service, "get", fake_get)
+    cache = RenderAssetCache(str(tmp_path))
+
+    with pytest.raises(BlockedAssetError):
+        await cache.fetch("http://169.254.169.254/latest/meta-data")
+    with pytest.raises(BlockedAssetError):
+        await cache.fetch("file:///etc/passwd")
+    assert calls == []
+
+    with pytest.raises(BlockedAssetError):
+        await cache.fetch("https://unpkg.com/lib.js")
+    assert calls == ["https://unpkg.com/lib.js"]
+    assert not (tmp_path / "urls").exists()
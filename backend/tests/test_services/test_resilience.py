@@ -0,0 +1,65 @@
+import pytest
+from app.services.rate_limiter import RateLimitExceeded
+from app.services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class Flaky:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("temporary failure")
+        return "ok"
+
+
+@pytest.mark.asyncio
+async def test_retry_policy_recovers_from_transient_errors():
+    """测试重试策略在临时错误后成功返回"""
+    func = Flaky(failures=2)
+    policy = RetryPolicy("test-retry", max_attempts=3, base_delay=0, max_delay=0)
+    assert await policy.call(func) == "ok"
+    assert func.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_recovers():
+    """测试熔断器连续失败后快速拒绝，冷却后半开探测成功即关闭"""
+    breaker = CircuitBreaker("test-breaker", failure_threshold=2, reset_timeout=60)
+    func = Flaky(failures=2)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await breaker.call(func)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(func)
+    assert func.calls == 2
+
+    # 模拟冷却时间已过
+    breaker.opened_at -= 60
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert await breaker.call(func) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_ignored_exceptions_do_not_open_the_breaker():
+    """测试本地限流拒绝不计入熔断失败，半开探测名额也会释放"""
+    breaker = CircuitBreaker(
+        "test-ignored",
+        failure_threshold=1,
+        reset_timeout=60,
+        ignore_exceptions=(RateLimitExceeded,)
+    )
+
+    async def throttled():
+        raise RateLimitExceeded("search", 1.0)
+
+    for _ in range(3):
+        with pytest.raises(RateLimitExceeded):
+            await breaker.call(throttled)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
@@ -0,0 +1,119 @@
+import uuid
+import pytest
+from sqlalchemy.sql.dml import Insert
+from app.services.revision_service import RevisionService
+from app.models.slide import Slide
+
+
+class FakeScalars:
+    def __init__(self, values):
+        self.values = values
+
+    def all(self):
+        return self.values
+
+
+class FakeResult:
+    def __init__(self, value=None, rows=None):
+        self.value = value
+        self.rows = rows or []
+
+    def scalar_one(self):
+        return self.value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def scalars(self):
+        return FakeScalars(self.rows)
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """幻灯片行、版本表和内容块表（按编译后的语句分派）"""
+
+    def __init__(self, slide):
+        self.slide = slide
+        self.revisions = {}
+        self.blobs = {}
+        self.locks = 0
+        self.commits = 0
+
+    async def execute(self, statement):
+        params = statement.compile().params
+        if isinstance(statement, Insert):
+            # 多行 VALUES 的参数按 hash_m0、data_m0 ... 编号
+            for name, value in params.items():
+                if name.startswith("hash_m"):
+                    self.blobs.setdefault(value, params[f"data_m{name[6:]}"])
+            return FakeResult()
+        sql = str(statement)
+        if "FOR UPDATE" in sql:
+            self.locks += 1
+            return FakeResult(self.slide.current_revision_id)
+        if "max(" in sql:
+            return FakeResult(max((r.revision_number for r in self.revisions.values()), default=0))
+        if "content_blobs.data" in sql:
+            return FakeResult(rows=[(h, self.blobs[h]) for h in params["hash_1"] if h in self.blobs])
+        return FakeResult(rows=[h for h in params["hash_1"] if h in self.blobs])
+
+    async def get(self, model, ident):
+        return self.revisions.get(ident)
+
+    def add(self, revision):
+        self.revisions[revision.id] = revision
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def refresh(self, instance):
+        pass
+
+
+def _slide(html):
+    return Slide(id=uuid.uuid4(), project_id=uuid.uuid4(), position="a0", html_content=html)
+
+
+@pytest.mark.asyncio
+async def test_record_revision_numbers_and_dedupes():
+    """测试版本号依次递增、父版本指向上一版，内容未变化时不产生新版本"""
+    slide = _slide("<h1>第一版</h1>")
+    db = FakeDB(slide)
+
+    first = await RevisionService.record_revision(db, slide, "insert_page")
+    assert first.revision_number == 1 and first.parent_id is None
+    assert slide.current_revision_id == first.id
+
+    assert await RevisionService.record_revision(db, slide, "api") is None
+    assert len(db.revisions) == 1
+
+    slide.html_content = "<h1>第二版</h1>"
+    second = await RevisionService.record_revision(db, slide, "patch_page")
+    assert second.revision_number == 2 and second.parent_id == first.id
+    assert slide.current_revision_id == second.id
+    assert db.locks == 3
+    assert await RevisionService.load_html(db, first) == "<h1>第一版</h1>"
+
+
+@pytest.mark.asyncio
+async def test_restore_revision_writes_no_new_blobs_or_revisions():
+    """测试恢复只切换版本指针并同步内容，锁定幻灯片行，不写入新的内容块或版本"""
+    slide = _slide("<h1>第一版</h1>" * 200)
+    db = FakeDB(slide)
+    first = await RevisionService.record_revision(db, slide, "insert_page")
+    slide.html_content = "<h1>第二版</h1>"
+    await RevisionService.record_revision(db, slide, "patch_page")
+    blobs, revisions, locks = dict(db.blobs), dict(db.revisions), db.locks
+
+    restored = await RevisionService.restore_revision(db, slide, first)
+
+    assert restored.html_content == "<h1>第一版</h1>" * 200
+    assert restored.current_revision_id == first.id
+    assert restored.content_hash == first.content_hash
+    assert db.blobs == blobs and db.revisions == revisions
+    assert db.locks == locks + 1 and db.commits == 1
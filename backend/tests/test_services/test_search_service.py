@@ -0,0 +1,79 @@
+import asyncio
+import os
+import pytest
+from app.config import settings
+from app.services.search_service import (
+    FixtureSearchProvider, SearchService, SearchProvider, SearchProviderError, build_providers
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "..", "fixtures", "search")
+
+
+class FailingProvider(SearchProvider):
+    name = "failing"
+
+    async def web_search(self, query, num=10, recency_days=-1):
+        raise SearchProviderError("upstream 502")
+
+    async def image_search(self, query, gl="cn", num=10):
+        raise SearchProviderError("upstream 502")
+
+
+@pytest.mark.asyncio
+async def test_fixture_provider_lookup():
+    """测试夹具提供方按查询命中，未命中时使用默认结果"""
+    provider = FixtureSearchProvider(FIXTURE_DIR)
+    hit = await provider.web_search("故宫")
+    assert hit[0]["link"] == "https://example.com/palace-museum"
+
+    fallback = await provider.image_search("任意查询", num=2)
+    assert len(fallback) == 2
+
+
+@pytest.mark.asyncio
+async def test_fixture_dir_does_not_depend_on_cwd(tmp_path, monkeypatch):
+    """测试默认夹具目录和相对路径配置都按后端根目录解析，与工作目录无关"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "SEARCH_PROVIDERS", ["fixture"])
+    hit = await build_providers()[0].web_search("故宫")
+    assert hit[0]["link"] == "https://example.com/palace-museum"
+
+    monkeypatch.setattr(settings, "SEARCH_FIXTURE_DIR", os.path.join("tests", "fixtures", "search"))
+    hit = await build_providers()[0].web_search("故宫")
+    assert hit[0]["link"] == "https://example.com/palace-museum"
+
+
+@pytest.mark.asyncio
+async def test_failover_to_backup_provider():
+    """测试主提供方失败时切换到备用提供方"""
+    service = SearchService([FailingProvider(), FixtureSearchProvider(FIXTURE_DIR, name="backup")])
+    results, provider = await service._hedged("web_search", "故宫", 5, -1)
+    assert provider == "backup"
+    assert results[0]["title"] == "故宫博物院"
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_when_primary_is_slow(monkeypatch):
+    """测试主提供方超过对冲延迟时由备用提供方返回结果"""
+    from app.config import settings
+    monkeypatch.setattr(settings, "SEARCH_HEDGE_DEFAULT_DELAY", 0.05)
+
+    slow = FixtureSearchProvider(FIXTURE_DIR, latency_ms=2000, name="slow")
+    fast = FixtureSearchProvider(FIXTURE_DIR, latency_ms=0, name="fast")
+    service = SearchService([slow, fast])
+
+    results, provider = await service._hedged("image_search", "办公室", "cn", 3)
+    assert provider == "fast"
+    assert len(results) == 3
+
+    # 被取消的慢请求也记录延迟（不低于对冲延迟），p95不会因此偏低
+    await asyncio.sleep(0)
+    assert service._tracker(slow).samples and min(service._tracker(slow).samples) >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_raises():
+    """测试所有提供方失败时抛出异常"""
+    service = SearchService([FailingProvider()])
+    with pytest.raises(SearchProviderError):
+        await service.web_search("故宫")
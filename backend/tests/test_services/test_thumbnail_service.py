@@ -0,0 +1,67 @@
+import pytest
+from app.config import settings
+from app.services import thumbnail_service as thumbnail_module
+from app.services.thumbnail_service import ThumbnailService
+from app.worker import celery_app
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def set_value(self, key, value, ttl=None):
+        self.values[key] = value
+
+    async def get_value(self, key):
+        return self.values.get(key)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    monkeypatch.setattr(thumbnail_module, "redis_service", FakeRedis())
+    calls = []
+    monkeypatch.setattr(celery_app, "send_task", lambda name, **kwargs: calls.append((name, kwargs)))
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_schedule_sends_delayed_job_to_thumbnail_queue(sent):
+    """投递到独立队列并延迟执行，同一批中的重复ID只投递一次"""
+    count = await ThumbnailService.schedule(["s1", "s1", "s2"], "c1")
+
+    assert count == 2
+    name, kwargs = sent[0]
+    assert name == ThumbnailService.TASK_NAME
+    assert kwargs["queue"] == settings.THUMBNAIL_QUEUE
+    assert kwargs["countdown"] == settings.THUMBNAIL_DEBOUNCE
+    assert kwargs["args"][0] == "s1" and kwargs["args"][2] == "c1"
+
+
+@pytest.mark.asyncio
+async def test_later_write_supersedes_pending_job(sent):
+    """连续写入同一页面时只有最后一次投递的任务会渲染"""
+    await ThumbnailService.schedule(["s1"])
+    await ThumbnailService.schedule(["s1"])
+
+    first_token, second_token = (kwargs["args"][1] for _, kwargs in sent)
+    assert not await ThumbnailService.is_current("s1", first_token)
+    assert await ThumbnailService.is_current("s1", second_token)
+
+
+def test_render_digest_depends_on_visible_content_theme_and_variants(monkeypatch):
+    """缓存键：不可见的差异不改变键，内容、主题或变体配置变化时生成新键"""
+    digest = ThumbnailService.render_digest('<body><div class="a b">标题</div></body>', "t1")
+    assert digest == ThumbnailService.render_digest('<body>\n  <div class="b a">标题</div>\n</body>', "t1")
+    assert digest != ThumbnailService.render_digest('<body><div class="a b">新标题</div></body>', "t1")
+    assert digest != ThumbnailService.render_digest('<body><div class="a b">标题</div></body>', "t2")
+    monkeypatch.setitem(settings.THUMBNAIL_QUALITY, "webp", 60)
+    assert digest != ThumbnailService.render_digest('<body><div class="a b">标题</div></body>', "t1")
+
+
+def test_variant_urls_cover_every_size_and_format():
+    """每个尺寸、每种格式一个独立对象，主缩略图取grid的首选格式"""
+    variants = ThumbnailService.variant_urls("ab" + "0" * 62)
+    assert set(variants) == set(settings.THUMBNAIL_VARIANTS)
+    assert all(set(urls) == set(ThumbnailService.formats()) for urls in variants.values())
+    primary = ThumbnailService.primary_url(variants)
+    assert primary.endswith(f"/grid-320.{ThumbnailService.formats()[0]}")
@@ -0,0 +1,22 @@
+import pytest
+from app.utils.byte_range import ByteRange
+
+
+def test_parse_single_ranges():
+    """起止区间、开放区间和后缀区间，结束位置截断到文件末尾"""
+    assert ByteRange.parse("bytes=0-99", 1000) == (0, 99)
+    assert ByteRange.parse("bytes=900-", 1000) == (900, 999)
+    assert ByteRange.parse("bytes=-100", 1000) == (900, 999)
+    assert ByteRange.parse("bytes=500-5000", 1000) == (500, 999)
+    assert ByteRange.parse("bytes=-5000", 1000) == (0, 999)
+
+
+def test_ignored_and_unsatisfiable_ranges():
+    """缺失、格式错误或多区间时返回整个文件，超出范围时报错"""
+    assert ByteRange.parse(None, 1000) is None
+    assert ByteRange.parse("bytes=0-1,5-9", 1000) is None
+    assert ByteRange.parse("items=0-1", 1000) is None
+    with pytest.raises(ValueError):
+        ByteRange.parse("bytes=1000-", 1000)
+    with pytest.raises(ValueError):
+        ByteRange.parse("bytes=10-5", 1000)
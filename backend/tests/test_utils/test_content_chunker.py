@@ -0,0 +1,29 @@
+import random
+from app.utils.content_chunker import ContentChunker
+
+
+def _slide(body: str) -> bytes:
+    head = "<html><head><style>" + ".c{color:#333;margin:0 auto;}" * 200 + "</style></head><body>"
+    return (head + body + "</body></html>").encode("utf-8")
+
+
+def test_chunks_reassemble_and_share_boilerplate():
+    """测试分块可还原，且不同页面共享相同的样式块"""
+    rng = random.Random(3)
+    first = _slide("".join(f"<p>要点{i} {rng.random()}</p>" for i in range(300)))
+    second = _slide("<h1>另一页</h1>")
+
+    first_chunks = ContentChunker.chunk(first)
+    second_chunks = ContentChunker.chunk(second)
+    assert b"".join(first_chunks) == first
+    assert set(first_chunks) & set(second_chunks)
+
+
+def test_local_edit_changes_few_chunks():
+    """测试局部修改只影响附近的块"""
+    rng = random.Random(5)
+    original = _slide("".join(f"<p>段落{i} {rng.random()}</p>" for i in range(1000)))
+    edited = original.replace("段落500 ".encode("utf-8"), "修改后的段落 ".encode("utf-8"))
+
+    before, after = ContentChunker.chunk(original), ContentChunker.chunk(edited)
+    assert len(set(after) - set(before)) <= 2
@@ -0,0 +1,59 @@
+import io
+import pytest
+from app.utils.font_subsetter import FontSubsetter
+
+
+def test_parse_font_faces_and_rewrite():
+    """解析 @font-face 描述符和src地址，生成指向子集的规则"""
+    css = (
+        "@font-face { font-family: 'MiSans'; font-weight: 400; "
+        "src: url('https://cdn.example.com/MiSans-Regular.woff2') format('woff2'), url(MiSans.ttf); "
+        "unicode-range: U+4E00-9FFF; font-display: block; }"
+    )
+    face = FontSubsetter.parse_font_faces(css)[0]
+
+    assert face["urls"] == ["https://cdn.example.com/MiSans-Regular.woff2", "MiSans.ttf"]
+    assert face["descriptors"]["unicode-range"] == "U+4E00-9FFF"
+    rule = FontSubsetter.font_face(face["descriptors"], "/api/assets/fonts/a/b.woff2")
+    assert "url('/api/assets/fonts/a/b.woff2') format('woff2')" in rule
+    assert "font-display: swap" in rule and "block" not in rule
+
+
+def test_coverage_round_trip():
+    """覆盖字符串只记录非ASCII字符，新增字符时判定为未覆盖"""
+    codepoints = FontSubsetter.codepoints(["<h1>季度报告 Q3</h1>"])
+    coverage = FontSubsetter.coverage(codepoints)
+
+    assert "季" in coverage and "Q" not in coverage
+    assert FontSubsetter.covers(coverage, ["<p>报告 2024，</p>"])
+    assert not FontSubsetter.covers(coverage, ["<p>年度报告</p>"])
+
+
+def test_subset_keeps_only_requested_glyphs():
+    """子集只包含需要的字符，输出WOFF2"""
+    pytest.importorskip("fontTools")
+    pytest.importorskip("brotli")
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    from fontTools.ttLib import TTFont
+
+    names = [".notdef", "A", "B", "C"]
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0)), pen.lineTo((0, 500)), pen.lineTo((500, 0)), pen.closePath()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(name): name for name in names[1:]})
+    builder.setupGlyf({name: pen.glyph() for name in names})
+    builder.setupHorizontalMetrics({name: (500, 0) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test", "styleName": "Regular"})
+    builder.setupOS2()
+    builder.setupPost()
+    buffer = io.BytesIO()
+    builder.save(buffer)
+
+    data = FontSubsetter.subset(buffer.getvalue(), {ord("A"), ord("C"), ord("中")})
+    font = TTFont(io.BytesIO(data))
+    assert font.flavor == "woff2"
+    assert set(font.getBestCmap()) == {ord("A"), ord("C")}
+    assert FontSubsetter.subset(buffer.getvalue(), {ord("中")}) is None
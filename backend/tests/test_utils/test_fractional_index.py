@@ -0,0 +1,36 @@
+import random
+import pytest
+from app.utils.fractional_index import FractionalIndex
+
+
+def test_between_keeps_order_under_random_inserts():
+    """测试随机位置反复插入时生成的键始终有序且唯一"""
+    rng = random.Random(7)
+    keys = []
+    for _ in range(2000):
+        i = rng.randint(0, len(keys))
+        lower = keys[i - 1] if i > 0 else None
+        upper = keys[i] if i < len(keys) else None
+        keys.insert(i, FractionalIndex.between(lower, upper))
+
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+    with pytest.raises(ValueError):
+        FractionalIndex.between("b", "a")
+
+
+def test_n_between_and_spread():
+    """测试批量生成的键位于区间内，均匀分配的键等宽有序"""
+    keys = FractionalIndex.n_between("a", "b", 20)
+    assert keys == sorted(keys) and all("a" < key < "b" for key in keys)
+    assert max(len(key) for key in keys) <= 4
+
+    spread = FractionalIndex.spread(100)
+    assert spread == sorted(spread) and len(set(spread)) == 100
+
+
+def test_longest_increasing_subsequence():
+    """测试重新排序时保留最长的未变化子序列"""
+    # 把第4张移到最前：只有它需要改写
+    assert FractionalIndex.longest_increasing_subsequence([3, 0, 1, 2, 4]) == [1, 2, 3, 4]
@@ -0,0 +1,30 @@
+import json
+import re
+from app.utils.html_bundler import HTMLBundler
+
+FONT_CSS = """
+@font-face { font-family: 'Noto Serif SC'; src: url(https://fonts.gstatic.com/s/a.woff2) format('woff2'); unicode-range: U+4E00-4E5F; }
+@font-face { font-family: 'Noto Serif SC'; src: url(https://fonts.gstatic.com/s/b.woff2) format('woff2'); unicode-range: U+9F00-9FFF; }
+@font-face { font-family: 'Noto Serif SC'; src: url(https://fonts.gstatic.com/s/c.woff2) format('woff2'); unicode-range: U+00??, U+0131; }
+"""
+
+
+def test_filter_font_faces_keeps_only_used_slices():
+    """只保留与页面文字有交集的字体分片（ASCII分片始终保留）"""
+    codepoints = HTMLBundler.codepoints(["<body><h1>一个标题</h1><style>h1{color:red}</style></body>"])
+    css = HTMLBundler.filter_font_faces(FONT_CSS, codepoints)
+
+    assert HTMLBundler.css_urls(css) == ["https://fonts.gstatic.com/s/a.woff2", "https://fonts.gstatic.com/s/c.woff2"]
+    assert HTMLBundler.parse_unicode_range("U+00??, U+0131, U+4E00-4E5F") == [
+        (0x00, 0xFF), (0x131, 0x131), (0x4E00, 0x4E5F)
+    ]
+
+
+def test_navigator_embeds_deck_safely():
+    """页面数据中的 </script> 不会提前结束导航页中的数据块"""
+    deck = {"mode": "single", "shell": "", "slides": [{"body": "<body><script>a()</script></body>"}], "assets": {}}
+    html = HTMLBundler.navigator("<标题>", deck, 1280, 720)
+
+    data = re.search(r'<script type="application/json" id="deck">(.*?)</script>', html, re.DOTALL).group(1)
+    assert json.loads(data) == deck
+    assert "<title>&lt;标题&gt;</title>" in html
@@ -0,0 +1,46 @@
+import pytest
+from app.utils.html_patcher import HTMLPatcher, PatchError
+
+SLIDE = (
+    '<div class="slide"><h2>旧标题</h2>'
+    '<div class="content-block"><p style="color: red; font-size: 24px">第一点</p><p>第二点</p></div></div>'
+)
+
+
+def test_apply_operations_and_report_changes():
+    """测试按选择器修改文字、样式、插入和删除，并只返回变更摘要"""
+    html, changes = HTMLPatcher.apply(SLIDE, [
+        {"op": "set_text", "selector": "h2", "text": "新标题"},
+        {"op": "set_style", "selector": ".content-block p", "property": "color", "value": "#1399FF"},
+        {"op": "insert_html", "selector": ".content-block", "html": "<p>第三点</p>", "position": "append"},
+        {"op": "remove", "selector": ".content-block p:nth-of-type(2)"},
+    ])
+
+    assert "<h2>新标题</h2>" in html
+    assert 'style="color: #1399FF; font-size: 24px"' in html
+    assert "第二点" not in html and "<p>第三点</p>" in html
+    assert changes[0]["before"] == ["<h2>旧标题</h2>"] and changes[0]["after"] == ["<h2>新标题</h2>"]
+
+
+def test_failed_operation_reports_index():
+    """测试选择器未命中时报告失败的操作序号"""
+    with pytest.raises(PatchError) as exc_info:
+        HTMLPatcher.apply(SLIDE, [
+            {"op": "set_text", "selector": "h2", "text": "x"},
+            {"op": "remove", "selector": ".missing"},
+        ])
+    assert exc_info.value.index == 1
+
+
+def test_inserted_fragments_cannot_carry_scripts():
+    """测试插入的片段删除脚本、事件处理器和 javascript: 地址，set_attr 拒绝事件处理器"""
+    html, _ = HTMLPatcher.apply(SLIDE, [{
+        "op": "insert_html",
+        "selector": ".content-block",
+        "html": '<p onclick="steal()">第三点<script>steal()</script></p><a href="javascript:steal()">链接</a>',
+    }])
+    assert "第三点" in html and "链接" in html
+    assert "script" not in html and "onclick" not in html and "javascript:" not in html
+
+    with pytest.raises(PatchError):
+        HTMLPatcher.apply(SLIDE, [{"op": "set_attr", "selector": "h2", "name": "onmouseover", "value": "steal()"}])
@@ -0,0 +1,43 @@
+from pathlib import Path
+from app.utils.html_sanitizer import HTMLSanitizer, SanitizePolicy
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures" / "slides"
+
+
+def test_allowlist_drops_unsafe_markup():
+    """测试按允许列表过滤：脚本连同内容删除，事件属性和危险链接被移除"""
+    html, stats = HTMLSanitizer.process(
+        '<div onclick="steal()"><p>安全 &amp; 可见</p><script>alert(1)</script>'
+        '<a href="javascript:alert(1)">链接</a><img src="/a.png" onerror="x()"></div>'
+    )
+    assert html == '<div><p>安全 &amp; 可见</p><a>链接</a><img src="/a.png"></div>'
+    assert stats["valid"] and stats["removed_tags"] == 1 and stats["removed_attrs"] == 3
+
+
+def test_clean_removes_empty_elements_and_collapses_whitespace():
+    """测试清理：压缩空白，删除（包括嵌套的）空元素，pre中空白保留"""
+    policy = SanitizePolicy(tags={"div", "span", "p", "pre"}, attributes=set())
+    html, stats = HTMLSanitizer.process("<div>\n  <p>  文本   内容 </p>\n<div><span> </span></div><pre>a  b</pre></div>", policy)
+    assert html == "<div> <p> 文本 内容 </p> <pre>a  b</pre></div>"
+    assert stats["removed_empty"] == 2
+
+
+def test_real_slides_keep_content_without_style_text():
+    """测试真实幻灯片：正文与图片保留，head中的样式和脚本不会泄漏成文本"""
+    for path in FIXTURES.glob("*.html"):
+        html, stats = HTMLSanitizer.process(path.read_text(encoding="utf-8"))
+        assert stats["valid"], path.name
+        assert "{" not in html and "new Chart" not in html, path.name
+        assert "<h1>" in html or "<h2>" in html, path.name
+    assert not HTMLSanitizer.has_element("纯文本")
+
+
+def test_canonicalize_ignores_invisible_differences():
+    """测试规范化：空白、属性顺序、class顺序和注释不影响结果，行内元素间的空格保留"""
+    a = '<div class="b a"  id=x>\n  <p style="color : red; ">Hello   <b>world</b></p><!-- c -->\n</div>'
+    b = '<div id="x" class="a b"><p style="color:red">Hello <b>world</b></p></div>'
+    assert HTMLSanitizer.canonicalize(a) == HTMLSanitizer.canonicalize(b)
+    assert HTMLSanitizer.canonicalize("<span>a</span> <span>b</span>") != HTMLSanitizer.canonicalize(
+        "<span>a</span><span>b</span>"
+    )
+    assert "a  b" in HTMLSanitizer.canonicalize("<pre>a  b</pre>")
@@ -0,0 +1,29 @@
+import struct
+from app.utils.image_probe import ImageProbe
+
+
+def test_parse_png_header():
+    """测试PNG头解析"""
+    data = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 1280, 720)
+    assert ImageProbe.parse_header(data) == {"format": "png", "width": 1280, "height": 720}
+
+
+def test_parse_jpeg_header_after_app_segment():
+    """测试跳过APP段后解析JPEG的SOF尺寸"""
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 600, 800) + b"\x00" * 10
+    data = b"\xff\xd8" + app0 + sof0
+    assert ImageProbe.parse_header(data) == {"format": "jpeg", "width": 800, "height": 600}
+
+
+def test_parse_webp_vp8x_header():
+    """测试WebP扩展格式尺寸解析"""
+    data = b"RIFF" + b"\x00" * 4 + b"WEBP" + b"VP8X" + b"\x00" * 8
+    data += (1919).to_bytes(3, "little") + (1079).to_bytes(3, "little")
+    assert ImageProbe.parse_header(data) == {"format": "webp", "width": 1920, "height": 1080}
+
+
+def test_parse_unknown_returns_none():
+    """测试非图片内容返回None"""
+    assert ImageProbe.parse_header(b"<html><body>404</body></html>") is None
+    assert ImageProbe.parse_header(b"") is None
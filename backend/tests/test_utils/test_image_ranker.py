@@ -0,0 +1,22 @@
+from app.utils.image_ranker import ImageRanker
+
+
+def test_tokenize_mixed_text():
+    """测试中英文混合分词（中文按二元组）"""
+    assert ImageRanker.tokenize("故宫 Forbidden City photo") == {"故宫", "forbidden", "city"}
+
+
+def test_rank_prefers_relevant_slide_sized_images():
+    """测试相关、尺寸合适、来源可信的图片排在前面，水印图库靠后"""
+    images = [
+        {"url": "https://www.shutterstock.com/a.jpg", "title": "故宫角楼 雪景", "width": 1920, "height": 1080},
+        {"url": "https://example.com/b.jpg", "title": "办公室", "width": 1920, "height": 1080},
+        {"url": "https://upload.wikimedia.org/c.jpg", "title": "故宫角楼", "width": 2400, "height": 1350},
+        {"url": "https://example.com/d.jpg", "title": "故宫角楼", "width": 500, "height": 1500},
+    ]
+    ranked = ImageRanker.rank(images, "故宫角楼", top_k=3)
+
+    assert len(ranked) == 3
+    assert ranked[0]["url"] == "https://upload.wikimedia.org/c.jpg"
+    assert ranked[0]["score"] > ranked[1]["score"]
+    assert "https://example.com/b.jpg" not in [image["url"] for image in ranked]
@@ -0,0 +1,23 @@
+from app.utils.payload_codec import PayloadCodec
+
+
+def test_encode_roundtrip_and_stable_digest():
+    """测试载荷序列化可还原，相同内容哈希一致"""
+    payload = {"success": True, "html": "<div>页面</div>" * 100, "items": [1, 2, 3]}
+    data = PayloadCodec.encode(payload)
+    assert PayloadCodec.decode(data) == payload
+    assert PayloadCodec.digest(data) == PayloadCodec.digest(PayloadCodec.encode(dict(payload)))
+
+
+def test_summary_prefers_scalar_fields():
+    """测试字典摘要保留标量字段并列出其余字段名"""
+    summary = PayloadCodec.summarize({"success": True, "url": "https://a.com", "passages": ["x"] * 50}, length=80)
+    assert '"success": true' in summary
+    assert "+passages" in summary
+    assert len(PayloadCodec.summarize("字" * 500, length=50)) == 53
+
+
+def test_html_summary_strips_markup():
+    """测试HTML摘要只保留可见文本"""
+    html = "<html><head><style>.a{color:red}</style></head><body><h1>标题</h1><p>正文  内容</p></body></html>"
+    assert PayloadCodec.html_summary(html) == "标题 正文 内容"
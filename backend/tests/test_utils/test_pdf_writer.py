@@ -0,0 +1,36 @@
+import io
+import re
+from PIL import Image
+from app.utils.pdf_writer import PDFImageWriter
+
+
+def _jpeg(color):
+    buffer = io.BytesIO()
+    Image.new("RGB", (1280, 720), color).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def test_out_of_order_pages_written_in_position_order():
+    """乱序加入的页面按页序写入页面树，交叉引用表偏移指向各对象"""
+    file = io.BytesIO()
+    writer = PDFImageWriter(file)
+    pages = {2: _jpeg("blue"), 0: _jpeg("red"), 1: _jpeg("green")}
+    for position, image in pages.items():
+        writer.add_page(image, 1280, 720, position)
+    size = writer.close()
+
+    data = file.getvalue()
+    assert size == len(data) and data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+    assert data.count(b"/MediaBox [0 0 960.0 540.0]") == 3
+    # 每页的JPEG原样嵌入
+    assert all(image in data for image in pages.values())
+
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    table = data[xref:].split(b"trailer")[0].splitlines()[2:]
+    for number, entry in enumerate(table[1:], start=1):
+        offset = int(entry[:10])
+        assert data[offset:].startswith(f"{number} 0 obj".encode("ascii"))
+
+    kids = [int(n) for n in re.search(rb"/Kids \[([^\]]*)\]", data).group(1).split()[::3]]
+    # 页面对象按加入顺序编号（第3个加入的是第1页），页面树按页序排列
+    assert kids == [8, 11, 5]
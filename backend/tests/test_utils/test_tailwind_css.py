@@ -0,0 +1,42 @@
+from app.utils.tailwind_css import TailwindCSS, CONFIG_STUB
+
+CONFIG_SCRIPT = "<script>tailwind.config = { theme: { extend: { colors: { brand: '#15857A' } } } }</script>"
+
+
+def test_scan_classes_and_config():
+    """扫描 class 属性中的类名（含变体和任意值），只把设置 tailwind.config 的内联脚本作为配置"""
+    html = (
+        '<body class="bg-brand"><div class=\'md:flex hover:bg-white/50\'>'
+        '<p class="w-[37px]  text-sm">正文</p></div>'
+        + CONFIG_SCRIPT + "<script>new Chart(ctx, {})</script></body>"
+    )
+
+    assert TailwindCSS.classes([html]) == {"bg-brand", "md:flex", "hover:bg-white/50", "w-[37px]", "text-sm"}
+    assert TailwindCSS.config(html).startswith("tailwind.config = {")
+    assert "Chart" not in TailwindCSS.config(html)
+    assert TailwindCSS.config("<p>无配置</p>") == "" and TailwindCSS.config_key("") == ""
+
+
+def test_digest_depends_on_class_set_not_order():
+    """缓存键只取决于脚本、配置和类名集合"""
+    script = '<script src="https://cdn.tailwindcss.com"></script>'
+    assert TailwindCSS.digest(script, "", ["p-4", "flex"]) == TailwindCSS.digest(script, "", {"flex", "p-4"})
+    assert TailwindCSS.digest(script, "", ["flex"]) != TailwindCSS.digest(script, "", ["flex", "p-4"])
+    assert TailwindCSS.digest(script, "a", ["flex"]) != TailwindCSS.digest(script, "", ["flex"])
+
+
+def test_runtime_script_compile_page_and_coverage():
+    """识别 Play CDN 脚本；编译页面带上全部类名和配置；配置不同的页面不使用预编译CSS"""
+    script = '<script src="https://cdn.tailwindcss.com?plugins=forms"></script>'
+    head = ['<link rel="preconnect" href="https://fonts.googleapis.com">', script]
+    assert TailwindCSS.runtime_script(head, ["cdn.tailwindcss.com"]) == script
+    assert TailwindCSS.runtime_script(head[:1], ["cdn.tailwindcss.com"]) is None
+
+    config = TailwindCSS.config(CONFIG_SCRIPT)
+    page = TailwindCSS.compile_page(script, config, {"p-4", "flex"})
+    assert script in page and f"<script>{config}</script>" in page and 'class="flex p-4"' in page
+
+    record = {"config": TailwindCSS.config_key(config), "classes": ["flex", "p-4"], "url": "/a.css"}
+    assert TailwindCSS.covers(record, ['<div class="flex">' + CONFIG_SCRIPT + "</div>"])
+    assert not TailwindCSS.covers(record, ['<div class="flex"></div>'])
+    assert TailwindCSS.head_tags(record) == ['<link rel="stylesheet" href="/a.css">', CONFIG_STUB]
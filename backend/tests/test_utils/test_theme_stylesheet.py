@@ -0,0 +1,99 @@
+from app.utils.theme_stylesheet import ThemeStylesheet
+
+
+def _page(title: str, extra_rule: str = "") -> str:
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        '<link rel="stylesheet" href="https://fonts.googleapis.com/icon?family=Material+Icons"/>'
+        '<script src="https://cdn.jsdelivr.net/npm/chart.js"></script>'
+        "<style>@import url('https://fonts.googleapis.com/css2?family=Spectral');\n"
+        f"body {{ color: #333; }}\n.card {{ padding: 24px; }}\nh1 {{ font-size: 40px; }} {extra_rule}</style></head>"
+        f'<body class="slide"><h1>{title}</h1></body></html>'
+    )
+
+
+def test_repeated_head_blocks_move_to_theme():
+    """测试重复的head标签与文档级规则并入主题，页面只保留<body>和页面规则"""
+    theme = ThemeStylesheet.build({"selected_font_scheme": "复古精致", "primary_color": "#123456"})
+    theme, first = ThemeStylesheet.absorb(theme, _page("封面"))
+    theme, second = ThemeStylesheet.absorb(theme, _page("目录", ".toc { color: red; }"))
+
+    assert first.startswith('<body class="slide"><style>')
+    assert second.startswith('<body class="slide"><style>')
+    assert "body { color: #333; }" not in second and "@import" not in second
+    assert "body { color: #333; }" in theme["shared_rules"]
+    # 类选择器规则可能在其它页面指向不同元素，即使重复也留在页面中
+    assert ".card { padding: 24px; }" in second and ".toc { color: red; }" in second
+    assert not any(".card" in rule or "h1" in rule for rule in theme["shared_rules"])
+    assert ThemeStylesheet.stylesheet(theme).startswith("@import")
+    # Material Icons 链接与规划生成的链接相同，只保留一份
+    assert sum("Material+Icons" in tag for tag in theme["head"]) == 1
+    assert any("chart.js" in tag for tag in theme["head"])
+
+
+def test_is_theme_rule():
+    """只有作用于整个文档的规则可以提升"""
+    assert ThemeStylesheet.is_theme_rule(":root { --a: 1; }")
+    assert ThemeStylesheet.is_theme_rule("html, body { margin: 0; }")
+    assert ThemeStylesheet.is_theme_rule("@font-face { font-family: 'A'; src: url(a.woff2); }")
+    assert not ThemeStylesheet.is_theme_rule("body .card { padding: 0; }")
+    assert not ThemeStylesheet.is_theme_rule("@media print { body { margin: 0; } }")
+
+
+def test_compose_injects_theme():
+    """测试合成文档包含主题变量，已是完整文档的旧页面原样返回"""
+    theme = ThemeStylesheet.build({"background_color": "#000000"})
+    html = ThemeStylesheet.compose(theme, "<h1>标题</h1>")
+    assert html.startswith("<!DOCTYPE html>")
+    assert "--theme-background: #000000;" in html
+    assert "<body><h1>标题</h1></body>" in html
+
+    legacy = "<html><head><title>旧</title></head><body></body></html>"
+    assert ThemeStylesheet.compose(theme, legacy) == legacy
+
+
+def test_font_subset_used_only_when_it_covers_the_page():
+    """字体子集替换原字体链接和规则，页面出现子集之外的字符时退回完整字体"""
+    mi_sans = '<link href="https://cdn.cn.font.mi.com/font/css?family=MiSans" rel="stylesheet">'
+    theme = ThemeStylesheet.build({})
+    theme["head"].append(mi_sans)
+    theme["shared_rules"].append("@font-face { font-family: 'Douyin'; src: url(https://example.com/d.ttf); }")
+    theme = ThemeStylesheet.rehash(theme)
+    theme["fonts"] = {
+        "theme": theme["hash"],
+        "css": "@font-face { font-family: 'MiSans'; src: url('/api/assets/fonts/a/b.woff2') format('woff2'); }",
+        "head": [ThemeStylesheet.tag_key(mi_sans)],
+        "rules": list(theme["shared_rules"]),
+        "coverage": "封面标题",
+    }
+
+    subset = ThemeStylesheet.compose(theme, "<body><h1>封面 Title</h1></body>")
+    assert "b.woff2" in subset and "cdn.cn.font.mi.com" not in subset and "d.ttf" not in subset
+
+    full = ThemeStylesheet.compose(theme, "<body><h1>目录</h1></body>")
+    assert "b.woff2" not in full and "cdn.cn.font.mi.com" in full
+
+    # 主题变化后旧子集不再使用
+    theme["hash"] = "changed"
+    assert "b.woff2" not in ThemeStylesheet.compose(theme, "<body><h1>封面</h1></body>")
+
+
+def test_tailwind_css_replaces_runtime_script_only_when_it_covers_the_page():
+    """预编译CSS覆盖页面类名时替换 Play CDN 脚本，出现新类名时保留运行时脚本"""
+    script = '<script src="https://cdn.tailwindcss.com"></script>'
+    theme = ThemeStylesheet.build({})
+    theme["head"].append(script)
+    theme = ThemeStylesheet.rehash(theme)
+    theme["tailwind"] = {
+        "script": ThemeStylesheet.tag_key(script),
+        "config": "",
+        "classes": ["flex", "p-4", "text-xl"],
+        "url": "/api/assets/tailwind/abc.css",
+    }
+
+    compiled = ThemeStylesheet.compose(theme, '<body class="flex"><h1 class="text-xl p-4">标题</h1></body>')
+    assert "tailwind/abc.css" in compiled and "cdn.tailwindcss.com" not in compiled
+
+    runtime = ThemeStylesheet.compose(theme, '<body><h1 class="text-2xl">标题</h1></body>')
+    assert "tailwind/abc.css" not in runtime and "cdn.tailwindcss.com" in runtime
+    assert ThemeStylesheet.prepare(theme)["hash"] == theme["hash"]
@@ -0,0 +1,23 @@
+import io
+from PIL import Image
+from app.utils.thumbnail import ThumbnailGenerator
+
+
+def _screenshot(width=1280, height=720):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 90, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_encode_variants_sizes_and_formats():
+    """一张截图编码出所有尺寸，不支持的格式跳过，WebP明显小于PNG"""
+    data = _screenshot()
+    sizes = {"sidebar": (160, 90), "grid": (320, 180), "full": (1280, 720)}
+    variants = ThumbnailGenerator.encode_variants(data, sizes, ["webp", "jpeg2000"], {"webp": 80})
+
+    assert set(variants) == set(sizes)
+    for name, (width, height) in sizes.items():
+        assert list(variants[name]) == ["webp"]
+        image = Image.open(io.BytesIO(variants[name]["webp"]))
+        assert image.format == "WEBP" and image.size == (width, height)
+    assert len(variants["full"]["webp"]) < len(data)
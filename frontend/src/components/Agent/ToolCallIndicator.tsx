@@ -23,7 +23,9 @@ const TOOL_ICONS = {
   visit_page: FileText,
   initialize_design: Layout,
   insert_page: Layout,
+  insert_pages: Layout,
   update_page: Edit,
+  patch_page: Edit,
   remove_pages: Trash,
   think: CheckCircle,
 };
@@ -34,7 +36,9 @@ const TOOL_LABELS = {
   visit_page: '访问网页内容',
   initialize_design: '初始化PPT设计',
   insert_page: '插入新幻灯片',
+  insert_pages: '批量插入幻灯片',
   update_page: '更新幻灯片内容',
+  patch_page: '局部修改幻灯片',
   remove_pages: '删除幻灯片',
   think: '规划PPT制作流程',
 };
@@ -1,12 +1,17 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { Eye, Edit, Download, Maximize2, ChevronLeft, ChevronRight } from 'lucide-react';
+import SlideThumbnail from '@/components/Slides/SlideThumbnail';
+import { slidesApi } from '@/services/api';
+import type { ThumbnailVariants } from '@/types';
 
 interface Slide {
   id: string;
+  project_id?: string;
   index: number;
-  html_content: string;
+  html_content?: string;
   thumbnail_url?: string;
+  thumbnail_variants?: ThumbnailVariants | null;
 }
 
 interface SlidePreviewGridProps {
@@ -81,9 +86,11 @@ const SlideCard: React.FC<SlideCardProps> = ({ slide, index, onPreview }) => {
       {/* 幻灯片缩略图 */}
       <div className="aspect-[16/9] bg-white flex items-center justify-center p-4">
         {slide.thumbnail_url ? (
-          <img
-            src={slide.thumbnail_url}
+          <SlideThumbnail
+            url={slide.thumbnail_url}
+            variants={slide.thumbnail_variants}
             alt={`幻灯片 ${index + 1}`}
+            sizes="(min-width: 1024px) 25vw, 50vw"
             className="w-full h-full object-cover rounded"
           />
         ) : (
@@ -129,6 +136,25 @@ interface SlidePreviewModalProps {
 }
 
 const SlidePreviewModal: React.FC<SlidePreviewModalProps> = ({ slide, onClose, totalSlides }) => {
+  const [rendered, setRendered] = useState<string | null>(null);
+
+  // 页面只保存<body>，由后端与项目主题（head标签、共享样式）合成完整文档后在iframe中渲染
+  useEffect(() => {
+    setRendered(null);
+    if (!slide?.project_id) return;
+
+    let cancelled = false;
+    slidesApi
+      .renderSlide(slide.id, slide.project_id)
+      .then((response) => {
+        if (!cancelled) setRendered(response.data);
+      })
+      .catch((error) => console.error('Failed to render slide:', error));
+    return () => {
+      cancelled = true;
+    };
+  }, [slide?.id, slide?.project_id]);
+
   if (!slide) return null;
 
   return (
@@ -181,10 +207,23 @@ const SlidePreviewModal: React.FC<SlidePreviewModalProps> = ({ slide, onClose, t
               className="bg-white border border-gray-200 rounded-lg overflow-hidden"
               style={{ aspectRatio: '16/9' }}
             >
-              <div
-                className="w-full h-full"
-                dangerouslySetInnerHTML={{ __html: slide.html_content }}
-              />
+              {rendered ? (
+                <iframe
+                  title={`幻灯片 ${slide.index + 1}`}
+                  srcDoc={rendered}
+                  sandbox="allow-scripts"
+                  className="w-full h-full border-0"
+                />
+              ) : slide.thumbnail_url ? (
+                <SlideThumbnail
+                  url={slide.thumbnail_url}
+                  variants={slide.thumbnail_variants}
+                  alt={`幻灯片 ${slide.index + 1}`}
+                  sizes="80vw"
+                  className="w-full h-full object-contain"
+                  lazy={false}
+                />
+              ) : null}
             </div>
           </div>
         </motion.div>
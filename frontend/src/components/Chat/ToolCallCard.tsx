@@ -41,6 +41,12 @@ const TOOL_CONFIG = {
     label: '插入页面',
     color: 'pink',
     description: '正在生成幻灯片页面...'
+  },
+  insert_pages: {
+    icon: Layout,
+    label: '批量插入页面',
+    color: 'pink',
+    description: '正在生成多页幻灯片...'
   }
 };
 
@@ -143,6 +149,11 @@ export const ToolCallCard: React.FC<ToolCallCardProps> = ({ toolCall }) => {
                     已插入第 {(toolCall.params?.index || 0) + 1} 页
                   </div>
                 )}
+                {toolCall.tool === 'insert_pages' && toolCall.result.slides && (
+                  <div className="text-sm text-green-700">
+                    已插入 {toolCall.result.slides.length} 页
+                  </div>
+                )}
               </div>
             )}
 
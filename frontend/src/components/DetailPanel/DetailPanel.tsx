@@ -28,6 +28,11 @@ const TOOL_CONFIG = {
     icon: Layout,
     label: '页面插入详情',
     color: 'pink'
+  },
+  insert_pages: {
+    icon: Layout,
+    label: '批量插入详情',
+    color: 'pink'
   }
 };
 
@@ -192,7 +197,9 @@ const ToolResultContent: React.FC<ToolResultContentProps> = ({ tool, result }) =
               页面内容摘要
             </div>
             <div className="text-xs text-gray-600 whitespace-pre-wrap">
-              {result.summary || result.content?.substring(0, 500) + '...'}
+              {result.summary
+                || result.passages?.map((passage: any) => passage.text).join('\n\n')
+                || result.content?.substring(0, 500) + '...'}
             </div>
           </div>
         </div>
@@ -225,6 +232,19 @@ const ToolResultContent: React.FC<ToolResultContentProps> = ({ tool, result }) =
         </div>
       );
 
+    case 'insert_pages':
+      return (
+        <div className="bg-green-50 border border-green-200 rounded-lg p-3">
+          <div className="flex items-center gap-2 mb-2">
+            <CheckCircle className="w-4 h-4 text-green-600" />
+            <span className="text-sm font-medium text-green-900">幻灯片生成成功</span>
+          </div>
+          <div className="text-xs text-green-700">
+            已插入第 {result.slides?.map((slide: any) => slide.index + 1).join('、')} 页幻灯片
+          </div>
+        </div>
+      );
+
     default:
       return (
         <div className="bg-gray-50 rounded-lg p-3">
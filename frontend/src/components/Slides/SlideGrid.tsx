@@ -1,13 +1,13 @@
 import React from 'react';
 import { motion } from 'framer-motion';
-import type { Slide } from '@/types';
+import type { SlideSummary } from '@/types';
 import ThumbnailCard from './ThumbnailCard';
 
 interface SlideGridProps {
-  slides: Slide[];
-  onSlideClick?: (slide: Slide) => void;
-  onSlideEdit?: (slide: Slide) => void;
-  onSlideDelete?: (slide: Slide) => void;
+  slides: SlideSummary[];
+  onSlideClick?: (slide: SlideSummary) => void;
+  onSlideEdit?: (slide: SlideSummary) => void;
+  onSlideDelete?: (slide: SlideSummary) => void;
 }
 
 const SlideGrid: React.FC<SlideGridProps> = ({
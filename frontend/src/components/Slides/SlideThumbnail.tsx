@@ -0,0 +1,55 @@
+import React from 'react';
+import type { ThumbnailVariants } from '@/types';
+
+interface SlideThumbnailProps {
+  url: string;
+  variants?: ThumbnailVariants | null;
+  alt: string;
+  sizes?: string;
+  className?: string;
+  lazy?: boolean;
+}
+
+// 变体对象名为 {尺寸名}-{宽度}.{格式}，从中取出宽度用于srcSet
+const widthOf = (url: string) => Number(url.match(/-(\d+)\.\w+$/)?.[1] || 0);
+
+const srcSetFor = (variants: ThumbnailVariants, format: string) =>
+  Object.values(variants)
+    .map(urls => urls[format])
+    .filter(Boolean)
+    .map(url => `${url} ${widthOf(url)}w`)
+    .join(', ');
+
+/**
+ * 幻灯片缩略图：有多尺寸变体时按AVIF > WebP输出<picture>，浏览器按显示宽度选尺寸
+ */
+const SlideThumbnail: React.FC<SlideThumbnailProps> = ({
+  url,
+  variants,
+  alt,
+  sizes = '320px',
+  className,
+  lazy = true,
+}) => {
+  const formats = variants ? Object.keys(Object.values(variants)[0] || {}) : [];
+  const fallback = formats.includes('webp') ? 'webp' : formats[0];
+
+  return (
+    <picture>
+      {variants && formats.includes('avif') && (
+        <source type="image/avif" srcSet={srcSetFor(variants, 'avif')} sizes={sizes} />
+      )}
+      <img
+        src={url}
+        srcSet={variants && fallback ? srcSetFor(variants, fallback) : undefined}
+        sizes={variants ? sizes : undefined}
+        alt={alt}
+        className={className}
+        loading={lazy ? 'lazy' : undefined}
+        decoding="async"
+      />
+    </picture>
+  );
+};
+
+export default SlideThumbnail;
@@ -1,10 +1,11 @@
 import React, { useState } from 'react';
 import { motion } from 'framer-motion';
 import { Edit, Trash2, Eye, MoreVertical } from 'lucide-react';
-import type { Slide } from '@/types';
+import type { SlideSummary } from '@/types';
+import SlideThumbnail from './SlideThumbnail';
 
 interface ThumbnailCardProps {
-  slide: Slide;
+  slide: SlideSummary;
   onClick?: () => void;
   onEdit?: () => void;
   onDelete?: () => void;
@@ -28,11 +29,12 @@ const ThumbnailCard: React.FC<ThumbnailCardProps> = ({
       {/* Thumbnail */}
       <div className="aspect-video bg-gray-100 relative overflow-hidden">
         {slide.thumbnail_url ? (
-          <img
-            src={slide.thumbnail_url}
+          <SlideThumbnail
+            url={slide.thumbnail_url}
+            variants={slide.thumbnail_variants}
             alt={`Slide ${slide.index}`}
+            sizes="(min-width: 1024px) 25vw, 50vw"
             className="w-full h-full object-cover"
-            loading="lazy"
           />
         ) : (
           <div className="w-full h-full flex items-center justify-center bg-gradient-to-br from-primary-50 to-primary-100">
@@ -130,9 +132,9 @@ const ThumbnailCard: React.FC<ThumbnailCardProps> = ({
             <h3 className="font-medium text-gray-900">
               第 {slide.index} 页
             </h3>
-            <p className="text-sm text-gray-500 mt-1">
-              {slide.html_content
-                ? `${slide.html_content.length} 字符`
+            <p className="text-sm text-gray-500 mt-1 truncate" title={slide.summary}>
+              {slide.content_size
+                ? slide.summary || `${slide.content_size} 字节`
                 : '无内容'
               }
             </p>
@@ -140,16 +142,9 @@ const ThumbnailCard: React.FC<ThumbnailCardProps> = ({
 
           {/* Status indicator */}
           <div className={`w-2 h-2 rounded-full ${
-            slide.html_content ? 'bg-green-500' : 'bg-gray-300'
+            slide.content_size ? 'bg-green-500' : 'bg-gray-300'
           }`} />
         </div>
-
-        {/* Assets count */}
-        {slide.assets && slide.assets.length > 0 && (
-          <div className="mt-2 text-xs text-gray-500">
-            {slide.assets.length} 个素材
-          </div>
-        )}
       </div>
     </motion.div>
   );
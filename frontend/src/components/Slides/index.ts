@@ -1,2 +1,3 @@
 export { default as SlideGrid } from './SlideGrid';
 export { default as ThumbnailCard } from './ThumbnailCard';
+export { default as SlideThumbnail } from './SlideThumbnail';
@@ -3,6 +3,7 @@ import type {
   User,
   Project,
   Slide,
+  SlideSummary,
   SlideAsset,
   Conversation,
   AgentLog,
@@ -84,11 +85,39 @@ export const projectsApi = {
   createProject: (data: CreateProjectRequest) => api.post<Project>('/api/projects/', data),
   updateProject: (id: string, data: UpdateProjectRequest) => api.put<Project>(`/api/projects/${id}`, data),
   deleteProject: (id: string) => api.delete(`/api/projects/${id}`),
+  getProjectTheme: (id: string) =>
+    api.get<{ hash: string; palette: Record<string, string>; head: string[]; stylesheet: string }>(
+      `/api/projects/${id}/theme`
+    ),
+  renderDeck: (id: string, conversationId?: string) =>
+    api.post<{ task_id: string; status: string }>(`/api/projects/${id}/render`, null, {
+      params: conversationId ? { conversation_id: conversationId } : undefined,
+    }),
+  exportPdf: (id: string, conversationId?: string) =>
+    api.post<{ status: 'queued' | 'ready'; url: string; task_id?: string; size?: number; pages?: number }>(
+      `/api/projects/${id}/export/pdf`,
+      null,
+      { params: conversationId ? { conversation_id: conversationId } : undefined }
+    ),
+  downloadPdf: (id: string) =>
+    api.get<Blob>(`/api/projects/${id}/export/pdf`, { responseType: 'blob', timeout: 0 }),
+  exportHtml: (id: string, bundle: 'single' | 'zip' = 'single', conversationId?: string) =>
+    api.post<{ status: 'queued' | 'ready'; url: string; task_id?: string; size?: number; pages?: number }>(
+      `/api/projects/${id}/export/html`,
+      null,
+      { params: { bundle, ...(conversationId ? { conversation_id: conversationId } : {}) } }
+    ),
+  downloadHtml: (id: string, bundle: 'single' | 'zip' = 'single') =>
+    api.get<Blob>(`/api/projects/${id}/export/html`, { params: { bundle }, responseType: 'blob', timeout: 0 }),
 };
 
 // Slides API
 export const slidesApi = {
   getSlides: (projectId: string) => api.get<Slide[]>(`/api/slides/?project_id=${projectId}`),
+  renderSlide: (slideId: string, projectId: string) =>
+    api.get<string>(`/api/slides/${slideId}/render?project_id=${projectId}`, { responseType: 'text' }),
+  getSlideSummaries: (projectId: string) =>
+    api.get<SlideSummary[]>(`/api/slides/summaries?project_id=${projectId}`),
   getSlide: (slideId: string, projectId: string) =>
     api.get<Slide>(`/api/slides/${slideId}?project_id=${projectId}`),
   createSlide: (projectId: string, data: CreateSlideRequest) =>
@@ -97,6 +126,8 @@ export const slidesApi = {
     api.put<Slide>(`/api/slides/${slideId}?project_id=${projectId}`, data),
   deleteSlide: (slideId: string, projectId: string) =>
     api.delete(`/api/slides/${slideId}?project_id=${projectId}`),
+  reorderSlides: (projectId: string, slideOrders: { id: string; index: number }[]) =>
+    api.put(`/api/slides/reorder?project_id=${projectId}`, slideOrders),
   createAsset: (slideId: string, projectId: string, data: CreateAssetRequest) =>
     api.post<SlideAsset>(`/api/slides/${slideId}/assets?project_id=${projectId}`, data),
   getAssets: (slideId: string, projectId: string) =>
@@ -2,6 +2,7 @@ import { create } from 'zustand';
 import type { AgentState, Message, ToolCallState } from '@/types';
 import { agentApi } from '@/services/api';
 import { agentEventSource } from '@/services/eventsource';
+import { useSlideStore } from './slideStore';
 import toast from 'react-hot-toast';
 
 export const useAgentStore = create<AgentState>((set: any, get: any) => ({
@@ -103,6 +104,14 @@ export const useAgentStore = create<AgentState>((set: any, get: any) => ({
               } : msg
             ),
           }));
+        } else if (streamMessage.type === 'thumbnail_ready') {
+          useSlideStore.getState().applyThumbnail(streamMessage.data);
+        } else if (streamMessage.type === 'deck_render_progress') {
+          const { project_id, slide } = streamMessage.data;
+          useSlideStore.getState().applyThumbnail({ ...slide, project_id });
+        } else if (streamMessage.type === 'export_complete') {
+          const label = streamMessage.data.format === 'pdf' ? 'PDF' : '离线HTML';
+          toast.success(`${label}导出完成（${streamMessage.data.pages} 页）`);
         } else if (streamMessage.type === 'error') {
           set({ isProcessing: false });
           toast.error(streamMessage.data.message);
@@ -1,5 +1,5 @@
 import { create } from 'zustand';
-import type { SlideState, Slide, CreateSlideRequest, UpdateSlideRequest } from '@/types';
+import type { SlideState, CreateSlideRequest, UpdateSlideRequest, ThumbnailReadyEvent } from '@/types';
 import { slidesApi } from '@/services/api';
 import toast from 'react-hot-toast';
 
@@ -10,7 +10,7 @@ export const useSlideStore = create<SlideState>((set, get) => ({
   fetchSlides: async (projectId: string) => {
     set({ loading: true });
     try {
-      const response = await slidesApi.getSlides(projectId);
+      const response = await slidesApi.getSlideSummaries(projectId);
       set({ slides: response.data, loading: false });
     } catch (error: any) {
       console.error('Failed to fetch slides:', error);
@@ -24,9 +24,9 @@ export const useSlideStore = create<SlideState>((set, get) => ({
       const response = await slidesApi.createSlide(projectId, data);
       const newSlide = response.data;
 
-      set(state => ({
-        slides: [...state.slides, newSlide].sort((a, b) => a.index - b.index),
-      }));
+      // 排序键、内容大小和摘要由后端计算，重新读取摘要列表
+      const summaries = await slidesApi.getSlideSummaries(projectId);
+      set({ slides: summaries.data });
 
       toast.success('幻灯片创建成功');
       return newSlide;
@@ -41,11 +41,10 @@ export const useSlideStore = create<SlideState>((set, get) => ({
     try {
       await slidesApi.updateSlide(slideId, projectId, data);
 
-      set(state => ({
-        slides: state.slides.map(slide =>
-          slide.id === slideId ? { ...slide, ...data } : slide
-        ),
-      }));
+      if (data.html_content !== undefined) {
+        const summaries = await slidesApi.getSlideSummaries(projectId);
+        set({ slides: summaries.data });
+      }
 
       toast.success('幻灯片更新成功');
     } catch (error: any) {
@@ -81,12 +80,22 @@ export const useSlideStore = create<SlideState>((set, get) => ({
         }).sort((a, b) => a.index - b.index),
       }));
 
-      // Here you would typically call an API endpoint to persist the order
-      // For now, we'll just simulate success
+      await slidesApi.reorderSlides(projectId, slideOrders);
       toast.success('幻灯片重新排序成功');
     } catch (error: any) {
       toast.error('重新排序失败');
       throw error;
     }
   },
+
+  applyThumbnail: (event: ThumbnailReadyEvent) => {
+    // 缩略图在后台队列中渲染，完成后通过SSE推送地址
+    set(state => ({
+      slides: state.slides.map(slide =>
+        slide.id === event.slide_id
+          ? { ...slide, thumbnail_url: event.thumbnail_url, thumbnail_variants: event.thumbnail_variants }
+          : slide
+      ),
+    }));
+  },
 }));
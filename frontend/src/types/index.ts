@@ -28,12 +28,30 @@ export interface Slide {
   index: number;
   html_content: string;
   thumbnail_url?: string;
+  thumbnail_variants?: ThumbnailVariants | null;
   style_config: Record<string, any>;
   created_at: string;
   updated_at: string;
   assets?: SlideAsset[];
 }
 
+export interface SlideSummary {
+  id: string;
+  project_id: string;
+  index: number;
+  position: string;
+  content_hash?: string;
+  content_size?: number;
+  summary?: string;
+  thumbnail_url?: string;
+  thumbnail_variants?: ThumbnailVariants | null;
+  current_revision_id?: string;
+  updated_at: string;
+}
+
+// 缩略图变体 {"sidebar" | "grid" | "full": {"avif" | "webp": url}}
+export type ThumbnailVariants = Record<string, Record<string, string>>;
+
 export interface SlideAsset {
   id: string;
   slide_id: string;
@@ -123,10 +141,62 @@ export interface CreateConversationRequest {
 
 // EventSource Stream Types (formerly WebSocket)
 export interface AgentStreamMessage {
-  type: 'message' | 'tool_call_start' | 'tool_call_complete' | 'error';
+  type:
+    | 'message'
+    | 'tool_call_start'
+    | 'tool_call_complete'
+    | 'thumbnail_ready'
+    | 'deck_render_progress'
+    | 'deck_render_complete'
+    | 'export_progress'
+    | 'export_complete'
+    | 'error';
   data: any;
 }
 
+// 缩略图渲染完成事件（thumbnail_ready）
+export interface ThumbnailReadyEvent {
+  slide_id: string;
+  project_id: string;
+  index: number;
+  thumbnail_url: string;
+  thumbnail_variants?: ThumbnailVariants;
+}
+
+// 整套渲染中单页结果
+export interface DeckSlideImage {
+  slide_id: string;
+  index: number;
+  image_url: string;
+  thumbnail_url: string;
+  thumbnail_variants?: ThumbnailVariants;
+  cached: boolean;
+}
+
+// 整套渲染进度事件（deck_render_progress）
+export interface DeckRenderProgressEvent {
+  project_id: string;
+  done: number;
+  total: number;
+  slide: DeckSlideImage;
+}
+
+// PDF导出进度事件（export_progress）
+export interface ExportProgressEvent {
+  project_id: string;
+  done: number;
+  total: number;
+}
+
+// 导出完成事件（export_complete），url 需携带登录凭证下载
+export interface ExportCompleteEvent {
+  project_id: string;
+  format: 'pdf' | 'single' | 'zip';
+  pages: number;
+  size: number;
+  url: string;
+}
+
 export interface ToolCallData {
   tool: string;
   status?: string;
@@ -182,11 +252,13 @@ export interface AgentState {
 }
 
 export interface SlideState {
-  slides: Slide[];
+  // 列表只读取摘要列（不含整页HTML）
+  slides: SlideSummary[];
   loading: boolean;
   fetchSlides: (projectId: string) => Promise<void>;
   createSlide: (projectId: string, data: CreateSlideRequest) => Promise<Slide>;
   updateSlide: (slideId: string, projectId: string, data: UpdateSlideRequest) => Promise<void>;
   deleteSlide: (slideId: string, projectId: string) => Promise<void>;
   reorderSlides: (projectId: string, slideOrders: { id: string; index: number }[]) => Promise<void>;
+  applyThumbnail: (event: ThumbnailReadyEvent) => void;
 }